@@ -0,0 +1,438 @@
+# -*- coding: utf-8 -*-
+"""
+구조 계산 핫패스 벤치마크
+- 고정 시드로 만든 합성 보 일람표 / 기둥 하중표 (small / medium / tower)
+- 측정 항목: 캐스틸레이티드 보 검토 (check_beams), 개구부별 표 (opening_table),
+  지배 web-post / 좌굴 검토, 하중조합 포락 (castillated_loads),
+  합성보 검토 / 스터드 탐색 (castillated_composite), 보 1개 수정 후 재계산 (result_cache),
+  형상 스윕 저장소 조회 / Pareto front (castillated_store),
+  PDF 계산서 생성,
+  tw/tf 범위 최적 단면 탐색 (kcol_section_finder), P-M-M 곡면 조회 (kcol_pmm_surface),
+  BOQ 집계 (kcol_boq)
+- 항목별 p50 / p95 지연 시간과 처리량 (보 또는 기둥 수 / s) 출력
+- 결과를 JSON 기준값으로 저장하고, 기준값보다 p50 이 threshold 이상 느려지면 종료 코드 1
+
+사용법:
+    python castillated_bench.py                                   # small, medium
+    python castillated_bench.py --sizes small,medium,tower --repeat 10
+    python castillated_bench.py --save-baseline bench_baseline.json
+    python castillated_bench.py --compare bench_baseline.json --threshold 0.2
+    python castillated_bench.py --cases beam_check,section_search --sizes tower
+
+PDF 항목은 reportlab / pandas / NanumGothic 폰트가 있을 때만 측정합니다.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+from castillated_composite import check_composite, framing_arrays
+from castillated_core import CastellatedBeamDesign, check_beams, governing_web_post, opening_table
+from castillated_loads import Load, LoadEnvelope
+from castillated_store import sweep_to_store
+from kcol_boq import ColumnBOQ, build_report
+from kcol_pmm_surface import PMMSurface
+from result_cache import ResultCache, cached_check_beams
+from kcol_section_finder import DEFAULT_KZ, DEFAULT_TW_RANGE, DEFAULT_TF_RANGE, run
+
+SEED = 20261018
+BASELINE_VERSION = 1
+
+DEFAULT_SIZES = ("small", "medium")
+DEFAULT_REPEAT = 5
+DEFAULT_WARMUP = 1
+DEFAULT_THRESHOLD = 0.20            # p50 이 기준값보다 20% 이상 느려지면 회귀
+MIN_SAMPLE_TIME = 0.005             # s, 이보다 짧은 항목은 여러 번 실행한 평균을 샘플 1개로 사용
+
+
+# ---------------------------------------------------------------------
+# 1. 합성 입력 (고정 시드)
+# ---------------------------------------------------------------------
+@dataclass(frozen=True)
+class BenchSize:
+    """벤치마크 규모: 보 수, 기둥 하중 행 수, PDF 계산서 수"""
+
+    beams: int
+    columns: int
+    pdfs: int
+
+
+SIZES = {
+    "small": BenchSize(beams=20, columns=100, pdfs=3),
+    "medium": BenchSize(beams=500, columns=2000, pdfs=10),
+    "tower": BenchSize(beams=5000, columns=20000, pdfs=30),
+}
+
+# 실제 일람표처럼 층고 / 유효길이 계수는 몇 가지 값만 반복
+STOREY_HEIGHTS = (3.6, 4.0, 4.5, 5.2, 6.0)
+K_FACTORS = (1.0, 1.0, 1.0, 0.8, 1.2)
+
+
+def beam_schedule(n, seed=SEED):
+    """합성 보 일람표 [(mark, 입력값 dict), ...] (castillated_report.load_schedule 과 같은 형식)"""
+    rng = np.random.default_rng(seed)
+    L = rng.choice(np.arange(9.0, 18.01, 0.5), n)
+    DL = rng.uniform(5.0, 10.0, n).round(1)
+    LL = rng.uniform(3.0, 8.0, n).round(1)
+    e = rng.choice([150.0, 175.0, 200.0, 225.0, 250.0], n)
+    p = rng.choice([0.8, 0.9, 1.0], n)
+    ho = rng.choice([0.5, 0.55, 0.6], n)
+    return [
+        (f"CB{i + 1}", dict(L=float(L[i]), DL=float(DL[i]), LL=float(LL[i]), e=float(e[i]),
+                            p=float(p[i]), ho=float(ho[i])))
+        for i in range(n)
+    ]
+
+
+def schedule_arrays(schedule):
+    """일람표 → check_beams 입력 배열 dict (보 배치 차원으로 이어 붙임)"""
+    per_beam = [CastellatedBeamDesign(**inp).arrays() for _, inp in schedule]
+    return {n: np.concatenate([a[n] for a in per_beam]) for n in per_beam[0]}
+
+
+def column_loads(n, seed=SEED):
+    """합성 기둥 하중표 (kcol_section_finder.iter_load_rows 와 같은 행 dict)"""
+    rng = np.random.default_rng(seed + 1)
+    pu = rng.uniform(500.0, 15000.0, n).round(1)
+    mux = rng.uniform(0.0, 900.0, n).round(1)
+    muy = rng.uniform(0.0, 300.0, n).round(1)
+    height = rng.choice(STOREY_HEIGHTS, n)
+    k = rng.choice(K_FACTORS, n)
+    return [
+        {"no": i + 1, "name": f"KC{i % 200 + 1}", "pu": float(pu[i]), "mux": float(mux[i]),
+         "muy": float(muy[i]), "lx": float(height[i]), "ly": float(height[i]),
+         "kx": float(k[i]), "ky": float(k[i])}
+        for i in range(n)
+    ]
+
+
+def column_counts(rows):
+    """기둥명 → (Type1..4 개수), BOQ 집계용"""
+    return {row["name"]: (1 + row["no"] % 3, row["no"] % 2, 0, 1) for row in rows}
+
+
+# ---------------------------------------------------------------------
+# 2. 측정 항목
+# ---------------------------------------------------------------------
+class SkipCase(Exception):
+    """이 환경에서 측정할 수 없는 항목"""
+
+
+# 각 항목은 (size) → (측정 함수, 측정 1회당 처리 개수, 단위) 를 반환합니다.
+# 측정 함수는 호출 1회가 샘플 1개이며, 인자 없이 반복 호출할 수 있어야 합니다.
+def case_beam_check(size):
+    arrays = schedule_arrays(beam_schedule(size.beams))
+    return (lambda: check_beams(**arrays)), size.beams, "beam"
+
+
+def case_opening_table(size):
+    result = check_beams(**schedule_arrays(beam_schedule(size.beams)))
+    i = result.inputs
+
+    def body():
+        return opening_table(i["L"], result.wu, i["p"], i["end_post"], result.n_openings,
+                             i["d_eff"], i["e"], i["phiPn"], i["phiMn"])
+    return body, size.beams, "beam"
+
+
+def case_web_post(size):
+    """지배 web-post 탐색 + DG31 좌굴 검토 (check_beams 와 같은 식)"""
+    result = check_beams(**schedule_arrays(beam_schedule(size.beams)))
+    i = result.inputs
+
+    def body():
+        Vrh, _ = governing_web_post(i["L"], result.wu, i["p"], i["end_post"], result.n_openings, i["d_eff"])
+        return Vrh * i["h_top"] <= result.phiMocr
+    return body, size.beams, "beam"
+
+
+def case_envelope(size):
+    """보마다 작은보 집중하중 2개 (D, L) + 등분포 D, L 의 기본 하중조합 포락 검토"""
+    schedule = beam_schedule(size.beams)
+    arrays = schedule_arrays(schedule)
+    loads = [[Load("D", "point", 40.0, a=inp["L"] / 3), Load("L", "point", 25.0, a=inp["L"] / 3),
+              Load("D", "point", 40.0, a=inp["L"] * 2 / 3), Load("L", "point", 25.0, a=inp["L"] * 2 / 3)]
+             for _, inp in schedule]
+    return (lambda: LoadEnvelope(arrays, loads).check()), size.beams, "beam"
+
+
+def case_composite(size):
+    """합성보 시공/합성 단계 검토 + 최소 스터드 탐색"""
+    arrays = framing_arrays(beam_schedule(size.beams))
+    return (lambda: check_composite(**arrays)), size.beams, "beam"
+
+
+def case_result_cache(size):
+    """결과 캐시를 채운 뒤 매번 보 1개의 활하중만 바꿔 일람표 전체 재계산 (처리량 = 일람표 보 수)"""
+    schedule = beam_schedule(size.beams)
+    out_dir = tempfile.mkdtemp(prefix="castillated_bench_")
+    atexit.register(shutil.rmtree, out_dir, ignore_errors=True)
+    cache = ResultCache(os.path.join(out_dir, "cache.sqlite"))
+    atexit.register(cache.close)
+    cached_check_beams(schedule, cache)
+    state = {"k": 0}
+
+    def body():
+        state["k"] += 1
+        mark, inputs = schedule[0]
+        edited = [(mark, {**inputs, "LL": inputs["LL"] + state["k"] * 0.01})] + schedule[1:]
+        return cached_check_beams(edited, cache)
+    return body, size.beams, "beam"
+
+
+def case_sweep_query(size):
+    """메모리 맵 스윕 저장소 (보 수 × 약 100 행) 의 조건 조회 + 중량-UR Pareto front"""
+    out_dir = tempfile.mkdtemp(prefix="castillated_bench_")
+    atexit.register(shutil.rmtree, out_dir, ignore_errors=True)
+    n_e = max(2, size.beams // 10)
+    store = sweep_to_store(os.path.join(out_dir, "sweep"), spans=(12.0, 15.0), e=np.linspace(150.0, 300.0, n_e),
+                           p=(0.8, 0.9, 1.0), ho=(0.5, 0.55, 0.6), theta=(45.0, 60.0), end_post=(0.6, 0.9),
+                           workers=1)
+
+    def body():
+        store.query(ur_max=0.9, buckling_ok=True, w_max=6.0, sort="weight", limit=20)
+        return store.pareto(ur_max=1.0)
+    return body, len(store), "row"
+
+
+def case_pdf(size):
+    """보 1개 계산서 PDF (샘플 = 계산서 1부)"""
+    try:
+        from castillated_report import build_pdf, get_styles
+        get_styles()
+    except (ImportError, OSError) as e:
+        raise SkipCase(f"PDF 생성 불가 ({e})")
+
+    schedule = beam_schedule(size.pdfs)
+    out_dir = tempfile.mkdtemp(prefix="castillated_bench_")
+    atexit.register(shutil.rmtree, out_dir, ignore_errors=True)
+    state = {"k": 0}
+
+    def body():
+        k = state["k"] % len(schedule)
+        state["k"] += 1
+        mark, inputs = schedule[k]
+        design = CastellatedBeamDesign(**inputs)
+        return build_pdf(design, design.check(), os.path.join(out_dir, f"{mark}.pdf"), mark=mark)
+    return body, 1, "pdf"
+
+
+def case_section_search(size):
+    """기둥 하중표 전체의 최적 단면 탐색 (단일 프로세스, 매번 새 성능 캐시)"""
+    rows = column_loads(size.columns)
+    return (lambda: run(rows, DEFAULT_TW_RANGE, DEFAULT_TF_RANGE, workers=1)), size.columns, "column"
+
+
+def case_pmm_check(size):
+    """기둥 하중표 전체를 후보 단면에 고루 배정하여 P-M-M 상관 곡면으로 검토 (곡면 생성은 제외)"""
+    rows = column_loads(size.columns)
+    surface = PMMSurface.build(k_sets=[(k, k, DEFAULT_KZ) for k in sorted(set(K_FACTORS))])
+    section = np.arange(len(rows)) % len(surface)
+    return (lambda: surface.check_rows(section, rows)), size.columns, "column"
+
+
+def case_boq(size):
+    rows = column_loads(size.columns)
+    results = run(rows, workers=1)
+    counts = column_counts(rows)
+    return (lambda: build_report(ColumnBOQ(counts).extend(results))), size.columns, "column"
+
+
+CASES = {
+    "beam_check": case_beam_check,
+    "opening_table": case_opening_table,
+    "web_post": case_web_post,
+    "envelope": case_envelope,
+    "composite": case_composite,
+    "result_cache": case_result_cache,
+    "sweep_query": case_sweep_query,
+    "pdf": case_pdf,
+    "section_search": case_section_search,
+    "pmm_check": case_pmm_check,
+    "boq": case_boq,
+}
+
+
+# ---------------------------------------------------------------------
+# 3. 측정 / 통계
+# ---------------------------------------------------------------------
+def calibrate(body, min_time=MIN_SAMPLE_TIME):
+    """샘플 1개가 min_time 이상이 되도록 하는 반복 횟수 (1, 2, 5, 10, 20, ...)
+
+    1 ms 미만의 배열 연산은 타이머 / 스케줄러 잡음이 커서 그대로 재면 p95 가 흔들리므로
+    여러 번 실행한 평균을 샘플 1개로 사용합니다.
+    """
+    loops = 1
+    while True:
+        for factor in (1, 2, 5):
+            n = loops * factor
+            start = time.perf_counter()
+            for _ in range(n):
+                body()
+            if time.perf_counter() - start >= min_time:
+                return n
+        loops *= 10
+
+
+def measure(body, repeat, warmup, loops=1):
+    """body() 를 warmup 회 실행한 뒤 repeat 개 샘플 측정 → 호출 1회당 소요 시간 목록 (s)"""
+    for _ in range(warmup):
+        body()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            body()
+        samples.append((time.perf_counter() - start) / loops)
+    return samples
+
+
+def summarize(samples, items, unit):
+    """샘플 (s) → p50 / p95 / 평균 (ms), 처리량 (unit / s, p50 기준)"""
+    s = np.asarray(samples) * 1000.0
+    p50 = float(np.percentile(s, 50))
+    return {
+        "unit": unit,
+        "items": items,
+        "samples": len(samples),
+        "p50_ms": p50,
+        "p95_ms": float(np.percentile(s, 95)),
+        "mean_ms": float(s.mean()),
+        "throughput": items / (p50 / 1000.0) if p50 > 0 else float("inf"),
+    }
+
+
+def run_bench(sizes, cases, repeat=DEFAULT_REPEAT, warmup=DEFAULT_WARMUP, log=print):
+    """{'size/case': 통계 dict} (측정할 수 없는 항목은 제외)"""
+    results = {}
+    for size_name in sizes:
+        size = SIZES[size_name]
+        for case in cases:
+            key = f"{size_name}/{case}"
+            try:
+                body, items, unit = CASES[case](size)
+            except SkipCase as e:
+                log(f"   ⏭️  {key}: {e}")
+                continue
+            # PDF 는 계산서 1부가 샘플 1개이므로 준비된 계산서 수만큼 측정
+            if case == "pdf":
+                samples = measure(body, max(repeat, size.pdfs), warmup)
+            else:
+                samples = measure(body, repeat, warmup, calibrate(body))
+            results[key] = stats = summarize(samples, items, unit)
+            log(f"   {key:<24} p50 {stats['p50_ms']:9.2f} ms  p95 {stats['p95_ms']:9.2f} ms  "
+                f"{stats['throughput']:12,.0f} {unit}/s")
+    return results
+
+
+# ---------------------------------------------------------------------
+# 4. 기준값 저장 / 비교
+# ---------------------------------------------------------------------
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_baseline(results, path, repeat):
+    data = {
+        "version": BASELINE_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "seed": SEED,
+        "repeat": repeat,
+        "environment": environment(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def load_baseline(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"지원하지 않는 기준값 형식: version {data.get('version')}")
+    return data
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """기준값과 p50 비교 → [(key, 기준 ms, 현재 ms, 변화율, 회귀 여부), ...]
+
+    기준값 또는 현재 결과 한쪽에만 있는 항목은 비교하지 않습니다.
+    """
+    rows = []
+    for key, stats in results.items():
+        base = baseline["results"].get(key)
+        if not base:
+            continue
+        change = stats["p50_ms"] / base["p50_ms"] - 1.0 if base["p50_ms"] > 0 else 0.0
+        rows.append((key, base["p50_ms"], stats["p50_ms"], change, change > threshold))
+    return rows
+
+
+def parse_list(spec, choices, what):
+    values = [s.strip() for s in spec.split(",") if s.strip()]
+    unknown = [v for v in values if v not in choices]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"알 수 없는 {what}: {', '.join(unknown)} (가능: {', '.join(choices)})")
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="구조 계산 핫패스 벤치마크")
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES),
+                        type=lambda s: parse_list(s, SIZES, "규모"), help="small,medium,tower")
+    parser.add_argument("--cases", default=",".join(CASES),
+                        type=lambda s: parse_list(s, CASES, "항목"), help=",".join(CASES))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="항목별 측정 횟수")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--save-baseline", default=None, help="결과를 기준값 JSON 으로 저장")
+    parser.add_argument("--compare", default=None, help="기준값 JSON 과 비교 (회귀 시 종료 코드 1)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="허용 p50 증가율 (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    env = environment()
+    print(f"⏱️  벤치마크: {', '.join(args.sizes)} / 측정 {args.repeat}회 "
+          f"(Python {env['python']}, NumPy {env['numpy']}, CPU {env['cpu_count']})")
+    results = run_bench(args.sizes, args.cases, args.repeat, args.warmup)
+
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline, args.repeat)
+        print(f"💾 기준값 저장: {args.save_baseline}")
+
+    if not args.compare:
+        return
+
+    baseline = load_baseline(args.compare)
+    if baseline.get("environment") != env:
+        print("⚠️  기준값과 측정 환경이 다릅니다. 같은 장비에서 만든 기준값과 비교하세요.")
+    rows = compare(results, baseline, args.threshold)
+    print(f"📊 기준값 비교 ({args.compare}, 허용 +{args.threshold:.0%})")
+    for key, base, now, change, regressed in rows:
+        mark = "❌" if regressed else "✅"
+        print(f"   {mark} {key:<24} {base:9.2f} → {now:9.2f} ms ({change:+.1%})")
+
+    regressions = [r for r in rows if r[4]]
+    if regressions:
+        print(f"❌ 성능 회귀 {len(regressions)}건")
+        sys.exit(1)
+    print(f"✅ 회귀 없음 ({len(rows)}개 항목)")
+
+
+if __name__ == "__main__":
+    main()
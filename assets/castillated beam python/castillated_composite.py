@@ -0,0 +1,434 @@
+# -*- coding: utf-8 -*-
+"""
+합성 캐스틸레이티드 보 배치 검토 (AISC 360 Chapter I / AISC DG31)
+- COMPOSITE_CASTELLATED_BEAM_DESIGN.md 의 검토식을 castillated_core 위에 배열 연산으로 구현
+- 소성중립축 (PNA) 과 탄성중립축은 보 배치 전체에 대해 닫힌 식으로 계산 (반복 계산 없음)
+- 시공 단계 (강재 단면만) / 합성 단계 (합성 휨 + 기존 Vierendeel·web-post 검토) 를 함께 검토
+- 스터드 열수 × 개수를 스윕하여 부분합성으로 휨/처짐을 만족하는 최소 스터드 개수를
+  보마다 이분 탐색 (모든 보를 한 번에)
+
+    from castillated_composite import CompositeBeamDesign
+
+    design = CompositeBeamDesign(L=[12.0, 13.5, 15.0], LL=[10.5, 10.5, 12.0], ts=135)
+    res = design.check()
+    res.n_studs, res.stud_spacing, res.UR_flex, res.ok
+
+사용법:
+    python castillated_composite.py
+    python castillated_composite.py --L 15 --LL 12 --ts 150 --spacing 3.0 --rows 1,2
+    python castillated_composite.py --schedule framing.csv --out composite_result.csv
+
+일람표 컬럼: mark (부재 마크) + CompositeBeamDesign 필드명 (L, DL, LL, ts, spacing, fc, ...)
+"""
+
+import argparse
+import csv
+import json
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+
+import numpy as np
+
+from castillated_core import CastellatedBeamDesign, CastellatedBeamResult, PHI_B, check_beams, tee_properties
+
+E_STEEL = 200000.0                  # MPa (합성보 계산기와 같은 값)
+
+DEFAULT_ROWS = (1, 2)               # 스윕할 스터드 열수
+MAX_STUD_SPACING = 900.0            # mm (8·ts 와 중 작은 값)
+LL_DEFLECTION_RATIO = 360.0         # 활하중 처짐 한계 L/360
+CONSTRUCTION_DEFLECTION_LIMIT = 60.0  # mm (콘크리트 타설 시 처짐 한계, 계산기와 같은 값)
+MIN_COMPOSITE_RATIO = 0.25          # ΣQn / Cf 하한 (AISC Commentary I3.2d)
+
+PNA_LOCATIONS = ("슬래브", "강재 플랜지", "강재 웹")
+
+STEEL_FIELDS = tuple(f.name for f in fields(CastellatedBeamDesign))
+
+
+# ---------------------------------------------------------------------
+# 1. 입력값
+# ---------------------------------------------------------------------
+@dataclass
+class CompositeBeamDesign(CastellatedBeamDesign):
+    """합성 캐스틸레이티드 보 입력값 (CastellatedBeamDesign + 슬래브 / 스터드).
+
+    DL 은 슬래브 자중을 포함한 고정하중 (합성보 계산기와 같음), LL 은 활하중 선하중입니다.
+    단위: ts, hr, stud_d [mm] / beff, spacing [m] / fc, stud_fu, Es [MPa] / q_const [kN/m²]
+    """
+
+    ts: float = 135.0                   # mm (슬래브 전체 두께, 데크 골 포함)
+    hr: float = 0.0                     # mm (데크플레이트 골 높이, 0 = 평슬래브)
+    spacing: float = 3.0                # m (보 간격 = 하중 폭)
+    beff: float = None                  # m (None 이면 min(L/4, 보 간격), AISC I3.1a)
+    fc: float = 24.0                    # MPa
+
+    q_const: float = 1.0                # kN/m² (시공하중)
+    DL_const: float = None              # kN/m (시공 중 고정하중, None 이면 DL)
+
+    stud_d: float = 19.0                # mm
+    stud_fu: float = 400.0              # MPa
+    Rg: float = 1.0
+    Rp: float = 1.0
+
+    Es: float = E_STEEL
+
+    def arrays(self):
+        out = super().arrays()
+        if "beff" not in out:
+            out["beff"] = np.minimum(out["L"] / 4.0, out["spacing"])
+        if "DL_const" not in out:
+            out["DL_const"] = out["DL"]
+        return out
+
+    def check(self, rows=DEFAULT_ROWS, ur_limit=1.0):
+        """시공/합성 단계 검토 + 최소 스터드 개수 탐색"""
+        return check_composite(**self.arrays(), rows=rows, ur_limit=ur_limit)
+
+
+@dataclass
+class CompositeBeamResult:
+    """합성보 배치 검토 결과 (모든 필드는 보 배치 차원의 배열)"""
+
+    steel: CastellatedBeamResult = field(repr=False)         # 합성 단계 하중의 개구부/web-post 검토
+    construction: CastellatedBeamResult = field(repr=False)  # 시공 단계 하중의 개구부/web-post 검토
+
+    # 단면
+    beff: np.ndarray                    # m
+    n_mod: np.ndarray                   # Es / Ec
+    A_net: np.ndarray                   # mm² (개구부 위치 순단면)
+    I_net: np.ndarray                   # mm⁴
+    Cf: np.ndarray                      # kN (완전합성 압축력 min(0.85·fc·beff·tc, As·Fy))
+    Qn: np.ndarray                      # kN (스터드 1개 공칭강도)
+
+    # 시공 단계 (강재 단면만)
+    wu_const: np.ndarray                # kN/m
+    UR_const: np.ndarray                # 휨 Mu / φMn_steel
+    delta_const: np.ndarray             # mm
+    construction_ok: np.ndarray
+
+    # 스터드 (반경간 = 최대 모멘트 위치 ~ 지점)
+    stud_rows: np.ndarray
+    studs_half: np.ndarray              # 반경간 스터드 열 위치 수 (0 = 만족하는 배치 없음)
+    n_studs: np.ndarray                 # 전 경간 스터드 총 개수
+    stud_spacing: np.ndarray            # mm
+    sum_Qn: np.ndarray                  # kN
+    composite_ratio: np.ndarray         # ΣQn / Cf (≤ 1)
+
+    # 합성 단계
+    pna_location: np.ndarray            # PNA_LOCATIONS 인덱스
+    y_pna: np.ndarray                   # mm (슬래브 상단 기준)
+    Mn: np.ndarray                      # kN·m
+    phiMn: np.ndarray
+    UR_flex: np.ndarray
+    y_ena: np.ndarray                   # mm (슬래브 상단 기준, 변환단면)
+    I_tr: np.ndarray                    # mm⁴
+    I_eff: np.ndarray                   # mm⁴ (부분합성 유효 단면2차모멘트)
+    delta_LL: np.ndarray                # mm
+    deflection_ok: np.ndarray
+
+    ok: np.ndarray
+
+    def __len__(self):
+        return len(self.beff)
+
+
+# ---------------------------------------------------------------------
+# 2. 단면 / 재료
+# ---------------------------------------------------------------------
+def stud_strength(stud_d, stud_fu, fc, Rg, Rp):
+    """(Ec MPa, 스터드 1개 Qn kN) - Qn = min(0.5·Asc·√(fc·Ec), Asc·Fu)·Rg·Rp (AISC I8.2a)"""
+    Ec = 4700.0 * np.sqrt(fc)
+    Asc = np.pi * stud_d ** 2 / 4.0
+    Qn = np.minimum(0.5 * Asc * np.sqrt(fc * Ec), Asc * stud_fu) * Rg * Rp / 1000.0
+    return Ec, Qn
+
+
+def net_section(dc, bf, tf, tw, ho, Fy):
+    """개구부 위치 순단면 (상·하 Tee) → A, I (중립축 = 보 춤 중앙), Tee 춤 dt (mm)"""
+    tee = tee_properties(dc, bf, tf, tw, ho, Fy)
+    dt = (dc - ho) * 1000.0 / 2.0
+    I_tee = tee["S"] * (dt - tee["ybar"])
+    arm = dc * 1000.0 / 2.0 - tee["ybar"]
+    return {"A": 2.0 * tee["A"], "I": 2.0 * (I_tee + tee["A"] * arm ** 2), "dt": dt}
+
+
+def compression_block(Ac, bf, tf, tw):
+    """상부 Tee 상단부터 면적 Ac 만큼의 압축 영역 → (깊이 yp, 강재 상단 기준 1차 모멘트) mm
+
+    Ac ≤ A_tee 이므로 압축 영역은 항상 상부 Tee (플랜지 또는 stem) 안에 있습니다.
+    """
+    Af = bf * tf
+    in_flange = Ac <= Af
+    yp = np.where(in_flange, Ac / bf, tf + (Ac - Af) / tw)
+    Q = np.where(in_flange, bf * yp ** 2 / 2.0,
+                 Af * tf / 2.0 + tw * (yp - tf) * (yp + tf) / 2.0)
+    return yp, Q
+
+
+def plastic_moment(C, A, dc_mm, ts, fc, beff_mm, Fy, bf, tf, tw):
+    """슬래브 압축력 C (N) 에서의 합성 소성 모멘트 (닫힌 식)
+
+    강재 압축력 Cs = (As·Fy - C) / 2 (힘의 평형), 압축 영역은 compression_block 으로 구함.
+    → (Mn N·mm, PNA 위치 인덱스, y_pna 슬래브 상단 기준 mm)
+    """
+    a = C / (0.85 * fc * beff_mm)                           # 콘크리트 압축 블록 깊이
+    Cs = np.maximum(A * Fy - C, 0.0) / 2.0
+    Ac = Cs / Fy
+    yp, Qc = compression_block(Ac, bf, tf, tw)
+
+    # 압축 / 인장 강재 합력 위치 (강재 상단 기준, 순단면은 상하 대칭 → 1차 모멘트 = A·dc/2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y_c = np.where(Ac > 0, Qc / np.where(Ac > 0, Ac, 1.0), 0.0)
+    y_t = (A * dc_mm / 2.0 - Qc) / (A - Ac)
+
+    Mn = C * (ts - a / 2.0 + y_t) + Cs * (y_t - y_c)
+    in_steel = Cs > 0
+    location = np.where(in_steel, np.where(yp <= tf, 1, 2), 0)
+    y_pna = np.where(in_steel, ts + yp, a)
+    return Mn, location, y_pna
+
+
+def transformed_section(A, I, dc_mm, ts, hr, beff_mm, n_mod):
+    """완전합성 변환단면 (콘크리트 인장부 무시) → (탄성중립축 y 슬래브 상단 기준, I_tr) mm
+
+    중립축이 데크 위 콘크리트 (tc = ts - hr) 안이면 b·y²/2 = As·(D - y) 의 근으로,
+    아래면 콘크리트 전체를 유효 단면으로 계산합니다.
+    """
+    b = beff_mm / n_mod
+    tc = ts - hr
+    D = ts + dc_mm / 2.0                                    # 강재 도심 깊이
+    Act = b * tc
+
+    y_full = (Act * tc / 2.0 + A * D) / (Act + A)
+    y_crack = (-A + np.sqrt(A ** 2 + 2.0 * b * A * D)) / b
+    cracked = y_full < tc
+    y = np.where(cracked, y_crack, y_full)
+
+    I_conc = np.where(cracked, b * y ** 3 / 3.0, b * tc ** 3 / 12.0 + Act * (y - tc / 2.0) ** 2)
+    return y, I_conc + I + A * (D - y) ** 2
+
+
+def deflection(w, L, Es, I):
+    """등분포 단순보 중앙 처짐 5wL⁴ / 384EI (w kN/m, L m, I mm⁴) → mm"""
+    return 5.0 * w * (L * 1000.0) ** 4 / (384.0 * Es * I)
+
+
+# ---------------------------------------------------------------------
+# 3. 단계별 검토
+# ---------------------------------------------------------------------
+def steel_check(steel, wu):
+    """계수하중 wu (kN/m) 로 castillated_core 검토 (개구부 / web-post / 용접)
+
+    check_beams 는 wu = 1.2·(DL + self_w) + 1.6·LL 로 계산하므로 DL = wu / 1.2 로 넘깁니다.
+    """
+    zero = np.zeros_like(wu)
+    return check_beams(**{**steel, "DL": wu / 1.2, "self_w": zero, "LL": zero})
+
+
+def composite_state(sum_Qn, sec, i, Cf, I_tr):
+    """ΣQn (kN) 에서의 부분합성 휨강도 / 유효 단면2차모멘트"""
+    C = np.minimum(sum_Qn, Cf) * 1000.0
+    Mn, location, y_pna = plastic_moment(C, sec["A"], i["dc"] * 1000.0, i["ts"], i["fc"], i["beff"] * 1000.0,
+                                         i["Fy"], i["bf"], i["tf"], i["tw"])
+    ratio = np.minimum(sum_Qn / Cf, 1.0)
+    I_eff = sec["I"] + np.sqrt(ratio) * (I_tr - sec["I"])  # AISC Commentary I3.2 (C-I3-4)
+    return Mn / 1e6, location, y_pna, ratio, I_eff
+
+
+def minimum_studs(passes, m_lo, m_hi):
+    """passes(m) 가 m 에 대해 단조 (한 번 만족하면 계속 만족) 일 때 보별 최소 m (배열 이분 탐색)
+
+    m_lo ~ m_hi 구간에서 만족하는 m 이 없으면 0.
+    """
+    ok_hi = (m_hi >= m_lo) & passes(np.maximum(m_hi, m_lo))
+    lo = m_lo - 1                                           # 항상 불만족으로 취급
+    hi = np.where(ok_hi, m_hi, lo)
+    while np.any(hi - lo > 1):
+        mid = np.where(hi - lo > 1, (lo + hi) // 2, hi)
+        ok = passes(np.maximum(mid, m_lo))
+        hi = np.where(ok, mid, hi)
+        lo = np.where(ok, lo, mid)
+    return np.where(ok_hi, hi, 0)
+
+
+def check_composite(rows=DEFAULT_ROWS, ur_limit=1.0, ratio_min=MIN_COMPOSITE_RATIO, **i):
+    """1차원 배열 입력 (CompositeBeamDesign.arrays()) 에 대한 시공/합성 단계 검토
+
+    스터드는 열수 rows 별로 반경간 위치 수 m 을 이분 탐색 (s_min = 6d ≤ L/2m ≤ s_max) 하고,
+    총 개수가 가장 적은 열수를 택합니다 (동률이면 열수가 적은 쪽).
+    """
+    steel = {n: i[n] for n in STEEL_FIELDS}
+    L, Fy, Es = i["L"], i["Fy"], i["Es"]
+    sec = net_section(i["dc"], i["bf"], i["tf"], i["tw"], i["ho"], Fy)
+
+    # 시공 단계: 강재 단면만, wu = max(1.4D, 1.2D + 1.6C)
+    w_dc = i["DL_const"] + i["self_w"]
+    wu_const = np.maximum(1.4 * w_dc, 1.2 * w_dc + 1.6 * i["q_const"] * i["spacing"])
+    construction = steel_check(steel, wu_const)
+    Mn_steel = sec["A"] / 2.0 * Fy * i["d_eff"] / 1000.0   # 상·하 Tee 전소성 (kN·m)
+    UR_const = wu_const * L ** 2 / 8.0 / (PHI_B * Mn_steel)
+    delta_const = deflection(w_dc, L, Es, sec["I"])
+    construction_ok = ((UR_const <= ur_limit) & (construction.UR_gov <= ur_limit)
+                       & construction.buckling_ok & (delta_const <= CONSTRUCTION_DEFLECTION_LIMIT))
+
+    # 합성 단면
+    Ec, Qn = stud_strength(i["stud_d"], i["stud_fu"], i["fc"], i["Rg"], i["Rp"])
+    n_mod = Es / Ec
+    tc = i["ts"] - i["hr"]
+    Cf = np.minimum(0.85 * i["fc"] * i["beff"] * 1000.0 * tc, sec["A"] * Fy) / 1000.0
+    y_ena, I_tr = transformed_section(sec["A"], sec["I"], i["dc"] * 1000.0, i["ts"], i["hr"],
+                                      i["beff"] * 1000.0, n_mod)
+
+    comp = check_beams(**steel)
+    Mu = comp.wu * L ** 2 / 8.0
+    delta_limit = L * 1000.0 / LL_DEFLECTION_RATIO
+
+    # 스터드 스윕: 열수별 최소 반경간 위치 수
+    half = L * 1000.0 / 2.0
+    s_min = 6.0 * i["stud_d"]
+    s_max = np.minimum(8.0 * i["ts"], MAX_STUD_SPACING)
+    m_lo = np.maximum(np.ceil(half / s_max), 1).astype(int)
+    m_max = np.floor(half / s_min).astype(int)
+
+    best_m = np.zeros(len(L), dtype=int)
+    best_rows = np.zeros(len(L), dtype=int)
+    best_total = np.full(len(L), np.inf)
+    for r in sorted(rows):
+        def passes(m):
+            sum_Qn = m * r * Qn
+            Mn, _, _, ratio, I_eff = composite_state(sum_Qn, sec, i, Cf, I_tr)
+            return ((Mu <= ur_limit * PHI_B * Mn) & (ratio >= ratio_min)
+                    & (deflection(i["LL"], L, Es, I_eff) <= delta_limit))
+
+        # 완전합성 이상의 스터드는 강도를 늘리지 않으므로 탐색 상한
+        m_full = np.maximum(np.ceil(Cf / (r * Qn)), m_lo).astype(int)
+        m = minimum_studs(passes, m_lo, np.minimum(m_max, m_full))
+        total = np.where(m > 0, 2 * m * r, np.inf)
+        better = total < best_total
+        best_m = np.where(better, m, best_m)
+        best_rows = np.where(better, r, best_rows)
+        best_total = np.where(better, total, best_total)
+
+    # 선택 배치 (만족하는 배치가 없으면 최대 배치로 검토 결과 표시)
+    found = best_m > 0
+    rows_out = np.where(found, best_rows, max(rows))
+    m_out = np.where(found, best_m, np.maximum(m_max, 1))
+    sum_Qn = m_out * rows_out * Qn
+    Mn, location, y_pna, ratio, I_eff = composite_state(sum_Qn, sec, i, Cf, I_tr)
+    phiMn = PHI_B * Mn
+    UR_flex = Mu / phiMn
+    delta_LL = deflection(i["LL"], L, Es, I_eff)
+    deflection_ok = delta_LL <= delta_limit
+
+    ok = (found & construction_ok & (UR_flex <= ur_limit) & deflection_ok
+          & (comp.UR_gov <= ur_limit) & comp.buckling_ok)
+
+    return CompositeBeamResult(
+        steel=comp, construction=construction,
+        beff=i["beff"], n_mod=n_mod, A_net=sec["A"], I_net=sec["I"], Cf=Cf, Qn=Qn,
+        wu_const=wu_const, UR_const=UR_const, delta_const=delta_const, construction_ok=construction_ok,
+        stud_rows=np.where(found, rows_out, 0), studs_half=np.where(found, m_out, 0),
+        n_studs=np.where(found, 2 * m_out * rows_out, 0), stud_spacing=np.where(found, half / m_out, np.nan),
+        sum_Qn=sum_Qn, composite_ratio=ratio,
+        pna_location=location, y_pna=y_pna, Mn=Mn, phiMn=phiMn, UR_flex=UR_flex,
+        y_ena=y_ena, I_tr=I_tr, I_eff=I_eff, delta_LL=delta_LL, deflection_ok=deflection_ok,
+        ok=ok,
+    )
+
+
+# ---------------------------------------------------------------------
+# 4. 일람표 입출력
+# ---------------------------------------------------------------------
+DESIGN_FIELDS = {f.name for f in fields(CompositeBeamDesign)}
+
+RESULT_COLUMNS = ["mark", "L (m)", "스터드 열수", "스터드 총 개수", "스터드 간격 (mm)", "ΣQn/Cf", "PNA",
+                  "φMn (kN·m)", "UR 휨", "UR 개구부", "web-post", "처짐 LL (mm)", "UR 시공", "판정"]
+
+
+def load_framing(path):
+    """보 일람표 (CSV 또는 JSON 배열) → [(mark, 입력값 dict), ...]"""
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+
+    schedule = []
+    for k, row in enumerate(rows, start=1):
+        mark = str(row.get("mark") or f"B{k}").strip()
+        inputs = {n: float(v) for n, v in row.items() if n in DESIGN_FIELDS and v not in ("", None)}
+        schedule.append((mark, inputs))
+    return schedule
+
+
+def framing_arrays(schedule):
+    """일람표 → check_composite 입력 배열 dict (보 배치 차원으로 이어 붙임)"""
+    per_beam = [CompositeBeamDesign(**inp).arrays() for _, inp in schedule]
+    return {n: np.concatenate([a[n] for a in per_beam]) for n in per_beam[0]}
+
+
+def result_rows(marks, res):
+    for k, mark in enumerate(marks):
+        found = res.n_studs[k] > 0
+        yield [
+            mark, float(res.steel.inputs["L"][k]),
+            int(res.stud_rows[k]), int(res.n_studs[k]),
+            round(float(res.stud_spacing[k]), 1) if found else "-",
+            round(float(res.composite_ratio[k]), 3), PNA_LOCATIONS[int(res.pna_location[k])],
+            round(float(res.phiMn[k]), 1), round(float(res.UR_flex[k]), 3),
+            round(float(res.steel.UR_gov[k]), 3), "OK" if res.steel.buckling_ok[k] else "NG",
+            round(float(res.delta_LL[k]), 1), round(float(res.UR_const[k]), 3),
+            "OK" if res.ok[k] else "NG",
+        ]
+
+
+def write_result_csv(marks, res, path):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(RESULT_COLUMNS)
+        writer.writerows(result_rows(marks, res))
+
+
+def parse_rows(spec):
+    return tuple(sorted({int(s) for s in spec.split(",") if s.strip()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 캐스틸레이티드 보 배치 검토 / 스터드 최적화")
+    parser.add_argument("--schedule", default=None, help="보 일람표 (CSV 또는 JSON)")
+    parser.add_argument("--out", default=None, help="결과 CSV 경로")
+    parser.add_argument("--rows", default=",".join(map(str, DEFAULT_ROWS)), help="스윕할 스터드 열수")
+    parser.add_argument("--ur-limit", type=float, default=1.0)
+    parser.add_argument("--L", type=float, default=13.5, help="경간 (m)")
+    parser.add_argument("--DL", type=float, default=8.0, help="고정하중 (kN/m, 슬래브 포함)")
+    parser.add_argument("--LL", type=float, default=6.0, help="활하중 (kN/m)")
+    parser.add_argument("--ts", type=float, default=135.0, help="슬래브 두께 (mm)")
+    parser.add_argument("--spacing", type=float, default=3.0, help="보 간격 (m)")
+    parser.add_argument("--fc", type=float, default=24.0, help="콘크리트 압축강도 (MPa)")
+    args = parser.parse_args()
+
+    if args.schedule:
+        schedule = load_framing(args.schedule)
+    else:
+        schedule = [("B1", dict(L=args.L, DL=args.DL, LL=args.LL, ts=args.ts, spacing=args.spacing, fc=args.fc))]
+    marks = [m for m, _ in schedule]
+    res = check_composite(**framing_arrays(schedule), rows=parse_rows(args.rows), ur_limit=args.ur_limit)
+
+    print(f"📋 합성보 {len(res)}개 검토: 통과 {int(res.ok.sum())}개")
+    print(f"   스터드 합계 {int(res.n_studs.sum())}개")
+    for row in list(result_rows(marks, res))[:20]:
+        mark, L, n_rows, n_studs, spacing, ratio, pna, phiMn, ur, ur_open, wp, delta, ur_const, verdict = row
+        mark_icon = "✅" if verdict == "OK" else "❌"
+        print(f"   {mark_icon} {mark}: L = {L:.2f} m, 스터드 {n_studs}개 ({n_rows}열 @ {spacing} mm), "
+              f"ΣQn/Cf = {ratio:.2f}, PNA {pna}, UR 휨 = {ur:.3f}, δLL = {delta:.1f} mm, UR 시공 = {ur_const:.3f}")
+    if len(res) > 20:
+        print(f"   ... 외 {len(res) - 20}개")
+
+    if args.out:
+        write_result_csv(marks, res, args.out)
+        print(f"✅ 결과 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+캐스틸레이티드 보 계산 코어 (AISC 360 LRFD / AISC DG31)
+- 계산만 수행하며 reportlab, pandas 를 import 하지 않음
+- PDF 계산서는 castillated_report 에서 별도로 생성
+
+    from castillated_core import CastellatedBeamDesign
+
+    # 여러 경간/하중 케이스를 한 번에 검토 (배열 입력은 broadcast)
+    design = CastellatedBeamDesign(L=[12.0, 13.5, 15.0], LL=[5.0, 6.0, 6.0])
+    result = design.check()
+    result.UR_gov, result.buckling_ok, result.w_final
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import Optional
+
+import numpy as np
+
+# ---------------------------------------------------------------------
+# DG31 web-post 좌굴 계수 (e/tw = 10, 20 에서의 Mocr/Mp 비율)
+# ---------------------------------------------------------------------
+ETW_POINTS = (10.0, 20.0)
+MOCR_RATIO_POINTS = (0.408, 0.437)
+
+PHI_B = 0.90
+PHI_W = 0.75
+PHI_T = 0.90
+
+STEEL_DENSITY = 7850.0              # kg/m³
+
+# geometry 로부터 계산 가능한 Tee 성능 필드 (None 이면 tee_properties()로 계산)
+TEE_FIELDS = ("phiPn", "phiMn", "d_eff", "h_top")
+
+# ---------------------------------------------------------------------
+# 1. 입력값 (기본값 = Option 1)
+# ---------------------------------------------------------------------
+@dataclass
+class CastellatedBeamDesign:
+    """캐스틸레이티드 보 설계 입력값.
+
+    모든 필드는 스칼라 또는 배열을 받을 수 있으며, 배열은 NumPy broadcast
+    규칙에 따라 보(beam) 배치 차원으로 확장됩니다.
+    단위: L, ho, p, end_post [m] / e, bf, tf, tw [mm] / 하중 [kN/m] / Fy, Fexx [MPa]
+    """
+
+    L: float = 13.5                     # m
+    DL: float = 8.0                     # kN/m
+    LL: float = 6.0                     # kN/m
+    self_w: float = 1.0                 # kN/m
+    Fy: float = 355.0                   # MPa (SM355)
+
+    bf: float = 200.0                   # mm
+    tf: float = 17.0                    # mm
+    tw: float = 11.0                    # mm
+
+    dc: float = 0.9                     # m (castellated 전체 춤)
+    ho: float = 0.6                     # m
+    p: float = 0.9                      # m
+    theta: float = 60.0                 # deg
+    end_post: float = 0.9               # m
+    e: float = 200.0                    # mm
+
+    # Tee 단면 성능 - None 이면 단면 치수로 계산 (tee_properties / steel_sections)
+    # H600×200×11×17, ho = 0.6 m: φPn ≈ 1553.7 kN, φMn ≈ 21.47 kN·m, d_eff ≈ 0.8379 m
+    phiPn: Optional[float] = None       # kN
+    phiMn: Optional[float] = None       # kN·m
+    d_eff: Optional[float] = None       # m
+    h_top: Optional[float] = None       # m
+
+    Fexx: float = 490.0                 # MPa
+
+    def arrays(self):
+        """입력값을 동일한 1차원 배치 shape의 float 배열 dict로 반환"""
+        names = [f.name for f in fields(self) if getattr(self, f.name) is not None]
+        values = np.broadcast_arrays(*[np.atleast_1d(np.asarray(getattr(self, n), dtype=float)) for n in names])
+        out = {n: v.ravel() for n, v in zip(names, values)}
+        missing = [n for n in TEE_FIELDS if n not in out]
+        if missing:
+            tee = tee_properties(out["dc"], out["bf"], out["tf"], out["tw"], out["ho"], out["Fy"])
+            for n in missing:
+                out[n] = tee[n]
+        return out
+
+    def check(self):
+        """모든 개구부/지배 web-post/좌굴/용접 검토를 배열 연산으로 수행"""
+        return check_beams(**self.arrays())
+
+
+@dataclass
+class CastellatedBeamResult:
+    """배치 검토 결과 (모든 필드는 보 배치 차원의 배열).
+
+    개구부별 표는 계산서가 필요할 때만 opening_table()/opening_rows()로 생성합니다.
+    """
+
+    inputs: dict = field(repr=False)
+
+    wu: np.ndarray
+    weight: np.ndarray                  # kg (개구부 제외 강재 중량)
+    delta_x: np.ndarray
+    W_open: np.ndarray
+    b_wp: np.ndarray
+    n_openings: np.ndarray
+
+    gov_index: np.ndarray               # 지배 개구부 번호 (1-based)
+    UR_gov: np.ndarray
+    Vrh: np.ndarray
+    wp_pair: np.ndarray                 # 지배 web-post 양쪽 개구부 번호 (n_beams, 2)
+
+    Mrh: np.ndarray
+    Mp: np.ndarray
+    Mocr: np.ndarray
+    phiMocr: np.ndarray
+    buckling_ok: np.ndarray
+
+    w_req: np.ndarray
+    w_final: np.ndarray
+
+    _table: dict = field(default=None, repr=False)
+
+    def __len__(self):
+        return len(self.wu)
+
+    def opening_table(self):
+        """개구부별 x, V, M, P, Mtee, UR 배열 (n_beams, n_max), 개구부가 없는 칸은 NaN"""
+        if self._table is None:
+            i = self.inputs
+            self._table = opening_table(i["L"], self.wu, i["p"], i["end_post"], self.n_openings,
+                                        i["d_eff"], i["e"], i["phiPn"], i["phiMn"])
+        return self._table
+
+    def opening_rows(self, k=0):
+        """k번째 보의 개구부별 표 (i, x, V, M, P, M_tee, UR) 행 목록"""
+        t = self.opening_table()
+        n = int(self.n_openings[k])
+        cols = [t[c][k] for c in ("x", "V", "M", "P", "Mtee", "UR")]
+        return [[i + 1] + [float(c[i]) for c in cols] for i in range(n)]
+
+
+# ---------------------------------------------------------------------
+# 2. Tee 단면 성능
+# ---------------------------------------------------------------------
+def tee_properties(dc, bf, tf, tw, ho, Fy):
+    """개구부 위/아래 Tee 단면 성능 (배열 입력 가능)
+
+    A, ybar (플랜지 상단 기준 도심), S (stem 끝단 기준 탄성단면계수), Z (소성단면계수),
+    φPn = φ·Fy·A, φMn = φ·Fy·S, d_eff = 상·하 Tee 도심 간 거리, h_top = d_eff / 2
+    """
+    dt = (dc - ho) * 1000.0 / 2.0           # Tee 춤 (mm)
+    hs = dt - tf                            # stem 길이 (mm)
+    Af = bf * tf
+    As = tw * hs
+    A = Af + As
+    ybar = (Af * tf / 2.0 + As * (tf + hs / 2.0)) / A
+    I = (bf * tf ** 3 / 12.0 + Af * (ybar - tf / 2.0) ** 2
+         + tw * hs ** 3 / 12.0 + As * (tf + hs / 2.0 - ybar) ** 2)
+    S = I / (dt - ybar)
+
+    # 소성중립축: 플랜지 안 (A/2 ≤ Af) 또는 stem 안
+    half = A / 2.0
+    yp_f = half / bf
+    Z_f = bf * yp_f ** 2 / 2.0 + bf * (tf - yp_f) ** 2 / 2.0 + As * (tf + hs / 2.0 - yp_f)
+    yp_s = tf + (half - Af) / tw
+    Z_s = Af * (yp_s - tf / 2.0) + tw * (yp_s - tf) ** 2 / 2.0 + tw * (dt - yp_s) ** 2 / 2.0
+    Z = np.where(half <= Af, Z_f, Z_s)
+
+    d_eff = (dc * 1000.0 - 2.0 * ybar) / 1000.0
+    return {
+        "A": A,                             # mm²
+        "ybar": ybar,                       # mm
+        "S": S,                             # mm³
+        "Z": Z,                             # mm³
+        "phiPn": PHI_T * Fy * A / 1000.0,   # kN
+        "phiMn": PHI_T * Fy * S / 1e6,      # kN·m
+        "d_eff": d_eff,                     # m
+        "h_top": d_eff / 2.0,               # m
+    }
+
+
+# ---------------------------------------------------------------------
+# 3. 개구부별 단면력 / 지배 위치
+# ---------------------------------------------------------------------
+def opening_geometry(ho, theta, e, p):
+    """개구부 경사 폭 delta_x, 개구부 폭 W_open, web-post 폭 b_wp (mm)"""
+    delta_x = (ho * 1000.0) / (2.0 * np.tan(np.radians(theta)))
+    W_open = e + 2.0 * delta_x
+    b_wp = p * 1000.0 - W_open
+    return delta_x, W_open, b_wp
+
+
+def opening_forces(x, L, wu, d_eff, e, phiPn, phiMn):
+    """개구부 중심 x 에서의 V, M, P, M_tee, UR (등분포 하중 단순보, broadcast)"""
+    V = 0.5 * wu * L - wu * x
+    M = 0.5 * wu * x * (L - x)
+    P = M / d_eff
+    Mtee = np.abs(V) * ((e / 4.0) / 1000.0)
+    UR = np.abs(P) / phiPn + Mtee / phiMn
+    return V, M, P, Mtee, UR
+
+
+def _columns(*arrays):
+    """(n_beams,) 배열들을 (n_beams, 1) 열 벡터로 변환"""
+    return [a[:, None] for a in arrays]
+
+
+def opening_table(L, wu, p, end_post, n_openings, d_eff, e, phiPn, phiMn):
+    """모든 개구부의 단면력 표 (n_beams, n_max) - 계산서 출력용"""
+    n_max = max(int(n_openings.max()), 1)
+    idx = np.arange(n_max)
+    valid = idx[None, :] < n_openings[:, None]
+    x = (end_post + 0.5 * p)[:, None] + idx[None, :] * p[:, None]
+    x = np.where(valid, x, np.nan)
+    V, M, P, Mtee, UR = opening_forces(x, *_columns(L, wu, d_eff, e, phiPn, phiMn))
+    return {"x": x, "V": V, "M": M, "P": P, "Mtee": Mtee, "UR": UR}
+
+
+def governing_opening(L, wu, p, end_post, n_openings, d_eff, e, phiPn, phiMn):
+    """표를 만들지 않고 UR 최대 개구부를 찾음 → (gov_index 1-based, UR_gov)
+
+    UR(x) = a·x(L-x) + b·|L/2 - x| 는 L/2 좌우 구간에서 각각 오목한 2차식이므로,
+    격자 x_i = x1 + i·p 위의 최댓값은 각 구간 꼭짓점과 L/2 의 양옆 격자점,
+    또는 양 끝 개구부에서만 발생합니다. 동률이면 번호가 작은 개구부를 택합니다.
+    """
+    x1 = end_post + 0.5 * p
+    a = wu / (2.0 * d_eff * phiPn)
+    b = wu * (e / 4.0 / 1000.0) / phiMn
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shift = np.where(a > 0, b / (2.0 * a), np.inf)
+    last = np.maximum(n_openings - 1, 0)[:, None]
+
+    vertex = np.stack([0.5 * L - shift, 0.5 * L, 0.5 * L + shift], axis=1)
+    u = (vertex - x1[:, None]) / p[:, None]
+    cand = np.concatenate([np.floor(u), np.ceil(u), np.zeros_like(u[:, :1]), last], axis=1)
+    cand = np.sort(np.clip(np.nan_to_num(cand), 0, last), axis=1).astype(int)
+
+    x = x1[:, None] + cand * p[:, None]
+    UR = opening_forces(x, *_columns(L, wu, d_eff, e, phiPn, phiMn))[4]
+    k = np.argmax(UR, axis=1)
+    rows = np.arange(len(L))
+
+    has_open = n_openings > 0
+    gov_index = np.where(has_open, cand[rows, k] + 1, 0)
+    UR_gov = np.where(has_open, UR[rows, k], np.nan)
+    return gov_index, UR_gov
+
+
+def governing_web_post(L, wu, p, end_post, n_openings, d_eff):
+    """표를 만들지 않고 인접 개구부 축력 차 ΔP 최대 web-post → (Vrh, wp_pair)
+
+    ΔP_i = wu·p·|L - p - 2·x_i| / (2·d_eff) 는 x_i 에 대해 선형(절댓값)이므로
+    최댓값은 첫 번째 또는 마지막 web-post 에서 발생합니다.
+    """
+    x1 = end_post + 0.5 * p
+    x_last = x1 + np.maximum(n_openings - 2, 0) * p
+    c = wu * p / (2.0 * d_eff)
+    dP_first = c * np.abs(L - p - 2.0 * x1)
+    dP_last = c * np.abs(L - p - 2.0 * x_last)
+
+    # 대칭 배치에서의 부동소수 오차로 동률이 뒤집히지 않도록 (동률 → 첫 번째 web-post)
+    use_last = dP_last > dP_first * (1.0 + 1e-12)
+    first = np.where(use_last, np.maximum(n_openings - 1, 1), 1)
+
+    has_wp = n_openings >= 2
+    Vrh = np.where(has_wp, np.where(use_last, dP_last, dP_first), 0.0)
+    wp_pair = np.where(has_wp[:, None], np.stack([first, first + 1], axis=1), 0)
+    return Vrh, wp_pair
+
+
+def web_post_capacity(tw, e, delta_x, Fy):
+    """DG31 web-post 좌굴 강도 → (Mp, Mocr, φMocr) kN·m"""
+    Mp = (0.25 * tw * (e + 2 * delta_x) ** 2 * Fy) / 1e6
+    ratio = np.interp(e / tw, ETW_POINTS, MOCR_RATIO_POINTS)
+    Mocr = ratio * Mp
+    return Mp, Mocr, PHI_B * Mocr
+
+
+def weld_size(Vrh, e, Fexx):
+    """web-post 수평전단력 Vrh (kN) 에 대한 필렛 용접 치수 → (w_req, w_final) mm (안전측)"""
+    Aw_req = (Vrh * 1000.0) / (PHI_W * 0.6 * Fexx)
+    w_req = Aw_req / (0.707 * e)
+    return w_req, np.ceil(w_req)
+
+
+# ---------------------------------------------------------------------
+# 4. 배치 계산
+# ---------------------------------------------------------------------
+def check_beams(L, DL, LL, self_w, Fy, bf, tf, tw, dc, ho, p, theta, end_post, e,
+                phiPn, phiMn, d_eff, h_top, Fexx):
+    """1차원 배열 입력(보 배치)에 대한 전체 검토 (개구부별 표는 만들지 않음)"""
+    inputs = dict(L=L, DL=DL, LL=LL, self_w=self_w, Fy=Fy, bf=bf, tf=tf, tw=tw, dc=dc, ho=ho,
+                  p=p, theta=theta, end_post=end_post, e=e, phiPn=phiPn, phiMn=phiMn,
+                  d_eff=d_eff, h_top=h_top, Fexx=Fexx)
+
+    # 개구부 형상
+    delta_x, W_open, b_wp = opening_geometry(ho, theta, e, p)
+
+    # 하중
+    wu = 1.2 * (DL + self_w) + 1.6 * LL
+
+    # 개구부 개수 (부동소수 오차 보정)
+    L_open = L - 2.0 * end_post
+    n_openings = np.maximum(np.rint(L_open / p), 0).astype(int)
+
+    # 강재 중량: 플랜지 + web plate - 육각형 개구부
+    A_gross = 2.0 * bf * tf + tw * (dc * 1000.0 - 2.0 * tf)            # mm²
+    A_open = ho * 1000.0 * (e + delta_x)                              # mm²
+    weight = STEEL_DENSITY * (A_gross * L * 1e-6 - n_openings * A_open * tw * 1e-9)
+
+    # 지배 개구부 / 지배 web-post (인접 개구부 축력 차)
+    gov_index, UR_gov = governing_opening(L, wu, p, end_post, n_openings, d_eff, e, phiPn, phiMn)
+    Vrh, wp_pair = governing_web_post(L, wu, p, end_post, n_openings, d_eff)
+
+    # DG31 web-post buckling
+    Mrh = Vrh * h_top
+    Mp, Mocr, phiMocr = web_post_capacity(tw, e, delta_x, Fy)
+    buckling_ok = Mrh <= phiMocr
+
+    # 용접 설계 (안전측)
+    w_req, w_final = weld_size(Vrh, e, Fexx)
+
+    return CastellatedBeamResult(
+        inputs=inputs,
+        wu=wu, weight=weight, delta_x=delta_x, W_open=W_open, b_wp=b_wp, n_openings=n_openings,
+        gov_index=gov_index, UR_gov=UR_gov, Vrh=Vrh, wp_pair=wp_pair,
+        Mrh=Mrh, Mp=Mp, Mocr=Mocr, phiMocr=phiMocr, buckling_ok=buckling_ok,
+        w_req=w_req, w_final=w_final,
+    )
@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+"""
+캐스틸레이티드 보 하중 케이스 / 하중조합 포락 검토
+- 하중 케이스 (D, L, Lr, S, W, E ...) 별로 등분포 / 부분 등분포 / 집중하중 (작은보 반력) 입력
+- 모든 개구부 중심 x 에서의 V, M 영향계수를 케이스별로 한 번만 계산하고,
+  하중조합은 (케이스 × 조합) 계수 행렬과의 행렬곱 한 번으로 전체 조합의 V, M 을 구함
+  → 조합 추가 = 계수 행렬의 열 하나 추가
+- 조합 포락으로 Tee 상관식 (지배 개구부), 지배 web-post (인접 개구부 ΔM / d_eff),
+  DG31 web-post 좌굴, 용접 치수 검토 (castillated_core 와 같은 식)
+
+    from castillated_core import CastellatedBeamDesign
+    from castillated_loads import Load, LoadEnvelope
+
+    design = CastellatedBeamDesign(L=13.5, DL=8.0, LL=6.0)
+    env = LoadEnvelope(design, loads=[Load("D", "point", 40.0, a=4.5), Load("L", "point", 30.0, a=4.5)])
+    res = env.check()                       # 기본 하중조합 (KDS 41 / ASCE 7 강도설계)
+    res.UR_gov, res.combinations[res.gov_combo[0]]
+
+사용법:
+    python castillated_loads.py beams.json
+    python castillated_loads.py beams.json --no-design-loads
+
+입력 JSON:
+    {"beams": [{"mark": "B1", "L": 13.5, "DL": 8.0, "LL": 6.0,
+                "loads": [{"case": "D", "type": "point", "value": 40, "a": 4.5},
+                          {"case": "L", "type": "partial", "value": 5, "a": 0, "b": 6}]}],
+     "combinations": {"1.2D+1.6L": {"D": 1.2, "L": 1.6}}}       # 생략 시 DEFAULT_COMBINATIONS
+"""
+
+import argparse
+import json
+from dataclasses import dataclass, field, fields
+
+import numpy as np
+
+from castillated_core import (
+    CastellatedBeamDesign,
+    opening_geometry,
+    web_post_capacity,
+    weld_size,
+)
+
+LOAD_TYPES = ("uniform", "partial", "point")
+
+# KDS 41 10 15 / ASCE 7 강도설계 하중조합. 정의되지 않은 케이스를 쓰는 조합은 제외합니다.
+DEFAULT_COMBINATIONS = (
+    ("1.4D", {"D": 1.4}),
+    ("1.2D+1.6L", {"D": 1.2, "L": 1.6}),
+    ("1.2D+1.6L+0.5Lr", {"D": 1.2, "L": 1.6, "Lr": 0.5}),
+    ("1.2D+1.6L+0.5S", {"D": 1.2, "L": 1.6, "S": 0.5}),
+    ("1.2D+1.6Lr+1.0L", {"D": 1.2, "Lr": 1.6, "L": 1.0}),
+    ("1.2D+1.6S+1.0L", {"D": 1.2, "S": 1.6, "L": 1.0}),
+    ("1.2D+1.0W+1.0L", {"D": 1.2, "W": 1.0, "L": 1.0}),
+    ("0.9D+1.0W", {"D": 0.9, "W": 1.0}),
+    ("1.2D+1.0E+1.0L", {"D": 1.2, "E": 1.0, "L": 1.0}),
+    ("0.9D+1.0E", {"D": 0.9, "E": 1.0}),
+)
+
+# 응답 성분: 개구부 중심 바로 왼쪽 / 오른쪽 전단력 (집중하중 위치에서 불연속), 모멘트
+V_LEFT, V_RIGHT, MOMENT = range(3)
+
+# 대칭 배치에서 부동소수 오차로 동률이 뒤집히지 않도록 (동률 → 번호가 작은 쪽)
+TIE_TOLERANCE = 1e-12
+
+
+# ---------------------------------------------------------------------
+# 1. 하중 / 하중조합
+# ---------------------------------------------------------------------
+@dataclass
+class Load:
+    """하중 1개 (단순보, 좌측 지점 기준 위치)
+
+    kind: "uniform" (전 경간 kN/m), "partial" (a ~ b 구간 kN/m), "point" (위치 a 의 kN)
+    단위: value [kN/m 또는 kN] / a, b [m]
+    """
+
+    case: str
+    kind: str
+    value: float
+    a: float = 0.0
+    b: float = None
+
+    def __post_init__(self):
+        if self.kind not in LOAD_TYPES:
+            raise ValueError(f"알 수 없는 하중 종류: {self.kind} (가능: {', '.join(LOAD_TYPES)})")
+
+
+def design_loads(arrays, k):
+    """CastellatedBeamDesign 의 등분포 하중 → D (DL + 자중), L (LL) 케이스"""
+    return [Load("D", "uniform", float(arrays["DL"][k] + arrays["self_w"][k])),
+            Load("L", "uniform", float(arrays["LL"][k]))]
+
+
+def factor_matrix(cases, combinations):
+    """(케이스 × 조합) 계수 행렬, 사용한 조합 이름, 제외한 조합 이름
+
+    조합이 참조하는 케이스가 하나라도 정의되지 않았으면 그 조합은 제외합니다.
+    """
+    index = {c: j for j, c in enumerate(cases)}
+    names, skipped, columns = [], [], []
+    for name, factors in combinations:
+        if not all(c in index for c in factors):
+            skipped.append(name)
+            continue
+        col = np.zeros(len(cases))
+        for c, f in factors.items():
+            col[index[c]] += f
+        names.append(name)
+        columns.append(col)
+    if not columns:
+        raise ValueError(f"정의된 하중 케이스 ({', '.join(cases)}) 로 만들 수 있는 하중조합이 없습니다.")
+    return np.stack(columns, axis=1), names, skipped
+
+
+# ---------------------------------------------------------------------
+# 2. 영향계수 (단순보, 개구부 중심 x)
+# ---------------------------------------------------------------------
+def opening_positions(L, p, end_post, n_openings):
+    """개구부 중심 x (n_beams, n_max), 개구부가 없는 칸은 NaN"""
+    n_max = max(int(n_openings.max()), 1)
+    idx = np.arange(n_max)
+    x = (end_post + 0.5 * p)[:, None] + idx[None, :] * p[:, None]
+    return np.where(idx[None, :] < n_openings[:, None], x, np.nan)
+
+
+def point_response(x, L, a, P):
+    """집중하중 P (위치 a) 에 의한 (V 왼쪽, V 오른쪽, M) - x (n, n_x), 나머지 (n, 1)"""
+    ra = P * (1.0 - a / L)
+    V_left = ra - P * (x > a)
+    V_right = ra - P * (x >= a)
+    M = np.where(x <= a, ra * x, P * a * (L - x) / L)
+    return V_left, V_right, M
+
+
+def partial_response(x, L, a, b, w):
+    """a ~ b 구간 등분포 하중 w 에 의한 (V, V, M) (등분포는 a = 0, b = L)"""
+    ra = w * (b - a) * (L - (a + b) / 2.0) / L
+    s = np.clip(x - a, 0.0, b - a)                          # x 왼쪽에 놓인 하중 길이
+    V = ra - w * s
+    M = ra * x - w * s * (x - a - s / 2.0)
+    return V, V, M
+
+
+def case_responses(x, L, loads, cases):
+    """케이스별 응답 (n_beams, n_cases, 3, n_max) - loads: 보별 Load 목록
+
+    하중 종류별로 모든 보의 하중을 한 번에 계산한 뒤 (보, 케이스) 칸에 더합니다.
+    """
+    index = {c: j for j, c in enumerate(cases)}
+    R = np.zeros((x.shape[0], len(cases), 3, x.shape[1]))
+    flat = [(k, ld) for k, beam_loads in enumerate(loads) for ld in beam_loads]
+    for kind in LOAD_TYPES:
+        group = [(k, ld) for k, ld in flat if ld.kind == kind]
+        if not group:
+            continue
+        beam = np.array([k for k, _ in group])
+        case = np.array([index[ld.case] for _, ld in group])
+        value = np.array([ld.value for _, ld in group], dtype=float)[:, None]
+        a = np.array([ld.a for _, ld in group], dtype=float)[:, None]
+        span = L[beam][:, None]
+        if kind == "point":
+            resp = point_response(x[beam], span, a, value)
+        elif kind == "uniform":
+            resp = partial_response(x[beam], span, np.zeros_like(span), span, value)
+        else:
+            b = np.array([span[j, 0] if ld.b is None else ld.b for j, (_, ld) in enumerate(group)])[:, None]
+            resp = partial_response(x[beam], span, a, np.minimum(b, span), value)
+        np.add.at(R, (beam, case), np.stack(resp, axis=1))
+    return R
+
+
+# ---------------------------------------------------------------------
+# 3. 포락 검토
+# ---------------------------------------------------------------------
+@dataclass
+class LoadEnvelopeResult:
+    """하중조합 포락 검토 결과
+
+    (n_beams, n_max, n_combos) 배열은 개구부 × 조합별 값 (개구부가 없는 칸은 NaN).
+    """
+
+    combinations: tuple
+    skipped: tuple
+    x: np.ndarray = field(repr=False)
+    V: np.ndarray = field(repr=False)       # |V| (개구부 양쪽 중 큰 값)
+    M: np.ndarray = field(repr=False)
+    UR: np.ndarray = field(repr=False)
+
+    n_openings: np.ndarray
+    gov_index: np.ndarray               # 지배 개구부 번호 (1-based)
+    gov_combo: np.ndarray               # 지배 하중조합 인덱스
+    UR_gov: np.ndarray
+    Vrh: np.ndarray
+    wp_pair: np.ndarray                 # 지배 web-post 양쪽 개구부 번호 (n_beams, 2)
+    wp_combo: np.ndarray
+
+    Mrh: np.ndarray
+    Mp: np.ndarray
+    Mocr: np.ndarray
+    phiMocr: np.ndarray
+    buckling_ok: np.ndarray
+
+    w_req: np.ndarray
+    w_final: np.ndarray
+
+    def __len__(self):
+        return len(self.UR_gov)
+
+    def governing(self, k=0):
+        """k번째 보의 (지배 개구부 조합명, 지배 web-post 조합명)"""
+        return self.combinations[int(self.gov_combo[k])], self.combinations[int(self.wp_combo[k])]
+
+
+def _first_max(values):
+    """(n_beams, N) 행별 최댓값과 그 값에 (상대오차 TIE_TOLERANCE 안에서) 처음 도달하는 위치"""
+    v = np.where(np.isnan(values), -np.inf, values)
+    best = v.max(axis=1)
+    hit = v >= np.where(best > 0, best * (1.0 - TIE_TOLERANCE), best)[:, None]
+    return best, np.argmax(hit, axis=1)
+
+
+class LoadEnvelope:
+    """보 배치 + 하중 케이스의 개구부 영향계수 (케이스별 V, M) 를 보관하고 하중조합을 검토
+
+    design: CastellatedBeamDesign (배열 입력 가능)
+    loads: 모든 보에 공통인 Load 목록 또는 보별 Load 목록의 목록
+    include_design_loads: design 의 DL + self_w, LL 을 D, L 등분포 케이스로 추가
+    """
+
+    def __init__(self, design, loads=(), include_design_loads=True):
+        self.inputs = i = design.arrays() if isinstance(design, CastellatedBeamDesign) else design
+        n_beams = len(i["L"])
+        loads = list(loads)
+        if not loads or isinstance(loads[0], Load):
+            loads = [loads] * n_beams
+        if len(loads) != n_beams:
+            raise ValueError(f"보 {n_beams}개에 하중 목록 {len(loads)}개")
+        self.loads = [(design_loads(i, k) if include_design_loads else []) + list(beam_loads)
+                      for k, beam_loads in enumerate(loads)]
+        self.cases = tuple(dict.fromkeys(ld.case for beam_loads in self.loads for ld in beam_loads))
+
+        self.n_openings = np.maximum(np.rint((i["L"] - 2.0 * i["end_post"]) / i["p"]), 0).astype(int)
+        self.x = opening_positions(i["L"], i["p"], i["end_post"], self.n_openings)
+        self.responses = case_responses(self.x, i["L"], self.loads, self.cases)
+
+    def combine(self, combinations=DEFAULT_COMBINATIONS):
+        """조합별 응답 (n_beams, 3, n_max, n_combos) - 케이스 응답 × 계수 행렬 (행렬곱 1회)"""
+        F, names, skipped = factor_matrix(self.cases, combinations)
+        return np.moveaxis(self.responses, 1, -1) @ F, names, skipped
+
+    def check(self, combinations=DEFAULT_COMBINATIONS):
+        """하중조합 포락으로 지배 개구부 / web-post / 좌굴 / 용접 검토"""
+        i = self.inputs
+        E, names, skipped = self.combine(combinations)
+        col = lambda a: a[:, None, None]                    # noqa: E731  (n_beams,) → 개구부 × 조합 broadcast
+
+        V = np.maximum(np.abs(E[:, V_LEFT]), np.abs(E[:, V_RIGHT]))
+        M = E[:, MOMENT]
+        P = M / col(i["d_eff"])
+        Mtee = V * ((col(i["e"]) / 4.0) / 1000.0)
+        UR = np.abs(P) / col(i["phiPn"]) + Mtee / col(i["phiMn"])
+
+        n_beams, n_max, n_combos = UR.shape
+        has_open = self.n_openings > 0
+        UR_gov, pos = _first_max(UR.reshape(n_beams, -1))
+        gov_index = np.where(has_open, pos // n_combos + 1, 0)
+        gov_combo = pos % n_combos
+        UR_gov = np.where(has_open, UR_gov, np.nan)
+
+        # 인접 개구부 Tee 축력 차 ΔP = ΔM / d_eff (집중하중이 web-post 위에 있어도 성립)
+        if n_max >= 2:
+            dP = np.abs(np.diff(M, axis=1)) / col(i["d_eff"])
+            Vrh, wpos = _first_max(dP.reshape(n_beams, -1))
+            first = wpos // n_combos + 1
+            wp_combo = wpos % n_combos
+        else:
+            Vrh = np.zeros(n_beams)
+            first = wp_combo = np.zeros(n_beams, dtype=int)
+        has_wp = self.n_openings >= 2
+        Vrh = np.where(has_wp, Vrh, 0.0)
+        wp_pair = np.where(has_wp[:, None], np.stack([first, first + 1], axis=1), 0)
+
+        delta_x, _, _ = opening_geometry(i["ho"], i["theta"], i["e"], i["p"])
+        Mrh = Vrh * i["h_top"]
+        Mp, Mocr, phiMocr = web_post_capacity(i["tw"], i["e"], delta_x, i["Fy"])
+        w_req, w_final = weld_size(Vrh, i["e"], i["Fexx"])
+
+        return LoadEnvelopeResult(
+            combinations=tuple(names), skipped=tuple(skipped), x=self.x, V=V, M=M, UR=UR,
+            n_openings=self.n_openings, gov_index=gov_index, gov_combo=np.where(has_open, gov_combo, 0),
+            UR_gov=UR_gov, Vrh=Vrh, wp_pair=wp_pair, wp_combo=np.where(has_wp, wp_combo, 0),
+            Mrh=Mrh, Mp=Mp, Mocr=Mocr, phiMocr=phiMocr, buckling_ok=Mrh <= phiMocr,
+            w_req=w_req, w_final=w_final,
+        )
+
+
+# ---------------------------------------------------------------------
+# 4. 입력 파일
+# ---------------------------------------------------------------------
+DESIGN_FIELDS = {f.name for f in fields(CastellatedBeamDesign)}
+
+
+def load_beams(path):
+    """입력 JSON → (부재 마크 목록, 보별 입력 배열 dict, 보별 Load 목록, 하중조합)"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    marks, per_beam, loads = [], [], []
+    for k, beam in enumerate(data["beams"], start=1):
+        marks.append(str(beam.get("mark") or f"B{k}"))
+        inputs = {n: float(v) for n, v in beam.items() if n in DESIGN_FIELDS and v not in ("", None)}
+        per_beam.append(CastellatedBeamDesign(**inputs).arrays())
+        loads.append([Load(ld["case"], ld.get("type", "uniform"), float(ld["value"]),
+                           float(ld.get("a", 0.0)), None if ld.get("b") is None else float(ld["b"]))
+                      for ld in beam.get("loads", [])])
+    arrays = {n: np.concatenate([a[n] for a in per_beam]) for n in per_beam[0]}
+
+    combinations = DEFAULT_COMBINATIONS
+    if data.get("combinations"):
+        combinations = tuple((name, {c: float(f) for c, f in factors.items()})
+                             for name, factors in data["combinations"].items())
+    return marks, arrays, loads, combinations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캐스틸레이티드 보 하중조합 포락 검토")
+    parser.add_argument("beams", help="보 / 하중 입력 JSON")
+    parser.add_argument("--no-design-loads", action="store_true",
+                        help="DL, LL 등분포 하중을 D, L 케이스로 추가하지 않음")
+    args = parser.parse_args()
+
+    marks, arrays, loads, combinations = load_beams(args.beams)
+    env = LoadEnvelope(arrays, loads, include_design_loads=not args.no_design_loads)
+    res = env.check(combinations)
+
+    print(f"📋 보 {len(res)}개 / 하중 케이스 {', '.join(env.cases)} / 하중조합 {len(res.combinations)}개")
+    if res.skipped:
+        print(f"   (정의되지 않은 케이스를 쓰는 조합 제외: {', '.join(res.skipped)})")
+    for k, mark in enumerate(marks):
+        combo, wp_combo = res.governing(k)
+        ok = "OK" if res.buckling_ok[k] else "NG"
+        icon = "✅" if res.buckling_ok[k] and res.UR_gov[k] <= 1.0 else "❌"
+        print(f"   {icon} {mark}: 지배 개구부 {int(res.gov_index[k])}번 UR = {res.UR_gov[k]:.3f} ({combo}), "
+              f"web-post {int(res.wp_pair[k, 0])}-{int(res.wp_pair[k, 1])} Vrh = {res.Vrh[k]:.1f} kN ({wp_combo}), "
+              f"좌굴 {ok}, 용접 {res.w_final[k]:.0f} mm")
+
+
+if __name__ == "__main__":
+    main()
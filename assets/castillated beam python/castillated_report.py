@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+캐스틸레이티드 보 한국어 PDF 계산서
+- reportlab / pandas / NanumGothic 폰트는 이 모듈에서만 사용
+- 계산 결과는 castillated_core.check_beams() 결과를 그대로 받음
+- 보 일람표(CSV/JSON)의 부재 마크별 계산서를 프로세스 풀에서 일괄 생성
+
+사용법:
+    python castillated_report.py schedule.csv --out-dir reports
+    python castillated_report.py schedule.json --out-dir reports --merged 전체계산서.pdf --workers 8
+
+일람표 컬럼: mark (부재 마크) + CastellatedBeamDesign 필드명 (L, DL, LL, e, p, ho, ...)
+생략한 필드는 기본값 (Option 1)을 사용합니다.
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from pathlib import Path
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, PageBreak, SimpleDocTemplate, Paragraph, Spacer
+from reportlab.platypus.tableofcontents import TableOfContents
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import colors
+from reportlab.lib.units import mm
+import numpy as np
+import pandas as pd
+
+from castillated_core import CastellatedBeamDesign, check_beams
+
+FONT_PATHS = {
+    "NanumGothic": "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "NanumGothicBold": "/usr/share/fonts/truetype/nanum/NanumGothicBold.ttf",
+}
+
+DEFAULT_PDF_PATH = "castellated_beam_전체계산서_option1.pdf"
+
+OPENING_COLUMNS = ["i", "x (m)", "V(x) (kN)", "M(x) (kN·m)", "P_i (kN)", "M_tee,i (kN·m)", "UR_i"]
+
+# KS 구조용 강재 항복강도 (MPa) → 강종 표기
+STEEL_GRADES = (275.0, 355.0, 420.0, 460.0)
+
+PAGE_MARGINS = dict(leftMargin=16 * mm, rightMargin=16 * mm, topMargin=14 * mm, bottomMargin=14 * mm)
+
+# 프로세스당 한 번만 폰트 등록 / 스타일 생성
+_styles = None
+
+
+# ---------------------------------------------------------------------
+# 1. 한글 폰트 등록 (Nanum Gothic) / 스타일
+# ---------------------------------------------------------------------
+def register_fonts():
+    for name, path in FONT_PATHS.items():
+        if name not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(TTFont(name, path))
+
+
+def build_styles():
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name="H1", fontName="NanumGothicBold", fontSize=16))
+    styles.add(ParagraphStyle(name="H2", fontName="NanumGothicBold", fontSize=12))
+    styles.add(ParagraphStyle(name="Body", fontName="NanumGothic", fontSize=9.5))
+    styles.add(ParagraphStyle(name="Small", fontName="NanumGothic", fontSize=8, textColor=colors.grey))
+    styles.add(ParagraphStyle(name="TOC1", fontName="NanumGothic", fontSize=10, leftIndent=10, leading=14))
+    return styles
+
+
+def get_styles():
+    """폰트 등록 + 스타일 생성 (프로세스당 1회, 이후 캐시 사용)"""
+    global _styles
+    if _styles is None:
+        register_fonts()
+        _styles = build_styles()
+    return _styles
+
+
+def opening_dataframe(result, k=0):
+    """k번째 보의 개구부별 표 (계산서 출력용)"""
+    return pd.DataFrame(result.opening_rows(k), columns=OPENING_COLUMNS)
+
+
+# ---------------------------------------------------------------------
+# 2. PDF 생성
+# ---------------------------------------------------------------------
+def steel_grade(Fy):
+    """Fy → 강종 표기 (KS 강종 항복강도가 아니면 Fy 만 표시)"""
+    if Fy in STEEL_GRADES:
+        return f"SM{Fy:.0f} (Fy = {Fy:.0f} MPa)"
+    return f"Fy = {Fy:.0f} MPa"
+
+
+def original_section(inp):
+    """원단면 표기 H×B×tw×tf (원단면 춤 H = dc - ho/2, steel_sections.castellated_depth 의 역)"""
+    H = (inp["dc"] - inp["ho"] / 2.0) * 1000.0
+    return f"H{H:.0f}×{inp['bf']:.0f}×{inp['tw']:g}×{inp['tf']:g}"
+
+
+def build_story(inp, result, styles, k=0, mark=None):
+    """k번째 보의 계산서 flowable 목록 (inp: 해당 보의 입력값 dict)"""
+    df = opening_dataframe(result, k)
+    title = f"캐스틸레이티드 보 전체 계산서 (e = {inp['e']:.0f} mm)"
+    if mark:
+        title = f"[{mark}] {title}"
+
+    story = []
+
+    story.append(Paragraph(title, styles["H1"]))
+    story.append(Spacer(1, 6))
+
+    story.append(Paragraph("1. 입력조건", styles["H2"]))
+    story.append(Paragraph(
+        f"- 경간 L = {inp['L']:.2f} m<br/>"
+        f"- DL = {inp['DL']:.1f} kN/m, LL = {inp['LL']:.1f} kN/m, 자중 ≈ {inp['self_w']:.1f} kN/m<br/>"
+        f"- 강재: {steel_grade(inp['Fy'])}<br/>"
+        f"- 원단면: {original_section(inp)} (전체 춤 dc = {inp['dc']:.3f} m)<br/>"
+        f"- p = {inp['p']:.2f} m, ho = {inp['ho']:.2f} m, θ = {inp['theta']:.0f}°<br/>"
+        f"- e = {inp['e']:.0f} mm, 개구부 수 = {len(df)}",
+        styles["Body"]
+    ))
+
+    story.append(Spacer(1, 6))
+    story.append(Paragraph("※ 지배 개구부, web-post, buckling, 용접 검토 포함", styles["Small"]))
+    return story
+
+
+def build_pdf(design, result, path=DEFAULT_PDF_PATH, k=0, mark=None):
+    """k번째 보의 계산서 PDF 생성"""
+    styles = get_styles()
+    inp = {n: float(v[k]) for n, v in design.arrays().items()}
+
+    doc = SimpleDocTemplate(path, pagesize=A4, **PAGE_MARGINS)
+    doc.build(build_story(inp, result, styles, k, mark))
+    return path
+
+
+class MergedReportTemplate(BaseDocTemplate):
+    """통합 계산서: H1 (부재별 제목)을 목차에 등록"""
+
+    def __init__(self, path, **kw):
+        super().__init__(path, pagesize=A4, **PAGE_MARGINS, **kw)
+        frame = Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id="body")
+        self.addPageTemplates([PageTemplate(id="page", frames=[frame])])
+
+    def afterFlowable(self, flowable):
+        if isinstance(flowable, Paragraph) and flowable.style.name == "H1":
+            self.notify("TOCEntry", (0, flowable.getPlainText(), self.page))
+
+
+# ---------------------------------------------------------------------
+# 3. 일괄 생성
+# ---------------------------------------------------------------------
+DESIGN_FIELDS = {f.name for f in fields(CastellatedBeamDesign)}
+
+
+def load_schedule(path):
+    """보 일람표 (CSV 또는 JSON 배열) → [(mark, 입력값 dict), ...]"""
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+
+    schedule = []
+    for i, row in enumerate(rows, start=1):
+        mark = str(row.get("mark") or f"B{i}").strip()
+        inputs = {k: float(v) for k, v in row.items() if k in DESIGN_FIELDS and v not in ("", None)}
+        schedule.append((mark, inputs))
+    return schedule
+
+
+def safe_filename(mark):
+    """부재 마크 → 파일명 (경로 구분자/공백 등은 '_' 로 치환)"""
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", mark).strip("._") or "beam"
+
+
+def _init_worker():
+    get_styles()
+
+
+def render_one(mark, inputs, out_dir):
+    """부재 1개 계산서 생성 → (mark, 경로, 소요 시간 s) (프로세스 풀 작업 단위)"""
+    start = time.perf_counter()
+    design = CastellatedBeamDesign(**inputs)
+    result = design.check()
+    path = os.path.join(out_dir, f"{safe_filename(mark)}.pdf")
+    build_pdf(design, result, path, mark=mark)
+    return mark, path, time.perf_counter() - start
+
+
+def render_batch(schedule, out_dir, workers=None):
+    """부재별 계산서를 프로세스 풀에서 생성 (입력 순서대로 결과 반환)"""
+    os.makedirs(out_dir, exist_ok=True)
+    marks = [m for m, _ in schedule]
+    names = [safe_filename(m) for m in marks]
+    duplicated = {n for n in names if names.count(n) > 1}
+    if duplicated:
+        raise ValueError(f"파일명이 중복되는 부재 마크: {', '.join(sorted(duplicated))}")
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(schedule) <= 1:
+        _init_worker()
+        return [render_one(m, inp, out_dir) for m, inp in schedule]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(render_one, marks, [inp for _, inp in schedule], [out_dir] * len(schedule)))
+
+
+def render_merged(schedule, path):
+    """전체 부재를 목차가 있는 하나의 PDF 로 생성"""
+    styles = get_styles()
+    toc = TableOfContents()
+    toc.levelStyles = [styles["TOC1"]]
+
+    # 일람표 전체를 한 번의 배열 연산으로 검토
+    per_beam = [CastellatedBeamDesign(**inp).arrays() for _, inp in schedule]
+    arrays = {n: np.concatenate([a[n] for a in per_beam]) for n in per_beam[0]}
+    result = check_beams(**arrays)
+
+    story = [Paragraph("캐스틸레이티드 보 계산서 목차", styles["H2"]), Spacer(1, 6), toc]
+    for k, (mark, _) in enumerate(schedule):
+        story.append(PageBreak())
+        inp = {n: float(v[k]) for n, v in arrays.items()}
+        story.extend(build_story(inp, result, styles, k, mark))
+
+    MergedReportTemplate(path).multiBuild(story)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캐스틸레이티드 보 계산서 일괄 생성")
+    parser.add_argument("schedule", help="보 일람표 (CSV 또는 JSON)")
+    parser.add_argument("--out-dir", default="reports", help="부재별 PDF 출력 폴더")
+    parser.add_argument("--merged", default=None, help="목차가 있는 통합 PDF 경로")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    schedule = load_schedule(args.schedule)
+    print(f"📋 부재 {len(schedule)}개 계산서 생성")
+
+    start = time.perf_counter()
+    rendered = render_batch(schedule, args.out_dir, args.workers)
+    wall = time.perf_counter() - start
+
+    for mark, path, elapsed in rendered:
+        print(f"   {mark}: {path} ({elapsed * 1000:.0f} ms)")
+    total = sum(e for _, _, e in rendered)
+    print(f"✅ {len(rendered)}개 완료: 경과 {wall:.2f} s (부재별 합계 {total:.2f} s)")
+
+    if args.merged:
+        start = time.perf_counter()
+        render_merged(schedule, args.merged)
+        print(f"✅ 통합 계산서: {args.merged} ({time.perf_counter() - start:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
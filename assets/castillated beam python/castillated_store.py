@@ -0,0 +1,492 @@
+# -*- coding: utf-8 -*-
+"""
+대규모 형상 스윕 결과 저장소 (메모리 맵 열 파일)
+- 스윕 결과 1행 = 고정 폭 NumPy 구조체 (RECORD_DTYPE), 열마다 raw 파일 1개 (<필드>.bin)
+  에 청크 단위로 이어 씀 → 후보 수가 메모리보다 커도 스윕 가능
+- 청크마다 열별 최솟값 / 최댓값 (zone map) 을 zones.bin 에 기록하여, 조건에 맞을 수 없는
+  청크는 읽지 않음 (단면 / 경간별로 청크가 나뉘므로 단면·경간 조건은 해당 청크만 읽음)
+- 조회는 np.memmap 을 블록 단위로 훑으며 조건에 필요한 열만 읽음
+  (UR ≤ 한계, buckling_ok, 용접 치수, 단면, 경간 / 중량-UR Pareto front)
+  → 메모리 사용량은 블록 크기로 일정하고, 다시 조회할 때는 OS 페이지 캐시에서 바로 읽음
+- 격자 (단면 × 경간 × e × p × ho × θ × end_post) 는 청크마다 인덱스로 만들어
+  전체 격자를 메모리에 만들지 않음 (castillated_sweep 의 평가 함수를 그대로 사용)
+
+    from castillated_store import SweepStore, sweep_to_store
+
+    store = sweep_to_store("sweep_h600", sections=["H600x200x11x17", "H588x300x12x20"],
+                           spans=[12.0, 13.5, 15.0], e=range(150, 301, 5), ...)
+    store.query(ur_max=0.9, buckling_ok=True, w_max=6, sort="weight", limit=20)
+    store.pareto(ur_max=1.0)            # 중량-UR Pareto front
+
+사용법:
+    python castillated_store.py sweep sweep_h600 --sections H600x200x11x17,H588x300x12x20 --L 12:15:1.5
+    python castillated_store.py query sweep_h600 --ur-max 0.9 --buckling-ok --w-max 6 --limit 20
+    python castillated_store.py pareto sweep_h600 --ur-max 1.0
+    python castillated_store.py info sweep_h600
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from castillated_core import CastellatedBeamDesign
+from castillated_sweep import (
+    DEFAULT_CHUNK_SIZE,
+    SWEEP_FIELDS,
+    evaluate_candidates,
+    feasible_mask,
+    parse_values,
+    section_grid,
+    sweep_base,
+)
+
+STORE_VERSION = 1
+META_FILE = "meta.json"
+ZONE_FILE = "zones.bin"
+
+DEFAULT_BLOCK_ROWS = 1 << 20        # 조회 시 한 번에 읽는 행 수
+
+BASE_SECTION = ""                   # section 미지정 (base 의 bf / tf / tw / dc 사용)
+
+# section 은 meta.json 의 sections 목록 인덱스
+RECORD_DTYPE = np.dtype([
+    ("section", "<i2"),
+    ("L", "<f8"),
+    ("e", "<f8"),
+    ("p", "<f8"),
+    ("ho", "<f8"),
+    ("theta", "<f8"),
+    ("end_post", "<f8"),
+    ("dc", "<f8"),
+    ("weight", "<f8"),
+    ("UR_gov", "<f8"),
+    ("Mrh", "<f8"),
+    ("phiMocr", "<f8"),
+    ("w_final", "<f8"),
+    ("buckling_ok", "?"),
+    ("passed", "?"),
+])
+
+# 청크별 (시작 행, 끝 행, 열별 최솟값, 최댓값)
+ZONE_DTYPE = np.dtype(
+    [("start", "<i8"), ("stop", "<i8")]
+    + [(f"min_{n}", "<f8") for n in RECORD_DTYPE.names]
+    + [(f"max_{n}", "<f8") for n in RECORD_DTYPE.names]
+)
+
+
+# ---------------------------------------------------------------------
+# 1. 저장소
+# ---------------------------------------------------------------------
+class SweepStore:
+    """열별 메모리 맵 파일로 된 스윕 결과 (append-only)
+
+    쓰기 순서: 열 데이터 → zone → meta.json (rows) 교체. meta.json 의 행 수까지만 유효하므로
+    쓰는 도중 중단되어도 다시 열면 마지막으로 완료한 청크까지의 결과가 남습니다.
+    열기만 해서는 파일을 바꾸지 않으므로 (앞쪽 meta.json 행 수만 매핑), 기록 중인 저장소도
+    다른 프로세스에서 조회할 수 있습니다. append 는 meta.json 의 행 수 위치부터 쓰고 그 뒤의
+    쓰다 만 데이터를 잘라냅니다.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / META_FILE, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"지원하지 않는 저장소 형식: version {meta.get('version')}")
+        if np.dtype([tuple(d) for d in meta["dtype"]]) != RECORD_DTYPE:
+            raise ValueError("저장소의 열 구성이 RECORD_DTYPE 과 다릅니다. 다시 생성하세요.")
+        self.meta = meta
+        self._columns = {}
+        self._zones = None
+
+    @classmethod
+    def create(cls, path, sections=(BASE_SECTION,), base=None, overwrite=False):
+        """빈 저장소 생성 (sections: 단면 명칭 목록, base: 기록용 공통 입력값 dict)"""
+        path = Path(path)
+        if path.exists():
+            if not overwrite:
+                raise FileExistsError(f"이미 있는 저장소: {path} (--overwrite 로 덮어쓰기)")
+            shutil.rmtree(path)
+        path.mkdir(parents=True)
+        for name in RECORD_DTYPE.names:
+            (path / f"{name}.bin").touch()
+        (path / ZONE_FILE).touch()
+        meta = {"version": STORE_VERSION, "dtype": RECORD_DTYPE.descr, "rows": 0, "chunks": 0,
+                "sections": list(sections), "base": base or {}}
+        _write_meta(path, meta)
+        return cls(path)
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    @property
+    def sections(self):
+        return self.meta["sections"]
+
+    def append(self, records):
+        """구조체 배열 (RECORD_DTYPE) 1청크 추가"""
+        records = np.asarray(records, dtype=RECORD_DTYPE)
+        if len(records) == 0:
+            return
+        zone = np.zeros(1, dtype=ZONE_DTYPE)
+        zone["start"], zone["stop"] = len(self), len(self) + len(records)
+        for name in RECORD_DTYPE.names:
+            col = records[name]
+            _write_at(self.path / f"{name}.bin", len(self) * col.itemsize, col.tobytes())
+            zone[f"min_{name}"], zone[f"max_{name}"] = col.min(), col.max()
+        _write_at(self.path / ZONE_FILE, self.meta["chunks"] * ZONE_DTYPE.itemsize, zone.tobytes())
+
+        self.meta["rows"] += len(records)
+        self.meta["chunks"] += 1
+        _write_meta(self.path, self.meta)
+        self._columns.clear()
+        self._zones = None
+
+    def column(self, name):
+        """열 전체의 읽기 전용 memmap (파일을 읽지 않고 매핑만)"""
+        if name not in self._columns:
+            if len(self) == 0:
+                self._columns[name] = np.zeros(0, dtype=RECORD_DTYPE[name])
+            else:
+                self._columns[name] = np.memmap(self.path / f"{name}.bin", dtype=RECORD_DTYPE[name],
+                                                mode="r", shape=(len(self),))
+        return self._columns[name]
+
+    def zones(self):
+        if self._zones is None:
+            self._zones = np.fromfile(self.path / ZONE_FILE, dtype=ZONE_DTYPE, count=self.meta["chunks"])
+        return self._zones
+
+    def section_id(self, section):
+        if section not in self.sections:
+            raise KeyError(f"저장소에 없는 단면: {section}")
+        return self.sections.index(section)
+
+    # -----------------------------------------------------------------
+    # 조회
+    # -----------------------------------------------------------------
+    def _conditions(self, ur_max=None, buckling_ok=None, passed=None, w_max=None, weight_max=None,
+                    section=None, L=None):
+        """조회 조건 → [(열, 하한, 상한)] (양 끝 포함, bool 은 0 / 1)"""
+        cond = []
+        if ur_max is not None:
+            cond.append(("UR_gov", -np.inf, ur_max))
+        if buckling_ok is not None:
+            cond.append(("buckling_ok", float(buckling_ok), float(buckling_ok)))
+        if passed is not None:
+            cond.append(("passed", float(passed), float(passed)))
+        if w_max is not None:
+            cond.append(("w_final", -np.inf, w_max))
+        if weight_max is not None:
+            cond.append(("weight", -np.inf, weight_max))
+        if section is not None:
+            k = self.section_id(section)
+            cond.append(("section", k, k))
+        if L is not None:
+            cond.append(("L", L, L))
+        return cond
+
+    def _blocks(self, cond, block_rows):
+        """조건을 만족할 수 있는 청크의 (start, stop) 블록 (zone map 으로 건너뜀)"""
+        for z in self.zones():
+            if any(z[f"max_{n}"] < lo or z[f"min_{n}"] > hi for n, lo, hi in cond):
+                continue
+            for start in range(int(z["start"]), int(z["stop"]), block_rows):
+                yield start, min(start + block_rows, int(z["stop"]))
+
+    def _scan(self, cond, block_rows):
+        """조건을 만족하는 행 번호를 블록별로 반환 (generator)"""
+        for start, stop in self._blocks(cond, block_rows):
+            mask = np.ones(stop - start, dtype=bool)
+            for name, lo, hi in cond:
+                col = self.column(name)[start:stop]
+                mask &= (col >= lo) & (col <= hi)
+            idx = np.flatnonzero(mask)
+            if len(idx):
+                yield idx + start
+
+    def rows(self, index, fields=None):
+        """행 번호 → 구조체 배열 (fields 로 열 선택)"""
+        dtype = RECORD_DTYPE if fields is None else np.dtype([(n, RECORD_DTYPE[n]) for n in fields])
+        out = np.empty(len(index), dtype=dtype)
+        for name in dtype.names:
+            out[name] = self.column(name)[index]
+        return out
+
+    def count(self, block_rows=DEFAULT_BLOCK_ROWS, **conditions):
+        return sum(len(idx) for idx in self._scan(self._conditions(**conditions), block_rows))
+
+    def query(self, fields=None, sort=None, limit=None, block_rows=DEFAULT_BLOCK_ROWS, **conditions):
+        """조건에 맞는 행 (구조체 배열)
+
+        conditions: ur_max, buckling_ok, passed, w_max (용접 치수 mm), weight_max, section, L
+        sort: 오름차순 정렬 열 (동률은 UR_gov, 행 번호 순). limit 과 함께 주면 블록마다 상위
+              limit 개만 남기므로 결과 수와 관계없이 메모리가 일정합니다.
+        """
+        cond = self._conditions(**conditions)
+        keep = np.zeros(0, dtype=np.int64)
+        for idx in self._scan(cond, block_rows):
+            keep = np.concatenate([keep, idx])
+            if sort is not None and limit is not None and len(keep) > limit:
+                keep = keep[self._order(keep, sort)[:limit]]
+            elif sort is None and limit is not None and len(keep) >= limit:
+                keep = keep[:limit]
+                break
+        if sort is not None:
+            keep = keep[self._order(keep, sort)]
+        if limit is not None:
+            keep = keep[:limit]
+        return self.rows(keep, fields)
+
+    def _order(self, index, sort):
+        index = np.asarray(index)
+        return np.lexsort((index, self.column("UR_gov")[index], self.column(sort)[index]))
+
+    def pareto(self, x="weight", y="UR_gov", block_rows=DEFAULT_BLOCK_ROWS, **conditions):
+        """x, y 를 모두 최소화하는 Pareto front (x 오름차순 구조체 배열)
+
+        블록마다 (지금까지의 front ∪ 블록 행) 의 front 만 남기므로 front 크기만큼의 메모리만 사용합니다.
+        """
+        front = np.zeros(0, dtype=np.int64)
+        for idx in self._scan(self._conditions(**conditions), block_rows):
+            cand = np.concatenate([front, idx])
+            front = cand[pareto_indices(self.column(x)[cand], self.column(y)[cand])]
+        return self.rows(front)
+
+    def summary(self):
+        """저장소 요약 (행 수, 청크 수, 통과 수, 단면별 행 수)"""
+        z = self.zones()
+        passed = sum(int(self.column("passed")[start:stop].sum())
+                     for start, stop in self._blocks([], DEFAULT_BLOCK_ROWS))
+        per_section = {s: int(np.sum((z["stop"] - z["start"])[z["min_section"] == k]))
+                       for k, s in enumerate(self.sections)}
+        size = sum(f.stat().st_size for f in self.path.glob("*.bin"))
+        return {"rows": len(self), "chunks": self.meta["chunks"], "passed": passed,
+                "sections": per_section, "bytes": size}
+
+
+def _write_at(path, offset, data):
+    """offset 부터 data 를 쓰고 그 뒤 (중단된 이전 쓰기의 나머지) 는 잘라냄"""
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.write(data)
+        f.truncate()
+
+
+def _write_meta(path, meta):
+    tmp = path / (META_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path / META_FILE)
+
+
+def pareto_indices(x, y):
+    """(x, y) 최소화 Pareto front 의 위치 (x 오름차순, 같은 점은 하나만)"""
+    order = np.lexsort((y, x))
+    ys = y[order]
+    best = np.minimum.accumulate(ys)
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = ys[1:] < best[:-1]
+    return order[keep]
+
+
+# ---------------------------------------------------------------------
+# 2. 스윕 → 저장소
+# ---------------------------------------------------------------------
+def grid_chunk(axes, start, stop):
+    """형상 격자 (SWEEP_FIELDS 축) 의 start ~ stop 번째 후보 (전체 격자를 만들지 않음)"""
+    idx = np.unravel_index(np.arange(start, stop), [len(a) for a in axes])
+    return {name: a[i] for name, a, i in zip(SWEEP_FIELDS, axes, idx)}
+
+
+def evaluate_chunk(base, section, section_id, axes, start, stop, ur_limit):
+    """격자 start ~ stop 평가 → RECORD_DTYPE 구조체 배열 (실행 가능 후보만, 프로세스 풀 작업 단위)"""
+    grid = grid_chunk(axes, start, stop)
+    if section != BASE_SECTION:
+        grid.update(section_grid(section, grid, base["Fy"]))
+    mask = feasible_mask(base, grid)
+    grid = {n: v[mask] for n, v in grid.items()}
+
+    records = np.zeros(int(mask.sum()), dtype=RECORD_DTYPE)
+    if len(records) == 0:
+        return records
+    res = evaluate_candidates(base, grid, ur_limit)
+    records["section"] = section_id
+    records["L"] = base["L"]
+    records["dc"] = grid.get("dc", base["dc"])
+    for name in RECORD_DTYPE.names:
+        if name in res:
+            records[name] = res[name]
+    return records
+
+
+def sweep_tasks(base, sections, spans, axes, chunk_size):
+    """(단면, 경간) 마다 격자를 chunk_size 씩 나눈 evaluate_chunk 인자"""
+    n_grid = int(np.prod([len(a) for a in axes]))
+    for k, section in enumerate(sections):
+        for L in spans:
+            b = sweep_base(CastellatedBeamDesign(**{**base, "L": L}), section or None)
+            for start in range(0, n_grid, chunk_size):
+                yield b, section, k, axes, start, min(start + chunk_size, n_grid)
+
+
+def sweep_to_store(path, base=None, sections=(BASE_SECTION,), spans=None, e=(200.0,), p=(0.9,), ho=(0.6,),
+                   theta=(60.0,), end_post=(0.9,), ur_limit=1.0, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                   overwrite=False, progress=None):
+    """단면 × 경간 × 형상 격자 스윕 결과를 저장소에 청크 단위로 기록 → SweepStore
+
+    base: 경간 / 하중 등 공통 입력값 dict (CastellatedBeamDesign 필드, 기본값 = Option 1)
+    sections: 단면 DB 명칭 목록 ("" = base 의 단면 치수)
+    spans: 경간 목록 (None = base 의 L)
+    progress: (완료 청크 수, 전체 청크 수, 저장 행 수) 를 받는 함수
+    프로세스 풀에는 workers × 2 청크까지만 넘기므로 후보 수와 관계없이 메모리가 일정합니다.
+    """
+    base = dict(base or {})
+    spans = [float(base.get("L", CastellatedBeamDesign.L))] if spans is None else [float(L) for L in spans]
+    axes = [np.atleast_1d(np.asarray(v, dtype=float)) for v in (e, p, ho, theta, end_post)]
+    n_grid = int(np.prod([len(a) for a in axes]))
+    n_chunks = len(sections) * len(spans) * -(-n_grid // chunk_size)
+
+    store = SweepStore.create(path, sections=sections, overwrite=overwrite, base={
+        **base, "spans": spans, "ur_limit": ur_limit, "n_grid": n_grid,
+        **{n: a.tolist() for n, a in zip(SWEEP_FIELDS, axes)},
+    })
+    tasks = sweep_tasks(base, sections, spans, axes, chunk_size)
+    workers = workers or os.cpu_count() or 1
+
+    def done(records, k):
+        store.append(records)
+        if progress:
+            progress(k, n_chunks, len(store))
+
+    if workers == 1 or n_chunks == 1:
+        for k, task in enumerate(tasks, start=1):
+            done(evaluate_chunk(*task, ur_limit), k)
+        return store
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        k = 0
+        for task in tasks:
+            pending.append(pool.submit(evaluate_chunk, *task, ur_limit))
+            if len(pending) < workers * 2:
+                continue
+            k += 1
+            done(pending.popleft().result(), k)
+        while pending:
+            k += 1
+            done(pending.popleft().result(), k)
+    return store
+
+
+# ---------------------------------------------------------------------
+# 3. CLI
+# ---------------------------------------------------------------------
+def print_rows(store, rows):
+    for r in rows:
+        section = store.sections[r["section"]] or "(base)"
+        ok = "OK" if r["buckling_ok"] else "NG"
+        print(f"   {section} L={r['L']:.2f} e={r['e']:.0f} p={r['p']:.2f} ho={r['ho']:.2f} "
+              f"θ={r['theta']:.0f} end={r['end_post']:.2f} | {r['weight']:.1f} kg, UR {r['UR_gov']:.3f}, "
+              f"좌굴 {ok}, 용접 {r['w_final']:.0f} mm")
+
+
+def add_filters(parser):
+    parser.add_argument("--ur-max", type=float, default=None)
+    parser.add_argument("--buckling-ok", action="store_true", default=None, help="web-post 좌굴 OK 만")
+    parser.add_argument("--passed", action="store_true", default=None, help="통과 후보만")
+    parser.add_argument("--w-max", type=float, default=None, help="용접 치수 상한 (mm)")
+    parser.add_argument("--weight-max", type=float, default=None, help="중량 상한 (kg)")
+    parser.add_argument("--section", default=None)
+    parser.add_argument("--L", type=float, default=None, help="경간 (m)")
+
+
+def filters(args):
+    return dict(ur_max=args.ur_max, buckling_ok=args.buckling_ok, passed=args.passed, w_max=args.w_max,
+                weight_max=args.weight_max, section=args.section, L=args.L)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캐스틸레이티드 보 스윕 결과 저장소 (메모리 맵)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_sweep = sub.add_parser("sweep", help="스윕 결과를 저장소에 기록")
+    p_sweep.add_argument("store", help="저장소 폴더")
+    p_sweep.add_argument("--sections", default="", help="단면 DB 명칭 목록 (쉼표 구분, 생략 = 기본 단면)")
+    p_sweep.add_argument("--L", default="13.5", help="경간 목록 또는 start:stop:step (m)")
+    p_sweep.add_argument("--e", default="150:300:25", help="e (mm)")
+    p_sweep.add_argument("--p", default="0.7:1.2:0.1", help="p (m)")
+    p_sweep.add_argument("--ho", default="0.5:0.65:0.05", help="ho (m)")
+    p_sweep.add_argument("--theta", default="45,60", help="θ (deg)")
+    p_sweep.add_argument("--end-post", default="0.6:1.0:0.1", help="end_post (m)")
+    p_sweep.add_argument("--DL", type=float, default=8.0, help="고정하중 (kN/m)")
+    p_sweep.add_argument("--LL", type=float, default=6.0, help="활하중 (kN/m)")
+    p_sweep.add_argument("--ur-limit", type=float, default=1.0)
+    p_sweep.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    p_sweep.add_argument("--workers", type=int, default=None)
+    p_sweep.add_argument("--overwrite", action="store_true")
+
+    p_query = sub.add_parser("query", help="조건 조회")
+    p_query.add_argument("store")
+    add_filters(p_query)
+    p_query.add_argument("--sort", default="weight", help="정렬 열 (오름차순)")
+    p_query.add_argument("--limit", type=int, default=20)
+
+    p_pareto = sub.add_parser("pareto", help="중량-UR Pareto front")
+    p_pareto.add_argument("store")
+    add_filters(p_pareto)
+
+    p_info = sub.add_parser("info", help="저장소 요약")
+    p_info.add_argument("store")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "sweep":
+        sections = [s.strip() for s in args.sections.split(",")] if args.sections else [BASE_SECTION]
+
+        def progress(k, n, rows):
+            print(f"\r   청크 {k}/{n}, 저장 {rows:,}행", end="", flush=True)
+
+        store = sweep_to_store(
+            args.store, base={"DL": args.DL, "LL": args.LL}, sections=sections, spans=parse_values(args.L),
+            e=parse_values(args.e), p=parse_values(args.p), ho=parse_values(args.ho),
+            theta=parse_values(args.theta), end_post=parse_values(args.end_post), ur_limit=args.ur_limit,
+            workers=args.workers, chunk_size=args.chunk_size, overwrite=args.overwrite, progress=progress,
+        )
+        elapsed = time.perf_counter() - start
+        print(f"\n✅ 스윕 완료: 실행 가능 후보 {len(store):,}개 ({elapsed:.2f} s) → {args.store}")
+        return
+
+    if not (Path(args.store) / META_FILE).exists():
+        raise SystemExit(f"❌ 저장소가 없습니다: {args.store}")
+    store = SweepStore(args.store)
+    if args.command == "info":
+        s = store.summary()
+        print(f"🗄️  {args.store}: {s['rows']:,}행 / 청크 {s['chunks']}개 / 통과 {s['passed']:,}개 "
+              f"({s['bytes'] / 1024 / 1024:.1f} MB)")
+        for section, n in s["sections"].items():
+            print(f"   {section or '(base)'}: {n:,}행")
+        return
+
+    if args.command == "query":
+        n = store.count(**filters(args))
+        rows = store.query(sort=args.sort, limit=args.limit, **filters(args))
+        print(f"🔎 조건 만족 {n:,}개 / 전체 {len(store):,}개 ({(time.perf_counter() - start) * 1000:.1f} ms), "
+              f"{args.sort} 오름차순 상위 {len(rows)}개")
+    else:
+        rows = store.pareto(**filters(args))
+        print(f"📈 중량-UR Pareto front {len(rows)}개 / 전체 {len(store):,}개 "
+              f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+    print_rows(store, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+캐스틸레이티드 보 형상 파라메트릭 스윕
+- (e, p, ho, θ, end_post) 격자의 모든 후보에 대해 지배 개구부 UR,
+  DG31 web-post 좌굴 (Mrh ≤ φMocr), 용접 치수를 계산
+- 기하학적으로 불가능한 후보 (b_wp ≤ 0 등)는 계산 전에 제외
+- 후보를 청크로 나누어 프로세스 풀에서 병렬 평가
+- 통과 후보 중 최경량 형상 반환
+- --section 을 주면 단면 DB (steel_sections)의 치수와 (단면, ho) 별 캐시된 Tee 성능 사용
+
+사용법:
+    python castillated_sweep.py --e 150:300:25 --p 0.7:1.2:0.1 --ho 0.5,0.55,0.6
+    python castillated_sweep.py --L 15 --LL 7 --workers 8
+    python castillated_sweep.py --section H588x300x12x20 --ho 0.3:0.45:0.05
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from castillated_core import CastellatedBeamDesign, TEE_FIELDS, check_beams, opening_geometry
+from steel_sections import load_sections
+
+SWEEP_FIELDS = ("e", "p", "ho", "theta", "end_post")
+
+DEFAULT_CHUNK_SIZE = 20000
+
+
+@dataclass
+class SweepResult:
+    """스윕 결과 요약 + 실행 가능 후보 전체의 결과 배열"""
+
+    n_total: int
+    n_feasible: int
+    n_passed: int
+    candidates: dict                    # 실행 가능 후보의 형상/결과 배열
+    best: dict                          # 최경량 통과 후보 (없으면 None)
+
+
+def candidate_grid(e, p, ho, theta, end_post):
+    """각 변수 값 목록의 직교 곱을 1차원 배열 dict로 반환"""
+    axes = [np.atleast_1d(np.asarray(v, dtype=float)) for v in (e, p, ho, theta, end_post)]
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return {name: m.ravel() for name, m in zip(SWEEP_FIELDS, mesh)}
+
+
+def feasible_mask(base, grid):
+    """계산 전에 걸러낼 수 있는 기하학적 조건 (web-post 폭, Tee stem, 개구부 수)"""
+    _, _, b_wp = opening_geometry(grid["ho"], grid["theta"], grid["e"], grid["p"])
+    dc = grid.get("dc", base["dc"])
+    stem = (dc - grid["ho"]) * 1000.0 / 2.0 - base["tf"]
+    n_openings = np.rint((base["L"] - 2.0 * grid["end_post"]) / grid["p"])
+    return (b_wp > 0) & (stem > 0) & (n_openings >= 1)
+
+
+def evaluate_candidates(base, grid, ur_limit=1.0):
+    """단일 보 입력(base) + 형상 배열(grid) 평가 (프로세스 풀 작업 단위)"""
+    design = replace(CastellatedBeamDesign(**base), **grid)
+    result = check_beams(**design.arrays())
+    passed = (result.UR_gov <= ur_limit) & result.buckling_ok
+    return {
+        **grid,
+        "weight": result.weight,
+        "UR_gov": result.UR_gov,
+        "Mrh": result.Mrh,
+        "phiMocr": result.phiMocr,
+        "buckling_ok": result.buckling_ok,
+        "w_final": result.w_final,
+        "passed": passed,
+    }
+
+
+def section_grid(section, grid, Fy):
+    """단면 DB 의 (단면, ho) 캐시로 후보별 dc / Tee 성능 배열 생성"""
+    table = load_sections()
+    ho_values, inverse = np.unique(grid["ho"], return_inverse=True)
+    tees = [table.tee(section, ho, Fy) for ho in ho_values]
+    return {n: np.array([t[n] for t in tees])[inverse] for n in ("dc",) + TEE_FIELDS}
+
+
+def sweep_base(base=None, section=None):
+    """스윕 후보에 공통인 단일 보 입력 dict (형상 필드 제외, Tee 성능은 None = 다시 계산)"""
+    base = replace(base or CastellatedBeamDesign(), **{n: None for n in TEE_FIELDS})
+    if section is not None:
+        s = load_sections().get(section)
+        base = replace(base, bf=s.B, tf=s.tf, tw=s.tw)
+    base_arrays = base.arrays()
+    if len(base_arrays["L"]) != 1:
+        raise ValueError("sweep()의 base 는 단일 보 입력이어야 합니다.")
+    base_kwargs = {n: float(v[0]) for n, v in base_arrays.items() if n not in TEE_FIELDS + SWEEP_FIELDS}
+    base_kwargs.update({n: None for n in TEE_FIELDS})
+    return base_kwargs
+
+
+def sweep(base=None, e=(200.0,), p=(0.9,), ho=(0.6,), theta=(60.0,), end_post=(0.9,),
+          ur_limit=1.0, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, section=None):
+    """형상 격자 스윕 후 최경량 통과 형상 탐색
+
+    base: 경간/하중/단면을 지정한 단일 CastellatedBeamDesign (기본값 = Option 1).
+          Tee 성능은 ho 에 따라 달라지므로 항상 단면 치수로 다시 계산합니다.
+    section: 단면 DB 명칭 (예: "H600x200x11x17"). 지정하면 bf/tf/tw 를 DB 값으로 쓰고
+             전체 춤 dc = H + ho/2 와 Tee 성능을 (단면, ho) 캐시에서 가져옵니다.
+    workers: 프로세스 수 (None = CPU 코어 수, 1 = 현재 프로세스에서 실행)
+    결과 전체를 메모리에 모으므로, 후보가 수백만 개 이상이면 castillated_store.sweep_to_store 를 사용하세요.
+    """
+    base_kwargs = sweep_base(base, section)
+
+    grid = candidate_grid(e, p, ho, theta, end_post)
+    n_total = len(grid["e"])
+    if section is not None:
+        grid.update(section_grid(section, grid, base_kwargs["Fy"]))
+    mask = feasible_mask(base_kwargs, grid)
+    grid = {n: v[mask] for n, v in grid.items()}
+    n_feasible = len(grid["e"])
+
+    if n_feasible == 0:
+        return SweepResult(n_total=n_total, n_feasible=0, n_passed=0, candidates={}, best=None)
+
+    n_chunks = max(1, -(-n_feasible // chunk_size))
+    chunks = [{n: v[s] for n, v in grid.items()}
+              for s in np.array_split(np.arange(n_feasible), n_chunks)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or n_chunks == 1:
+        parts = [evaluate_candidates(base_kwargs, c, ur_limit) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, n_chunks)) as pool:
+            parts = list(pool.map(evaluate_candidates, [base_kwargs] * n_chunks, chunks,
+                                  [ur_limit] * n_chunks))
+
+    candidates = {n: np.concatenate([part[n] for part in parts]) for n in parts[0]}
+
+    passed = candidates["passed"]
+    best = None
+    if passed.any():
+        # 최경량 → 동일 중량이면 UR 이 작은 형상
+        order = np.lexsort((candidates["UR_gov"], np.where(passed, candidates["weight"], np.inf)))
+        k = int(order[0])
+        best = {n: v[k].item() for n, v in candidates.items()}
+
+    return SweepResult(
+        n_total=n_total,
+        n_feasible=n_feasible,
+        n_passed=int(passed.sum()),
+        candidates=candidates,
+        best=best,
+    )
+
+
+def parse_values(spec):
+    """'a,b,c' 목록 또는 'start:stop:step' 범위 (stop 포함)"""
+    if ":" in spec:
+        start, stop, step = (float(s) for s in spec.split(":"))
+        return np.arange(start, stop + step * 0.5, step)
+    return np.array([float(s) for s in spec.split(",")])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캐스틸레이티드 보 형상 스윕")
+    parser.add_argument("--e", default="150:300:25", help="e (mm)")
+    parser.add_argument("--p", default="0.7:1.2:0.1", help="p (m)")
+    parser.add_argument("--ho", default="0.5:0.65:0.05", help="ho (m)")
+    parser.add_argument("--theta", default="45,60", help="θ (deg)")
+    parser.add_argument("--end-post", default="0.6:1.0:0.1", help="end_post (m)")
+    parser.add_argument("--section", default=None, help="단면 DB 명칭 (예: H600x200x11x17)")
+    parser.add_argument("--L", type=float, default=13.5, help="경간 (m)")
+    parser.add_argument("--DL", type=float, default=8.0, help="고정하중 (kN/m)")
+    parser.add_argument("--LL", type=float, default=6.0, help="활하중 (kN/m)")
+    parser.add_argument("--ur-limit", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    base = CastellatedBeamDesign(L=args.L, DL=args.DL, LL=args.LL)
+    res = sweep(
+        base,
+        e=parse_values(args.e),
+        p=parse_values(args.p),
+        ho=parse_values(args.ho),
+        theta=parse_values(args.theta),
+        end_post=parse_values(args.end_post),
+        ur_limit=args.ur_limit,
+        workers=args.workers,
+        section=args.section,
+    )
+
+    print(f"후보 {res.n_total}개 / 실행 가능 {res.n_feasible}개 / 통과 {res.n_passed}개")
+    if res.best is None:
+        print("통과하는 형상이 없습니다.")
+        return
+    b = res.best
+    print(
+        f"최경량 형상: e = {b['e']:.0f} mm, p = {b['p']:.2f} m, ho = {b['ho']:.2f} m, "
+        f"θ = {b['theta']:.0f}°, end_post = {b['end_post']:.2f} m"
+    )
+    print(
+        f"  중량 = {b['weight']:.1f} kg, UR = {b['UR_gov']:.3f}, "
+        f"Mrh = {b['Mrh']:.2f} ≤ φMocr = {b['phiMocr']:.2f} kN·m, 용접 = {b['w_final']:.0f} mm"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,854 @@
+# -*- coding: utf-8 -*-
+"""
+K-COL BOQ (공사 수량 산출서) 스트리밍 집계
+- auto-find-section.html 의 generateBOQWithLengths, boq-report.html 의 loadBOQData /
+  generatePlateBOQ / generateRolledHBOQ / generateSubMaterialBOQ /
+  group*ItemsByQuantity / 두께 통합 규칙과 같은 표와 합계
+- Auto Find Section 결과를 한 행씩 받아 규격 키별 집계기에 누적 (결과 목록을 보관하지 않음)
+  → 메모리는 행 수가 아니라 서로 다른 규격 수에 비례
+- 두께 통합 규칙은 Plate 로 분해되는 집계 항목에 스트리밍 변환으로 적용
+- 기둥명은 웹과 같이 전부 표시 (--max-names N: 항목마다 N 개만 보관하고 나머지는 '외 N개' 로 표시)
+- 결과는 XLSX (write-only) / CSV 로 한 행씩 기록
+
+사용법:
+    python kcol_boq.py loads.xlsx --counts BOQ_Type개수.xlsx
+    python kcol_boq.py loads.xlsx --counts counts.xlsx --merge 11:12 --merge 13:14 -o boq.xlsx
+    python kcol_boq.py loads.xlsx --counts counts.xlsx --csv boq.csv --group-plates
+
+엑셀 입출력에는 openpyxl 이 필요합니다 (pip install openpyxl).
+"""
+
+import argparse
+import csv
+import json
+import math
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+
+from castillated_core import STEEL_DENSITY
+from kcol_section_finder import (
+    COMBINATIONS,
+    DEFAULT_KZ,
+    DEFAULT_PMM_LIMIT,
+    iter_rows_from_excel,
+    iter_run,
+    parse_range,
+    require_openpyxl,
+)
+
+# Type별 기둥 길이 (m), auto-find-section 의 typeLengths 기본값
+TYPE_LENGTHS = {1: 26.478, 2: 23.678, 3: 25.938, 4: 22.438}
+
+# 조합 3 (Rolled H): Built-UP Plate 물량에서 제외
+ROLLED_H_COMBINATIONS = frozenset(name for name, *_ in COMBINATIONS[2:])
+
+# 단가 (원/톤), boqUnitPrices 기본값
+MAIN_PRICES = {"SM420": 1900000, "SM355": 1830000}
+SUB_MATERIAL_PRICE = 1900000
+
+SURCHARGE_RATE = 0.15               # 소부재 할증률
+PLATE3_RATIO = 0.15                 # 3 PLATE (접합부) = 전체 철골물량의 15%
+SMALL_QUANTITY_RATIO = 0.05         # 물량 그룹핑: 전체의 5% 미만 항목
+GROUP_TOLERANCE = 0.15              # 물량 그룹핑: 유사 단면 ±15%
+THICK_PLATE_ORDER_TON = 25          # 25 톤 미만 → 후판주문
+
+DEFAULT_MAX_NAMES = None            # 항목별 기둥명 보관 수 (None = 전부, generateBOQWithLengths 와 같음)
+
+COLUMN_HEADERS = ['No.', '기둥명', '조합', 'H (mm)', 'B (mm)', 'tw (mm)', 'tf (mm)', '단면적 (mm²)',
+                  '단중 (kg/m)', '길이 (m)', '길이타입', '개수', '총 중량 (kg)', '강종', '금액 (원)']
+PLATE_HEADERS = ['No.', 'Plate 종류 (두께, mm)', '사용부위', '폭 (mm)', '두께 (mm)', '단중 (kg/m)',
+                 '길이 (m)', '개수', '총 중량 (kg)', '강종', '비고']
+ROLLED_H_HEADERS = ['No.', '기둥번호', '단면 규격', '길이 (m)', '개수', '단중 (kg/m)', '총 중량 (kg)',
+                    '강종', '비고']
+SUB_MATERIAL_HEADERS = ['No.', '소부재 종류', '규격/사양', '단위', '수량', '강종', '주기둥부재물량 (kg)',
+                        '할증 (15%)', '소부재 단가 (원/톤)', '금액 (원)', '비고']
+CSV_HEADERS = ['No.', '기둥명', '조합', 'H(mm)', 'B(mm)', 'tw(mm)', 'tf(mm)', '단면적(mm²)', '단중(kg/m)',
+               '길이(m)', '길이타입', '개수', '총 중량(kg)', '강종']
+
+
+# ---------------------------------------------------------------------
+# 1. 숫자 표시 (웹 리포트와 같은 문자열)
+# ---------------------------------------------------------------------
+def js_fixed(value, digits):
+    """Number.prototype.toFixed (이진 값 그대로 반올림, 동률은 0 에서 먼 쪽)"""
+    q = Decimal(value).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP)
+    return f"{q:.{digits}f}"
+
+
+def js_str(value):
+    """`${number}` 와 같은 표시 (정수 값은 소수점 없이)"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def ko_number(value):
+    """parseFloat(v.toFixed(2)).toLocaleString('ko-KR', 소수 2자리)"""
+    return f"{float(js_fixed(value, 2)):,.2f}"
+
+
+def js_round(value):
+    """Math.round"""
+    return math.floor(value + 0.5)
+
+
+def ko_int(value):
+    """Math.round(v).toLocaleString('ko-KR')"""
+    return f"{js_round(value):,}"
+
+
+def parse_display(text):
+    """parseFloat(text.replace(/[^0-9.]/g, '')) || 0 (표 합계 셀을 다시 읽는 웹 리포트 동작)"""
+    digits = "".join(ch for ch in text if ch.isdigit() or ch == ".")
+    try:
+        return float(digits)
+    except ValueError:
+        return 0.0
+
+
+# ---------------------------------------------------------------------
+# 2. 기둥 물량 집계 (generateBOQWithLengths)
+# ---------------------------------------------------------------------
+class NameList:
+    """기둥명 목록 (최대 limit 개만 보관하고 나머지는 개수만 셈, limit=None 이면 전부)"""
+
+    __slots__ = ("names", "total", "limit")
+
+    def __init__(self, names=(), limit=None):
+        self.names = []
+        self.total = 0
+        self.limit = limit
+        for name in names:
+            self.append(name)
+
+    def __len__(self):
+        return self.total
+
+    def append(self, name):
+        self.total += 1
+        if self.limit is None or len(self.names) < self.limit:
+            self.names.append(name)
+
+    def skip(self, n):
+        """보관하지 않고 개수만 추가"""
+        self.total += n
+
+    def extend(self, other):
+        for name in other.names:
+            self.append(name)
+        self.skip(other.total - len(other.names))
+
+    def unique(self):
+        """[...new Set(names)] (보관된 이름 기준)"""
+        out = NameList(dict.fromkeys(self.names), self.limit)
+        out.skip(self.total - len(self.names))
+        return out
+
+    def join(self, sep=", "):
+        hidden = self.total - len(self.names)
+        text = sep.join(self.names)
+        return f"{text} 외 {hidden}개" if hidden else text
+
+    def summary(self):
+        """그룹핑된 항목의 대표 이름: '첫 기둥 외 N개'"""
+        if self.total > 1:
+            return NameList([f"{self.names[0]} 외 {self.total - 1}개"], self.limit)
+        return self
+
+
+@dataclass
+class BOQItem:
+    """규격 (H, B, tw, tf, 강종, Type, 길이) 별 기둥 물량"""
+
+    combination: str
+    h: float
+    b: float
+    tw: float
+    tf: float
+    area: float
+    unit_weight: float
+    length: float
+    length_type: int
+    steel_grade: str
+    H1: float
+    H2: float
+    B1: float
+    B2: float
+    count: int = 0
+    names: NameList = None
+    quantity: float = None              # 물량 그룹핑 시 unit_weight × length × count
+    is_grouped: bool = False
+
+    @property
+    def total_weight(self):
+        return self.unit_weight * self.length * self.count
+
+
+class ColumnBOQ:
+    """Auto Find Section 결과를 한 행씩 받아 규격 키별로 합산
+
+    counts: 기둥명 → (Type1, Type2, Type3, Type4 개수), 웹 계산기의 columnLengthData
+    """
+
+    def __init__(self, counts, type_lengths=None, max_names=DEFAULT_MAX_NAMES):
+        self.counts = counts
+        self.type_lengths = type_lengths or TYPE_LENGTHS
+        self.max_names = max_names
+        self._items = {}
+        self.n_results = 0
+
+    def add(self, result):
+        self.n_results += 1
+        if not result.get("tw") or not result.get("tf"):      # 유효하지 않은 결과 제외
+            return
+        counts = self.counts.get(result["name"], (0, 0, 0, 0))
+        for length_type, count in enumerate(counts, start=1):
+            if count <= 0:
+                continue
+            length = self.type_lengths.get(length_type) or 4.5
+            key = (result["h"], result["b"], result["tw"], result["tf"], result["steel_grade"],
+                   length_type, length)
+            item = self._items.get(key)
+            if item is None:
+                item = self._items[key] = BOQItem(
+                    combination=result["combination"], h=result["h"], b=result["b"],
+                    tw=result["tw"], tf=result["tf"], area=result["area"],
+                    unit_weight=result["unit_weight"], length=length, length_type=length_type,
+                    steel_grade=result["steel_grade"],
+                    H1=result.get("H1") or result["h"], H2=result.get("H2") or result["h"],
+                    B1=result.get("B1") or result["b"], B2=result.get("B2") or result["b"],
+                    names=NameList(limit=self.max_names),
+                )
+            item.count += count
+            names = item.names
+            room = count if names.limit is None else max(0, min(count, names.limit - len(names.names)))
+            for i in range(room):
+                names.append(f"{result['name']}-Type{length_type}-{i + 1}" if count > 1
+                             else f"{result['name']}-Type{length_type}")
+            names.skip(count - room)
+
+    def extend(self, results):
+        for result in results:
+            self.add(result)
+        return self
+
+    @property
+    def items(self):
+        """집계 항목 (처음 나온 순서)"""
+        return list(self._items.values())
+
+
+# ---------------------------------------------------------------------
+# 3. 물량 기준 그룹핑 (group*ItemsByQuantity)
+# ---------------------------------------------------------------------
+def _split_by_quantity(items, weight):
+    """물량순 정렬 후 전체의 5% 이상 / 미만으로 분리"""
+    items = sorted(items, key=lambda x: -(weight(x) or 0))
+    total = 0
+    for x in items:
+        total += weight(x) or 0
+    threshold = total * SMALL_QUANTITY_RATIO
+    large = [x for x in items if weight(x) >= threshold]
+    small = [x for x in items if not weight(x) >= threshold]
+    return large, small
+
+
+def _rel_diff(a, b):
+    return abs(a - b) / b
+
+
+def group_column_items(items):
+    """groupBOQItemsByQuantity: 작은 물량 항목을 유사 단면 (H, B, tw, tf ±15%, 같은 조합/강종)끼리 합침"""
+    if not items:
+        return items
+    items = [replace(item, quantity=item.unit_weight * item.length * item.count) for item in items]
+    large, small = _split_by_quantity(items, lambda x: x.quantity)
+
+    groups = []
+    for item in small:
+        if not (item.h and item.b and item.tw and item.tf):
+            large.append(item)
+            continue
+        for g in groups:
+            rep = g["items"][0]
+            if (_rel_diff(item.h, rep.h) <= GROUP_TOLERANCE and _rel_diff(item.b, rep.b) <= GROUP_TOLERANCE
+                    and _rel_diff(item.tw, rep.tw) <= GROUP_TOLERANCE
+                    and _rel_diff(item.tf, rep.tf) <= GROUP_TOLERANCE
+                    and item.combination == rep.combination and item.steel_grade == rep.steel_grade):
+                g["items"].append(item)
+                g["quantity"] += item.quantity or 0
+                g["count"] += item.count or 0
+                g["length"] += item.length * item.count or 0
+                g["names"].extend(item.names)
+                break
+        else:
+            names = NameList(limit=item.names.limit)
+            names.extend(item.names)
+            groups.append({"items": [item], "quantity": item.quantity or 0, "count": item.count or 0,
+                           "length": item.length * item.count or 0, "names": names})
+
+    grouped = [
+        replace(g["items"][0], names=g["names"].summary(), quantity=g["quantity"], count=g["count"],
+                length=g["length"] / g["count"] if g["count"] > 0 else g["items"][0].length,
+                is_grouped=True)
+        for g in groups
+    ]
+    grouped.sort(key=lambda x: -(x.quantity or 0))
+    return large + grouped
+
+
+@dataclass
+class PlateItem:
+    """두께별 Built-UP Plate 물량"""
+
+    thickness_mm: float
+    usage_parts: str
+    avg_width: float
+    unit_weight: float
+    total_length: float
+    total_count: int
+    total_weight: float
+    steel_grade: str
+    original_thicknesses: list = field(default_factory=list)
+    original_total_weight: float = 0.0
+    merge_info: str = ""
+    is_grouped: bool = False
+
+
+def group_plate_items(plates, rules):
+    """groupPlateItemsByQuantity: 작은 물량 Plate 를 두께 통합 규칙 적용 후 같은 두께
+    (또는 두께·폭 ±15%)끼리 합치고 통합 전 두께별 물량을 비고로 남김"""
+    if not plates:
+        return plates
+    large, small = _split_by_quantity(plates, lambda p: p.total_weight)
+
+    groups = []
+    for plate in small:
+        if not plate.thickness_mm or not plate.avg_width:
+            large.append(plate)
+            continue
+        original = plate.thickness_mm
+        plate = replace(plate, thickness_mm=rules.get(plate.thickness_mm, plate.thickness_mm))
+        for g in groups:
+            rep = g["items"][0][0]
+            if (plate.thickness_mm == rep.thickness_mm
+                    or (_rel_diff(plate.thickness_mm, rep.thickness_mm) <= GROUP_TOLERANCE
+                        and _rel_diff(plate.avg_width, rep.avg_width) <= GROUP_TOLERANCE)):
+                g["items"].append((plate, original))
+                g["weight"] += plate.total_weight or 0
+                g["count"] += plate.total_count or 0
+                g["length"] += plate.total_length or 0
+                g["usage"] = ", ".join(dict.fromkeys(g["usage"].split(", ") + plate.usage_parts.split(", ")))
+                g["before"][original] = g["before"].get(original, 0) + (plate.total_weight or 0)
+                break
+        else:
+            groups.append({"items": [(plate, original)], "weight": plate.total_weight or 0,
+                           "count": plate.total_count or 0, "length": plate.total_length or 0,
+                           "usage": plate.usage_parts, "before": {original: plate.total_weight or 0}})
+
+    grouped = []
+    for g in groups:
+        rep = g["items"][0][0]
+        # 웹 리포트와 같이 그룹 누적값에 items 물량을 한 번 더 더한 값을 통합 전 물량으로 표시
+        before = dict(g["before"])
+        for plate, original in g["items"]:
+            before[original] = before.get(original, 0) + (plate.total_weight or 0)
+        parts = [f"{js_str(t)}mm: {ko_number(before[t])}kg" for t in sorted(before)]
+        merge_info = f"{', '.join(parts)} → {js_str(rep.thickness_mm)}mm: {ko_number(g['weight'])}kg"
+        grouped.append(replace(
+            rep, usage_parts=g["usage"], total_weight=g["weight"], total_count=g["count"],
+            total_length=g["length"],
+            unit_weight=g["weight"] / g["length"] if g["length"] > 0 else rep.unit_weight,
+            is_grouped=True, merge_info=merge_info,
+        ))
+    grouped.sort(key=lambda p: -(p.total_weight or 0))
+    return large + grouped
+
+
+@dataclass
+class RolledHGroup:
+    """조합 / 길이별 Rolled H 물량"""
+
+    combination: str
+    length: float
+    unit_weight: float
+    steel_grade: str
+    count: int = 0
+    total_weight: float = 0.0
+    names: NameList = None
+    is_grouped: bool = False
+    original_count: int = 1
+
+
+def group_rolled_items(groups):
+    """groupRolledHItemsByQuantity: 작은 물량 항목을 같은 조합, 길이 ±15% 끼리 합침"""
+    if not groups:
+        return groups
+    large, small = _split_by_quantity(groups, lambda g: g.total_weight)
+
+    merged = []
+    for group in small:
+        if not group.combination or not group.length:
+            large.append(group)
+            continue
+        for m in merged:
+            rep = m["items"][0]
+            if group.combination == rep.combination and _rel_diff(group.length, rep.length) <= GROUP_TOLERANCE:
+                m["items"].append(group)
+                m["weight"] += group.total_weight or 0
+                m["count"] += group.count or 0
+                union = NameList(limit=m["names"].limit)
+                union.extend(m["names"])
+                union.extend(group.names)
+                m["names"] = union.unique()
+                break
+        else:
+            names = NameList(limit=group.names.limit)
+            names.extend(group.names)
+            merged.append({"items": [group], "weight": group.total_weight or 0,
+                           "count": group.count or 0, "names": names})
+
+    grouped = [
+        replace(m["items"][0], names=m["names"].summary(), total_weight=m["weight"], count=m["count"],
+                is_grouped=True, original_count=len(m["items"]))
+        for m in merged
+    ]
+    grouped.sort(key=lambda g: -(g.total_weight or 0))
+    return large + grouped
+
+
+# ---------------------------------------------------------------------
+# 4. Plate 물량 (generatePlateBOQ + 두께 통합 규칙)
+# ---------------------------------------------------------------------
+def merge_thickness(items, rules):
+    """두께 통합 규칙을 적용하며 기둥 항목을 Plate 조각으로 분해 (스트리밍 변환)
+
+    조각: (key, 첫 항목 기준 속성, 길이 증분, 개수 증분). 규칙은 한 단계만 적용 (8 → 9).
+    """
+    for item in items:
+        H1, H2, B1, B2 = item.H1 or item.h, item.H2 or item.h, item.B1 or item.b, item.B2 or item.b
+        tw = rules.get(item.tw, item.tw)
+        tf = rules.get(item.tf, item.tf)
+        run = item.length * item.count
+        grade = item.steel_grade
+        yield (f"tw{js_str(tw)}-H1-Web", ("H1", "Web", H1 - 2 * tf, tw, item.tw, H1 - 2 * item.tf, grade),
+               run, item.count)
+        yield (f"tf{js_str(tf)}-H1-Flange", ("H1", "Flange", B1, tf, item.tf, None, grade),
+               item.length * item.count * 2, item.count * 2)
+        yield (f"tw{js_str(tw)}-H2-Web", ("H2", "Web", H2 - 2 * tf, tw, item.tw, H2 - 2 * item.tf, grade),
+               run, item.count)
+        yield (f"tf{js_str(tf)}-H2-Flange", ("H2", "Flange", B2, tf, item.tf, None, grade),
+               item.length * item.count * 2, item.count * 2)
+
+
+def plate_items(items, rules):
+    """Built-UP 기둥 항목 → 두께 오름차순 Plate 물량 목록"""
+    plates = {}
+    for key, attrs, length, count in merge_thickness(items, rules):
+        p = plates.get(key)
+        if p is None:
+            p = plates[key] = {"attrs": attrs, "length": 0, "count": 0}
+        p["length"] += length
+        p["count"] += count
+
+    by_thickness = {}
+    for p in plates.values():
+        section, kind, width, thickness, original, original_width, grade = p["attrs"]
+        original = original or thickness
+        original_width = original_width or width
+        unit_weight = (width * thickness * STEEL_DENSITY) / 1000000
+        total_weight = unit_weight * p["length"]
+        by_thickness.setdefault(thickness, []).append({
+            "usage": f"{section} {kind}", "width": width, "length": p["length"], "count": p["count"],
+            "weight": total_weight, "grade": grade, "original": original,
+            "original_weight": (original_width * original * STEEL_DENSITY) / 1000000 * p["length"],
+        })
+
+    out = []
+    for thickness in sorted(by_thickness):
+        group = by_thickness[thickness]
+        total_length = sum(p["length"] for p in group)
+        total_weight = sum(p["weight"] for p in group)
+        out.append(PlateItem(
+            thickness_mm=float(thickness),
+            usage_parts=", ".join(p["usage"] for p in group),
+            avg_width=sum(p["width"] for p in group) / len(group),
+            unit_weight=total_weight / total_length if total_length > 0 else 0,
+            total_length=total_length,
+            total_count=sum(p["count"] for p in group),
+            total_weight=total_weight,
+            steel_grade=group[0]["grade"],
+            original_thicknesses=list(dict.fromkeys(p["original"] for p in group)),
+            original_total_weight=sum(p["original_weight"] or p["weight"] for p in group),
+        ))
+    return out
+
+
+def plate_note(plate, rules):
+    """Plate 표 비고: 두께 통합 정보 | 후판주문"""
+    if plate.merge_info:
+        merge_note = plate.merge_info
+    else:
+        merged_from = [t for t in sorted(rules) if rules[t] == plate.thickness_mm]
+        applied = [t for t in plate.original_thicknesses if t != plate.thickness_mm and t in merged_from]
+        to = js_str(plate.thickness_mm)
+        if applied:
+            merge_note = ", ".join(f"{js_str(t)}mm → {to}mm" for t in applied)
+            original = plate.original_total_weight or plate.total_weight
+            if not abs(plate.total_weight - original) < 0.01:
+                merge_note += f" (원본: {ko_number(original)}kg)"
+        else:
+            merge_note = ", ".join(f"{js_str(t)}mm → {to}mm" for t in merged_from)
+    note = "후판주문" if plate.total_weight / 1000 < THICK_PLATE_ORDER_TON else ""
+    return " | ".join(n for n in (merge_note, note) if n) or "-"
+
+
+# ---------------------------------------------------------------------
+# 5. 리포트 (loadBOQData)
+# ---------------------------------------------------------------------
+@dataclass
+class BOQReport:
+    """BOQ 리포트의 표 (표시 문자열 행)와 합계"""
+
+    column_rows: list
+    column_footer: list
+    plate_rows: list = None
+    plate_footer: list = None
+    rolled_rows: list = None
+    rolled_footer: list = None
+    sub_rows: list = None
+    sub_footer: list = None
+    total_count: int = 0
+    total_area: float = 0.0
+    total_weight: float = 0.0
+    total_column_amount: float = 0.0
+    total_amount: int = 0
+    csv_rows: list = None
+
+
+def main_price(grade, prices):
+    if "SM420" in grade:
+        return prices["SM420"]
+    if "SM355" in grade:
+        return prices["SM355"]
+    return prices["SM420"]
+
+
+def iter_column_rows(items, prices, totals):
+    """기둥 물량 표 행 (totals 에 개수 / 단면적 / 중량 / 금액 합계 누적)"""
+    for i, item in enumerate(items, start=1):
+        weight = item.unit_weight * item.length * item.count
+        amount = weight / 1000 * main_price(item.steel_grade, prices)
+        totals["count"] += item.count
+        totals["area"] += item.area * item.count
+        totals["weight"] += weight
+        totals["amount"] += amount
+        yield [
+            i, item.names.join(", "), item.combination, js_str(item.h), js_str(item.b), js_str(item.tw),
+            js_str(item.tf), js_fixed(item.area, 2), js_fixed(item.unit_weight, 2), js_fixed(item.length, 2),
+            f"Type{item.length_type or ''}", item.count, ko_number(weight), item.steel_grade,
+            ko_int(amount) if amount > 0 else "-",
+        ]
+
+
+def iter_csv_rows(items, totals):
+    """exportToCSV 와 같은 행 (그룹핑 전 항목)"""
+    for i, item in enumerate(items, start=1):
+        weight = item.unit_weight * item.length * item.count
+        totals["count"] += item.count
+        totals["weight"] += weight
+        yield [
+            i, item.names.join(", "), item.combination, js_str(item.h), js_str(item.b), js_str(item.tw),
+            js_str(item.tf), js_fixed(item.area, 2), js_fixed(item.unit_weight, 2), js_fixed(item.length, 2),
+            f"Type{item.length_type or ''}", item.count, js_fixed(weight, 2), item.steel_grade,
+        ]
+
+
+def rolled_groups(items, max_names=DEFAULT_MAX_NAMES):
+    groups = {}
+    for item in items:
+        key = f"{item.combination}-{js_fixed(item.length, 2)}"
+        g = groups.get(key)
+        if g is None:
+            g = groups[key] = RolledHGroup(item.combination, item.length, item.unit_weight, item.steel_grade,
+                                           names=NameList(limit=max_names))
+        g.count += item.count
+        g.total_weight += item.unit_weight * item.length * item.count
+        g.names.extend(item.names)
+    return list(groups.values())
+
+
+def sub_material_table(column_total_weight, plate_total_weight, extra_items, unit_price):
+    """generateSubMaterialBOQ: 3 PLATE (접합부) + 사용자 추가 소부재"""
+    column_total = parse_display(ko_number(column_total_weight))
+    plate_total = parse_display(ko_number(plate_total_weight))
+    data = []
+    if (column_total + plate_total) * PLATE3_RATIO > 0:
+        surcharge = column_total * SURCHARGE_RATE
+        data.append({"type": "3 PLATE", "spec": "접합부", "unit": "Ton", "quantity": "",
+                     "steelGrade": "SM355/SM420", "surcharge": float(js_fixed(surcharge, 2)),
+                     "amount": surcharge / 1000 * unit_price, "remark": "전체 철골물량의 15%"})
+    for item in extra_items or ():
+        surcharge = float(item.get("surcharge") or 0)
+        data.append({"type": item.get("type", ""), "spec": item.get("spec", ""), "unit": item.get("unit", ""),
+                     "quantity": item.get("quantity") or 0, "steelGrade": item.get("steelGrade") or "SM420",
+                     "surcharge": float(js_fixed(surcharge, 2)), "amount": surcharge / 1000 * unit_price,
+                     "remark": item.get("remark") or ""})
+
+    if not data:
+        return [], ["0", "0", "0", "0", "0"], 0.0
+
+    rows = []
+    total_qty = total_surcharge = total_amount = 0
+    for i, item in enumerate(data, start=1):
+        try:
+            qty = float(item["quantity"])
+        except (TypeError, ValueError):
+            qty = 0.0
+        total_qty += qty
+        total_surcharge += item["surcharge"]
+        total_amount += item["amount"]
+        rows.append([
+            i, item["type"], item["spec"], item["unit"],
+            "" if item["quantity"] in ("", None) else (js_fixed(qty, 2) if qty > 0 else ""),
+            item["steelGrade"], ko_number(column_total), ko_number(item["surcharge"]), f"{unit_price:,}",
+            ko_int(item["amount"]) if item["amount"] > 0 else "-", item["remark"],
+        ])
+    footer = [
+        js_fixed(total_qty, 2),
+        ko_number(column_total) if column_total > 0 else "0",
+        ko_number(total_surcharge) if total_surcharge > 0 else "0",
+        f"{unit_price:,}",
+        f"{ko_int(total_amount)}원" if total_amount > 0 else "-",
+    ]
+    return rows, footer, total_amount
+
+
+def build_report(column_boq, rules=None, prices=None, sub_price=SUB_MATERIAL_PRICE, sub_materials=(),
+                 group_columns=False, group_plates=False, group_rolled=False, with_csv=True):
+    """집계된 기둥 항목으로 BOQ 리포트의 모든 표 생성 (항목 수는 규격 수에 비례)"""
+    rules = rules or {}
+    prices = prices or MAIN_PRICES
+    items = column_boq.items
+    shown = group_column_items(items) if group_columns else items
+
+    totals = {"count": 0, "area": 0.0, "weight": 0.0, "amount": 0.0}
+    column_rows = list(iter_column_rows(shown, prices, totals))
+    column_amount_text = f"{ko_int(totals['amount'])}원" if totals["amount"] > 0 else "0원"
+    report = BOQReport(
+        column_rows=column_rows,
+        column_footer=[totals["count"], ko_number(totals["weight"]), column_amount_text],
+        total_count=totals["count"], total_area=totals["area"], total_weight=totals["weight"],
+        total_column_amount=totals["amount"],
+    )
+    if with_csv:
+        csv_totals = {"count": 0, "weight": 0.0}
+        report.csv_rows = list(iter_csv_rows(items, csv_totals))
+        report.csv_rows.append(["합계"] + [""] * 11 + [csv_totals["count"], js_fixed(csv_totals["weight"], 2), ""])
+
+    rolled = [item for item in shown if item.combination in ROLLED_H_COMBINATIONS]
+    built_up = [item for item in shown if item.combination not in ROLLED_H_COMBINATIONS]
+    sub_amount_text = "0"
+
+    if built_up:
+        plates = plate_items(built_up, rules)
+        if group_plates:
+            plates = group_plate_items(plates, rules)
+        report.plate_rows = [
+            [i, f"{js_str(p.thickness_mm)}mm", p.usage_parts, js_fixed(p.avg_width, 2), js_str(p.thickness_mm),
+             js_fixed(p.unit_weight, 2), js_fixed(p.total_length, 2), p.total_count, ko_number(p.total_weight),
+             p.steel_grade, plate_note(p, rules)]
+            for i, p in enumerate(plates, start=1)
+        ]
+        built_up_weight = 0
+        for item in built_up:
+            built_up_weight += item.unit_weight * item.length * item.count
+        report.plate_footer = [sum(p.total_count for p in plates), ko_number(built_up_weight),
+                               "후판주문" if built_up_weight / 1000 < THICK_PLATE_ORDER_TON else ""]
+
+        report.sub_rows, report.sub_footer, _ = sub_material_table(
+            totals["weight"], built_up_weight, sub_materials, sub_price)
+        sub_amount_text = report.sub_footer[4]
+
+    if built_up and rolled:
+        groups = rolled_groups(rolled, column_boq.max_names)
+        if group_rolled:
+            groups = group_rolled_items(groups)
+        rows, count, weight = [], 0, 0
+        for i, g in enumerate(groups, start=1):
+            count += g.count
+            weight += g.total_weight
+            names = g.names.summary().join() if g.is_grouped and g.original_count > 1 else g.names.unique().join()
+            rows.append([i, names, g.combination, js_fixed(g.length, 2), g.count, js_fixed(g.unit_weight, 2),
+                         ko_number(g.total_weight), g.steel_grade, "-"])
+        report.rolled_rows = rows
+        report.rolled_footer = [count, ko_number(weight), "-"]
+
+    report.total_amount = js_round(parse_display(column_amount_text) + parse_display(sub_amount_text))
+    return report
+
+
+# ---------------------------------------------------------------------
+# 6. 입출력
+# ---------------------------------------------------------------------
+def _int_or_zero(value):
+    """parseInt(v) || 0"""
+    try:
+        return int(float(str(value).strip()))
+    except ValueError:
+        return 0
+
+
+def read_type_counts(values):
+    """기둥별 Type 개수 표 (importBOQTypeCountFromExcel 과 같은 헤더 규칙) → {기둥명: (t1, t2, t3, t4)}"""
+    values = iter(values)
+    header = next(values, None) or []
+    headers = [str(h if h is not None else "").lower().strip() for h in header]
+
+    def find(pred):
+        return next((i for i, h in enumerate(headers) if pred(h)), -1)
+
+    name_idx = find(lambda h: "기둥" in h or "name" in h or "명" in h)
+    type_idx = [find(lambda h, n=n: f"type{n}" in h or f"type {n}" in h) for n in range(1, 5)]
+    if -1 in type_idx:
+        raise ValueError("엑셀 파일에 Type1~Type4 컬럼이 없습니다. 컬럼명을 확인해주세요.")
+
+    counts = {}
+    for row in values:
+        if not row:
+            continue
+        first = str(row[0] if row[0] is not None else "").strip().lower()
+        if not first or "type" in first:                      # 빈 행, Type 길이 안내 행
+            continue
+        name = str(row[name_idx] or "").strip() if 0 <= name_idx < len(row) else ""
+        if not name:
+            continue
+        counts[name] = tuple(_int_or_zero(row[i]) if i < len(row) and row[i] is not None else 0
+                             for i in type_idx)
+    return counts
+
+
+def load_type_counts(path):
+    if str(path).lower().endswith(".csv"):
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            return read_type_counts(csv.reader(f))
+    openpyxl = require_openpyxl()
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        return read_type_counts(wb.worksheets[0].iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+
+def write_xlsx(report, path):
+    """BOQ 표를 시트별로 한 행씩 기록 (write-only 워크북)"""
+    openpyxl = require_openpyxl()
+    wb = openpyxl.Workbook(write_only=True)
+
+    def sheet(title, headers, rows, footer_label, footer):
+        ws = wb.create_sheet(title)
+        ws.append(headers)
+        for row in rows:
+            ws.append(row)
+        ws.append([footer_label] + list(footer))
+
+    sheet("기둥 물량", COLUMN_HEADERS, report.column_rows, "합계", report.column_footer)
+    if report.plate_rows is not None:
+        sheet("Built-UP Plate 물량", PLATE_HEADERS, report.plate_rows, "합계", report.plate_footer)
+    if report.rolled_rows is not None:
+        sheet("Rolled H 물량", ROLLED_H_HEADERS, report.rolled_rows, "합계", report.rolled_footer)
+    if report.sub_rows is not None:
+        sheet("소부재 물량", SUB_MATERIAL_HEADERS, report.sub_rows, "합계", report.sub_footer)
+
+    ws = wb.create_sheet("요약")
+    for row in (
+        ["총 개수", report.total_count],
+        ["총 단면적 (mm²)", js_fixed(report.total_area, 2)],
+        ["총 중량 (kg)", ko_number(report.total_weight)],
+        ["총 금액 (원)", f"{report.total_amount:,}"],
+    ):
+        ws.append(row)
+    wb.save(path)
+    return path
+
+
+def write_csv(report, path):
+    """exportToCSV 와 같은 CSV (UTF-8 BOM)"""
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(CSV_HEADERS)
+        for row in report.csv_rows:
+            writer.writerow(row)
+    return path
+
+
+def parse_rules(specs):
+    """['11:12', '13:14'] → {11: 12, 13: 14}"""
+    rules = {}
+    for spec in specs or ():
+        src, dst = (int(v) for v in spec.split(":"))
+        if src == dst:
+            raise ValueError("From과 To 값이 같을 수 없습니다.")
+        rules[src] = dst
+    return rules
+
+
+def default_boq_filename(now=None):
+    now = now or datetime.now()
+    return f"BOQ_{now:%Y%m%d_%H%M}.xlsx"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="K-COL BOQ 스트리밍 집계")
+    parser.add_argument("input", help="하중 입력 엑셀 (.xlsx)")
+    parser.add_argument("--counts", required=True, help="기둥별 Type 개수 (.xlsx / .csv)")
+    parser.add_argument("-o", "--output", default=None, help="BOQ 엑셀 경로")
+    parser.add_argument("--csv", default=None, help="기둥 물량 CSV 경로")
+    parser.add_argument("--lengths", default=None, help="Type1~4 길이 (m), 예: 26.478,23.678,25.938,22.438")
+    parser.add_argument("--merge", action="append", help="두께 통합 규칙 from:to (mm), 여러 번 지정 가능")
+    parser.add_argument("--sub-materials", default=None, help="추가 소부재 항목 JSON")
+    parser.add_argument("--group-columns", action="store_true", help="기둥 물량 그룹핑")
+    parser.add_argument("--group-plates", action="store_true", help="Plate 물량 그룹핑")
+    parser.add_argument("--group-rolled", action="store_true", help="Rolled H 물량 그룹핑")
+    parser.add_argument("--max-names", type=int, default=0,
+                        help="항목별 기둥명 표시 수 상한 (기본 0 = 전부, 웹과 같음)")
+    parser.add_argument("--tw", default="8:16", help="tw 범위 twMin:twMax (mm)")
+    parser.add_argument("--tf", default="10:20", help="tf 범위 tfMin:tfMax (mm)")
+    parser.add_argument("--pmm-limit", type=float, default=DEFAULT_PMM_LIMIT)
+    parser.add_argument("--kz", type=float, default=DEFAULT_KZ)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    type_lengths = None
+    if args.lengths:
+        type_lengths = dict(enumerate((float(v) for v in args.lengths.split(",")), start=1))
+    sub_materials = ()
+    if args.sub_materials:
+        with open(args.sub_materials, "r", encoding="utf-8") as f:
+            sub_materials = json.load(f)
+
+    counts = load_type_counts(args.counts)
+    print(f"📋 기둥별 Type 개수 {len(counts)}개")
+
+    start = time.perf_counter()
+    boq = ColumnBOQ(counts, type_lengths, args.max_names or None)
+    boq.extend(iter_run(iter_rows_from_excel(args.input), parse_range(args.tw), parse_range(args.tf),
+                        args.pmm_limit, args.kz, args.workers))
+    report = build_report(boq, parse_rules(args.merge), sub_materials=sub_materials,
+                          group_columns=args.group_columns, group_plates=args.group_plates,
+                          group_rolled=args.group_rolled, with_csv=bool(args.csv))
+    output = write_xlsx(report, args.output or default_boq_filename())
+    if args.csv:
+        write_csv(report, args.csv)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ BOQ 완료: 결과 {boq.n_results}개 → 규격 {len(boq.items)}개 ({elapsed:.2f} s)")
+    print(f"   총 개수 {report.total_count}, 총 중량 {ko_number(report.total_weight)} kg, "
+          f"총 금액 {report.total_amount:,}원")
+    print(f"   결과: {output}")
+
+
+if __name__ == "__main__":
+    main()
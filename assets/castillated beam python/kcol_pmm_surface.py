@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+Cross H 기둥 P-M-M 상관 곡면 사전 계산 / 일괄 조회
+- kcol_section_finder 의 후보 단면 (조합 × 강종 × tw × tf) 마다 유효길이 계수 세트
+  (Kx, Ky, Kz) 와 비지지 길이 L 격자에서 φPn, φMnx, φMny 를 한 번 계산하여 .npz 로 저장
+  (φMnx, φMny 는 길이와 무관 → 단면당 1개, φPn 만 (세트, 단면, L) float32 표)
+- 하중점 (Pu, Mux, Muy) 검토: L 격자 이분 탐색 (searchsorted, O(log n)) + 선형 보간한 φPn 으로
+  calculateSection 과 같은 상관식 (AISC H1-1a / H1-1b) 계산
+- 보간 오차는 곡면 생성 시 격자 구간 내부점에서 단면별로 측정하여 함께 저장하고,
+  판정이 바뀔 수 있는 점 (한계값 / H1-1a·b 경계 0.2 / φPn = Pu 근처) 과
+  표 밖의 점 (Lx ≠ Ly, 격자에 없는 K 세트, 길이 범위 밖) 만 section_capacity 로 정확히 재계산
+  → 통과 / NG 판정은 항상 정확 계산과 같음
+
+사용법:
+    python kcol_pmm_surface.py build -o pmm_surface.npz
+    python kcol_pmm_surface.py build -o pmm_surface.npz --lengths 2:15:0.25 --k 1,1,0.8 --k 0.65,0.65,0.8
+    python kcol_pmm_surface.py check loads.xlsx --surface pmm_surface.npz \\
+        --combination BH500×B300 --grade SM355 --tw 12 --tf 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from kcol_section_finder import (
+    COMBINATIONS,
+    DEFAULT_KZ,
+    DEFAULT_PMM_LIMIT,
+    DEFAULT_TF_RANGE,
+    DEFAULT_TW_RANGE,
+    E_STEEL,
+    NU,
+    build_candidates,
+    interaction,
+    load_rows_from_excel,
+    parse_range,
+    row_arrays,
+    section_capacity,
+)
+
+SURFACE_VERSION = 1
+
+DEFAULT_LENGTHS = (1.0, 15.0, 0.25)         # m (start, stop, step), stop 포함
+DEFAULT_K_SETS = ((1.0, 1.0, DEFAULT_KZ),)  # (Kx, Ky, Kz)
+
+CANDIDATE_COLUMNS = ("tw", "tf", "fy", "h1", "h2", "b1", "b2", "r", "area")
+
+# 보간 오차 측정점 (격자 구간 내부 비율) / 측정값에 곱하는 안전율 / float32 저장 오차
+ERROR_PROBES = (0.25, 0.5, 0.75)
+ERROR_SAFETY = 2.0
+FLOAT32_ERROR = 1e-6
+
+H1_SWITCH = 0.2                             # Pu/φPn ≥ 0.2 → H1-1a
+
+
+# ---------------------------------------------------------------------
+# 1. 곡면 생성
+# ---------------------------------------------------------------------
+def length_grid(start, stop, step):
+    """비지지 길이 격자 (m, stop 포함)"""
+    return np.round(np.arange(start, stop + step * 0.5, step), 6)
+
+
+def _capacity(c, s, kx, ky, kz, lx, ly):
+    """후보 s 의 section_capacity (길이 m, 배열 broadcast)"""
+    return section_capacity(
+        c["tw"][s], c["tf"][s], c["fy"][s], E_STEEL, NU, kx, ky, kz, lx * 1000.0, ly * 1000.0,
+        c["h1"][s], c["h2"][s], c["b1"][s], c["b2"][s], c["r"][s], c["r"][s],
+    )
+
+
+class PMMSurface:
+    """후보 단면 × K 세트 × 길이 격자의 상관 곡면 (φPn 표 + 단면별 φMnx, φMny)"""
+
+    def __init__(self, candidates, combination, k_sets, lengths, phi_Pn, phi_Mnx, phi_Mny, usable, error):
+        self.candidates = candidates        # CANDIDATE_COLUMNS → (n_sections,)
+        self.combination = combination      # COMBINATIONS 인덱스 (n_sections,)
+        self.k_sets = k_sets                # (n_k, 3)
+        self.lengths = lengths              # (n_L,) m, 오름차순
+        self.phi_Pn = phi_Pn                # (n_k, n_sections, n_L) float32
+        self.phi_Mnx = phi_Mnx              # (n_sections,)
+        self.phi_Mny = phi_Mny
+        self.usable = usable                # Slender 가 아닌 단면
+        self.error = error                  # (n_k, n_sections) φPn 보간 상대오차 상한
+        self._section_index = {
+            (int(comb), float(fy), float(tw), float(tf)): s
+            for s, (comb, fy, tw, tf) in enumerate(zip(combination, candidates["fy"],
+                                                       candidates["tw"], candidates["tf"]))
+        }
+
+    def __len__(self):
+        return len(self.combination)
+
+    @classmethod
+    def build(cls, tw_range=DEFAULT_TW_RANGE, tf_range=DEFAULT_TF_RANGE, k_sets=DEFAULT_K_SETS,
+              lengths=None):
+        """후보 단면 전체의 곡면 계산 (K 세트마다 (n_L, n_sections) 배열 연산 1회)"""
+        c, groups = build_candidates(tw_range, tf_range)
+        combination = np.zeros(len(c["tw"]), dtype=np.int16)
+        for g in groups:
+            combination[g.start:g.stop] = COMBINATIONS.index(g.combination)
+        lengths = length_grid(*DEFAULT_LENGTHS) if lengths is None else np.asarray(lengths, dtype=float)
+        k_sets = np.asarray(k_sets, dtype=float).reshape(-1, 3)
+        s = np.arange(len(combination))
+
+        tables, errors = [], []
+        cap = None
+        for kx, ky, kz in k_sets:
+            L = lengths[:, None]
+            cap = _capacity(c, s, kx, ky, kz, L, L)
+            table = cap["phi_Pn"].T.astype(np.float32)          # (n_sections, n_L)
+
+            # 격자 구간 내부점의 정확값과 보간값 비교 → 단면별 최대 상대오차
+            worst = np.zeros(len(s))
+            for t in ERROR_PROBES:
+                Lp = (lengths[:-1] + t * np.diff(lengths))[:, None]
+                exact = _capacity(c, s, kx, ky, kz, Lp, Lp)["phi_Pn"].T
+                approx = (1 - t) * table[:, :-1].astype(float) + t * table[:, 1:].astype(float)
+                worst = np.maximum(worst, np.max(np.abs(approx - exact) / exact, axis=1))
+            tables.append(table)
+            errors.append(worst * ERROR_SAFETY + FLOAT32_ERROR)
+
+        usable = ~np.asarray(cap["is_slender_flange"][0]) & ~np.asarray(cap["is_slender_web"][0])
+        return cls(
+            candidates={n: c[n] for n in CANDIDATE_COLUMNS}, combination=combination, k_sets=k_sets,
+            lengths=lengths, phi_Pn=np.stack(tables), phi_Mnx=np.array(cap["phi_Mnx"][0]),
+            phi_Mny=np.array(cap["phi_Mny"][0]), usable=usable, error=np.stack(errors),
+        )
+
+    # -----------------------------------------------------------------
+    # 저장 / 읽기
+    # -----------------------------------------------------------------
+    def save(self, path):
+        np.savez_compressed(
+            path, version=SURFACE_VERSION, E=E_STEEL, nu=NU,
+            combination=self.combination, k_sets=self.k_sets, lengths=self.lengths,
+            phi_Pn=self.phi_Pn, phi_Mnx=self.phi_Mnx, phi_Mny=self.phi_Mny, usable=self.usable,
+            error=self.error, **{f"c_{n}": v for n, v in self.candidates.items()},
+        )
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            if int(f["version"]) != SURFACE_VERSION:
+                raise ValueError(f"지원하지 않는 곡면 파일 형식: version {int(f['version'])}")
+            if float(f["E"]) != E_STEEL or float(f["nu"]) != NU:
+                raise ValueError("곡면 파일의 재료 상수 (E, ν) 가 kcol_section_finder 와 다릅니다. 다시 생성하세요.")
+            return cls(
+                candidates={n: f[f"c_{n}"] for n in CANDIDATE_COLUMNS}, combination=f["combination"],
+                k_sets=f["k_sets"], lengths=f["lengths"], phi_Pn=f["phi_Pn"], phi_Mnx=f["phi_Mnx"],
+                phi_Mny=f["phi_Mny"], usable=f["usable"], error=f["error"],
+            )
+
+    # -----------------------------------------------------------------
+    # 조회
+    # -----------------------------------------------------------------
+    def section_index(self, combination, fy, tw, tf):
+        """(조합명, Fy, tw, tf) → 후보 인덱스"""
+        names = [name for name, *_ in COMBINATIONS]
+        if combination not in names:
+            raise KeyError(f"알 수 없는 조합: {combination}")
+        key = (names.index(combination), float(fy), float(tw), float(tf))
+        if key not in self._section_index:
+            raise KeyError(f"곡면에 없는 단면: {combination} SM{int(fy)} tw={tw} tf={tf}")
+        return self._section_index[key]
+
+    def check(self, section, pu, mux, muy, kx, ky, lx, ly, kz=DEFAULT_KZ, pmm_limit=DEFAULT_PMM_LIMIT):
+        """하중점 일괄 검토 (모든 인자는 broadcast 가능한 스칼라 / 배열, 길이 m)
+
+        반환 dict: ratio_pmm, is_compressive_ng, passes (calculateAll 의 통과 조건),
+                   phi_Pn, exact (정확 재계산한 점)
+        """
+        section, pu, mux, muy, kx, ky, lx, ly, kz = (
+            np.atleast_1d(a) for a in np.broadcast_arrays(section, pu, mux, muy, kx, ky, lx, ly, kz))
+        section = section.astype(int)
+        pu, mux, muy, kx, ky, lx, ly, kz = (a.astype(float) for a in (pu, mux, muy, kx, ky, lx, ly, kz))
+        n = len(pu)
+
+        # K 세트 인덱스 (세트 수만큼 비교, 격자에 없는 세트는 -1)
+        k = np.full(n, -1)
+        for j, (sx, sy, sz) in enumerate(self.k_sets):
+            k[(kx == sx) & (ky == sy) & (kz == sz)] = j
+
+        L = self.lengths
+        in_table = (k >= 0) & (lx == ly) & (lx >= L[0]) & (lx <= L[-1])
+        j = np.clip(np.searchsorted(L, lx, side="right") - 1, 0, len(L) - 2)
+        t = np.clip((lx - L[j]) / (L[j + 1] - L[j]), 0.0, 1.0)
+        kk = np.maximum(k, 0)
+        lo = self.phi_Pn[kk, section, j].astype(float)
+        hi = self.phi_Pn[kk, section, j + 1].astype(float)
+        phi_Pn = (1 - t) * lo + t * hi
+
+        cap = {"phi_Pn": phi_Pn, "phi_Mnx": self.phi_Mnx[section], "phi_Mny": self.phi_Mny[section]}
+        res = interaction(cap, pu, mux, muy)
+
+        # φPn 상대오차 e → Pu/φPn 오차 ≤ (Pu/φPn)·e/(1-e): 판정이 바뀔 수 있는 점은 정확 재계산
+        err = self.error[kk, section]
+        ratio_comp = pu / phi_Pn
+        band = np.abs(ratio_comp) * err / (1 - err)
+        near = ((np.abs(res["ratio_pmm"] - pmm_limit) <= band)
+                | (np.abs(ratio_comp - H1_SWITCH) <= band)
+                | (np.abs(ratio_comp - 1.0) <= band))
+        exact = ~in_table | near
+        if exact.any():
+            idx = np.flatnonzero(exact)
+            cap_x = _capacity(self.candidates, section[idx], kx[idx], ky[idx], kz[idx], lx[idx], ly[idx])
+            res_x = interaction(cap_x, pu[idx], mux[idx], muy[idx])
+            phi_Pn[idx] = cap_x["phi_Pn"]
+            for name in res:
+                res[name][idx] = res_x[name]
+
+        pmm = res["ratio_pmm"]
+        usable = self.usable[section]
+        return {
+            "ratio_pmm": pmm,
+            "is_compressive_ng": res["is_compressive_ng"],
+            "passes": usable & (pmm > 0) & (pmm <= pmm_limit),
+            "phi_Pn": phi_Pn,
+            "exact": exact if n else np.zeros(0, dtype=bool),
+        }
+
+    def check_rows(self, section, rows, kz=DEFAULT_KZ, pmm_limit=DEFAULT_PMM_LIMIT):
+        """하중 행 dict 목록 (iter_load_rows 형식) 을 한 단면으로 검토"""
+        r = row_arrays(rows)
+        return self.check(section, r["pu"], r["mux"], r["muy"], r["kx"], r["ky"], r["lx"], r["ly"],
+                          kz, pmm_limit)
+
+
+# ---------------------------------------------------------------------
+# 2. CLI
+# ---------------------------------------------------------------------
+def parse_lengths(spec):
+    start, stop, step = (float(v) for v in spec.split(":"))
+    return length_grid(start, stop, step)
+
+
+def parse_k(spec):
+    kx, ky, kz = (float(v) for v in spec.split(","))
+    return kx, ky, kz
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross H 기둥 P-M-M 상관 곡면 생성 / 일괄 검토")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="상관 곡면 생성")
+    p_build.add_argument("-o", "--output", default="pmm_surface.npz")
+    p_build.add_argument("--tw", default="8:16", help="tw 범위 twMin:twMax (mm)")
+    p_build.add_argument("--tf", default="10:20", help="tf 범위 tfMin:tfMax (mm)")
+    p_build.add_argument("--lengths", default=":".join(str(v) for v in DEFAULT_LENGTHS),
+                         help="비지지 길이 격자 start:stop:step (m)")
+    p_build.add_argument("--k", action="append", type=parse_k, default=None,
+                         help="유효길이 계수 Kx,Ky,Kz (여러 번 지정 가능, 기본 1,1,0.8)")
+
+    p_check = sub.add_parser("check", help="하중 입력 엑셀의 모든 행을 한 단면으로 검토")
+    p_check.add_argument("input", help="하중 입력 엑셀 (.xlsx)")
+    p_check.add_argument("--surface", default="pmm_surface.npz")
+    p_check.add_argument("--combination", required=True, help="조합명 (예: BH500×B300)")
+    p_check.add_argument("--grade", default="SM355", help="강종 (SM355 / SM420)")
+    p_check.add_argument("--tw", type=float, required=True)
+    p_check.add_argument("--tf", type=float, required=True)
+    p_check.add_argument("--pmm-limit", type=float, default=DEFAULT_PMM_LIMIT)
+    p_check.add_argument("--kz", type=float, default=DEFAULT_KZ)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        surface = PMMSurface.build(parse_range(args.tw), parse_range(args.tf),
+                                   args.k or DEFAULT_K_SETS, parse_lengths(args.lengths))
+        surface.save(args.output)
+        print(f"✅ 상관 곡면 생성: 단면 {len(surface)}개 × K 세트 {len(surface.k_sets)}개 × "
+              f"길이 {len(surface.lengths)}개 ({time.perf_counter() - start:.2f} s)")
+        print(f"   최대 보간 오차 {surface.error.max():.2e} → {args.output}")
+        return
+
+    surface = PMMSurface.load(args.surface)
+    try:
+        section = surface.section_index(args.combination, float(args.grade.upper().lstrip("SM")), args.tw, args.tf)
+    except KeyError as e:
+        raise SystemExit(f"❌ {e.args[0]}")
+    rows = load_rows_from_excel(args.input)
+    print(f"📋 하중 데이터 {len(rows)}개 행 / 단면 {args.combination} {args.grade} tw={args.tw:g} tf={args.tf:g}")
+
+    start = time.perf_counter()
+    res = surface.check_rows(section, rows, args.kz, args.pmm_limit)
+    elapsed = time.perf_counter() - start
+
+    passed = int(res["passes"].sum())
+    worst = int(np.argmax(res["ratio_pmm"]))
+    print(f"✅ 검토 완료 ({elapsed * 1000:.1f} ms): 통과 {passed}개 / NG {len(rows) - passed}개, "
+          f"정확 재계산 {int(res['exact'].sum())}개")
+    print(f"   최대 P-M-M {res['ratio_pmm'][worst]:.3f} ({rows[worst]['name']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,815 @@
+# -*- coding: utf-8 -*-
+"""
+K-COL Auto Find Section 일괄 계산 엔진 (Cross H 기둥)
+- pages/k-col web software/auto-find-section.html 의 calculateSection /
+  findOptimalSection / calculateAll 과 동일한 공식과 선택 규칙
+- 행(기둥)마다 (조합, 강종) 그룹의 (tw, tf) 후보를 배열 연산으로 평가
+  (기본: tw 마다 tf 이분 탐색, --search grid: 전체 후보)
+- 행 묶음을 프로세스 풀에서 병렬 처리
+- 입력: importLoadFromExcel 과 같은 하중 입력 엑셀 (No., 기둥이름, Pu, Mux, Muy, Lx, Ly, Kx, Ky)
+- 출력: exportResultToExcel 과 같은 결과 엑셀 (시트 'Auto Find Section Result')
+
+사용법:
+    python kcol_section_finder.py loads.xlsx
+    python kcol_section_finder.py loads.xlsx -o result.xlsx --tw 8:16 --tf 10:20 --workers 8
+    python kcol_section_finder.py loads.xlsx --search grid          # 전체 후보 평가
+    python kcol_section_finder.py loads.xlsx --crosscheck           # bisect 결과를 grid 와 비교
+    python kcol_section_finder.py loads.xlsx --cache .result_cache.sqlite   # 바뀐 행만 다시 계산
+
+엑셀 입출력에는 openpyxl 이 필요합니다 (pip install openpyxl).
+"""
+
+import argparse
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+
+import numpy as np
+
+from castillated_core import STEEL_DENSITY
+from steel_sections import load_sections
+
+E_STEEL = 210000.0                  # MPa
+NU = 0.3
+
+DEFAULT_KZ = 0.8
+DEFAULT_PMM_LIMIT = 1.0
+DEFAULT_TW_RANGE = (8, 16)          # mm (twMin, twMax)
+DEFAULT_TF_RANGE = (10, 20)         # mm (tfMin, tfMax)
+DEFAULT_LENGTH = 4.5                # m (Lx, Ly 미입력 시)
+DEFAULT_ROW_CHUNK = 500
+DEFAULT_CACHE_SIZE = 4096           # (Kx, Ky, Kz, Lx, Ly) 키 수
+
+# 세 가지 조합 정의 (name, H1, H2, B1, B2)
+COMBINATIONS = (
+    ("BH500×B300", 500, 500, 300, 300),
+    ("BH450×B250", 450, 450, 250, 250),
+    # 조합 3: Rolled H 단면들
+    ("H400×B200", 400, 400, 200, 200),
+    ("H450×B200", 450, 450, 200, 200),
+    ("H500×B200", 500, 500, 200, 200),
+    ("H506×B201", 506, 506, 201, 201),
+    ("H482×B300", 482, 482, 300, 300),
+    ("H488×B300", 488, 488, 300, 300),
+    ("H582×B300", 582, 582, 300, 300),
+    ("H588×B300", 588, 588, 300, 300),
+    ("H600×B200", 600, 600, 200, 200),
+)
+
+# 강종 (Fy MPa, 원/톤): 조합 1, 2는 SM420과 SM355, 조합 3은 SM355만
+STEEL_GRADES_COMB1_2 = ((420, 1900000), (355, 1830000))
+STEEL_GRADES_COMB3 = ((355, 1830000),)
+
+RESULT_HEADERS = [
+    'No.', '기둥명', 'Pu (kN)', 'P-M-M', '강종', '조합', 'K', 'L (m)', 'H (mm)', 'B (mm)',
+    'tw (mm)', 'tf (mm)', '단면적 (mm²)', '단중 (kg/m)', '단가 (원/톤)', '단위길이당 금액 (원/m)', '비고'
+]
+RESULT_COLUMN_WIDTHS = [6, 12, 10, 10, 10, 15, 6, 8, 8, 8, 8, 8, 12, 10, 12, 15, 30]
+RESULT_SHEET_NAME = 'Auto Find Section Result'
+NO_DATA_MESSAGE = "엑셀 파일에 데이터가 없습니다. 헤더 행과 최소 1개의 데이터 행이 필요합니다."
+
+
+def rolled_h_standard():
+    """조합 3: Rolled H 단면의 표준 tw, tf, r 값 (KS 표준, 단면 DB 의 rolled 단면)"""
+    return {int(s.H): (s.tw, s.tf, s.r) for s in load_sections().query(kind="rolled")}
+
+
+def is_combination3(h1, b1, standard):
+    """h1 이 표준 Rolled H 이고 B1 이 200/201 (또는 H482/488/582/588 의 300)이면 조합 3"""
+    return h1 in standard and (b1 in (200, 201) or (b1 == 300 and h1 in (482, 488, 582, 588)))
+
+
+# ---------------------------------------------------------------------
+# 1. 단면 계산 (calculateSection 과 동일한 공식, 배열 broadcast)
+# ---------------------------------------------------------------------
+def section_area(tw, tf, h1, h2, b1, b2, r1, r2):
+    """Total section area - Cross H section (하중과 무관, tw / tf 에 대해 단조 증가)"""
+    ag1 = b1 * tf
+    ag3 = (h1 - 2 * tf) * tw
+    ag4 = b2 * tf
+    ag6 = (h2 - 2 * tf) * tw
+    ag7 = 4 * (r1 * r1 - math.pi * r1 * r1 / 4)
+    ag8 = 4 * (r2 * r2 - math.pi * r2 * r2 / 4)
+    ag9 = tw * tw
+    return ag1 + ag1 + ag3 + ag4 + ag4 + ag6 + ag7 + ag8 - ag9
+
+
+def section_capacity(tw, tf, Fy, E, nu, Kx, Ky, Kz, Lx, Ly, h1, h2, b1, b2, r1, r2):
+    """하중과 무관한 부분: 단면 성능, 세장비 분류, φPn, φMnx, φMny"""
+    tw1 = tw2 = tw
+    tf1 = tf2 = tf
+
+    hw3 = h1 - 2 * tf1
+    hw6 = h2 - 2 * tf2
+    d1 = h1 / 2 - tf1 / 2
+    d4 = h2 / 2 - tf2 / 2
+
+    ag1 = b1 * tf1
+    ag4 = b2 * tf2
+    area = section_area(tw, tf, h1, h2, b1, b2, r1, r2)
+
+    # Second inertia moment
+    # (합산 순서는 웹 계산기와 동일하게 유지 → 동일한 부동소수점 결과)
+    Ix1 = 1 / 12 * b1 * tf1 ** 3 + ag1 * d1 ** 2
+    Ix4 = 1 / 12 * tf2 * b2 ** 3
+    Ix = Ix1 + Ix1 + 1 / 12 * tw1 * hw3 ** 3 + Ix4 + Ix4 + 1 / 12 * hw6 * tw2 ** 3
+    Iy4 = 1 / 12 * b2 * tf2 ** 3 + ag4 * d4 ** 2
+    Iy1 = 1 / 12 * tf1 * b1 ** 3
+    Iy = Iy1 + Iy1 + 1 / 12 * hw3 * tw2 ** 3 + Iy4 + Iy4 + 1 / 12 * tw2 * hw6 ** 3
+    ix = np.sqrt(Ix / area)
+    iy = np.sqrt(Iy / area)
+
+    # Elastic / plastic section modulus
+    sx = Ix / (h1 / 2)
+    sy = Iy / (h2 / 2)
+    zx1 = (b1 * tf1) * d1
+    zx3 = (tw1 * hw3 / 2) * hw3 / 4
+    zx = zx1 + zx1 + zx3 + zx3 + (b2 * b2 * tf2 / 2) + (tw2 * hw6 / 8) * 2
+    zy1 = (b2 * tf2) * d4
+    zy3 = (tw2 * hw6 / 2) * hw6 / 4
+    zy = zy1 + zy1 + zy3 + zy3 + (b1 * b1 * tf1 / 2) + (tw1 * hw3 / 8) * 2
+
+    # Torsional / warping constant
+    J = (2 * b1 * tf1 ** 3 + h1 * tw1 ** 3) / 3 + (2 * b2 * tf2 ** 3 + h2 * tw2 ** 3) / 3
+    cw = Iy * (h1 - tf1) ** 2 / 4
+
+    # Plate thickness ratio for compression (Minor Section)
+    lcfr = 0.56 * np.sqrt(E / Fy)
+    lcf = b2 / (2 * tf2)
+    is_slender_flange = lcf > lcfr
+
+    # Web slenderness ratio for Flexure (Slender → 제외)
+    lwr = 5.70 * np.sqrt(E / Fy)
+    lw1 = (h1 - 2 * (tf1 + r1) - tw1) / (2 * tw1)
+    lw2 = (h2 - 2 * (tf2 + r2) - tw2) / (2 * tw2)
+    is_slender_web = (lw1 > lwr) | (lw2 > lwr)
+
+    # Slenderness / buckling stress
+    lam = np.maximum(Kx * Lx / ix, Ky * Ly / iy)
+    Fe1 = math.pi ** 2 * E / lam ** 2
+    G = E / (2 * (1 + nu))
+    Fe2 = (math.pi ** 2 * E * cw / (Kz * Lx) ** 2 + G * J) / (Ix + Iy)
+    Fe = np.minimum(Fe1, Fe2)
+    Fcr = 0.658 ** (Fy / Fe) * Fy
+
+    phi_Pn = 0.9 * area * Fcr / 1000                                     # kN
+    phi_Mnx = 0.9 * (np.minimum(Fy * zx, 1.6 * Fy * sx) / 1000000)      # kN.m
+    phi_Mny = 0.9 * (np.minimum(Fy * zy, 1.6 * Fy * sy) / 1000000)      # kN.m
+
+    shape = np.broadcast(area, phi_Pn).shape
+    return {
+        n: np.broadcast_to(v, shape)
+        for n, v in (
+            ("area", area), ("phi_Pn", phi_Pn), ("phi_Mnx", phi_Mnx), ("phi_Mny", phi_Mny),
+            ("lcf", lcf), ("lcfr", lcfr), ("is_slender_flange", is_slender_flange),
+            ("is_slender_web", is_slender_web),
+        )
+    }
+
+
+def interaction(cap, Pu, Mux, Muy):
+    """하중에 따른 부분: P-M-M 상관식 (AISC H1-1a / H1-1b), φPn < Pu 판정"""
+    phi_Pn, phi_Mnx, phi_Mny = cap["phi_Pn"], cap["phi_Mnx"], cap["phi_Mny"]
+    ratio_comp = Pu / phi_Pn
+    ratio_bend_x = np.where(phi_Mnx > 0, Mux / phi_Mnx, 0.0)
+    ratio_bend_y = np.where(phi_Mny > 0, Muy / phi_Mny, 0.0)
+    ratio_pmm = np.where(
+        ratio_comp >= 0.2,
+        ratio_comp + 8 / 9 * (ratio_bend_x + ratio_bend_y),
+        ratio_comp / 2 + ratio_bend_x + ratio_bend_y,
+    )
+
+    return {"ratio_pmm": ratio_pmm, "is_compressive_ng": phi_Pn < Pu}
+
+
+def calculate_section(tw, tf, Fy, E, nu, Kx, Ky, Kz, Lx, Ly, Pu, Mux, Muy, h1, h2, b1, b2, r1, r2):
+    """calculateSection: section_capacity + interaction"""
+    cap = section_capacity(tw, tf, Fy, E, nu, Kx, Ky, Kz, Lx, Ly, h1, h2, b1, b2, r1, r2)
+    return {**cap, **interaction(cap, Pu, Mux, Muy)}
+
+
+# ---------------------------------------------------------------------
+# 2. 후보 (조합 × 강종 × tw × tf) 테이블
+# ---------------------------------------------------------------------
+@dataclass
+class CandidateGroup:
+    """findOptimalSection 1회 호출에 해당하는 후보 묶음"""
+
+    combination: tuple              # (name, H1, H2, B1, B2)
+    fy: float
+    unit_price: float               # 원/톤
+    start: int
+    stop: int
+
+
+def build_candidates(tw_range=DEFAULT_TW_RANGE, tf_range=DEFAULT_TF_RANGE):
+    """calculateAll 의 검색 순서 (조합1/2 × SM420/SM355 → 조합3 × SM355, tw → tf) 그대로의
+    후보 배열과 그룹 목록"""
+    standard = rolled_h_standard()
+    tw_values = range(int(tw_range[0]), int(tw_range[1]) + 1)
+    tf_values = range(int(tf_range[0]), int(tf_range[1]) + 1)
+
+    cols = {k: [] for k in ("tw", "tf", "fy", "h1", "h2", "b1", "b2", "r")}
+    groups = []
+    for i, comb in enumerate(COMBINATIONS):
+        name, h1, h2, b1, b2 = comb
+        comb3 = is_combination3(h1, b1, standard)
+        if comb3:
+            tw_s, tf_s, r = standard[h1]
+            pairs = [(tw_s, tf_s)]
+        else:
+            r = 0.0
+            pairs = [(tw, tf) for tw in tw_values for tf in tf_values]
+        pairs = [(tw, tf) for tw, tf in pairs if tf >= tw]           # tf >= tw 조건
+
+        grades = STEEL_GRADES_COMB1_2 if i < 2 else STEEL_GRADES_COMB3
+        for fy, price in grades:
+            start = len(cols["tw"])
+            for tw, tf in pairs:
+                for k, v in zip(cols, (tw, tf, fy, h1, h2, b1, b2, r)):
+                    cols[k].append(float(v))
+            groups.append(CandidateGroup(comb, float(fy), float(price), start, len(cols["tw"])))
+
+    cols = {k: np.array(v) for k, v in cols.items()}
+    cols["area"] = section_area(cols["tw"], cols["tf"], cols["h1"], cols["h2"],
+                                cols["b1"], cols["b2"], cols["r"], cols["r"])
+    return cols, groups
+
+
+# ---------------------------------------------------------------------
+# 3. 하중 무관 성능 캐시 (LRU)
+# ---------------------------------------------------------------------
+class CapacityCache:
+    """후보 테이블 전체의 하중 무관 성능 (section_capacity) LRU 캐시
+
+    실제 기둥 일람표는 행마다 Pu / Mux / Muy 만 다르고 (Kx, Ky, Lx, Ly) 는 몇 가지뿐이므로
+    키 (Kx, Ky, Kz, Lx, Ly) 마다 모든 (조합, 강종, tw, tf) 후보의 성능을 한 번만 계산하고,
+    행마다는 interaction (P-M-M 상관식) 만 계산합니다.
+    단면 치수와 강종은 후보 테이블에 고정되어 있으므로 키에 들어가지 않습니다.
+    키는 입력값 그대로 (float 변환만) 사용하므로 캐시 유무와 관계없이 결과가 같습니다.
+    """
+
+    def __init__(self, candidates, maxsize=DEFAULT_CACHE_SIZE):
+        self.candidates = candidates
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, Kx, Ky, Kz, Lx, Ly):
+        """후보별 성능 dict (Lx, Ly 는 m)"""
+        key = (float(Kx), float(Ky), float(Kz), float(Lx), float(Ly))
+        cap = self._entries.get(key)
+        if cap is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return cap
+
+        self.misses += 1
+        c = self.candidates
+        cap = section_capacity(
+            c["tw"], c["tf"], c["fy"], E_STEEL, NU, key[0], key[1], key[2],
+            key[3] * 1000.0, key[4] * 1000.0,
+            c["h1"], c["h2"], c["b1"], c["b2"], c["r"], c["r"],
+        )
+        self._entries[key] = cap
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return cap
+
+    def lookup(self, r, Kz):
+        """행 배열 → ((키 수, 후보 수) 성능 배열 dict, 행별 키 인덱스)"""
+        keys = np.stack([r["kx"], r["ky"], r["lx"], r["ly"]], axis=1)
+        uniq, inverse = np.unique(keys, axis=0, return_inverse=True)
+        caps = [self.get(kx, ky, Kz, lx, ly) for kx, ky, lx, ly in uniq]
+        return {n: np.stack([cap[n] for cap in caps]) for n in caps[0]}, inverse.ravel()
+
+    def cache_info(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._entries), "maxsize": self.maxsize}
+
+
+# ---------------------------------------------------------------------
+# 4. 최적 단면 선택 (행 × 후보 배열)
+# ---------------------------------------------------------------------
+# 탐색 방식
+#   grid   : 그룹의 모든 (tw, tf) 후보를 평가 (웹 계산기 findOptimalSection 과 동일)
+#   bisect : tw 마다 통과하는 최소 tf 를 이분 탐색 (Pareto 경계), 단면적이 더 줄어들 수
+#            없으면 중단. tw 당 평가 횟수 |tf| → log2|tf|
+#
+# bisect 가 grid 와 같은 결과를 주는 근거 (tw 고정, tf 증가):
+#   - 단면적은 tw, tf 에 대해 단조 증가 (d/dtf = 4B - 4tw > 0, d/dtw = 2(H - 2tf) - 2tw > 0)
+#   - λcf, λw 는 감소 → Slender 제외 조건은 한 번 풀리면 다시 걸리지 않음
+#   - φPn, φMn 증가 → 같은 식 (H1-1a 또는 H1-1b) 안에서는 P-M-M 감소
+#   - Pu/φPn 이 0.2 를 지나 H1-1a → H1-1b 로 바뀔 때만 P-M-M 이 커질 수 있으나
+#     증가 후 값 < 0.1 + Mr/Mc ≤ 9/8·limit - 0.125 ≤ limit (limit ≤ 1.0 일 때)
+#   - 통과 조건의 P-M-M > 0 은 Pu > 0, Mux ≥ 0, Muy ≥ 0 이면 항상 성립
+#   따라서 limit ≤ 1.0 이고 Pu > 0, Mux ≥ 0, Muy ≥ 0 이면 "통과" 는 tf 에 대해 단조
+#   (한 번 통과하면 계속 통과).
+#   모멘트가 음수이면 tf 가 커질수록 P-M-M 이 0 이하로 내려가 다시 "불통과" 가 될 수 있으므로
+#   (웹 계산기는 P-M-M ≤ 0 인 단면을 제외), 그런 행과 Pu ≤ 0 인 행, limit > 1.0,
+#   통과 단면이 없는 행 (최소 P-M-M fallback) 은 grid 로 계산합니다.
+SEARCH_MODES = ("bisect", "grid")
+
+
+def row_arrays(rows):
+    return {k: np.array([row[k] for row in rows], dtype=float)
+            for k in ("pu", "mux", "muy", "kx", "ky", "lx", "ly")}
+
+
+def evaluate(r, caps, idx):
+    """행 배열 r 과 후보 인덱스 idx (행마다 1개 (n,) 또는 여러 개 (n, m)) 평가
+
+    caps 는 CapacityCache.lookup 의 (키 수, 후보 수) 성능 배열, r["key"] 는 행별 키 인덱스.
+    """
+    r = {k: v.reshape(v.shape + (1,) * (np.ndim(idx) - 1)) for k, v in r.items()}
+    cap = {n: v[r["key"], idx] for n, v in caps.items()}
+    return {**cap, **interaction(cap, r["pu"], r["mux"], r["muy"])}
+
+
+def _usable(res):
+    return ~res["is_slender_flange"] & ~res["is_slender_web"]
+
+
+def _passes(res, pmm_limit):
+    pmm = res["ratio_pmm"]
+    return _usable(res) & (pmm > 0) & (pmm <= pmm_limit)
+
+
+def select_grid(r, caps, c, group, pmm_limit):
+    """findOptimalSection: P-M-M ≤ limit 인 최소 단면적 → 없으면 φPn ≥ Pu 인 최소 P-M-M
+
+    반환: 후보 인덱스 (n_rows,), 찾지 못한 행은 -1
+    """
+    n = len(r["pu"])
+    if group.stop == group.start or n == 0:
+        return np.full(n, -1)
+    idx = np.broadcast_to(np.arange(group.start, group.stop), (n, group.stop - group.start))
+    res = evaluate(r, caps, idx)
+    pmm = res["ratio_pmm"]
+    area = c["area"][idx]
+
+    # argmin 은 첫 번째 최솟값 → 웹 계산기의 tw → tf 순서 strict < 비교와 같은 동률 처리
+    ok = _passes(res, pmm_limit)
+    first = np.argmin(np.where(ok, area, np.inf), axis=1)
+
+    ok2 = _usable(res) & ~res["is_compressive_ng"] & (pmm < np.inf)
+    fallback = np.argmin(np.where(ok2, pmm, np.inf), axis=1)
+
+    k = np.where(ok.any(axis=1), first, np.where(ok2.any(axis=1), fallback, -1))
+    return np.where(k >= 0, k + group.start, -1)
+
+
+def _tw_blocks(c, group):
+    """그룹 안에서 같은 tw 를 가진 후보 구간 [a, b) 목록 (tw 오름차순, 구간 안은 tf 오름차순)"""
+    tw = c["tw"][group.start:group.stop]
+    cuts = np.flatnonzero(np.diff(tw)) + 1
+    edges = np.concatenate(([0], cuts, [len(tw)])) + group.start
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def select_bisect(r, caps, c, group, pmm_limit):
+    """select_grid 와 같은 결과를 tw 마다 tf 이분 탐색으로 계산"""
+    n = len(r["pu"])
+    if pmm_limit > 1.0 or group.stop == group.start or n == 0:
+        return select_grid(r, caps, c, group, pmm_limit)
+
+    # P-M-M > 0 조건이 tf 에 대해 단조가 아닐 수 있는 행 (음수 모멘트, Pu ≤ 0) 은 grid
+    signed = (r["pu"] <= 0) | (r["mux"] < 0) | (r["muy"] < 0)
+    if signed.any():
+        best = np.empty(n, dtype=int)
+        for mask, select in ((signed, select_grid), (~signed, select_bisect)):
+            idx = np.flatnonzero(mask)
+            if len(idx):
+                best[idx] = select({k: v[idx] for k, v in r.items()}, caps, c, group, pmm_limit)
+        return best
+
+    best = np.full(n, -1)
+    best_area = np.full(n, np.inf)
+    for a, b in _tw_blocks(c, group):
+        # 이 tw 의 최소 단면적이 현재 최적 이상이면 이후 tw 도 개선 불가 (단면적 단조 증가)
+        rows = np.flatnonzero(c["area"][a] < best_area)
+        if len(rows) == 0:
+            break
+        sub = {k: v[rows] for k, v in r.items()}
+        lo = np.full(len(rows), a)
+        hi = np.full(len(rows), b)             # 첫 통과 위치 (b = 통과 없음)
+        while True:
+            open_ = np.flatnonzero(lo < hi)
+            if len(open_) == 0:
+                break
+            mid = (lo[open_] + hi[open_]) // 2
+            ok = _passes(evaluate({k: v[open_] for k, v in sub.items()}, caps, mid), pmm_limit)
+            hi[open_] = np.where(ok, mid, hi[open_])
+            lo[open_] = np.where(ok, lo[open_], mid + 1)
+
+        found = lo < b
+        better = found & (c["area"][np.minimum(lo, b - 1)] < best_area[rows])
+        best[rows[better]] = lo[better]
+        best_area[rows[better]] = c["area"][lo[better]]
+
+    # 통과 단면이 없는 행: 최소 P-M-M fallback 은 grid 로 계산
+    missing = np.flatnonzero(best < 0)
+    if len(missing):
+        best[missing] = select_grid({k: v[missing] for k, v in r.items()}, caps, c, group, pmm_limit)
+    return best
+
+
+def select_sections(r, caps, c, groups, pmm_limit, search="bisect", crosscheck=False):
+    """그룹별 최적 후보 인덱스 (n_rows, n_groups)
+
+    crosscheck=True 면 grid 결과와 비교하여 다르면 RuntimeError (검증용).
+    """
+    if search not in SEARCH_MODES:
+        raise ValueError(f"search 는 {SEARCH_MODES} 중 하나여야 합니다: {search!r}")
+    select = select_bisect if search == "bisect" else select_grid
+    picks = np.stack([select(r, caps, c, g, pmm_limit) for g in groups], axis=1)
+    if crosscheck and search != "grid":
+        expected = np.stack([select_grid(r, caps, c, g, pmm_limit) for g in groups], axis=1)
+        diff = np.argwhere(picks != expected)
+        if len(diff):
+            i, j = diff[0]
+            raise RuntimeError(
+                f"{search} 탐색 결과가 grid 와 다릅니다: 행 {i}, 그룹 {j} "
+                f"({picks[i, j]} != {expected[i, j]}), 불일치 {len(diff)}건"
+            )
+    return picks
+
+
+def find_sections(rows, candidates, groups, pmm_limit=DEFAULT_PMM_LIMIT, Kz=DEFAULT_KZ,
+                  search="bisect", crosscheck=False, cache=None):
+    """calculateAll 과 동일한 규칙으로 행별 결과 dict 목록 반환
+
+    cache: 하중 무관 성능 캐시 (CapacityCache). 여러 번 호출할 때 같은 캐시를 넘기면
+           (Kx, Ky, Kz, Lx, Ly) 가 같은 행의 단면 성능을 다시 계산하지 않습니다.
+    """
+    results = [None] * len(rows)
+    active = [i for i, row in enumerate(rows) if row["pu"] > 0]
+    for i, row in enumerate(rows):
+        if row["pu"] <= 0:
+            results[i] = warning_result(row, 'Pu 값을 입력해주세요.', lx=DEFAULT_LENGTH, ly=DEFAULT_LENGTH)
+    if not active:
+        return results
+
+    act_rows = [rows[i] for i in active]
+    c = candidates
+    r = row_arrays(act_rows)
+    cache = cache or CapacityCache(c)
+    caps, r["key"] = cache.lookup(r, Kz)
+    lines = np.arange(len(act_rows))
+
+    # 그룹별 최적 단면 → 단위 길이당 금액이 가장 작은 그룹 (동률이면 먼저 검색한 그룹)
+    picks = select_sections(r, caps, c, groups, pmm_limit, search, crosscheck)
+    prices = np.array([g.unit_price for g in groups])
+    pick_area = np.where(picks >= 0, c["area"][np.maximum(picks, 0)], np.inf)
+    cost = (pick_area / 1000000 * STEEL_DENSITY) * (prices / 1000)
+    best_group = np.argmin(cost, axis=1)
+    best = picks[lines, best_group]
+
+    # 최종 계산 결과 (웹 계산기와 같이 선택 단면으로 재계산)
+    final = evaluate(r, caps, np.maximum(best, 0))
+
+    for j, (i, row) in enumerate(zip(active, act_rows)):
+        k = int(best[j])
+        if k < 0:
+            results[i] = warning_result(row, '최적 단면을 찾을 수 없습니다. 하중 조건을 확인해주세요.')
+            continue
+
+        pmm = float(final["ratio_pmm"][j])
+        if pmm > pmm_limit:
+            results[i] = warning_result(
+                row,
+                f'P-M-M 최대 허용값 ({pmm_limit:.2f}) 이하의 단면을 찾을 수 없습니다. 발견된 최소 P-M-M: {pmm:.3f}',
+            )
+            continue
+
+        g = groups[int(best_group[j])]
+        name, h1, h2, b1, b2 = g.combination
+        area = float(c["area"][k])
+        unit_weight = area / 1000000 * STEEL_DENSITY
+        results[i] = {
+            "no": row["no"],
+            "name": row["name"],
+            "pu": row["pu"],
+            "mux": row["mux"],
+            "muy": row["muy"],
+            "pmm": pmm,
+            "steel_grade": f"SM{int(g.fy)}",
+            "combination": name,
+            "kx": row["kx"],
+            "lx": row["lx"],
+            "ly": row["ly"],
+            "h": h1,
+            "b": b1,
+            "tw": c["tw"][k].item(),
+            "tf": c["tf"][k].item(),
+            "area": area,
+            "unit_weight": unit_weight,
+            "unit_price": g.unit_price,
+            "cost_per_meter": unit_weight * (g.unit_price / 1000),
+            "fy": g.fy,
+            "is_slender_flange": bool(final["is_slender_flange"][j]),
+            "lcf": float(final["lcf"][j]),
+            "lcfr": float(final["lcfr"][j]),
+            "is_compressive_ng": bool(final["is_compressive_ng"][j]),
+            "phi_Pn": float(final["phi_Pn"][j]),
+            "H1": h1, "H2": h2, "B1": b1, "B2": b2,
+            "warning": None,
+        }
+    return results
+
+
+def warning_result(row, warning, lx=None, ly=None):
+    """계산할 수 없는 행 (경고 표시용)"""
+    return {
+        "no": row["no"], "name": row["name"], "pu": row["pu"], "mux": row["mux"], "muy": row["muy"],
+        "pmm": 0, "steel_grade": "SM420/SM355", "combination": "-", "kx": row["kx"],
+        "lx": row["lx"] if lx is None else lx, "ly": row["ly"] if ly is None else ly,
+        "h": 0, "b": 0, "tw": 0, "tf": 0, "area": 0, "unit_weight": 0,
+        "warning": warning,
+    }
+
+
+# ---------------------------------------------------------------------
+# 5. 병렬 실행
+# ---------------------------------------------------------------------
+_worker_state = None
+
+
+def _init_worker(tw_range, tf_range, cache_size):
+    global _worker_state
+    candidates, groups = build_candidates(tw_range, tf_range)
+    _worker_state = (candidates, groups, CapacityCache(candidates, cache_size))
+
+
+def _run_chunk(rows, options):
+    """행 묶음 계산 → (결과, 이 묶음에서의 캐시 hit / miss)"""
+    candidates, groups, cache = _worker_state
+    hits, misses = cache.hits, cache.misses
+    results = find_sections(rows, candidates, groups, cache=cache, **options)
+    return results, (cache.hits - hits, cache.misses - misses)
+
+
+def iter_run(rows, tw_range=DEFAULT_TW_RANGE, tf_range=DEFAULT_TF_RANGE, pmm_limit=DEFAULT_PMM_LIMIT,
+             Kz=DEFAULT_KZ, workers=None, chunk_size=DEFAULT_ROW_CHUNK, search="bisect", crosscheck=False,
+             cache_size=DEFAULT_CACHE_SIZE, stats=None):
+    """행 iterable 을 묶음 단위로 계산하여 결과를 입력 순서대로 하나씩 반환 (generator)
+
+    search: "bisect" (기본, tf 이분 탐색) 또는 "grid" (전체 후보 평가)
+    crosscheck: bisect 결과를 grid 와 비교 (다르면 RuntimeError)
+    cache_size: 프로세스별 하중 무관 성능 캐시 크기 (키 수)
+    stats: dict 를 주면 성능 캐시 hits / misses 합계를 채웁니다 (끝까지 소비한 뒤).
+    프로세스 풀에는 workers × 2 묶음까지만 넘기므로 행 수와 관계없이 메모리가 일정합니다.
+    """
+    options = dict(pmm_limit=pmm_limit, Kz=Kz, search=search, crosscheck=crosscheck)
+    rows = iter(rows)
+    chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+    workers = workers or os.cpu_count() or 1
+    hits = misses = 0
+
+    if workers == 1:
+        _init_worker(tw_range, tf_range, cache_size)
+        parts = (_run_chunk(c, options) for c in chunks)
+        for results, (h, m) in parts:
+            hits, misses = hits + h, misses + m
+            yield from results
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(tw_range, tf_range, cache_size)) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_run_chunk, chunk, options))
+                if len(pending) < workers * 2:
+                    continue
+                results, (h, m) = pending.popleft().result()
+                hits, misses = hits + h, misses + m
+                yield from results
+            while pending:
+                results, (h, m) = pending.popleft().result()
+                hits, misses = hits + h, misses + m
+                yield from results
+
+    if stats is not None:
+        stats["hits"] = hits
+        stats["misses"] = misses
+
+
+def run(rows, tw_range=DEFAULT_TW_RANGE, tf_range=DEFAULT_TF_RANGE, pmm_limit=DEFAULT_PMM_LIMIT,
+        Kz=DEFAULT_KZ, workers=None, chunk_size=DEFAULT_ROW_CHUNK, search="bisect", crosscheck=False,
+        cache_size=DEFAULT_CACHE_SIZE, stats=None):
+    """전체 행 계산 (입력 순서대로 결과 목록 반환, 인자는 iter_run 과 같음)"""
+    if workers is None and len(rows) <= chunk_size:
+        workers = 1
+    return list(iter_run(rows, tw_range, tf_range, pmm_limit, Kz, workers, chunk_size,
+                         search, crosscheck, cache_size, stats))
+
+
+# ---------------------------------------------------------------------
+# 6. 엑셀 입출력
+# ---------------------------------------------------------------------
+def require_openpyxl():
+    try:
+        import openpyxl
+    except ImportError:
+        raise SystemExit("❌ openpyxl 이 필요합니다: pip install openpyxl")
+    return openpyxl
+
+
+def _parse_float(value, default):
+    """JS parseFloat(v) || default 와 같은 규칙 (빈 값, 0, 숫자 아님 → default)"""
+    try:
+        v = float(str(value).strip().replace(",", ""))
+    except ValueError:
+        return default
+    return default if v == 0 or math.isnan(v) else v
+
+
+def _parse_int(value, default):
+    v = _parse_float(value, 0)
+    return int(v) if v else default
+
+
+def _find_header(headers, pred):
+    return next((i for i, h in enumerate(headers) if pred(h)), -1)
+
+
+def iter_load_rows(values):
+    """하중 입력 표 (첫 행 = 헤더) → 행 dict (importLoadFromExcel 과 같은 헤더 규칙, generator)"""
+    values = iter(values)
+    header = next(values, None)
+    if header is None:
+        raise ValueError(NO_DATA_MESSAGE)
+
+    headers = [str(h if h is not None else "").lower().strip() for h in header]
+    idx = {
+        "no": _find_header(headers, lambda h: "no" in h),
+        "name": _find_header(headers, lambda h: "기둥" in h or "name" in h or "이름" in h),
+        "pu": _find_header(headers, lambda h: "pu" in h and "mux" not in h and "muy" not in h),
+        "mux": _find_header(headers, lambda h: "mux" in h),
+        "muy": _find_header(headers, lambda h: "muy" in h),
+        "lx": _find_header(headers, lambda h: "lx" in h and "mux" not in h),
+        "ly": _find_header(headers, lambda h: "ly" in h and "muy" not in h),
+        "kx": _find_header(headers, lambda h: "kx" in h and "mux" not in h),
+        "ky": _find_header(headers, lambda h: "ky" in h and "muy" not in h),
+    }
+    if idx["pu"] == -1:
+        raise ValueError('엑셀 파일에 "Pu" 컬럼이 없습니다. 컬럼명을 확인해주세요.')
+
+    def cell(row, key):
+        i = idx[key]
+        return row[i] if 0 <= i < len(row) else None
+
+    i = 0
+    for i, row in enumerate(values, start=1):
+        if not row or all(v in (None, "") for v in row):
+            continue
+        name = str(cell(row, "name") or "").strip()
+        yield {
+            "no": _parse_int(cell(row, "no"), i),
+            "name": name or f"KC{i}",
+            "pu": _parse_float(cell(row, "pu"), 0.0),
+            "mux": _parse_float(cell(row, "mux"), 0.0),
+            "muy": _parse_float(cell(row, "muy"), 0.0),
+            # 하중 입력 테이블과 같이 Lx, Ly 미입력 시 4.5 m, Kx, Ky 미입력 시 1
+            "lx": _parse_float(cell(row, "lx"), DEFAULT_LENGTH),
+            "ly": _parse_float(cell(row, "ly"), DEFAULT_LENGTH),
+            "kx": _parse_float(cell(row, "kx"), 1.0),
+            "ky": _parse_float(cell(row, "ky"), 1.0),
+        }
+    if i == 0:
+        raise ValueError(NO_DATA_MESSAGE)
+
+
+def read_load_rows(values):
+    """하중 입력 표 → 행 dict 목록"""
+    return list(iter_load_rows(values))
+
+
+def iter_rows_from_excel(path):
+    """하중 입력 엑셀을 read-only 모드로 한 행씩 읽음 (generator)"""
+    openpyxl = require_openpyxl()
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from iter_load_rows(wb.worksheets[0].iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+
+def load_rows_from_excel(path):
+    return list(iter_rows_from_excel(path))
+
+
+def result_row(r):
+    """exportResultToExcel 과 같은 형식의 결과 행"""
+    if r["warning"]:
+        return [r["no"] or '', r["name"] or '', r["pu"] or 0] + ['-'] * 13 + [r["warning"]]
+
+    remarks = []
+    if r["is_slender_flange"]:
+        remarks.append('Slender check needed')
+    if r["is_compressive_ng"]:
+        remarks.append('Compressive NG (φPn < Pu)')
+    if r["pmm"] > 1.0:
+        remarks.append('P-M-M > 1.0')
+
+    return [
+        r["no"] or '',
+        r["name"] or '',
+        f'{r["pu"]:.1f}' if r["pu"] else 0,
+        f'{r["pmm"]:.3f}' if r["pmm"] > 0 else '-',
+        r["steel_grade"] or '-',
+        r["combination"] or '-',
+        f'{r["kx"]:.1f}' if r["kx"] else '-',
+        f'{r["lx"]:.1f}' if r["lx"] else '-',
+        r["h"] or '-',
+        r["b"] or '-',
+        _int_if_whole(r["tw"]) or '-',
+        _int_if_whole(r["tf"]) or '-',
+        f'{r["area"]:.2f}' if r["area"] else '-',
+        f'{r["unit_weight"]:.4f}' if r["unit_weight"] else '-',
+        f'{r["unit_price"]:,.0f}' if r["unit_price"] else '-',
+        f'{r["cost_per_meter"]:.0f}' if r["cost_per_meter"] else '-',
+        ', '.join(remarks) or '-',
+    ]
+
+
+def _int_if_whole(v):
+    return int(v) if float(v).is_integer() else v
+
+
+def write_result_excel(results, path):
+    openpyxl = require_openpyxl()
+    from openpyxl.utils import get_column_letter
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = RESULT_SHEET_NAME
+    ws.append(RESULT_HEADERS)
+    for r in results:
+        ws.append(result_row(r))
+    for i, width in enumerate(RESULT_COLUMN_WIDTHS, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = width
+    wb.save(path)
+    return path
+
+
+def default_result_filename(now=None):
+    now = now or datetime.now()
+    return f"AutoFindSectionResult_{now:%Y%m%d_%H%M}.xlsx"
+
+
+def parse_range(spec):
+    lo, hi = (int(v) for v in spec.split(":"))
+    return lo, hi
+
+
+def main():
+    parser = argparse.ArgumentParser(description="K-COL Auto Find Section 일괄 계산")
+    parser.add_argument("input", help="하중 입력 엑셀 (.xlsx)")
+    parser.add_argument("-o", "--output", default=None, help="결과 엑셀 경로")
+    parser.add_argument("--tw", default="8:16", help="tw 범위 twMin:twMax (mm)")
+    parser.add_argument("--tf", default="10:20", help="tf 범위 tfMin:tfMax (mm)")
+    parser.add_argument("--pmm-limit", type=float, default=DEFAULT_PMM_LIMIT)
+    parser.add_argument("--kz", type=float, default=DEFAULT_KZ)
+    parser.add_argument("--search", choices=SEARCH_MODES, default="bisect",
+                        help="두께 탐색 방식 (bisect: tf 이분 탐색, grid: 전체 후보)")
+    parser.add_argument("--crosscheck", action="store_true", help="bisect 결과를 grid 와 비교")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default=None,
+                        help="부재별 결과 캐시 (SQLite, result_cache) - 바뀐 행만 다시 계산")
+    args = parser.parse_args()
+
+    rows = load_rows_from_excel(args.input)
+    print(f"📋 하중 데이터 {len(rows)}개 행")
+
+    start = time.perf_counter()
+    stats = {}
+    if args.cache:
+        from result_cache import ResultCache, cached_run
+
+        with ResultCache(args.cache) as cache:
+            results = cached_run(rows, cache, parse_range(args.tw), parse_range(args.tf), args.pmm_limit,
+                                 args.kz, args.workers, args.search, args.crosscheck, stats)
+            cache_stats = cache.stats()
+    else:
+        results = run(rows, parse_range(args.tw), parse_range(args.tf), args.pmm_limit, args.kz, args.workers,
+                      search=args.search, crosscheck=args.crosscheck, stats=stats)
+    elapsed = time.perf_counter() - start
+
+    warnings = sum(1 for r in results if r["warning"])
+    output = write_result_excel(results, args.output or default_result_filename())
+    print(f"✅ 계산 완료: {len(results)}개 ({elapsed:.2f} s), 경고 {warnings}개")
+    print(f"   단면 성능 캐시: hit {stats['hits']} / miss {stats['misses']}")
+    if args.cache:
+        print(f"   결과 캐시: hit {cache_stats['hits']} / miss {cache_stats['misses']} "
+              f"({cache_stats['entries']}개, {cache_stats['bytes'] / 1024 / 1024:.2f} MB)")
+    print(f"   결과: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+"""
+부재별 계산 결과 캐시 (SQLite, 입력값 해시 기반)
+- 키 = sha256(계산 종류, 계산 코드 버전, 정규화한 부재 입력값)
+  · 계산 코드 버전 = 계산 모듈 소스 (castillated_core / kcol_section_finder / ks_sections.csv)
+    내용의 해시 → 계산식을 고치면 이전 결과는 자동으로 쓰이지 않음
+  · 보: 생략한 필드는 CastellatedBeamDesign 기본값으로 채운 뒤 해시 (생략 = 기본값 명시)
+  · 기둥: 부재 마크 / No. 는 키에서 제외 (하중, 길이, K 와 탐색 조건만)
+- 일람표를 다시 계산하면 바뀐 부재만 한 번의 배열 연산 (check_beams / run) 으로 계산하고
+  나머지는 저장된 결과를 그대로 사용 → 소요 시간은 수정한 부재 수에 비례
+- 전체 크기 상한 (max_mb) 을 넘으면 가장 오래 사용하지 않은 결과부터 삭제 (LRU)
+
+    from result_cache import ResultCache, cached_check_beams
+
+    with ResultCache(".result_cache.sqlite") as cache:
+        result = cached_check_beams(load_schedule("schedule.csv"), cache)   # CastellatedBeamResult
+        cache.stats()
+
+사용법:
+    python result_cache.py beams schedule.csv
+    python result_cache.py columns loads.xlsx -o result.xlsx --tw 8:16 --tf 10:20
+    python result_cache.py stats
+    python result_cache.py prune              # 현재 코드 버전이 아닌 결과 삭제
+    python result_cache.py clear
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from dataclasses import fields
+from pathlib import Path
+
+import numpy as np
+
+import castillated_core
+import kcol_section_finder
+import steel_sections
+from castillated_core import CastellatedBeamDesign, CastellatedBeamResult, check_beams
+from kcol_section_finder import (
+    DEFAULT_KZ,
+    DEFAULT_PMM_LIMIT,
+    DEFAULT_TF_RANGE,
+    DEFAULT_TW_RANGE,
+    run,
+)
+
+CACHE_FORMAT = 1
+DEFAULT_CACHE_PATH = ".result_cache.sqlite"
+DEFAULT_MAX_MB = 256.0
+SQL_BATCH = 500                     # IN (...) 한 번에 넘기는 키 수 (SQLite 변수 개수 제한)
+
+BEAM, COLUMN = "beam", "column"
+
+# 계산 종류별 결과에 영향을 주는 소스 파일
+CODE_FILES = {
+    BEAM: (Path(castillated_core.__file__),),
+    COLUMN: (Path(kcol_section_finder.__file__), Path(steel_sections.__file__), steel_sections.DATA_PATH),
+}
+
+DESIGN_DEFAULTS = {f.name: f.default for f in fields(CastellatedBeamDesign)}
+RESULT_FIELDS = tuple(f.name for f in fields(CastellatedBeamResult)
+                      if f.name != "inputs" and not f.name.startswith("_"))
+
+COLUMN_KEYS = ("pu", "mux", "muy", "kx", "ky", "lx", "ly")
+ROW_IDENTITY = ("no", "name")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key      TEXT PRIMARY KEY,
+    kind     TEXT NOT NULL,
+    version  TEXT NOT NULL,
+    value    TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    created  REAL NOT NULL,
+    accessed REAL NOT NULL,
+    hits     INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+"""
+
+
+# ---------------------------------------------------------------------
+# 1. 키 (코드 버전 + 정규화 입력값)
+# ---------------------------------------------------------------------
+_versions = {}
+
+
+def code_version(kind):
+    """계산 종류의 코드 버전 (소스 파일 내용 해시, 프로세스당 한 번 계산)"""
+    if kind not in _versions:
+        h = hashlib.sha256(f"{CACHE_FORMAT}:{kind}".encode())
+        for path in CODE_FILES[kind]:
+            h.update(path.name.encode())
+            h.update(path.read_bytes())
+        _versions[kind] = h.hexdigest()[:16]
+    return _versions[kind]
+
+
+def _normalize(value):
+    """해시용 값 정규화 (숫자는 float repr 로 통일: 12 == 12.0, numpy 스칼라 == float)"""
+    if value is None or isinstance(value, str):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return "(" + ",".join(_normalize(v) for v in value) + ")"
+    return repr(float(value))
+
+
+def member_key(kind, version, inputs, context=""):
+    """(계산 종류, 코드 버전, 입력값 dict) → 캐시 키 (sha256 hex, 필드 이름 순)
+
+    context: 모든 부재에 공통인 조건 (normalize_inputs 결과, 한 번만 정규화)
+    """
+    payload = "\x1f".join((kind, version, context, normalize_inputs(inputs)))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def normalize_inputs(inputs):
+    """입력값 dict → 필드 이름 순 정규화 문자열"""
+    return "\x1f".join(f"{name}={_normalize(inputs[name])}" for name in sorted(inputs))
+
+
+def beam_inputs(inputs):
+    """일람표 입력값 (생략 가능) → 모든 CastellatedBeamDesign 필드 (생략 = 기본값)"""
+    unknown = set(inputs) - set(DESIGN_DEFAULTS)
+    if unknown:
+        raise ValueError(f"CastellatedBeamDesign 에 없는 필드: {', '.join(sorted(unknown))}")
+    return {**DESIGN_DEFAULTS, **inputs}
+
+
+# ---------------------------------------------------------------------
+# 2. SQLite 저장소
+# ---------------------------------------------------------------------
+class ResultCache:
+    """키 → JSON 결과 저장소 (크기 상한 LRU 삭제, 이번 실행의 hit / miss 집계)"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_mb=DEFAULT_MAX_MB):
+        self.path = str(path)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def get_many(self, keys):
+        """키 목록 → {키: 결과} (있는 것만), 찾은 결과는 사용 시각 / 사용 횟수 갱신"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for i in range(0, len(keys), SQL_BATCH):
+            batch = keys[i:i + SQL_BATCH]
+            marks = ",".join("?" * len(batch))
+            for key, value in self.conn.execute(f"SELECT key, value FROM results WHERE key IN ({marks})", batch):
+                found[key] = json.loads(value)
+        if found:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany("UPDATE results SET accessed = ?, hits = hits + 1 WHERE key = ?",
+                                      [(now, k) for k in found])
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, kind, version, items):
+        """[(키, 결과), ...] 저장 후 크기 상한을 넘으면 LRU 삭제"""
+        now = time.time()
+        rows = []
+        for key, value in items:
+            text = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+            rows.append((key, kind, version, text, len(text.encode()), now, now))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO results (key, kind, version, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self.evict()
+
+    def total_bytes(self):
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 가장 오래 사용하지 않은 결과 삭제 → 삭제 개수"""
+        excess = self.total_bytes() - self.max_bytes
+        if excess <= 0:
+            return 0
+        victims = []
+        for key, size in self.conn.execute("SELECT key, size FROM results ORDER BY accessed, created"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        with self.conn:
+            self.conn.executemany("DELETE FROM results WHERE key = ?", victims)
+        self.evictions += len(victims)
+        return len(victims)
+
+    def prune(self):
+        """현재 코드 버전이 아닌 결과 삭제 → 삭제 개수"""
+        current = {kind: code_version(kind) for kind in CODE_FILES}
+        with self.conn:
+            deleted = 0
+            for kind, version in current.items():
+                deleted += self.conn.execute("DELETE FROM results WHERE kind = ? AND version != ?",
+                                             (kind, version)).rowcount
+            deleted += self.conn.execute(
+                f"DELETE FROM results WHERE kind NOT IN ({','.join('?' * len(current))})", list(current)).rowcount
+        return deleted
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM results")
+
+    def stats(self):
+        """저장 현황 (종류별 개수 / 크기 / 이전 코드 버전 개수) + 이번 실행의 hit / miss / 삭제"""
+        kinds = {}
+        for kind, version, count, size, hits in self.conn.execute(
+                "SELECT kind, version, COUNT(*), SUM(size), SUM(hits) FROM results GROUP BY kind, version"):
+            k = kinds.setdefault(kind, {"entries": 0, "bytes": 0, "stored_hits": 0, "stale": 0})
+            k["entries"] += count
+            k["bytes"] += size
+            k["stored_hits"] += hits
+            if kind not in CODE_FILES or version != code_version(kind):
+                k["stale"] += count
+        requests = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": sum(k["entries"] for k in kinds.values()),
+            "bytes": sum(k["bytes"] for k in kinds.values()),
+            "max_bytes": self.max_bytes,
+            "kinds": kinds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+# ---------------------------------------------------------------------
+# 3. 캐시를 거치는 계산
+# ---------------------------------------------------------------------
+def _beam_entry(result, k):
+    """check_beams 결과의 k번째 보 → JSON 저장용 dict (입력 배열 + 결과 필드)"""
+    return {
+        "inputs": {n: v[k].item() for n, v in result.inputs.items()},
+        "result": {n: getattr(result, n)[k].tolist() for n in RESULT_FIELDS},
+    }
+
+
+def cached_check_beams(schedule, cache):
+    """보 일람표 [(mark, 입력값 dict), ...] 검토 (check_beams 와 같은 CastellatedBeamResult)
+
+    캐시에 없는 보만 모아 check_beams 를 한 번 호출합니다.
+    """
+    if not schedule:
+        raise ValueError("보 일람표가 비어 있습니다.")
+    version = code_version(BEAM)
+    keys = [member_key(BEAM, version, beam_inputs(inputs)) for _, inputs in schedule]
+    entries = cache.get_many(keys)
+
+    missing = list(dict.fromkeys(key for key in keys if key not in entries))
+    if missing:
+        first = {key: k for k, key in reversed(list(enumerate(keys)))}
+        per_beam = [CastellatedBeamDesign(**schedule[first[key]][1]).arrays() for key in missing]
+        arrays = {n: np.concatenate([a[n] for a in per_beam]) for n in per_beam[0]}
+        result = check_beams(**arrays)
+        computed = [(key, _beam_entry(result, j)) for j, key in enumerate(missing)]
+        cache.put_many(BEAM, version, computed)
+        entries.update(computed)
+
+    rows = [entries[key] for key in keys]
+    return CastellatedBeamResult(
+        inputs={n: np.array([r["inputs"][n] for r in rows], dtype=float) for n in rows[0]["inputs"]},
+        **{n: np.array([r["result"][n] for r in rows]) for n in RESULT_FIELDS},
+    )
+
+
+def cached_run(rows, cache, tw_range=DEFAULT_TW_RANGE, tf_range=DEFAULT_TF_RANGE, pmm_limit=DEFAULT_PMM_LIMIT,
+               Kz=DEFAULT_KZ, workers=None, search="bisect", crosscheck=False, stats=None):
+    """kcol_section_finder.run 과 같은 결과 목록 (캐시에 없는 행만 run 으로 계산)
+
+    결과의 no / name 은 항상 현재 행의 값을 사용합니다.
+    crosscheck 는 결과를 바꾸지 않으므로 키에 들어가지 않고, 캐시에 없는 행에만 적용됩니다.
+    stats: run 의 단면 성능 캐시 hits / misses (모두 캐시에서 찾으면 0)
+    """
+    version = code_version(COLUMN)
+    options = {"tw_range": list(tw_range), "tf_range": list(tf_range), "pmm_limit": pmm_limit,
+               "Kz": Kz, "search": search}
+    context = normalize_inputs(options)
+    keys = [member_key(COLUMN, version, {k: row[k] for k in COLUMN_KEYS}, context) for row in rows]
+    entries = cache.get_many(keys)
+    if stats is not None:
+        stats.update(hits=0, misses=0)
+
+    missing = list(dict.fromkeys(key for key in keys if key not in entries))
+    if missing:
+        first = {key: i for i, key in reversed(list(enumerate(keys)))}
+        results = run([rows[first[key]] for key in missing], tw_range, tf_range, pmm_limit, Kz, workers,
+                      search=search, crosscheck=crosscheck, stats=stats)
+        computed = [(key, {k: v for k, v in r.items() if k not in ROW_IDENTITY})
+                    for key, r in zip(missing, results)]
+        cache.put_many(COLUMN, version, computed)
+        entries.update(computed)
+
+    return [{**{k: row[k] for k in ROW_IDENTITY}, **entries[key]} for row, key in zip(rows, keys)]
+
+
+# ---------------------------------------------------------------------
+# 4. CLI
+# ---------------------------------------------------------------------
+def print_stats(stats):
+    print(f"🗄️  {stats['path']}: {stats['entries']}개, {stats['bytes'] / 1024 / 1024:.2f} MB "
+          f"/ 상한 {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+    for kind, k in sorted(stats["kinds"].items()):
+        print(f"   {kind}: {k['entries']}개 ({k['bytes'] / 1024:.1f} KB), 누적 hit {k['stored_hits']}, "
+              f"이전 코드 버전 {k['stale']}개")
+    if stats["hits"] or stats["misses"]:
+        print(f"   이번 실행: hit {stats['hits']} / miss {stats['misses']} "
+              f"({stats['hit_rate'] * 100:.1f}%), LRU 삭제 {stats['evictions']}개")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="부재별 계산 결과 캐시 (바뀐 부재만 다시 계산)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="캐시 파일 (SQLite)")
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_MB, help="캐시 크기 상한 (MB)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_beams = sub.add_parser("beams", help="보 일람표 검토")
+    p_beams.add_argument("schedule", help="보 일람표 (CSV 또는 JSON)")
+
+    p_cols = sub.add_parser("columns", help="기둥 하중 엑셀 최적 단면 탐색")
+    p_cols.add_argument("input", help="하중 입력 엑셀 (.xlsx)")
+    p_cols.add_argument("-o", "--output", default=None, help="결과 엑셀 경로")
+    p_cols.add_argument("--tw", default="8:16", help="tw 범위 twMin:twMax (mm)")
+    p_cols.add_argument("--tf", default="10:20", help="tf 범위 tfMin:tfMax (mm)")
+    p_cols.add_argument("--pmm-limit", type=float, default=DEFAULT_PMM_LIMIT)
+    p_cols.add_argument("--kz", type=float, default=DEFAULT_KZ)
+    p_cols.add_argument("--search", choices=kcol_section_finder.SEARCH_MODES, default="bisect")
+    p_cols.add_argument("--workers", type=int, default=None)
+
+    sub.add_parser("stats", help="캐시 현황")
+    sub.add_parser("prune", help="현재 코드 버전이 아닌 결과 삭제")
+    sub.add_parser("clear", help="캐시 전체 삭제")
+    args = parser.parse_args()
+
+    with ResultCache(args.cache, args.max_mb) as cache:
+        if args.command == "stats":
+            print_stats(cache.stats())
+            return
+        if args.command == "prune":
+            print(f"🧹 이전 코드 버전 결과 {cache.prune()}개 삭제")
+            return
+        if args.command == "clear":
+            cache.clear()
+            print(f"🧹 캐시 삭제: {args.cache}")
+            return
+
+        if args.command == "beams":
+            from castillated_report import load_schedule
+
+            schedule = load_schedule(args.schedule)
+            start = time.perf_counter()
+            result = cached_check_beams(schedule, cache)
+            elapsed = time.perf_counter() - start
+            ng = int(np.sum((result.UR_gov > 1.0) | ~result.buckling_ok))
+            worst = int(np.argmax(result.UR_gov))
+            print(f"✅ 보 {len(schedule)}개 검토 ({elapsed * 1000:.1f} ms), NG {ng}개, "
+                  f"최대 UR {result.UR_gov[worst]:.3f} ({schedule[worst][0]})")
+        else:
+            rows = kcol_section_finder.load_rows_from_excel(args.input)
+            start = time.perf_counter()
+            results = cached_run(rows, cache, kcol_section_finder.parse_range(args.tw),
+                                 kcol_section_finder.parse_range(args.tf), args.pmm_limit, args.kz,
+                                 args.workers, args.search)
+            elapsed = time.perf_counter() - start
+            warnings = sum(1 for r in results if r["warning"])
+            output = kcol_section_finder.write_result_excel(
+                results, args.output or kcol_section_finder.default_result_filename())
+            print(f"✅ 계산 완료: {len(results)}개 ({elapsed:.2f} s), 경고 {warnings}개")
+            print(f"   결과: {output}")
+        print_stats(cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+강재 단면 데이터베이스 (KS Rolled H + Built-up H)
+- ks_sections.csv: 웹 계산기 (auto-find-section 의 rolledHStandardThickness,
+  조합1/조합2 Built-up 두께 범위)와 동일한 단면 치수
+- 춤(H), 플랜지 폭(B), 단위중량으로 조회하는 메모리 인덱스
+- 캐스틸레이티드 Tee 단면 성능을 (단면, ho) 별로 한 번만 계산하여 캐시
+
+    from steel_sections import load_sections
+
+    table = load_sections()
+    table.by_depth(600)                       # H = 600 인 단면 목록
+    table.query(B=300, max_weight=120.0)      # 조건 조회 (단위중량 오름차순)
+    design = table.design("H600x200x11x17", ho=0.6, L=13.5)
+"""
+
+import bisect
+import csv
+import math
+from pathlib import Path
+from typing import NamedTuple
+
+from castillated_core import STEEL_DENSITY, TEE_FIELDS, CastellatedBeamDesign, tee_properties
+
+DATA_PATH = Path(__file__).with_name("ks_sections.csv")
+
+
+class Section(NamedTuple):
+    designation: str                # 예: H600x200x11x17, BH500x300x12x16
+    kind: str                       # rolled / built-up
+    H: float                        # mm
+    B: float                        # mm
+    tw: float                       # mm
+    tf: float                       # mm
+    r: float                        # mm (Built-up 은 0)
+    A: float                        # mm² (fillet 포함)
+    weight: float                   # kg/m
+
+
+def make_section(designation, kind, H, B, tw, tf, r):
+    """단면 치수로 Section 생성 (단면적에 fillet 4·(r² - πr²/4) 포함)"""
+    A = 2.0 * B * tf + (H - 2.0 * tf) * tw + 4.0 * (r * r - math.pi * r * r / 4.0)
+    return Section(designation, kind, H, B, tw, tf, r, A, A * 1e-6 * STEEL_DENSITY)
+
+
+class SectionTable:
+    """단면 목록 + 조회 인덱스 + Tee 성능 캐시"""
+
+    def __init__(self, sections):
+        self.sections = sorted(sections, key=lambda s: (s.weight, s.designation))
+        self._by_name = {s.designation: s for s in self.sections}
+        self._by_depth = {}
+        self._by_width = {}
+        for s in self.sections:
+            self._by_depth.setdefault(s.H, []).append(s)
+            self._by_width.setdefault(s.B, []).append(s)
+        self._weights = [s.weight for s in self.sections]
+        self._tee_cache = {}
+
+    def __len__(self):
+        return len(self.sections)
+
+    def __contains__(self, designation):
+        return designation in self._by_name
+
+    def get(self, designation):
+        try:
+            return self._by_name[designation]
+        except KeyError:
+            raise KeyError(f"단면 데이터베이스에 없는 단면: {designation}") from None
+
+    def by_depth(self, H):
+        return list(self._by_depth.get(float(H), []))
+
+    def by_width(self, B):
+        return list(self._by_width.get(float(B), []))
+
+    def by_weight(self, min_weight=0.0, max_weight=math.inf):
+        lo = bisect.bisect_left(self._weights, min_weight)
+        hi = bisect.bisect_right(self._weights, max_weight)
+        return self.sections[lo:hi]
+
+    def query(self, H=None, B=None, kind=None, min_weight=0.0, max_weight=math.inf):
+        """조건에 맞는 단면 (단위중량 오름차순)"""
+        if H is not None:
+            found = self.by_depth(H)
+        elif B is not None:
+            found = self.by_width(B)
+        else:
+            found = self.by_weight(min_weight, max_weight)
+        return [
+            s for s in found
+            if (B is None or s.B == B)
+            and (kind is None or s.kind == kind)
+            and min_weight <= s.weight <= max_weight
+        ]
+
+    def tee(self, designation, ho, Fy=355.0):
+        """캐스틸레이티드 Tee 성능 (원단면 춤 H, 전체 춤 dc = H + ho/2)
+
+        web-post 폭 e 는 Tee 단면에 영향을 주지 않으므로 키는 (단면, ho, Fy) 입니다.
+        """
+        key = (designation, round(ho * 1000.0, 3), float(Fy))
+        tee = self._tee_cache.get(key)
+        if tee is None:
+            s = self.get(designation)
+            dc = castellated_depth(s, ho)
+            tee = {n: float(v) for n, v in tee_properties(dc, s.B, s.tf, s.tw, ho, Fy).items()}
+            tee["dc"] = dc
+            self._tee_cache[key] = tee
+        return tee
+
+    def design(self, designation, ho=0.6, Fy=355.0, **kw):
+        """단면 + ho 로 CastellatedBeamDesign 생성 (Tee 성능은 캐시 사용)"""
+        s = self.get(designation)
+        tee = self.tee(designation, ho, Fy)
+        return CastellatedBeamDesign(
+            bf=s.B, tf=s.tf, tw=s.tw, dc=tee["dc"], ho=ho, Fy=Fy,
+            **{n: tee[n] for n in TEE_FIELDS}, **kw
+        )
+
+    def cache_info(self):
+        return {"tee_entries": len(self._tee_cache)}
+
+
+def castellated_depth(section, ho):
+    """원단면 H 를 지그재그 절단/재용접한 전체 춤 dc (m) = H + ho/2"""
+    return section.H / 1000.0 + ho / 2.0
+
+
+def read_sections(path=DATA_PATH):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [
+            make_section(row["designation"], row["kind"],
+                         *(float(row[k]) for k in ("H", "B", "tw", "tf", "r")))
+            for row in csv.DictReader(f)
+        ]
+
+
+_default_table = None
+
+
+def load_sections(path=None):
+    """단면 테이블 로드 (기본 데이터는 프로세스당 1회만 읽음)"""
+    global _default_table
+    if path is not None:
+        return SectionTable(read_sections(path))
+    if _default_table is None:
+        _default_table = SectionTable(read_sections())
+    return _default_table
@@ -76,6 +76,35 @@
     return { title: title, message: message, showLogin: showLogin };
   }
 
+  // Shared-code chunks (scripts/bundle-protected-pages.py): a <script src> can't carry the
+  // auth header, so fetch each chunk and inline it where its placeholder sits.
+  // Chunk names are content hashes served as immutable, so repeat loads come from the HTTP cache.
+  var CHUNK_RE = /<script data-protected-chunk="(chunk-[0-9a-f]{16}\.js)"><\/script>/g;
+
+  function resolveChunks(html, supabaseUrl, headers) {
+    var names = [];
+    html.replace(CHUNK_RE, function(tag, name) {
+      if (names.indexOf(name) === -1) names.push(name);
+      return tag;
+    });
+    if (names.length === 0) return Promise.resolve(html);
+
+    return Promise.all(names.map(function(name) {
+      return fetch(supabaseUrl + '/functions/v1/serve-protected-page?chunk=' + encodeURIComponent(name), {
+        headers: headers
+      }).then(function(response) {
+        return response.text().then(function(text) {
+          if (!response.ok) throw new Error('공통 스크립트를 불러오지 못했습니다. (' + response.status + ')');
+          return text;
+        });
+      });
+    })).then(function(codes) {
+      return html.replace(CHUNK_RE, function(tag, name) {
+        return '<script>' + codes[names.indexOf(name)] + '</script>';
+      });
+    });
+  }
+
   window.loadProtectedPage = function(pageId) {
     showLoading();
 
@@ -122,9 +151,14 @@
           var trimmed = html.trim();
           
           if (trimmed.startsWith('<!DOCTYPE') || trimmed.startsWith('<html') || trimmed.startsWith('<HTML')) {
-            document.open();
-            document.write(html);
-            document.close();
+            return resolveChunks(html, supabaseUrl, {
+              'Authorization': 'Bearer ' + session.access_token,
+              'apikey': window.SDP_AUTH_CONFIG.anonKey
+            }).then(function(page) {
+              document.open();
+              document.write(page);
+              document.close();
+            });
           } else {
             var err = parseErrorResponse(html);
             if (err.title !== '접근 불가') {
@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Build Protected Pages for upload
+
+Minifies the protected calculator pages before they are uploaded to Supabase
+Storage and writes pre-compressed variants next to them:
+
+    build/protected-pages/<page>.html       minified HTML (inline JS/CSS minified,
+                                            console.log(...) calls removed)
+    build/protected-pages/<page>.html.gz    gzip (level 9, mtime 0 -> reproducible)
+    build/protected-pages/<page>.html.br    brotli (only if the 'brotli' package is installed)
+    build/protected-pages/chunk-<hash>.js   functions shared by several pages
+                                            (bundle-protected-pages.py), with .gz/.br too
+    build/protected-pages/chunk-pages.json  chunk name -> pages that load it (uploaded; the
+                                            edge function serves a chunk only to users who
+                                            may open one of its pages)
+    build/protected-pages/manifest.json     sizes and content-hash ETags of every variant
+
+The minifier is deliberately conservative: it only drops comments and
+whitespace (a line break is kept wherever it could matter for automatic
+semicolon insertion) and never renames or reorders code. A console.log call is
+removed when it is a whole statement, otherwise replaced by `void 0`.
+
+Usage:
+    python3 scripts/build-protected-pages.py
+    python3 scripts/build-protected-pages.py --keep-console   # keep console.log calls
+    python3 scripts/build-protected-pages.py --no-bundle      # no shared-code chunks
+"""
+
+import re
+import sys
+import json
+import gzip
+import hashlib
+import argparse
+import importlib.util
+from pathlib import Path
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Configuration
+PROJECT_ROOT = Path(__file__).parent.parent
+BUILD_DIR = PROJECT_ROOT / 'build' / 'protected-pages'
+MANIFEST_NAME = 'manifest.json'
+CHUNK_PAGES_NAME = 'chunk-pages.json'
+VARIANTS = {'gzip': '.gz', 'br': '.br'}   # Content-Encoding -> storage suffix
+
+# Colors for terminal output
+GREEN = '\033[92m'
+YELLOW = '\033[93m'
+RED = '\033[91m'
+NC = '\033[0m'  # No Color
+
+
+# ---------------------------------------------------------------------
+# JavaScript
+# ---------------------------------------------------------------------
+# After these tokens a '/' starts a regular expression, not a division
+REGEX_PREFIX_KEYWORDS = {
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+    'case', 'do', 'else', 'yield', 'await',
+}
+REGEX_PREFIX_PUNCT = set('(,=:[!&|?{};+-*%<>~^')
+
+
+def _is_ident_char(ch):
+    return ch.isalnum() or ch in '_$' or ord(ch) > 127
+
+
+def _skip_string(src, i):
+    """Index just past the string literal starting at src[i]"""
+    quote = src[i]
+    i += 1
+    while i < len(src):
+        ch = src[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == quote or ch == '\n':
+            return i + 1
+        i += 1
+    return i
+
+
+def _skip_template(src, i):
+    """Index just past the template literal starting at src[i], including ${...} parts"""
+    i += 1
+    while i < len(src):
+        ch = src[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == '`':
+            return i + 1
+        if ch == '$' and src.startswith('${', i):
+            i = _skip_braces(src, i + 2)
+            continue
+        i += 1
+    return i
+
+
+def _skip_braces(src, i):
+    """Index just past the '}' that closes an expression starting at src[i]"""
+    depth = 1
+    for kind, text, end in _scan(src, i):
+        if kind == 'punct' and text == '{':
+            depth += 1
+        elif kind == 'punct' and text == '}':
+            depth -= 1
+            if depth == 0:
+                return end
+    return len(src)
+
+
+def _skip_regex(src, i):
+    """Index just past the regular expression literal (and flags) starting at src[i]"""
+    i += 1
+    in_class = False
+    while i < len(src):
+        ch = src[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == '\n':
+            return i
+        if in_class:
+            if ch == ']':
+                in_class = False
+        elif ch == '[':
+            in_class = True
+        elif ch == '/':
+            i += 1
+            while i < len(src) and _is_ident_char(src[i]):
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+def _scan(src, i=0):
+    """Yield (kind, text, end) tokens: ws, comment, str, regex, word, punct"""
+    prev = None                                   # last significant token (kind, text)
+    n = len(src)
+    while i < n:
+        ch = src[i]
+        start = i
+        if ch.isspace():
+            while i < n and src[i].isspace():
+                i += 1
+            yield 'ws', src[start:i], i
+            continue
+        if ch == '/' and src.startswith('//', i):
+            end = src.find('\n', i)
+            i = n if end == -1 else end
+            yield 'comment', src[start:i], i
+            continue
+        if ch == '/' and src.startswith('/*', i):
+            end = src.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            yield 'comment', src[start:i], i
+            continue
+        if ch in '\'"':
+            i = _skip_string(src, i)
+            kind = 'str'
+        elif ch == '`':
+            i = _skip_template(src, i)
+            kind = 'str'
+        elif ch == '/' and (prev is None or (prev[0] == 'punct' and prev[1] in REGEX_PREFIX_PUNCT)
+                            or (prev[0] == 'word' and prev[1] in REGEX_PREFIX_KEYWORDS)):
+            i = _skip_regex(src, i)
+            kind = 'regex'
+        elif _is_ident_char(ch):
+            while i < n and _is_ident_char(src[i]):
+                i += 1
+            kind = 'word'
+        else:
+            i += 1
+            kind = 'punct'
+        prev = (kind, src[start:i])
+        yield kind, prev[1], i
+
+
+def _needs_space(prev, nxt):
+    """A space between two tokens that cannot simply be dropped"""
+    a, b = prev[-1], nxt[0]
+    if _is_ident_char(a) and _is_ident_char(b):
+        return True
+    if a in '+-' and b in '+-':                   # a + +b, a - -b
+        return True
+    if a == '/' and b in '/*':
+        return True
+    return prev[0].isdigit() and b == '.'         # 1 .toString()
+
+
+def _strip_console_log(tokens):
+    """Remove console.log(...) calls from a token list (kind, text)"""
+    out = []
+    i = 0
+    n = len(tokens)
+
+    def next_sig(j):
+        while j < n and tokens[j][0] in ('ws', 'comment'):
+            j += 1
+        return j
+
+    def prev_sig():
+        return next((t for t in reversed(out) if t[0] not in ('ws', 'comment')), None)
+
+    while i < n:
+        kind, text = tokens[i]
+        if kind == 'word' and text == 'console':
+            j = next_sig(i + 1)
+            k = next_sig(j + 1) if j < n and tokens[j][1] == '.' else n
+            p = next_sig(k + 1) if k < n and tokens[k][1] == 'log' else n
+            before = prev_sig()
+            is_member = before is not None and before[1] == '.'          # obj.console.log(...)
+            if p < n and tokens[p][1] == '(' and not is_member:
+                depth = 0
+                end = p
+                while end < n:
+                    if tokens[end][0] == 'punct':
+                        if tokens[end][1] in '([{':
+                            depth += 1
+                        elif tokens[end][1] in ')]}':
+                            depth -= 1
+                            if depth == 0:
+                                break
+                    end += 1
+                if end < n:
+                    after = next_sig(end + 1)
+                    at_statement = before is None or before[1] in (';', '{', '}')
+                    if at_statement and after < n and tokens[after][1] == ';':
+                        i = after + 1                     # whole statement: drop it with its ';'
+                    elif at_statement and (after >= n or tokens[after][1] == '}'):
+                        i = end + 1
+                    else:
+                        out.extend([('word', 'void'), ('ws', ' '), ('word', '0')])
+                        i = end + 1
+                    continue
+        out.append((kind, text))
+        i += 1
+    return out
+
+
+def minify_js(src, strip_console=True):
+    """Drop comments and redundant whitespace from a script (optionally console.log calls)"""
+    tokens = [(kind, text) for kind, text, _ in _scan(src)]
+    if strip_console:
+        tokens = _strip_console_log(tokens)
+
+    # Comments become whitespace (keeping a line break if the comment spanned one)
+    merged = []
+    for kind, text in tokens:
+        if kind == 'comment':
+            kind, text = 'ws', ('\n' if '\n' in text or text.startswith('//') else ' ')
+        if kind == 'ws' and merged and merged[-1][0] == 'ws':
+            merged[-1] = ('ws', merged[-1][1] + text)
+        else:
+            merged.append((kind, text))
+
+    out = []
+    for idx, (kind, text) in enumerate(merged):
+        if kind != 'ws':
+            out.append(text)
+            continue
+        prev = out[-1] if out else ''
+        nxt = merged[idx + 1][1] if idx + 1 < len(merged) else ''
+        if not prev or not nxt:
+            continue
+        if '\n' in text:
+            # A line break is only dropped where ASI can never apply
+            if prev[-1] in '{;,([' or nxt[0] in '}),];':
+                if _needs_space(prev, nxt):
+                    out.append(' ')
+                continue
+            out.append('\n')
+        elif _needs_space(prev, nxt):
+            out.append(' ')
+    return ''.join(out)
+
+
+# ---------------------------------------------------------------------
+# CSS / HTML
+# ---------------------------------------------------------------------
+CSS_TOKEN = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|\s+|[^\s"\'/]+|/', re.S)
+
+
+def minify_css(src):
+    """Drop comments and whitespace around CSS punctuation (selectors keep their combinators)"""
+    out = []
+    for token in CSS_TOKEN.findall(src):
+        if token.startswith('/*'):
+            token = ' '
+        if token.isspace():
+            if out and not out[-1].isspace():
+                out.append(' ')
+            continue
+        out.append(token)
+    css = ''.join(out).strip()
+    # Outside strings only: the tokenizer keeps quoted text as single tokens
+    parts = re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', css)
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r'\s*([{};,>])\s*', r'\1', parts[i])
+        parts[i] = re.sub(r':\s+', ':', parts[i])
+        parts[i] = parts[i].replace(';}', '}')
+    return ''.join(parts)
+
+
+BLOCK_RE = re.compile(r'(<(script|style|pre|textarea)\b[^>]*>)(.*?)(</\2\s*>)', re.S | re.I)
+JS_TYPES = {'', 'text/javascript', 'application/javascript', 'module'}
+
+
+def _script_type(open_tag):
+    m = re.search(r'\btype\s*=\s*["\']?([^"\'\s>]+)', open_tag, re.I)
+    return m.group(1).lower() if m else ''
+
+
+def _minify_markup(html):
+    """HTML outside script/style/pre/textarea: drop comments and line indentation"""
+    html = re.sub(r'<!--(?!\[if).*?-->', '', html, flags=re.S)
+    html = re.sub(r'\n[ \t]+', '\n', html)
+    return re.sub(r'\n{2,}', '\n', html)
+
+
+def minify_html(html, strip_console=True):
+    """Minify a page: markup whitespace/comments, inline <style> and inline <script>"""
+    out = []
+    pos = 0
+    for m in BLOCK_RE.finditer(html):
+        out.append(_minify_markup(html[pos:m.start()]))
+        open_tag, tag, body, close_tag = m.group(1), m.group(2).lower(), m.group(3), m.group(4)
+        if tag == 'style':
+            body = minify_css(body)
+        elif tag == 'script' and not re.search(r'\bsrc\s*=', open_tag, re.I) \
+                and _script_type(open_tag) in JS_TYPES:
+            body = minify_js(body, strip_console)
+        out.append(open_tag + body + close_tag)
+        pos = m.end()
+    out.append(_minify_markup(html[pos:]))
+    return ''.join(out)
+
+
+# ---------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------
+def etag(data):
+    """Strong content-hash ETag of the bytes actually served"""
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+
+def compress_variants(data):
+    """Content-Encoding -> compressed bytes (brotli only when available)"""
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)
+    return variants
+
+
+def write_variants(storage_path, data, out_dir=BUILD_DIR):
+    """Write data and its compressed variants; returns {encoding: {path, size, etag}}"""
+    out_path = out_dir / storage_path
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_bytes(data)
+    variants = {'identity': {'path': storage_path, 'size': len(data), 'etag': etag(data)}}
+    for encoding, encoded in compress_variants(data).items():
+        path = storage_path + VARIANTS[encoding]
+        (out_dir / path).write_bytes(encoded)
+        variants[encoding] = {'path': path, 'size': len(encoded), 'etag': etag(encoded)}
+    return variants
+
+
+def build_page(local_path, storage_path, out_dir=BUILD_DIR, strip_console=True, html=None):
+    """Minify + compress one page; returns its manifest entry (None if the source is missing)
+
+    html: page text to build instead of the source file (e.g. after bundling)
+    """
+    src_path = PROJECT_ROOT / local_path
+    if not src_path.exists():
+        print(f"   {YELLOW}⚠️  File not found: {local_path}{NC}")
+        return None
+
+    source = src_path.read_bytes()
+    if html is None:
+        html = source.decode('utf-8')
+    minified = minify_html(html, strip_console).encode('utf-8')
+    return {
+        'source': local_path,
+        'source_sha256': hashlib.sha256(source).hexdigest(),
+        'source_size': len(source),
+        'variants': write_variants(storage_path, minified, out_dir),
+    }
+
+
+def build_chunk(name, code, pages, out_dir=BUILD_DIR, strip_console=True):
+    """Minify + compress a shared-code chunk from bundle-protected-pages.py"""
+    minified = minify_js(code, strip_console).encode('utf-8')
+    return {
+        'source': 'bundle',
+        'pages': pages,
+        'source_size': len(code.encode('utf-8')),
+        'variants': write_variants(name, minified, out_dir),
+    }
+
+
+def build_all(files, out_dir=BUILD_DIR, strip_console=True, bundle=True):
+    """Build every page in files (PROTECTED_FILES entries), write manifest.json and chunk-pages.json
+
+    With bundle=True, functions shared by several pages are first moved into
+    content-hash-named chunks (see bundle-protected-pages.py), which are built
+    and listed in the manifest like pages.
+    """
+    pages = {}
+    for file_info in files:
+        src_path = PROJECT_ROOT / file_info['local_path']
+        if src_path.exists():
+            pages[file_info['storage_path']] = src_path.read_text(encoding='utf-8')
+
+    chunks, chunk_pages = {}, {}
+    if bundle and len(pages) > 1:
+        pages, chunks, chunk_pages = _load_sibling('bundle-protected-pages.py', 'bundle_protected_pages') \
+            .bundle(pages)
+
+    manifest = {}
+    for file_info in files:
+        storage_path = file_info['storage_path']
+        entry = build_page(file_info['local_path'], storage_path, out_dir, strip_console,
+                           pages.get(storage_path))
+        if entry is None:
+            continue
+        manifest[storage_path] = entry
+        sizes = ', '.join(f"{enc} {v['size'] / 1024:.1f} KB" for enc, v in entry['variants'].items())
+        print(f"📄 {storage_path}: {entry['source_size'] / 1024:.1f} KB → {sizes}")
+    for name, code in chunks.items():
+        manifest[name] = build_chunk(name, code, chunk_pages[name], out_dir, strip_console)
+        sizes = ', '.join(f"{enc} {v['size'] / 1024:.1f} KB" for enc, v in manifest[name]['variants'].items())
+        print(f"🧩 {name} ({', '.join(chunk_pages[name])}): {sizes}")
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    write_chunk_pages(chunk_pages, out_dir)
+    return manifest
+
+
+def write_chunk_pages(chunk_pages, out_dir=BUILD_DIR):
+    """Write chunk-pages.json ({chunk name: [page storage path, ...]})
+
+    Written even when there are no chunks, so the uploaded copy never keeps stale owners.
+    """
+    data = json.dumps({name: sorted(pages) for name, pages in chunk_pages.items()},
+                      indent=2, sort_keys=True).encode('utf-8')
+    (out_dir / CHUNK_PAGES_NAME).write_bytes(data)
+    return data
+
+
+def _load_sibling(filename, module_name):
+    """Sibling scripts have hyphenated names, so load them by path"""
+    spec = importlib.util.spec_from_file_location(module_name, Path(__file__).with_name(filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_uploader():
+    """PROTECTED_FILES lives in upload-protected-pages.py"""
+    return _load_sibling('upload-protected-pages.py', 'upload_protected_pages')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Minify and pre-compress protected pages')
+    parser.add_argument('--keep-console', action='store_true', help='keep console.log calls')
+    parser.add_argument('--no-bundle', action='store_true', help='do not extract shared code into chunks')
+    parser.add_argument('--out', default=str(BUILD_DIR), help='output directory')
+    args = parser.parse_args()
+
+    print()
+    print("🔧 Protected Pages Build")
+    print("=" * 45)
+    if brotli is None:
+        print(f"   {YELLOW}⚠️  brotli not installed (pip install brotli): only gzip variants{NC}")
+
+    manifest = build_all(load_uploader().PROTECTED_FILES, Path(args.out), not args.keep_console,
+                         not args.no_bundle)
+
+    print()
+    print("=" * 45)
+    n_chunks = sum(1 for entry in manifest.values() if entry['source'] == 'bundle')
+    print(f"{GREEN}✅ Built: {len(manifest) - n_chunks} pages, {n_chunks} chunks → {args.out}{NC}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
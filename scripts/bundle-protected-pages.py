@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Bundle shared code out of the protected calculator pages
+
+Finds top-level function declarations that appear, identical after comment /
+whitespace normalisation, in the inline scripts of two or more pages and moves
+them into content-hash-named chunks (chunk-<sha256[:16]>.js). Functions are
+grouped by the set of pages that share them, so every page references a few
+chunks and a user switching between calculators only downloads the
+page-specific code again.
+
+A rewritten page loads its chunks with a placeholder in front of its first
+inline script:
+
+    <script data-protected-chunk="chunk-0123456789abcdef.js"></script>
+
+js/protected-loader.js (and pages/k-col web software/protected.html) fetch the
+chunk through serve-protected-page?chunk=... (authenticated, served with
+Cache-Control: immutable) and inline it before document.write, so the chunk
+runs exactly where the placeholder is and the functions stay global.
+
+Only function declarations are moved (their bodies run when called, so moving
+them earlier cannot change behaviour); a name declared more than once in a page,
+or a script with a 'use strict' directive, is left alone.
+
+Usage:
+    python3 scripts/bundle-protected-pages.py                   # report shared code in pages/k-col web software
+    python3 scripts/bundle-protected-pages.py a.html b.html     # report for specific pages
+    python3 scripts/bundle-protected-pages.py --out build/bundle # also write rewritten pages + chunks
+"""
+
+import re
+import sys
+import hashlib
+import argparse
+import importlib.util
+from pathlib import Path
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+# Configuration
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_PAGES_GLOB = 'pages/k-col web software/*.html'
+MIN_CHUNK_BYTES = 512               # smaller shared code stays inline (not worth a request)
+CHUNK_ATTR = 'data-protected-chunk'
+CHUNK_NAME_RE = re.compile(r'^chunk-[0-9a-f]{16}\.js$')
+
+# Colors for terminal output
+GREEN = '\033[92m'
+YELLOW = '\033[93m'
+RED = '\033[91m'
+NC = '\033[0m'  # No Color
+
+
+def _load_script(filename, module_name):
+    """Sibling scripts have hyphenated names, so load them by path"""
+    spec = importlib.util.spec_from_file_location(module_name, Path(__file__).with_name(filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+builder = _load_script('build-protected-pages.py', 'build_protected_pages')
+
+
+def inline_scripts(html):
+    """(body start, body end) of every inline classic script in a page"""
+    spans = []
+    for m in builder.BLOCK_RE.finditer(html):
+        open_tag = m.group(1)
+        if m.group(2).lower() != 'script' or re.search(r'\bsrc\s*=', open_tag, re.I):
+            continue
+        if builder._script_type(open_tag) not in ('', 'text/javascript', 'application/javascript'):
+            continue
+        spans.append((m.start(3), m.end(3)))
+    return spans
+
+
+def _uses_strict(js):
+    return re.match(r'\s*(?://[^\n]*\n\s*|/\*.*?\*/\s*)*[\'"]use strict[\'"]', js, re.S) is not None
+
+
+def top_level_functions(js):
+    """(name, start, end) of the top-level function declarations in a script"""
+    tokens = list(builder._scan(js))
+    found = []
+    depth = 0
+    prev = None                              # last significant token text
+    newline = False                          # line break since prev (ASI ends the statement)
+    i = 0
+    while i < len(tokens):
+        kind, text, end = tokens[i]
+        if kind in ('ws', 'comment'):
+            newline = newline or '\n' in text
+            i += 1
+            continue
+        start = end - len(text)
+        at_statement = prev is None or prev in (';', '{', '}') or (
+            newline and (prev[-1] in ')]\'"`' or builder._is_ident_char(prev[-1])))
+        if depth == 0 and at_statement and kind == 'word' and text in ('function', 'async'):
+            j = i + 1
+            sig = [k for k in range(j, min(len(tokens), j + 8)) if tokens[k][0] not in ('ws', 'comment')]
+            if text == 'async':
+                if not sig or tokens[sig[0]][1] != 'function':
+                    prev, newline = text, False
+                    i += 1
+                    continue
+                sig = sig[1:]
+            if sig and tokens[sig[0]][1] == '*':
+                sig = sig[1:]
+            if sig and tokens[sig[0]][0] == 'word':
+                name = tokens[sig[0]][1]
+                k = sig[0]
+                while k < len(tokens) and not (tokens[k][0] == 'punct' and tokens[k][1] == '{'):
+                    k += 1
+                body_depth = 0
+                while k < len(tokens):
+                    if tokens[k][0] == 'punct' and tokens[k][1] in '{}':
+                        body_depth += 1 if tokens[k][1] == '{' else -1
+                        if body_depth == 0:
+                            break
+                    k += 1
+                if k < len(tokens):
+                    found.append((name, start, tokens[k][2]))
+                    prev, newline = '}', False
+                    i = k + 1
+                    continue
+        if kind == 'punct' and text in '({[':
+            depth += 1
+        elif kind == 'punct' and text in ')}]':
+            depth -= 1
+        prev, newline = text, False
+        i += 1
+    return found
+
+
+def normalize(js):
+    """Text used to decide that two declarations are the same code"""
+    return builder.minify_js(js, strip_console=False).strip()
+
+
+def chunk_name(code):
+    return f"chunk-{hashlib.sha256(code.encode('utf-8')).hexdigest()[:16]}.js"
+
+
+def bundle(pages, min_chunk_bytes=MIN_CHUNK_BYTES):
+    """Extract shared functions from pages {name: html}
+
+    Returns (rewritten pages, chunks {chunk name: code}, chunk owners {chunk name: [page, ...]}).
+    """
+    # 1. Top-level functions per page (names declared more than once are not movable)
+    found = {}                               # page -> [(key, name, start, end)]
+    for page, html in pages.items():
+        units = []
+        for s, e in inline_scripts(html):
+            js = html[s:e]
+            if _uses_strict(js):
+                continue
+            for name, start, end in top_level_functions(js):
+                units.append((normalize(js[start:end]), name, s + start, s + end))
+        counts = {}
+        for _, name, _, _ in units:
+            counts[name] = counts.get(name, 0) + 1
+        found[page] = [u for u in units if counts[u[1]] == 1]
+
+    # 2. Code shared by 2+ pages, grouped by the exact set of pages sharing it
+    owners = {}
+    for page in pages:
+        for key, _, _, _ in found[page]:
+            owners.setdefault(key, []).append(page)
+    groups = {}                              # pages tuple -> [key, ...] in first-seen order
+    for key, key_pages in owners.items():
+        if len(key_pages) > 1:
+            groups.setdefault(tuple(key_pages), []).append(key)
+
+    chunks, chunk_pages, moved = {}, {}, {}
+    for group_pages, keys in groups.items():
+        code = '\n'.join(keys) + '\n'
+        if len(code.encode('utf-8')) < min_chunk_bytes:
+            continue
+        name = chunk_name(code)
+        chunks[name] = code
+        chunk_pages[name] = list(group_pages)
+        for key in keys:
+            moved[key] = name
+
+    # 3. Rewrite: cut moved functions, load their chunks before the first inline script
+    rewritten = {}
+    for page, html in pages.items():
+        cuts = sorted((start, end, moved[key]) for key, _, start, end in found[page] if key in moved)
+        if not cuts:
+            rewritten[page] = html
+            continue
+        names = list(dict.fromkeys(name for _, _, name in cuts))
+        first_script = inline_scripts(html)[0][0]
+        tag_start = html.rfind('<script', 0, first_script)
+        loader = ''.join(f'<script {CHUNK_ATTR}="{name}"></script>\n' for name in names)
+        out, pos = [], 0
+        for start, end, _ in cuts:
+            out.append(html[pos:start])
+            pos = end
+        out.append(html[pos:])
+        body = ''.join(out)
+        # cuts all lie after the first script tag, so its offset is unchanged
+        rewritten[page] = body[:tag_start] + loader + body[tag_start:]
+    return rewritten, chunks, chunk_pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract shared code from protected pages into chunks')
+    parser.add_argument('pages', nargs='*', help=f'pages to bundle (default: {DEFAULT_PAGES_GLOB})')
+    parser.add_argument('--min-chunk', type=int, default=MIN_CHUNK_BYTES, help='minimum chunk size (bytes)')
+    parser.add_argument('--out', default=None, help='write rewritten pages and chunks to this directory')
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.pages] or sorted(PROJECT_ROOT.glob(DEFAULT_PAGES_GLOB))
+    pages = {p.name: p.read_text(encoding='utf-8') for p in paths}
+
+    print()
+    print("🧩 Protected Pages Bundler")
+    print("=" * 45)
+    rewritten, chunks, chunk_pages = bundle(pages, args.min_chunk)
+
+    for name, code in chunks.items():
+        print(f"📦 {name} ({len(code.encode('utf-8')) / 1024:.1f} KB) ← {', '.join(chunk_pages[name])}")
+    for page, html in rewritten.items():
+        before, after = len(pages[page].encode('utf-8')), len(html.encode('utf-8'))
+        if before != after:
+            print(f"📄 {page}: {before / 1024:.1f} KB → {after / 1024:.1f} KB")
+
+    if args.out:
+        out_dir = Path(args.out)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for page, html in rewritten.items():
+            (out_dir / page).write_text(html, encoding='utf-8')
+        for name, code in chunks.items():
+            (out_dir / name).write_text(code, encoding='utf-8')
+
+    print()
+    print("=" * 45)
+    print(f"{GREEN}✅ Chunks: {len(chunks)}, pages: {len(pages)}{NC}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,14 +2,31 @@
 """
 Deploy Supabase Edge Functions
 
+Each function directory is fingerprinted (index.ts, the local files it imports
+and any deno.json / import_map.json) and compared with a local manifest
+(.edge-functions-manifest.json, kept per project); only changed functions are
+deployed. Deploys run concurrently on a bounded worker pool, each line of CLI
+output is streamed with the function name, and the summary compares wall-clock
+time with the summed per-function time.
+
+The CLI is looked up as `supabase` on PATH, so a stub executable can stand in
+for it when testing.
+
 Usage:
-    python3 scripts/deploy-edge-functions.py [function_name]
+    python3 scripts/deploy-edge-functions.py [function_name ...]
     
-    # Deploy all functions
+    # Deploy changed functions
     python3 scripts/deploy-edge-functions.py
     
-    # Deploy specific function
+    # Deploy specific function (always deployed)
     python3 scripts/deploy-edge-functions.py serve-protected-page
+    
+    # Deploy every function / show the plan only
+    python3 scripts/deploy-edge-functions.py --force
+    python3 scripts/deploy-edge-functions.py --dry-run
+    
+    # Limit concurrent deploys
+    python3 scripts/deploy-edge-functions.py --workers 2
 
 Environment variables (in .env.local):
     SUPABASE_PROJECT_REF - Project reference ID (from URL: https://xxx.supabase.co -> xxx)
@@ -17,8 +34,15 @@ Environment variables (in .env.local):
 """
 
 import os
+import re
 import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Colors
@@ -30,6 +54,28 @@ NC = '\033[0m'
 # Configuration
 PROJECT_ROOT = Path(__file__).parent.parent
 FUNCTIONS_DIR = PROJECT_ROOT / 'supabase' / 'functions'
+MANIFEST_PATH = PROJECT_ROOT / '.edge-functions-manifest.json'
+DEFAULT_WORKERS = 4
+
+# --no-verify-jwt: Disable Supabase's automatic JWT verification
+# Our function handles its own JWT validation
+DEPLOY_FLAGS = ['--no-verify-jwt']
+
+# Files next to index.ts that change how a function is bundled
+CONFIG_FILES = ('deno.json', 'deno.jsonc', 'import_map.json')
+SOURCE_SUFFIXES = ('.ts', '.tsx', '.js', '.jsx', '.mjs')
+
+# Relative specifiers in static imports / re-exports and dynamic import()
+LOCAL_IMPORT_RE = re.compile(
+    r"""(?:\bfrom\s*|\bimport\s*\(?\s*)['"](\.{1,2}/[^'"]+)['"]""")
+
+_print_lock = threading.Lock()
+
+
+def log(*args):
+    """print() that keeps lines from concurrent deploys intact"""
+    with _print_lock:
+        print(*args, flush=True)
 
 
 def load_env():
@@ -53,52 +99,135 @@ def get_functions():
             if d.is_dir() and (d / 'index.ts').exists()]
 
 
+def local_imports(path):
+    """Local files imported by a source file (resolved, existing or not)"""
+    try:
+        text = path.read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        return []
+    return [(path.parent / spec).resolve() for spec in LOCAL_IMPORT_RE.findall(text)]
+
+
+def function_files(function_name):
+    """index.ts, everything it imports locally (transitively) and config files"""
+    function_path = FUNCTIONS_DIR / function_name
+    files = [function_path / name for name in CONFIG_FILES if (function_path / name).exists()]
+    seen = set()
+    pending = [(function_path / 'index.ts').resolve()]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        files.append(path)
+        if path.suffix in SOURCE_SUFFIXES and path.is_file():
+            pending.extend(local_imports(path))
+    return files
+
+
+def function_fingerprint(function_name):
+    """SHA-256 over the deploy flags and every file that goes into the bundle"""
+    digest = hashlib.sha256()
+    digest.update(' '.join(DEPLOY_FLAGS).encode('utf-8') + b'\0')
+    for path in sorted(function_files(function_name)):
+        try:
+            rel = path.relative_to(FUNCTIONS_DIR.resolve()).as_posix()
+        except ValueError:
+            rel = path.as_posix()
+        digest.update(rel.encode('utf-8') + b'\0')
+        if path.is_file():
+            digest.update(path.read_bytes())
+        else:
+            digest.update(b'<missing>')
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def load_manifest(project_ref):
+    if not MANIFEST_PATH.exists():
+        return {}
+    try:
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f).get(project_ref, {})
+    except (ValueError, OSError):
+        print(f"   {YELLOW}⚠️  Ignoring unreadable manifest: {MANIFEST_PATH.name}{NC}")
+        return {}
+
+
+def save_manifest(project_ref, entries):
+    data = {}
+    if MANIFEST_PATH.exists():
+        try:
+            with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (ValueError, OSError):
+            data = {}
+    data[project_ref] = entries
+    tmp_path = MANIFEST_PATH.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
 def deploy_function(project_ref, function_name):
-    """Deploy a single Edge Function"""
-    print(f"\n📦 Deploying: {function_name}")
+    """Deploy a single Edge Function, streaming CLI output
+
+    Returns (ok, seconds).
+    """
+    log(f"\n📦 Deploying: {function_name}")
     
     function_path = FUNCTIONS_DIR / function_name
     if not function_path.exists():
-        print(f"   {RED}❌ Function not found: {function_name}{NC}")
-        return False
+        log(f"   {RED}❌ Function not found: {function_name}{NC}")
+        return False, 0.0
     
     # Deploy using Supabase CLI
-    # --no-verify-jwt: Disable Supabase's automatic JWT verification
-    # Our function handles its own JWT validation
     cmd = [
         'supabase', 'functions', 'deploy', function_name,
         '--project-ref', project_ref,
-        '--no-verify-jwt'
+        *DEPLOY_FLAGS,
     ]
     
+    started = time.perf_counter()
     try:
-        result = subprocess.run(
+        process = subprocess.Popen(
             cmd,
             cwd=str(PROJECT_ROOT),
-            capture_output=True,
-            text=True
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors='replace',
         )
+        for line in process.stdout:
+            line = line.rstrip()
+            if line:
+                log(f"   [{function_name}] {line}")
+        returncode = process.wait()
+        elapsed = time.perf_counter() - started
         
-        if result.returncode == 0:
-            print(f"   {GREEN}✓ Deployed successfully{NC}")
-            return True
+        if returncode == 0:
+            log(f"   {GREEN}✓ Deployed successfully: {function_name} ({elapsed:.1f}s){NC}")
+            return True, elapsed
         else:
-            print(f"   {RED}❌ Deployment failed{NC}")
-            if result.stderr:
-                print(f"   Error: {result.stderr}")
-            if result.stdout:
-                print(f"   Output: {result.stdout}")
-            return False
+            log(f"   {RED}❌ Deployment failed: {function_name} (exit {returncode}, {elapsed:.1f}s){NC}")
+            return False, elapsed
             
     except FileNotFoundError:
-        print(f"   {RED}❌ Supabase CLI not found. Install with: brew install supabase/tap/supabase{NC}")
-        return False
+        log(f"   {RED}❌ Supabase CLI not found. Install with: brew install supabase/tap/supabase{NC}")
+        return False, 0.0
     except Exception as e:
-        print(f"   {RED}❌ Error: {e}{NC}")
-        return False
+        log(f"   {RED}❌ Error: {function_name}: {e}{NC}")
+        return False, time.perf_counter() - started
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Deploy Supabase Edge Functions')
+    parser.add_argument('functions', nargs='*', help='functions to deploy (always deployed, changed or not)')
+    parser.add_argument('--force', action='store_true', help='deploy every function, changed or not')
+    parser.add_argument('--dry-run', action='store_true', help='show what would be deployed')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='concurrent deploys')
+    args = parser.parse_args()
+
     load_env()
     
     # Get project reference from environment or URL
@@ -137,32 +266,68 @@ def main():
         print(f"\n{YELLOW}⚠️  No Edge Functions found in supabase/functions/{NC}")
         sys.exit(0)
     
-    # If specific function specified, deploy only that
-    if len(sys.argv) > 1:
-        target_function = sys.argv[1]
-        if target_function not in all_functions:
-            print(f"\n{RED}❌ Function not found: {target_function}{NC}")
+    # If specific functions specified, deploy only those
+    if args.functions:
+        unknown = [name for name in args.functions if name not in all_functions]
+        if unknown:
+            print(f"\n{RED}❌ Function not found: {', '.join(unknown)}{NC}")
             print(f"   Available: {', '.join(all_functions)}")
             sys.exit(1)
-        functions_to_deploy = [target_function]
+        candidates = list(dict.fromkeys(args.functions))
     else:
-        functions_to_deploy = all_functions
+        candidates = all_functions
     
-    print(f"   Functions: {', '.join(functions_to_deploy)}")
+    # Skip functions whose fingerprint matches the last successful deploy
+    manifest = load_manifest(project_ref)
+    fingerprints = {name: function_fingerprint(name) for name in candidates}
+    if args.force or args.functions:
+        functions_to_deploy = candidates
+    else:
+        functions_to_deploy = [name for name in candidates if manifest.get(name) != fingerprints[name]]
+    unchanged = [name for name in candidates if name not in functions_to_deploy]
+    
+    print(f"   Functions: {', '.join(functions_to_deploy) or '(none)'}")
+    if unchanged:
+        print(f"   Unchanged: {', '.join(unchanged)}")
+    
+    if args.dry_run or not functions_to_deploy:
+        print()
+        print("=" * 45)
+        if args.dry_run:
+            print(f"{YELLOW}🔍 Dry run: {len(functions_to_deploy)} functions would be deployed{NC}")
+        else:
+            print(f"{GREEN}✅ Nothing to deploy: {len(unchanged)} functions unchanged{NC}")
+        print()
+        sys.exit(0)
+    
+    # Deploy concurrently
+    workers = max(1, min(args.workers, len(functions_to_deploy)))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda name: deploy_function(project_ref, name), functions_to_deploy))
+    wall_time = time.perf_counter() - started
     
-    # Deploy each function
     success_count = 0
     fail_count = 0
-    
-    for func_name in functions_to_deploy:
-        if deploy_function(project_ref, func_name):
+    for func_name, (ok, _) in zip(functions_to_deploy, results):
+        if ok:
+            manifest[func_name] = fingerprints[func_name]
             success_count += 1
         else:
             fail_count += 1
+    if success_count:
+        save_manifest(project_ref, manifest)
     
     print()
     print("=" * 45)
+    for func_name, (ok, elapsed) in sorted(zip(functions_to_deploy, results), key=lambda r: -r[1][1]):
+        mark = f"{GREEN}✓{NC}" if ok else f"{RED}❌{NC}"
+        print(f"   {mark} {func_name}: {elapsed:.1f}s")
+    total_time = sum(elapsed for _, elapsed in results)
+    print(f"   ⏱️  Wall clock: {wall_time:.1f}s, per-function total: {total_time:.1f}s ({workers} workers)")
     print(f"{GREEN}✅ Success: {success_count} functions{NC}")
+    if unchanged:
+        print(f"   Skipped (unchanged): {len(unchanged)} functions")
     if fail_count > 0:
         print(f"{RED}❌ Failed: {fail_count} functions{NC}")
     print()
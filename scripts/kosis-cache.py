@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Local KOSIS statistics cache
+
+Fetches KOSIS tables with the same parameters as the kosis-proxy Edge Function
+(orgId, tblId, itmId, prdSe, objL1..objL8, startPrdDe/endPrdDe) and keeps the
+rows in a local SQLite store (.kosis-cache.sqlite), one series per normalised
+request. A refresh only asks KOSIS for the periods after the newest one already
+stored, so re-running it is cheap.
+
+`snapshot` writes the newest rows of every series as JSON files in the same
+shape kosis.kr returns (a list of rows), ready to be served as precomputed
+snapshots instead of calling KOSIS on every cold start.
+
+Usage:
+    python3 scripts/kosis-cache.py fetch --orgId 101 --tblId DT_1ST1501 --prdSe M
+    python3 scripts/kosis-cache.py refresh                # all stored series (or the site's defaults)
+    python3 scripts/kosis-cache.py list
+    python3 scripts/kosis-cache.py snapshot --out build/kosis --rows 24
+
+Environment variables (one of, as for kosis-proxy):
+    KOSIS_API_KEY - kosis.kr OpenAPI key (preferred)
+    KOSIS_SERVICE_KEY - data.go.kr gateway key
+    KOSIS_ENDPOINT - override the upstream URL (e.g. a local stub for testing)
+
+Or create a .env.local file in project root with these values
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+# Configuration
+PROJECT_ROOT = Path(__file__).parent.parent
+DB_PATH = PROJECT_ROOT / '.kosis-cache.sqlite'
+KOSIS_KR_ENDPOINT = 'https://kosis.kr/openapi/statisticsData.do'
+DATA_GO_KR_ENDPOINT = 'https://apis.data.go.kr/1240000/statisticsData/getStatisticsData'
+OBJ_LEVELS = [f'objL{i}' for i in range(1, 9)]
+DEFAULT_ROWS = 24           # rows per series on first fetch / in snapshots (numOfRows in the site)
+PAGE_ROWS = 1000            # numOfRows per page on data.go.kr range requests (its default page is ~10 rows)
+REQUEST_TIMEOUT = 60
+
+# Tables shown on the site (priceTypeInfo in index.html), used when the store is empty
+DEFAULT_SERIES = [
+    {'orgId': '397', 'tblId': 'DT_39701_A003'},   # 건설공사비지수
+    {'orgId': '101', 'tblId': 'DT_1ST1501'},      # 철강 가격
+    {'orgId': '301', 'tblId': 'DT_404Y016'},      # 생산자물가지수(품목별) - 판재
+    {'orgId': '301', 'tblId': 'DT_404Y014'},      # 생산자물가지수(기본분류) - 철근, 레미콘
+]
+
+# Colors for terminal output
+GREEN = '\033[92m'
+YELLOW = '\033[93m'
+RED = '\033[91m'
+NC = '\033[0m'  # No Color
+
+
+def load_env():
+    """Load environment variables from .env.local if exists"""
+    env_path = PROJECT_ROOT / '.env.local'
+    if env_path.exists():
+        with open(env_path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#') and '=' in line:
+                    key, value = line.split('=', 1)
+                    value = value.strip().strip('"').strip("'")
+                    os.environ[key.strip()] = value
+
+
+# --- Request parameters (same defaults as kosis-proxy) ---
+
+def normalize_request(params):
+    """KosisRequest → the parameters that identify a series"""
+    series = {
+        'orgId': str(params.get('orgId') or '').strip(),
+        'tblId': str(params.get('tblId') or '').strip(),
+        'itmId': str(params.get('itmId') or '').strip(),
+        'prdSe': params.get('prdSe') or 'M',
+        'objL1': params.get('objL1') or 'ALL',
+    }
+    if series['itmId'] == 'ALL':
+        series['itmId'] = ''
+    for level in OBJ_LEVELS[1:]:
+        if params.get(level):
+            series[level] = params[level]
+    if not series['orgId'] or not series['tblId']:
+        raise ValueError('orgId/tblId are required')
+    return series
+
+
+def series_key(series):
+    """Stable store key: table, item, period type and classification filters"""
+    parts = [series['orgId'], series['tblId'], series['itmId'] or 'ALL', series['prdSe']]
+    parts += [f"{level}={series[level]}" for level in OBJ_LEVELS if series.get(level)]
+    return '/'.join(parts)
+
+
+def build_url(series, start=None, end=None, rows=DEFAULT_ROWS, page=1):
+    """Upstream URL, built like kosis-proxy (kosis.kr if KOSIS_API_KEY is set, else data.go.kr)
+
+    data.go.kr pages range requests too, so they carry numOfRows/pageNo.
+    """
+    api_key = os.environ.get('KOSIS_API_KEY', '')
+    service_key = os.environ.get('KOSIS_SERVICE_KEY', '')
+    endpoint = os.environ.get('KOSIS_ENDPOINT') or (KOSIS_KR_ENDPOINT if api_key else DATA_GO_KR_ENDPOINT)
+
+    query = []
+    if api_key:
+        query += [('method', 'getList'), ('apiKey', api_key), ('format', 'json'), ('jsonVD', 'Y')]
+    elif service_key:
+        query += [('serviceKey', service_key), ('format', 'json')]
+    else:
+        raise RuntimeError('Missing KOSIS_API_KEY or KOSIS_SERVICE_KEY')
+    query += [('orgId', series['orgId']), ('tblId', series['tblId']), ('prdSe', series['prdSe'])]
+    query += [(level, series[level]) for level in OBJ_LEVELS if series.get(level)]
+    if series['itmId']:
+        query.append(('itmId', series['itmId']))
+    if start:
+        query += [('startPrdDe', start), ('endPrdDe', end or current_period(series['prdSe']) or start)]
+        if not api_key:
+            query += [('numOfRows', str(PAGE_ROWS)), ('pageNo', str(page))]
+    else:
+        query.append(('newEstPrdCnt' if api_key else 'numOfRows', str(rows)))
+    return f"{endpoint}?{urllib.parse.urlencode(query)}"
+
+
+# --- Periods ---
+
+def current_period(prd_se, today=None):
+    """Latest possible PRD_DE for a period type (None if the format is unknown)"""
+    today = today or date.today()
+    if prd_se == 'M':
+        return f"{today.year}{today.month:02d}"
+    if prd_se == 'Q':
+        return f"{today.year}{(today.month - 1) // 3 + 1:02d}"
+    if prd_se == 'Y':
+        return str(today.year)
+    return None
+
+
+def next_period(prd_de, prd_se):
+    """The period after prd_de (M: YYYYMM, Q: YYYY0Q, Y: YYYY); prd_de itself if unknown"""
+    if prd_se == 'M' and len(prd_de) == 6:
+        year, month = int(prd_de[:4]), int(prd_de[4:])
+        return f"{year + month // 12}{month % 12 + 1:02d}"
+    if prd_se == 'Q' and len(prd_de) == 6:
+        year, quarter = int(prd_de[:4]), int(prd_de[4:])
+        return f"{year + quarter // 4}{quarter % 4 + 1:02d}"
+    if prd_se == 'Y' and len(prd_de) == 4:
+        return str(int(prd_de) + 1)
+    return prd_de
+
+
+# --- Upstream ---
+
+def parse_rows(text):
+    """(rows, totalCount) from a kosis.kr (list) or data.go.kr (response.body.items) JSON response
+
+    totalCount is only reported by data.go.kr; it is None for kosis.kr.
+    """
+    data = json.loads(text)
+    if isinstance(data, list):
+        return data, None
+    if isinstance(data, dict):
+        if data.get('err'):
+            # kosis.kr reports "no data" (err 30) as an error object
+            if str(data['err']) == '30':
+                return [], None
+            raise RuntimeError(f"KOSIS error {data['err']}: {data.get('errMsg', '')}")
+        body = (data.get('response') or {}).get('body') or {}
+        items = body.get('items')
+        if isinstance(items, dict):
+            items = items.get('item', [])
+        if isinstance(items, dict):
+            items = [items]
+        if items in (None, ''):
+            items = [] if 'totalCount' in body else None
+        if isinstance(items, list):
+            total = body.get('totalCount')
+            return items, int(total) if total not in (None, '') else None
+    raise RuntimeError(f"Unexpected KOSIS response: {text[:200]}")
+
+
+def fetch_page(url):
+    request = urllib.request.Request(url, headers={'Accept': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+            return parse_rows(response.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(f"HTTP {e.code}: {e.read().decode('utf-8', 'replace')[:200]}")
+
+
+def fetch_rows(series, start=None, end=None, rows=DEFAULT_ROWS):
+    """Rows for a request; data.go.kr range requests are paged (pageNo) until totalCount is covered"""
+    paged = bool(start) and not os.environ.get('KOSIS_API_KEY')
+    fetched, page = [], 1
+    while True:
+        page_rows, total = fetch_page(build_url(series, start, end, rows, page))
+        fetched += page_rows
+        if not paged or not page_rows:
+            return fetched
+        # totalCount decides when it is reported (the gateway may cap numOfRows below PAGE_ROWS)
+        if len(fetched) >= total if total is not None else len(page_rows) < PAGE_ROWS:
+            return fetched
+        page += 1
+
+
+# --- Store ---
+
+def open_store(path=DB_PATH):
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS series (
+            key TEXT PRIMARY KEY,
+            params TEXT NOT NULL,
+            latest_prd_de TEXT,
+            fetched_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS observations (
+            series_key TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            prd_de TEXT NOT NULL,
+            row TEXT NOT NULL,
+            PRIMARY KEY (series_key, prd_de, row_key)
+        ) WITHOUT ROWID;
+    ''')
+    return conn
+
+
+def row_key(row):
+    """Item + classification codes of a row (one value per period)"""
+    codes = [row.get('ITM_ID') or '']
+    codes += [row.get(f'C{i}') or '' for i in range(1, 9)]
+    return '|'.join(codes).rstrip('|')
+
+
+def store_rows(conn, key, series, rows):
+    """Upsert rows and advance the series' newest period; returns the number of rows written"""
+    with conn:
+        conn.executemany(
+            'INSERT OR REPLACE INTO observations (series_key, row_key, prd_de, row) VALUES (?, ?, ?, ?)',
+            [(key, row_key(row), str(row.get('PRD_DE', '')),
+              json.dumps(row, ensure_ascii=False, separators=(',', ':'))) for row in rows if row.get('PRD_DE')],
+        )
+        latest = conn.execute('SELECT MAX(prd_de) FROM observations WHERE series_key = ?', (key,)).fetchone()[0]
+        conn.execute(
+            'INSERT OR REPLACE INTO series (key, params, latest_prd_de, fetched_at) VALUES (?, ?, ?, ?)',
+            (key, json.dumps(series, sort_keys=True), latest, datetime.now(timezone.utc).isoformat(timespec='seconds')),
+        )
+    return len(rows)
+
+
+def refresh_series(conn, params, rows=DEFAULT_ROWS):
+    """Fetch the periods after the newest stored one (or the newest `rows` periods the first time)
+
+    Returns (key, start period or None, rows fetched).
+    """
+    series = normalize_request(params)
+    key = series_key(series)
+    found = conn.execute('SELECT latest_prd_de FROM series WHERE key = ?', (key,)).fetchone()
+    start = params.get('startPrdDe')
+    if found and found[0] and not start:
+        start = next_period(found[0], series['prdSe'])
+        latest = current_period(series['prdSe'])
+        if latest and start > latest:
+            return key, start, 0
+    fetched = fetch_rows(series, start, params.get('endPrdDe'), rows)
+    store_rows(conn, key, series, fetched)
+    return key, start, len(fetched)
+
+
+def latest_rows(conn, key, rows):
+    """The newest `rows` periods of a series, oldest first (as KOSIS returns them)"""
+    periods = [p for (p,) in conn.execute(
+        'SELECT DISTINCT prd_de FROM observations WHERE series_key = ? ORDER BY prd_de DESC LIMIT ?', (key, rows))]
+    if not periods:
+        return []
+    return [json.loads(row) for (row,) in conn.execute(
+        'SELECT row FROM observations WHERE series_key = ? AND prd_de >= ? ORDER BY prd_de, row_key',
+        (key, min(periods)))]
+
+
+def snapshot_name(series):
+    return series_key(series).replace('/', '_').replace('=', '-') + '.json'
+
+
+# --- CLI ---
+
+def add_request_args(parser):
+    parser.add_argument('--orgId', required=True)
+    parser.add_argument('--tblId', required=True)
+    parser.add_argument('--itmId', default='')
+    parser.add_argument('--prdSe', default='M')
+    for level in OBJ_LEVELS:
+        parser.add_argument(f'--{level}', default=None)
+    parser.add_argument('--startPrdDe', default=None)
+    parser.add_argument('--endPrdDe', default=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local KOSIS statistics cache')
+    parser.add_argument('--db', default=str(DB_PATH), help='SQLite store path')
+    sub = parser.add_subparsers(dest='command', required=True)
+    fetch_parser = sub.add_parser('fetch', help='fetch one series (incrementally if already stored)')
+    add_request_args(fetch_parser)
+    fetch_parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help='periods on first fetch')
+    refresh_parser = sub.add_parser('refresh', help='fetch new periods for every stored series')
+    refresh_parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help='periods on first fetch')
+    sub.add_parser('list', help='show stored series')
+    snapshot_parser = sub.add_parser('snapshot', help='write the newest rows of every series as JSON')
+    snapshot_parser.add_argument('--out', default='build/kosis', help='output directory')
+    snapshot_parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help='periods per series')
+    args = parser.parse_args()
+
+    load_env()
+    conn = open_store(args.db)
+
+    print()
+    print("📈 KOSIS Cache")
+    print("=" * 45)
+
+    if args.command in ('fetch', 'refresh'):
+        if args.command == 'fetch':
+            requests = [{k: v for k, v in vars(args).items() if v is not None}]
+        else:
+            requests = [json.loads(p) for (p,) in conn.execute('SELECT params FROM series ORDER BY key')]
+            if not requests:
+                print(f"   {YELLOW}⚠️  Store is empty: fetching the site's default tables{NC}")
+                requests = DEFAULT_SERIES
+
+        started = time.perf_counter()
+        fail_count = 0
+        for params in requests:
+            try:
+                key, start, count = refresh_series(conn, params, args.rows)
+            except Exception as e:
+                print(f"   {RED}❌ {params.get('orgId')}/{params.get('tblId')}: {e}{NC}")
+                fail_count += 1
+                continue
+            since = f"from {start}" if start else f"newest {args.rows} periods"
+            print(f"   {GREEN}✓{NC} {key}: {count} rows ({since})")
+        print()
+        print("=" * 45)
+        print(f"{GREEN}✅ Series: {len(requests) - fail_count}, {time.perf_counter() - started:.1f}s{NC}")
+        if fail_count:
+            print(f"{RED}❌ Failed: {fail_count} series{NC}")
+        print()
+        sys.exit(1 if fail_count else 0)
+
+    if args.command == 'list':
+        for key, latest, fetched_at, count in conn.execute(
+                'SELECT s.key, s.latest_prd_de, s.fetched_at, COUNT(o.prd_de) FROM series s '
+                'LEFT JOIN observations o ON o.series_key = s.key GROUP BY s.key ORDER BY s.key'):
+            print(f"   📄 {key}: {count} rows, newest {latest or '-'} (fetched {fetched_at})")
+        print()
+        return
+
+    if args.command == 'snapshot':
+        out_dir = Path(args.out)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written = 0
+        for key, params in conn.execute('SELECT key, params FROM series ORDER BY key').fetchall():
+            rows = latest_rows(conn, key, args.rows)
+            path = out_dir / snapshot_name(json.loads(params))
+            path.write_text(json.dumps(rows, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+            written += 1
+            print(f"   📄 {path.name}: {len(rows)} rows")
+        print()
+        print("=" * 45)
+        print(f"{GREEN}✅ Snapshots: {written} → {out_dir}{NC}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
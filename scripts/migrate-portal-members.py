@@ -3,32 +3,270 @@
 Portal Members 마이그레이션 스크립트 (Python)
 
 기존: /portal_members/{uid}
-새로운: /projects/P1/portal_members/{uid}
+새로운: /projects/{프로젝트}/portal_members/{uid}  (기본: P1)
+
+원본 컬렉션은 문서 ID 순서로 --page-size 개씩 start_after 커서로 읽으므로
+컬렉션 크기와 관계없이 메모리 사용량이 일정합니다. 페이지마다 존재 여부 확인은
+get_all 로 한 번에 읽고, 쓰기/삭제는 BulkWriter 로 묶어서 보냅니다 (초당 요청 수
+제한, 실패 시 재시도).
+
+페이지를 끝낼 때마다 마지막 문서 ID를 체크포인트 파일(.migration-checkpoint.json)에
+기록하므로, 중간에 멈춘 실행은 다시 실행하면 이어서 진행합니다. 끝까지 진행하면
+체크포인트를 지우므로, 다음 실행은 처음부터 다시 확인하여 그 사이 추가된 문서도
+옮깁니다 (이미 옮긴 문서는 건너뜀, 문서 ID가 순서대로 생기지 않으므로). 대상 프로젝트가
+여러 개면 병렬로 마이그레이션합니다. 다른 컬렉션도 --source / --target 으로
+옮길 수 있습니다.
 
 사용법:
-    python scripts/migrate-portal-members.py
+    python scripts/migrate-portal-members.py                       # P1 로 마이그레이션
+    python scripts/migrate-portal-members.py --projects P1 P2 P3   # 여러 프로젝트 (병렬)
+    python scripts/migrate-portal-members.py --dry-run             # 건수만 출력 (쓰기 없음)
+    python scripts/migrate-portal-members.py --restart             # 체크포인트 무시하고 처음부터
+    python scripts/migrate-portal-members.py --source portal_members --target "projects/{project}/portal_members"
+    python scripts/migrate-portal-members.py --page-size 500 --read-batch 300 --max-ops 500
 
 환경 변수:
     GOOGLE_APPLICATION_CREDENTIALS: Firebase Admin SDK 서비스 계정 키 경로
     또는 FIREBASE_PROJECT_ID: Firebase 프로젝트 ID
+    FIRESTORE_EMULATOR_HOST: 설정하면 Firestore 에뮬레이터에 연결 (예: localhost:8080)
 """
 
 import os
 import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from firebase_admin import credentials, firestore, initialize_app
+from google.cloud.firestore_v1.bulk_writer import BulkWriterOptions
+from google.cloud.firestore_v1.field_path import FieldPath
 
-def migrate_portal_members():
-    print("=" * 40)
-    print("  Portal Members 마이그레이션")
-    print("=" * 40)
-    print()
+PROJECT_ROOT = Path(__file__).parent.parent
+CHECKPOINT_PATH = PROJECT_ROOT / ".migration-checkpoint.json"
+DEFAULT_PROJECTS = ["P1"]
+DEFAULT_SOURCE = "portal_members"
+DEFAULT_TARGET = "projects/{project}/portal_members"
+PAGE_SIZE = 500            # 원본 컬렉션 한 페이지 문서 수
+READ_BATCH_SIZE = 300      # get_all 한 번에 읽는 문서 수
+MAX_OPS_PER_SECOND = 500   # BulkWriter 초당 최대 쓰기 수 (동시 요청 상한)
+MAX_ATTEMPTS = 5           # 문서별 최대 시도 횟수
+DEFAULT_WORKERS = 4        # 동시에 마이그레이션할 프로젝트 수
 
-    project_id = "P1"  # P1만 마이그레이션 (하드코딩)
-    print(f"📋 대상 프로젝트: {project_id} (하드코딩)")
-    print("⚠️  주의: 이 스크립트는 P1 프로젝트만 마이그레이션합니다.")
-    print()
+_print_lock = threading.Lock()
+_checkpoint_lock = threading.Lock()
+
+
+def log(*args):
+    """여러 프로젝트를 병렬로 돌릴 때 출력 줄이 섞이지 않도록"""
+    with _print_lock:
+        print(*args, flush=True)
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def find_existing(db, refs, batch_size):
+    """새 경로에 이미 있는 문서 id 집합 (get_all 로 batch_size 개씩 조회)
+
+    반환: (id 집합, 요청 횟수)
+    """
+    existing = set()
+    requests = 0
+    for batch in chunked(refs, batch_size):
+        for snapshot in db.get_all(batch):
+            if snapshot.exists:
+                existing.add(snapshot.id)
+        requests += 1
+    return existing, requests
+
+
+def bulk_apply(db, operations, max_ops):
+    """BulkWriter 로 ("set", ref, data) / ("delete", ref, None) 일괄 실행
+
+    반환: {"success": 성공 수, "failed": [(id, 메시지)], "retries": 재시도 수, "elapsed": 초}
+    """
+    result = {"success": 0, "failed": [], "retries": 0}
+    lock = threading.Lock()
+
+    writer = db.bulk_writer(options=BulkWriterOptions(
+        initial_ops_per_second=min(max_ops, MAX_OPS_PER_SECOND),
+        max_ops_per_second=max_ops,
+    ))
+
+    def on_result(reference, write_result, bulk_writer):
+        with lock:
+            result["success"] += 1
+
+    def on_error(error, bulk_writer):
+        retry = error.attempts < MAX_ATTEMPTS
+        with lock:
+            if retry:
+                result["retries"] += 1
+            else:
+                result["failed"].append((error.operation.reference.id, error.message))
+        return retry
+
+    writer.on_write_result(on_result)
+    writer.on_write_error(on_error)
+
+    started = time.perf_counter()
+    for kind, ref, data in operations:
+        if kind == "set":
+            writer.set(ref, data)
+        else:
+            writer.delete(ref)
+    writer.close()
+    result["elapsed"] = time.perf_counter() - started
+    return result
+
+
+def print_bulk_failures(result, label, prefix=""):
+    for doc_id, message in result["failed"]:
+        log(f"   {prefix}❌ {doc_id}: {label} 실패 - {message}")
+
+
+# --- 체크포인트 ---
+
+def checkpoint_key(source, target):
+    return f"{source} -> {target}"
+
+
+def load_checkpoint():
+    if not CHECKPOINT_PATH.exists():
+        return {}
+    try:
+        with open(CHECKPOINT_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (ValueError, OSError):
+        log(f"⚠️  체크포인트 파일을 읽을 수 없어 무시합니다: {CHECKPOINT_PATH.name}")
+        return {}
+
+
+def save_checkpoint(key, state):
+    """key 항목만 갱신 (병렬 실행 중인 다른 프로젝트 항목은 유지), state=None 이면 삭제"""
+    with _checkpoint_lock:
+        data = load_checkpoint()
+        if state is None:
+            data.pop(key, None)
+        else:
+            data[key] = state
+        tmp_path = CHECKPOINT_PATH.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, CHECKPOINT_PATH)
+
+
+# --- 페이지 단위 읽기 ---
+
+def iter_pages(db, source, page_size, start_after=None):
+    """원본 컬렉션을 문서 ID 순서로 page_size 개씩 (start_after 커서)"""
+    doc_id = FieldPath.document_id()
+    while True:
+        query = db.collection(source).order_by(doc_id).limit(page_size)
+        if start_after:
+            query = query.start_after({doc_id: start_after})
+        page = list(query.stream())
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        start_after = page[-1].id
 
-    # Firebase Admin 초기화
+
+# --- 마이그레이션 ---
+
+def migrate_project(db, project, options):
+    """원본 → 대상 프로젝트 하나, 체크포인트에서 이어서 진행
+
+    반환: {"project", "scanned", "migrated", "skipped", "failed", "retries", "elapsed", "ok"}
+    """
+    target_path = options.target.format(project=project)
+    key = checkpoint_key(options.source, target_path)
+    prefix = f"[{project}] "
+    state = {} if (options.restart or options.dry_run) else load_checkpoint().get(key, {})
+    stats = {
+        "project": project,
+        "scanned": state.get("scanned", 0),
+        "migrated": state.get("migrated", 0),
+        "skipped": state.get("skipped", 0),
+        "failed": 0,
+        "retries": 0,
+        "elapsed": 0.0,
+        "ok": True,
+    }
+
+    if state.get("last_id"):
+        log(f"   {prefix}↪️  체크포인트에서 이어서 진행: {state['last_id']} 다음부터")
+
+    target_collection = db.collection(target_path)
+    started = time.perf_counter()
+    for page in iter_pages(db, options.source, options.page_size, state.get("last_id")):
+        existing, _ = find_existing(db, [target_collection.document(doc.id) for doc in page], options.read_batch)
+        to_write = [doc for doc in page if doc.id not in existing]
+
+        if to_write and not options.dry_run:
+            result = bulk_apply(
+                db,
+                [("set", target_collection.document(doc.id), doc.to_dict()) for doc in to_write],
+                options.max_ops,
+            )
+            print_bulk_failures(result, "마이그레이션", prefix)
+            stats["retries"] += result["retries"]
+            if result["failed"]:
+                # 체크포인트는 이 페이지 앞에 머무름 → 다시 실행하면 이 페이지부터 재시도
+                stats["failed"] += len(result["failed"])
+                stats["ok"] = False
+                break
+
+        stats["scanned"] += len(page)
+        stats["migrated"] += len(to_write)
+        stats["skipped"] += len(existing)
+        if not options.dry_run:
+            save_checkpoint(key, {
+                "last_id": page[-1].id,
+                "scanned": stats["scanned"],
+                "migrated": stats["migrated"],
+                "skipped": stats["skipped"],
+            })
+        log(f"   {prefix}{stats['scanned']}개 확인, {stats['migrated']}개 "
+            f"{'대상' if options.dry_run else '이전'}, {stats['skipped']}개 건너뜀")
+
+    stats["elapsed"] = time.perf_counter() - started
+    if stats["ok"] and not options.dry_run:
+        # 끝까지 확인함 → 다음 실행은 처음부터 (새로 추가된 문서가 어느 위치에든 있을 수 있음)
+        save_checkpoint(key, None)
+    return stats
+
+
+def delete_source(db, options):
+    """원본 컬렉션 삭제 (매번 첫 페이지를 읽어 지우므로 중단되어도 다시 실행하면 됨)
+
+    반환: (삭제 수, 재시도 수, 초, 성공 여부)
+    """
+    deleted = 0
+    retries = 0
+    started = time.perf_counter()
+    while True:
+        page = next(iter_pages(db, options.source, options.page_size), [])
+        if not page:
+            break
+        result = bulk_apply(db, [("delete", doc.reference, None) for doc in page], options.max_ops)
+        print_bulk_failures(result, "삭제")
+        deleted += result["success"]
+        retries += result["retries"]
+        if result["failed"]:
+            return deleted, retries, time.perf_counter() - started, False
+        log(f"   {deleted}개 삭제")
+    return deleted, retries, time.perf_counter() - started, True
+
+
+def init_firebase():
+    """Firebase Admin 초기화 (실패 시 종료)"""
     try:
         service_account_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
         firebase_project_id = os.environ.get("FIREBASE_PROJECT_ID")
@@ -53,110 +291,80 @@ def migrate_portal_members():
         print(f"❌ Firebase Admin 초기화 실패: {e}")
         sys.exit(1)
 
-    db = firestore.client()
-
-    try:
-        # 1. 기존 portal_members 컬렉션 읽기
-        print("[1/4] 기존 portal_members 데이터 읽기 중...")
-        portal_members_ref = db.collection("portal_members")
-        portal_members_docs = portal_members_ref.stream()
-
-        portal_members_list = list(portal_members_docs)
-        if not portal_members_list:
-            print("✅ 기존 portal_members 데이터가 없습니다. 마이그레이션할 데이터가 없습니다.")
-            return
+    return firestore.client()
 
-        print(f"   발견된 문서 수: {len(portal_members_list)}개")
-        print()
-
-        # 2. 마이그레이션 대상 확인
-        print("[2/4] 마이그레이션 대상 확인 중...")
-        to_migrate = []
-        for doc in portal_members_list:
-            uid = doc.id
-            data = doc.to_dict()
-
-            # 이미 새 경로에 데이터가 있는지 확인
-            new_doc_ref = (
-                db.collection("projects")
-                .document(project_id)
-                .collection("portal_members")
-                .document(uid)
-            )
-            new_doc = new_doc_ref.get()
 
-            if new_doc.exists:
-                print(f"   ⚠️  {uid}: 이미 새 경로에 존재 (건너뜀)")
-            else:
-                to_migrate.append({"uid": uid, "data": data})
-                print(f"   ✅ {uid}: 마이그레이션 대상")
-        print()
+def migrate_portal_members(options):
+    print("=" * 40)
+    print("  Portal Members 마이그레이션")
+    print("=" * 40)
+    print()
 
-        if not to_migrate:
-            print("✅ 모든 데이터가 이미 마이그레이션되었습니다.")
-            return
+    projects = list(dict.fromkeys(options.projects))
+    workers = max(1, min(options.workers, len(projects)))
+    print(f"📋 원본: /{options.source}")
+    for project in projects:
+        print(f"📋 대상: /{options.target.format(project=project)}")
+    print(f"   페이지 크기: {options.page_size}, 병렬 프로젝트: {workers}")
+    if options.dry_run:
+        print("🔍 Dry run: 건수만 확인합니다 (쓰기 없음)")
+    print()
 
-        # 3. 사용자 확인
-        print("[3/4] 마이그레이션 확인")
-        print(f"   마이그레이션할 문서 수: {len(to_migrate)}개")
-        print()
-        answer = input("마이그레이션을 진행하시겠습니까? (yes/no): ")
+    db = init_firebase()
 
-        if answer.lower() not in ["yes", "y"]:
-            print("❌ 마이그레이션이 취소되었습니다.")
-            return
-        print()
+    try:
+        # 1. 사용자 확인
+        if not options.dry_run and not options.yes:
+            answer = input("마이그레이션을 진행하시겠습니까? (yes/no): ")
+            if answer.lower() not in ["yes", "y"]:
+                print("❌ 마이그레이션이 취소되었습니다.")
+                return
+            print()
 
-        # 4. 마이그레이션 실행
-        print("[4/4] 마이그레이션 실행 중...")
-        success_count = 0
-        fail_count = 0
-
-        for item in to_migrate:
-            uid = item["uid"]
-            data = item["data"]
-            try:
-                (
-                    db.collection("projects")
-                    .document(project_id)
-                    .collection("portal_members")
-                    .document(uid)
-                    .set(data)
-                )
-                print(f"   ✅ {uid}: 마이그레이션 완료")
-                success_count += 1
-            except Exception as e:
-                print(f"   ❌ {uid}: 마이그레이션 실패 - {e}")
-                fail_count += 1
+        # 2. 프로젝트별 병렬 마이그레이션
+        print("[1/2] 마이그레이션 실행 중...")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda project: migrate_project(db, project, options), projects))
+        wall_time = time.perf_counter() - started
         print()
 
-        # 5. 결과 요약
+        # 3. 결과 요약
         print("=" * 40)
-        print("  마이그레이션 완료")
+        print("  마이그레이션 " + ("확인 (dry run)" if options.dry_run else "결과"))
         print("=" * 40)
-        print(f"   성공: {success_count}개")
-        print(f"   실패: {fail_count}개")
+        for stats in results:
+            rate = stats["migrated"] / stats["elapsed"] if stats["elapsed"] > 0 else 0
+            mark = "✅" if stats["ok"] else "❌"
+            action = "대상" if options.dry_run else "이전"
+            print(f"   {mark} {stats['project']}: 확인 {stats['scanned']}개, {action} {stats['migrated']}개, "
+                  f"건너뜀 {stats['skipped']}개, 실패 {stats['failed']}개, 재시도 {stats['retries']}회, "
+                  f"{stats['elapsed']:.1f}초 ({rate:.0f}건/초)")
+        print(f"   ⏱️  전체 {wall_time:.1f}초")
         print()
 
-        # 6. 기존 데이터 삭제 여부 확인
-        if success_count > 0:
-            print("⚠️  기존 /portal_members 데이터 삭제")
-            print("   마이그레이션이 완료되었으므로 기존 데이터를 삭제할 수 있습니다.")
-            delete_answer = input("기존 /portal_members 데이터를 삭제하시겠습니까? (yes/no): ")
-
-            if delete_answer.lower() in ["yes", "y"]:
-                print()
-                print("기존 데이터 삭제 중...")
-                for doc in portal_members_list:
-                    try:
-                        doc.reference.delete()
-                        print(f"   ✅ {doc.id}: 삭제 완료")
-                    except Exception as e:
-                        print(f"   ❌ {doc.id}: 삭제 실패 - {e}")
-                print()
-                print("✅ 기존 데이터 삭제 완료")
-            else:
-                print("⚠️  기존 데이터는 유지됩니다. Firestore Rules에서 읽기 차단하세요.")
+        if options.dry_run:
+            return
+        if not all(stats["ok"] for stats in results):
+            print("❌ 일부 프로젝트가 실패했습니다. 다시 실행하면 체크포인트에서 이어서 진행합니다.")
+            sys.exit(1)
+
+        # 4. 기존 데이터 삭제 여부 확인 (모든 프로젝트가 성공했을 때만)
+        print(f"[2/2] 기존 /{options.source} 데이터 삭제")
+        print("   마이그레이션이 완료되었으므로 기존 데이터를 삭제할 수 있습니다.")
+        delete_answer = input(f"기존 /{options.source} 데이터를 삭제하시겠습니까? (yes/no): ")
+
+        if delete_answer.lower() in ["yes", "y"]:
+            print()
+            print("기존 데이터 삭제 중...")
+            deleted, retries, elapsed, ok = delete_source(db, options)
+            print(f"   삭제: {deleted}개, {elapsed:.1f}초, 재시도 {retries}회")
+            if not ok:
+                print("❌ 일부 문서를 삭제하지 못했습니다. 다시 실행하면 남은 문서를 삭제합니다.")
+                sys.exit(1)
+            print("✅ 기존 데이터 삭제 완료")
+        else:
+            print("⚠️  기존 데이터는 유지됩니다. Firestore Rules에서 읽기 차단하세요.")
 
         print()
         print("✅ 마이그레이션 프로세스 완료!")
@@ -173,4 +381,18 @@ def migrate_portal_members():
 
 
 if __name__ == "__main__":
-    migrate_portal_members()
+    parser = argparse.ArgumentParser(description="Firestore 컬렉션을 프로젝트별 경로로 마이그레이션")
+    parser.add_argument("--projects", nargs="+", default=DEFAULT_PROJECTS, help="대상 프로젝트 ID (병렬 실행)")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="원본 컬렉션 경로")
+    parser.add_argument("--target", default=DEFAULT_TARGET, help="대상 컬렉션 경로 ({project} 치환)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="원본 한 페이지 문서 수")
+    parser.add_argument("--read-batch", type=int, default=READ_BATCH_SIZE, help="get_all 한 번에 읽는 문서 수")
+    parser.add_argument("--max-ops", type=int, default=MAX_OPS_PER_SECOND, help="초당 최대 쓰기/삭제 수")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="동시에 마이그레이션할 프로젝트 수")
+    parser.add_argument("--dry-run", action="store_true", help="건수만 출력 (쓰기/체크포인트 없음)")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터")
+    parser.add_argument("--yes", action="store_true", help="마이그레이션 확인 질문 생략")
+    args = parser.parse_args()
+    if "{project}" not in args.target and len(args.projects) > 1:
+        parser.error("--target 에 {project} 가 없으면 프로젝트를 하나만 지정할 수 있습니다")
+    migrate_portal_members(args)
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Reconcile auth users with user_profiles
+
+Streams auth users page by page from the GoTrue admin API and joins each page
+against user_profiles in id-ordered batches (id=in.(...)), so memory and
+request size stay bounded however many members there are. Candidates are
+reported as each page is read (and optionally appended to a JSON-lines file):
+
+    unverified       email not confirmed and created before --older-than-hours
+    unapproved       email confirmed, profile exists but is_approved is false
+    missing_profile  email confirmed but no user_profiles row (report only)
+
+--delete-unverified deletes the unverified candidates, --approve-unapproved sets
+is_approved on the unapproved ones. Both run after the scan (deleting while
+paging would shift users onto pages already read) in batches of --batch-size,
+with --workers requests in flight, and print the latency of every batch.
+
+Usage:
+    python3 scripts/reconcile-users.py                         # report candidates
+    python3 scripts/reconcile-users.py --output candidates.jsonl
+    python3 scripts/reconcile-users.py --delete-unverified     # delete unverified (48h+)
+    python3 scripts/reconcile-users.py --approve-unapproved --dry-run
+    python3 scripts/reconcile-users.py --page-size 500 --batch-size 50 --workers 8
+
+Environment variables required:
+    SUPABASE_URL - Supabase project URL (http://127.0.0.1:54321 for `supabase start`)
+    SUPABASE_SERVICE_ROLE_KEY - Service role key (not anon key)
+
+Or create a .env.local file in project root with these values
+"""
+
+import os
+import sys
+import json
+import ssl
+import time
+import argparse
+import threading
+import http.client
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+# SSL context for macOS certificate issues
+ssl_context = ssl.create_default_context()
+try:
+    import certifi
+    ssl_context.load_verify_locations(certifi.where())
+except ImportError:
+    # If certifi not available, use unverified context (less secure but works)
+    ssl_context = ssl._create_unverified_context()
+
+# Configuration
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_PAGE_SIZE = 500        # auth users per admin API page
+PROFILE_BATCH_SIZE = 100       # ids per user_profiles lookup
+DEFAULT_BATCH_SIZE = 50        # users per delete / approve batch
+DEFAULT_WORKERS = 5            # requests in flight per batch
+DEFAULT_OLDER_THAN_HOURS = 48  # same threshold as cleanup-unverified-users
+REQUEST_TIMEOUT = 60
+
+# Colors for terminal output
+GREEN = '\033[92m'
+YELLOW = '\033[93m'
+RED = '\033[91m'
+NC = '\033[0m'  # No Color
+
+SUPABASE_URL = None
+SUPABASE_SERVICE_ROLE_KEY = None
+
+# One keep-alive connection per worker thread
+_local = threading.local()
+
+
+def load_env():
+    """Load environment variables from .env.local if exists"""
+    env_path = PROJECT_ROOT / '.env.local'
+    if env_path.exists():
+        with open(env_path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#') and '=' in line:
+                    key, value = line.split('=', 1)
+                    value = value.strip().strip('"').strip("'")
+                    os.environ[key.strip()] = value
+
+
+def get_connection(fresh=False):
+    """Return this thread's keep-alive connection to SUPABASE_URL"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and not fresh:
+        return conn
+    if conn is not None:
+        conn.close()
+    parsed = urllib.parse.urlsplit(SUPABASE_URL)
+    if parsed.scheme == 'https':
+        conn = http.client.HTTPSConnection(parsed.netloc, timeout=REQUEST_TIMEOUT, context=ssl_context)
+    else:
+        conn = http.client.HTTPConnection(parsed.netloc, timeout=REQUEST_TIMEOUT)
+    _local.conn = conn
+    return conn
+
+
+def supabase_request(method, endpoint, query=None, body=None, prefer=None):
+    """Make HTTP request to a Supabase API (endpoint like /auth/v1/... or /rest/v1/...)
+
+    Returns (status, parsed JSON or None); raises RuntimeError on HTTP errors.
+    """
+    path = urllib.parse.urlsplit(SUPABASE_URL).path.rstrip('/')
+    url = f"{path}{endpoint}"
+    if query:
+        url += '?' + urllib.parse.urlencode(query, safe='(),.')
+
+    headers = {
+        'Authorization': f'Bearer {SUPABASE_SERVICE_ROLE_KEY}',
+        'apikey': SUPABASE_SERVICE_ROLE_KEY,
+        'Connection': 'keep-alive',
+    }
+    data = None
+    if body is not None:
+        data = json.dumps(body).encode('utf-8')
+        headers['Content-Type'] = 'application/json'
+    if prefer:
+        headers['Prefer'] = prefer
+
+    for attempt in range(2):
+        conn = get_connection(fresh=attempt > 0)
+        try:
+            conn.request(method, url, body=data, headers=headers)
+            response = conn.getresponse()
+            payload = response.read()
+            break
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # Keep-alive connection closed by the server: reconnect once
+            if attempt:
+                raise
+
+    text = payload.decode('utf-8') if payload else ''
+    if response.status >= 400:
+        raise RuntimeError(f"HTTP {response.status} {text[:200]}")
+    return response.status, (json.loads(text) if text else None)
+
+
+def iter_auth_pages(page_size):
+    """Auth users, one admin API page at a time"""
+    page = 1
+    while True:
+        _, data = supabase_request('GET', '/auth/v1/admin/users', {'page': page, 'per_page': page_size})
+        users = (data or {}).get('users', [])
+        if users:
+            yield users
+        if len(users) < page_size:
+            return
+        page += 1
+
+
+def fetch_profiles(ids):
+    """{id: profile} for ids, looked up in id-ordered batches"""
+    profiles = {}
+    ids = sorted(ids)
+    for i in range(0, len(ids), PROFILE_BATCH_SIZE):
+        batch = ids[i:i + PROFILE_BATCH_SIZE]
+        _, rows = supabase_request('GET', '/rest/v1/user_profiles', {
+            'select': 'id,is_approved,role',
+            'id': f"in.({','.join(batch)})",
+        })
+        for row in rows or []:
+            profiles[row['id']] = row
+    return profiles
+
+
+def classify(user, profile, cutoff):
+    """Candidate kind for one auth user, or None"""
+    if not user.get('email_confirmed_at'):
+        created_at = datetime.fromisoformat(user['created_at'].replace('Z', '+00:00'))
+        return 'unverified' if created_at < cutoff else None
+    if profile is None:
+        return 'missing_profile'
+    if not profile.get('is_approved') and profile.get('role') != 'admin':
+        return 'unapproved'
+    return None
+
+
+def scan(page_size, cutoff, output=None):
+    """Stream auth users, print candidates per page; returns {kind: [(id, email)]}"""
+    candidates = {'unverified': [], 'unapproved': [], 'missing_profile': []}
+    total = 0
+    for page_no, users in enumerate(iter_auth_pages(page_size), 1):
+        profiles = fetch_profiles([user['id'] for user in users])
+        found = {kind: 0 for kind in candidates}
+        for user in users:
+            kind = classify(user, profiles.get(user['id']), cutoff)
+            if kind is None:
+                continue
+            candidates[kind].append((user['id'], user.get('email') or ''))
+            found[kind] += 1
+            if output:
+                output.write(json.dumps({
+                    'kind': kind,
+                    'id': user['id'],
+                    'email': user.get('email'),
+                    'created_at': user.get('created_at'),
+                }) + '\n')
+                output.flush()
+        total += len(users)
+        print(f"   📄 Page {page_no}: {len(users)} users, {len(profiles)} profiles → "
+              f"unverified {found['unverified']}, unapproved {found['unapproved']}, "
+              f"missing profile {found['missing_profile']}")
+    return total, candidates
+
+
+def delete_user(user_id):
+    started = time.perf_counter()
+    try:
+        supabase_request('DELETE', f'/auth/v1/admin/users/{user_id}')
+        error = None
+    except Exception as e:
+        error = str(e)
+    return time.perf_counter() - started, error, 1
+
+
+def approve_users(user_ids):
+    """One PATCH for a whole batch of profiles"""
+    started = time.perf_counter()
+    try:
+        supabase_request('PATCH', '/rest/v1/user_profiles', {'id': f"in.({','.join(sorted(user_ids))})"},
+                         body={'is_approved': True}, prefer='return=minimal')
+        error = None
+    except Exception as e:
+        error = str(e)
+    return time.perf_counter() - started, error, len(user_ids)
+
+
+def run_batches(label, users, batch_size, workers, apply_batch):
+    """Apply apply_batch(batch, pool) to users in batches; print per-batch latency
+
+    apply_batch returns one (seconds, error, users covered) per request. Returns (done, failed).
+    """
+    done = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for number, i in enumerate(range(0, len(users), batch_size), 1):
+            batch = users[i:i + batch_size]
+            started = time.perf_counter()
+            results = apply_batch(batch, pool)
+            elapsed = time.perf_counter() - started
+            latencies = sorted(seconds for seconds, _, _ in results)
+            errors = [error for _, error, _ in results if error]
+            done += sum(count for _, error, count in results if not error)
+            failed += sum(count for _, error, count in results if error)
+            if errors:
+                print(f"   {RED}❌ {label} batch {number}: {len(errors)} requests failed, e.g. {errors[0]}{NC}")
+            print(f"   ⏱️  {label} batch {number}: {len(batch)} users in {elapsed * 1000:.0f} ms "
+                  f"(p50 {latencies[len(latencies) // 2] * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms)")
+    return done, failed
+
+
+def main():
+    global SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
+
+    parser = argparse.ArgumentParser(description='Reconcile auth users with user_profiles')
+    parser.add_argument('--delete-unverified', action='store_true', help='delete unverified candidates')
+    parser.add_argument('--approve-unapproved', action='store_true', help='approve unapproved candidates')
+    parser.add_argument('--dry-run', action='store_true', help='report what would be changed')
+    parser.add_argument('--output', default=None, help='append candidates to this JSON-lines file')
+    parser.add_argument('--older-than-hours', type=float, default=DEFAULT_OLDER_THAN_HOURS,
+                        help='unverified users must be at least this old')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help='auth users per page')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='users per delete/approve batch')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='deletions in flight per batch')
+    args = parser.parse_args()
+
+    load_env()
+    SUPABASE_URL = os.environ.get('SUPABASE_URL')
+    SUPABASE_SERVICE_ROLE_KEY = os.environ.get('SUPABASE_SERVICE_ROLE_KEY')
+
+    if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
+        print(f"{RED}❌ Error: Missing environment variables{NC}")
+        print()
+        print("Set these environment variables or create .env.local:")
+        print("  SUPABASE_URL=https://xxx.supabase.co")
+        print("  SUPABASE_SERVICE_ROLE_KEY=eyJ...")
+        sys.exit(1)
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=args.older_than_hours)
+
+    print()
+    print("👥 User Reconciliation")
+    print("=" * 45)
+    print(f"   Unverified cutoff: {cutoff.isoformat()}")
+
+    output = open(args.output, 'a', encoding='utf-8') if args.output else None
+    started = time.perf_counter()
+    try:
+        total, candidates = scan(args.page_size, cutoff, output)
+    except Exception as e:
+        print(f"   {RED}❌ Error: {e}{NC}")
+        sys.exit(1)
+    finally:
+        if output:
+            output.close()
+    print(f"   Scanned {total} users in {time.perf_counter() - started:.1f}s")
+
+    fail_count = 0
+    workers = max(1, args.workers)
+    batch_size = max(1, args.batch_size)
+
+    if args.delete_unverified and candidates['unverified']:
+        print()
+        if args.dry_run:
+            print(f"{YELLOW}🔍 Dry run: {len(candidates['unverified'])} unverified users would be deleted{NC}")
+        else:
+            print(f"🗑️  Deleting {len(candidates['unverified'])} unverified users")
+            ids = [user_id for user_id, _ in candidates['unverified']]
+            done, failed = run_batches('Delete', ids, batch_size, workers,
+                                       lambda batch, pool: list(pool.map(delete_user, batch)))
+            print(f"   Deleted: {done}, failed: {failed}")
+            fail_count += failed
+
+    if args.approve_unapproved and candidates['unapproved']:
+        print()
+        if args.dry_run:
+            print(f"{YELLOW}🔍 Dry run: {len(candidates['unapproved'])} users would be approved{NC}")
+        else:
+            print(f"✅ Approving {len(candidates['unapproved'])} users")
+            ids = [user_id for user_id, _ in candidates['unapproved']]
+            done, failed = run_batches('Approve', ids, batch_size, workers,
+                                       lambda batch, pool: [approve_users(batch)])
+            print(f"   Approved: {done}, failed: {failed}")
+            fail_count += failed
+
+    print()
+    print("=" * 45)
+    print(f"   Users: {total}")
+    print(f"   Unverified (>{args.older_than_hours:g}h): {len(candidates['unverified'])}")
+    print(f"   Unapproved: {len(candidates['unapproved'])}")
+    print(f"   Missing profile: {len(candidates['missing_profile'])}")
+    if fail_count:
+        print(f"{RED}❌ Failed: {fail_count} users{NC}")
+    else:
+        print(f"{GREEN}✅ Done{NC}")
+    print()
+
+    sys.exit(1 if fail_count else 0)
+
+
+if __name__ == '__main__':
+    main()
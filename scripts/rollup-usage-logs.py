@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Roll up usage_logs into daily per-user / per-feature counts
+
+Walks usage_logs in (accessed_at, id) order with keyset pagination (served by
+idx_usage_logs_accessed_at), counts page opens per UTC day / user / feature and
+adds each page of counts to usage_daily_stats through the apply_usage_rollup
+RPC. The RPC advances the watermark in usage_rollup_state in the same
+transaction, so each run only reads rows logged since the previous one and an
+interrupted run never counts a row twice.
+
+Rows newer than --lag-minutes are left for the next run: accessed_at is set at
+insert time, so a slow transaction can still commit a row just behind the
+newest one already visible.
+
+Usage:
+    python3 scripts/rollup-usage-logs.py                  # roll up new rows
+    python3 scripts/rollup-usage-logs.py --dry-run        # count new rows only
+    python3 scripts/rollup-usage-logs.py --reset          # rebuild the aggregates from scratch
+    python3 scripts/rollup-usage-logs.py --page-size 5000 --lag-minutes 5
+
+Environment variables required:
+    SUPABASE_URL - Supabase project URL (http://127.0.0.1:54321 for `supabase start`)
+    SUPABASE_SERVICE_ROLE_KEY - Service role key (not anon key)
+
+Or create a .env.local file in project root with these values
+"""
+
+import os
+import sys
+import json
+import ssl
+import time
+import argparse
+import http.client
+import urllib.parse
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+# SSL context for macOS certificate issues
+ssl_context = ssl.create_default_context()
+try:
+    import certifi
+    ssl_context.load_verify_locations(certifi.where())
+except ImportError:
+    # If certifi not available, use unverified context (less secure but works)
+    ssl_context = ssl._create_unverified_context()
+
+# Configuration
+PROJECT_ROOT = Path(__file__).parent.parent
+ROLLUP_NAME = 'usage_daily_stats'
+DEFAULT_PAGE_SIZE = 5000
+DEFAULT_LAG_MINUTES = 5
+REQUEST_TIMEOUT = 60
+
+# Colors for terminal output
+GREEN = '\033[92m'
+YELLOW = '\033[93m'
+RED = '\033[91m'
+NC = '\033[0m'  # No Color
+
+SUPABASE_URL = None
+SUPABASE_SERVICE_ROLE_KEY = None
+_conn = None
+
+
+def load_env():
+    """Load environment variables from .env.local if exists"""
+    env_path = PROJECT_ROOT / '.env.local'
+    if env_path.exists():
+        with open(env_path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#') and '=' in line:
+                    key, value = line.split('=', 1)
+                    value = value.strip().strip('"').strip("'")
+                    os.environ[key.strip()] = value
+
+
+def get_connection(fresh=False):
+    """Keep-alive connection to SUPABASE_URL"""
+    global _conn
+    if _conn is not None and not fresh:
+        return _conn
+    if _conn is not None:
+        _conn.close()
+    parsed = urllib.parse.urlsplit(SUPABASE_URL)
+    if parsed.scheme == 'https':
+        _conn = http.client.HTTPSConnection(parsed.netloc, timeout=REQUEST_TIMEOUT, context=ssl_context)
+    else:
+        _conn = http.client.HTTPConnection(parsed.netloc, timeout=REQUEST_TIMEOUT)
+    return _conn
+
+
+def rest_request(method, endpoint, query=None, body=None, prefer=None):
+    """Make HTTP request to the Supabase REST API (PostgREST)
+
+    Returns (status, parsed JSON or None).
+    """
+    path = urllib.parse.urlsplit(SUPABASE_URL).path.rstrip('/')
+    url = f"{path}/rest/v1/{endpoint}"
+    if query:
+        url += '?' + urllib.parse.urlencode(query, safe='(),.:*')
+
+    headers = {
+        'Authorization': f'Bearer {SUPABASE_SERVICE_ROLE_KEY}',
+        'apikey': SUPABASE_SERVICE_ROLE_KEY,
+        'Connection': 'keep-alive',
+    }
+    data = None
+    if body is not None:
+        data = json.dumps(body).encode('utf-8')
+        headers['Content-Type'] = 'application/json'
+    if prefer:
+        headers['Prefer'] = prefer
+
+    for attempt in range(2):
+        conn = get_connection(fresh=attempt > 0)
+        try:
+            conn.request(method, url, body=data, headers=headers)
+            response = conn.getresponse()
+            payload = response.read()
+            break
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # Keep-alive connection closed by the server: reconnect once
+            if attempt:
+                raise
+
+    text = payload.decode('utf-8') if payload else ''
+    if response.status >= 400:
+        raise RuntimeError(f"{method} {endpoint}: HTTP {response.status} {text}")
+    return response.status, (json.loads(text) if text else None)
+
+
+def load_watermark():
+    """(last_accessed_at, last_id) of the last rolled-up row, (None, None) before the first run"""
+    _, rows = rest_request('GET', 'usage_rollup_state', {
+        'select': 'last_accessed_at,last_id',
+        'name': f'eq.{ROLLUP_NAME}',
+    })
+    if not rows:
+        return None, None
+    return rows[0]['last_accessed_at'], rows[0]['last_id']
+
+
+def fetch_page(after_at, after_id, until, page_size):
+    """Next page of usage_logs strictly after (after_at, after_id) and before until"""
+    query = [
+        ('select', 'id,user_id,feature_name,accessed_at'),
+        ('accessed_at', f'lt.{until}'),
+        ('order', 'accessed_at.asc,id.asc'),
+        ('limit', str(page_size)),
+    ]
+    if after_at is None:
+        query.append(('accessed_at', 'not.is.null'))
+    else:
+        query.append(('or', f'(accessed_at.gt."{after_at}",and(accessed_at.eq."{after_at}",id.gt.{after_id}))'))
+    _, rows = rest_request('GET', 'usage_logs', query)
+    return rows or []
+
+
+def utc_day(timestamp):
+    """UTC date (YYYY-MM-DD) of a PostgREST timestamptz"""
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).astimezone(timezone.utc).date().isoformat()
+
+
+def aggregate(rows):
+    """Counter {(day, user_id, feature_name): count}; rows without a user are not counted"""
+    counts = Counter()
+    for row in rows:
+        if row['user_id']:
+            counts[(utc_day(row['accessed_at']), row['user_id'], row['feature_name'])] += 1
+    return counts
+
+
+def apply_page(counts, expected, last_row, batch_rows):
+    """Add counts and move the watermark to last_row in one transaction"""
+    rest_request('POST', 'rpc/apply_usage_rollup', body={
+        'rollup_name': ROLLUP_NAME,
+        'counts': [
+            {'day': day, 'user_id': user_id, 'feature_name': feature, 'count': count}
+            for (day, user_id, feature), count in counts.items()
+        ],
+        'expected_at': expected[0],
+        'expected_id': expected[1],
+        'new_at': last_row['accessed_at'],
+        'new_id': last_row['id'],
+        'batch_rows': batch_rows,
+    })
+
+
+def reset_rollup():
+    """Drop all aggregates and the watermark (next run starts from the first row)"""
+    rest_request('DELETE', 'usage_daily_stats', {'day': 'not.is.null'}, prefer='return=minimal')
+    rest_request('DELETE', 'usage_rollup_state', {'name': f'eq.{ROLLUP_NAME}'}, prefer='return=minimal')
+
+
+def main():
+    global SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
+
+    parser = argparse.ArgumentParser(description='Roll up usage_logs into usage_daily_stats')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help='usage_logs rows per request')
+    parser.add_argument('--lag-minutes', type=float, default=DEFAULT_LAG_MINUTES,
+                        help='leave rows newer than this for the next run')
+    parser.add_argument('--dry-run', action='store_true', help='count new rows without writing')
+    parser.add_argument('--reset', action='store_true', help='delete the aggregates and start over')
+    args = parser.parse_args()
+
+    load_env()
+    SUPABASE_URL = os.environ.get('SUPABASE_URL')
+    SUPABASE_SERVICE_ROLE_KEY = os.environ.get('SUPABASE_SERVICE_ROLE_KEY')
+
+    if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
+        print(f"{RED}❌ Error: Missing environment variables{NC}")
+        print()
+        print("Set these environment variables or create .env.local:")
+        print("  SUPABASE_URL=https://xxx.supabase.co")
+        print("  SUPABASE_SERVICE_ROLE_KEY=eyJ...")
+        sys.exit(1)
+
+    print()
+    print("📊 Usage Log Rollup")
+    print("=" * 45)
+
+    if args.reset and not args.dry_run:
+        reset_rollup()
+        print(f"   {YELLOW}🗑️  Aggregates and watermark reset{NC}")
+
+    until = (datetime.now(timezone.utc) - timedelta(minutes=args.lag_minutes)).isoformat()
+    watermark = load_watermark()
+    if args.reset and args.dry_run:
+        watermark = (None, None)
+    print(f"   Watermark: {watermark[0] or '(first run)'}")
+    print(f"   Until: {until}")
+
+    started = time.perf_counter()
+    rows_total = 0
+    pages = 0
+    keys = set()
+    try:
+        while True:
+            rows = fetch_page(watermark[0], watermark[1], until, args.page_size)
+            if not rows:
+                break
+            counts = aggregate(rows)
+            if not args.dry_run:
+                apply_page(counts, watermark, rows[-1], len(rows))
+            watermark = (rows[-1]['accessed_at'], rows[-1]['id'])
+            rows_total += len(rows)
+            pages += 1
+            keys.update(counts)
+            print(f"   📄 Page {pages}: {len(rows)} rows → {len(counts)} aggregates (up to {watermark[0]})")
+            if len(rows) < args.page_size:
+                break
+    except Exception as e:
+        print(f"   {RED}❌ Error: {e}{NC}")
+        print(f"   Processed {rows_total} rows before the error; the next run resumes from the watermark")
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - started
+    rate = rows_total / elapsed if elapsed > 0 else 0
+    print()
+    print("=" * 45)
+    if args.dry_run:
+        print(f"{YELLOW}🔍 Dry run: {rows_total} new rows → {len(keys)} aggregate rows{NC}")
+    else:
+        print(f"{GREEN}✅ Rolled up: {rows_total} rows → {len(keys)} aggregate rows{NC}")
+    print(f"   {pages} pages, {elapsed:.1f}s ({rate:.0f} rows/s)")
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,11 +2,27 @@
 """
 Upload Protected Pages to Supabase Storage
 
+Pages are first minified and pre-compressed by build-protected-pages.py
+(page.html, page.html.gz, page.html.br); serve-protected-page picks the variant
+matching the client's Accept-Encoding. Code shared by several pages is uploaded
+as content-hash chunks (chunk-<hash>.js, see bundle-protected-pages.py) along
+with chunk-pages.json, which lists the pages each chunk belongs to. Only
+objects whose content changed since the last successful upload are sent.
+
+A local SHA-256 manifest (.protected-pages-manifest.json) records what was
+uploaded per project/bucket; --verify-remote additionally compares against the
+object metadata in the bucket. Changed pages are uploaded concurrently as a
+single upsert each, streamed from disk over pooled keep-alive connections.
+
 Usage:
-    python3 scripts/upload-protected-pages.py
+    python3 scripts/upload-protected-pages.py                 # upload changed pages
+    python3 scripts/upload-protected-pages.py --force         # upload every page
+    python3 scripts/upload-protected-pages.py --dry-run       # show what would be uploaded
+    python3 scripts/upload-protected-pages.py --verify-remote # also check bucket metadata
+    python3 scripts/upload-protected-pages.py --no-build      # upload the raw pages only
 
 Environment variables required:
-    SUPABASE_URL - Supabase project URL
+    SUPABASE_URL - Supabase project URL (http://127.0.0.1:port works for a local stand-in)
     SUPABASE_SERVICE_ROLE_KEY - Service role key (not anon key)
 
 Or create a .env.local file in project root with these values
@@ -16,8 +32,13 @@ import os
 import sys
 import json
 import ssl
-import urllib.request
-import urllib.error
+import argparse
+import hashlib
+import threading
+import importlib.util
+import http.client
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Fix Windows console encoding
@@ -36,7 +57,13 @@ except ImportError:
     ssl_context = ssl._create_unverified_context()
 
 # Configuration
+PROJECT_ROOT = Path(__file__).parent.parent
+MANIFEST_PATH = PROJECT_ROOT / '.protected-pages-manifest.json'
 BUCKET_NAME = 'protected-pages'
+CONTENT_TYPE = 'text/html; charset=utf-8'
+HASH_CHUNK_SIZE = 64 * 1024
+DEFAULT_WORKERS = 4
+REQUEST_TIMEOUT = 60
 PROTECTED_FILES = [
     {
         'local_path': 'dev/auto-find-section.html',
@@ -62,10 +89,20 @@ YELLOW = '\033[93m'
 RED = '\033[91m'
 NC = '\033[0m'  # No Color
 
+# One keep-alive connection per worker thread
+_local = threading.local()
+_print_lock = threading.Lock()
+
+
+def log(*args):
+    """print() that does not interleave between upload threads"""
+    with _print_lock:
+        print(*args)
+
 
 def load_env():
     """Load environment variables from .env.local if exists"""
-    env_path = Path(__file__).parent.parent / '.env.local'
+    env_path = PROJECT_ROOT / '.env.local'
     if env_path.exists():
         with open(env_path, 'r') as f:
             for line in f:
@@ -76,50 +113,84 @@ def load_env():
                     os.environ[key.strip()] = value
 
 
-def supabase_request(method, endpoint, body=None, content_type=None):
-    """Make HTTP request to Supabase Storage API"""
-    url = f"{SUPABASE_URL}/storage/v1{endpoint}"
-    
-    headers = {
+def get_connection(fresh=False):
+    """Return this thread's keep-alive connection to SUPABASE_URL"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and not fresh:
+        return conn
+    if conn is not None:
+        conn.close()
+    parsed = urllib.parse.urlsplit(SUPABASE_URL)
+    if parsed.scheme == 'https':
+        conn = http.client.HTTPSConnection(parsed.netloc, timeout=REQUEST_TIMEOUT, context=ssl_context)
+    else:
+        conn = http.client.HTTPConnection(parsed.netloc, timeout=REQUEST_TIMEOUT)
+    _local.conn = conn
+    return conn
+
+
+def supabase_request(method, endpoint, body=None, content_type=None, headers=None):
+    """Make HTTP request to Supabase Storage API
+
+    body may be str, bytes or a binary file object (streamed; sent with Content-Length).
+    """
+    path = urllib.parse.urlsplit(SUPABASE_URL).path.rstrip('/')
+    url = f"{path}/storage/v1{urllib.parse.quote(endpoint)}"
+
+    request_headers = {
         'Authorization': f'Bearer {SUPABASE_SERVICE_ROLE_KEY}',
         'apikey': SUPABASE_SERVICE_ROLE_KEY,
+        'Connection': 'keep-alive',
     }
-    
     if content_type:
-        headers['Content-Type'] = content_type
-    
+        request_headers['Content-Type'] = content_type
+    if headers:
+        request_headers.update(headers)
+
     data = body.encode('utf-8') if isinstance(body, str) else body
-    
-    req = urllib.request.Request(url, data=data, headers=headers, method=method)
-    
-    try:
-        with urllib.request.urlopen(req, context=ssl_context) as response:
-            body = response.read()
-            return {
-                'status': response.status,
-                'data': json.loads(body.decode('utf-8')) if body else {}
-            }
-    except urllib.error.HTTPError as e:
+    if hasattr(data, 'seek'):
+        start = data.tell()
+        request_headers['Content-Length'] = str(os.fstat(data.fileno()).st_size - start)
+    elif data is not None:
+        request_headers['Content-Length'] = str(len(data))
+
+    # A pooled connection may have been closed by the server; retry once on a new one
+    for attempt in range(2):
+        conn = get_connection(fresh=attempt > 0)
+        if hasattr(data, 'seek'):
+            data.seek(start)
+        try:
+            conn.request(method, url, body=data, headers=request_headers)
+            response = conn.getresponse()
+            raw = response.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError,
+                http.client.CannotSendRequest):
+            if attempt == 0:
+                continue
+            return {'status': 0, 'data': 'connection closed by server'}
+        except Exception as e:
+            get_connection(fresh=True)
+            return {'status': 0, 'data': str(e)}
+        if response.will_close:
+            conn.close()
         try:
-            error_body = json.loads(e.read().decode('utf-8'))
-        except:
-            error_body = str(e)
-        return {'status': e.code, 'data': error_body}
-    except Exception as e:
-        return {'status': 0, 'data': str(e)}
+            parsed = json.loads(raw.decode('utf-8')) if raw else {}
+        except ValueError:
+            parsed = raw.decode('utf-8', errors='replace')
+        return {'status': response.status, 'data': parsed}
 
 
 def ensure_bucket():
     """Create bucket if it doesn't exist"""
     print(f"📦 Checking bucket: {BUCKET_NAME}")
-    
+
     # Try to get bucket info
     result = supabase_request('GET', f'/bucket/{BUCKET_NAME}')
-    
+
     if result['status'] == 200:
         print(f"   ✓ Bucket exists")
         return True
-    
+
     # Create bucket
     print(f"   Creating bucket...")
     create_result = supabase_request(
@@ -134,57 +205,178 @@ def ensure_bucket():
         }),
         'application/json'
     )
-    
+
     if create_result['status'] in [200, 201]:
         print(f"   ✓ Bucket created")
         return True
-    
+
     print(f"   {RED}❌ Failed to create bucket:{NC}", create_result['data'])
     return False
 
 
-def upload_file(local_path, storage_path):
-    """Upload a single file"""
-    project_root = Path(__file__).parent.parent
-    full_path = project_root / local_path
-    
-    if not full_path.exists():
-        print(f"   {YELLOW}⚠️  File not found: {local_path}{NC}")
-        return False
-    
+def file_digest(full_path):
+    """SHA-256 (manifest) and MD5 (matches the Storage eTag) of a file, read in chunks"""
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5()
+    size = 0
     with open(full_path, 'rb') as f:
-        file_content = f.read()
-    
-    file_size = len(file_content)
-    print(f"📄 Uploading: {storage_path} ({file_size / 1024:.1f} KB)")
-    
-    # Delete existing file first (upsert)
-    supabase_request('DELETE', f'/object/{BUCKET_NAME}/{storage_path}')
-    
-    # Upload new file
-    result = supabase_request(
-        'POST',
-        f'/object/{BUCKET_NAME}/{storage_path}',
-        file_content,
-        'text/html; charset=utf-8'
-    )
-    
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            sha256.update(chunk)
+            md5.update(chunk)
+            size += len(chunk)
+    return {'sha256': sha256.hexdigest(), 'md5': md5.hexdigest(), 'size': size}
+
+
+def manifest_key():
+    """Manifest entries are kept per project URL and bucket"""
+    return f"{SUPABASE_URL.rstrip('/')}/{BUCKET_NAME}"
+
+
+def load_manifest():
+    if not MANIFEST_PATH.exists():
+        return {}
+    try:
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f).get(manifest_key(), {})
+    except (ValueError, OSError):
+        print(f"   {YELLOW}⚠️  Ignoring unreadable manifest: {MANIFEST_PATH.name}{NC}")
+        return {}
+
+
+def save_manifest(entries):
+    data = {}
+    if MANIFEST_PATH.exists():
+        try:
+            with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (ValueError, OSError):
+            data = {}
+    data[manifest_key()] = entries
+    tmp_path = MANIFEST_PATH.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def list_remote_objects():
+    """storage_path -> object metadata for every object in the bucket"""
+    objects = {}
+    offset = 0
+    limit = 1000
+    while True:
+        result = supabase_request(
+            'POST',
+            f'/object/list/{BUCKET_NAME}',
+            json.dumps({'prefix': '', 'limit': limit, 'offset': offset,
+                        'sortBy': {'column': 'name', 'order': 'asc'}}),
+            'application/json'
+        )
+        if result['status'] != 200 or not isinstance(result['data'], list):
+            print(f"   {YELLOW}⚠️  Could not list bucket objects:{NC}", result['data'])
+            return None
+        for obj in result['data']:
+            objects[obj.get('name')] = obj.get('metadata') or {}
+        if len(result['data']) < limit:
+            return objects
+        offset += limit
+
+
+def remote_matches(metadata, digest):
+    """Storage metadata agrees with the local file (eTag = MD5 for single uploads)"""
+    if metadata is None:
+        return False
+    etag = str(metadata.get('eTag', '')).strip('"')
+    if etag and etag != digest['md5']:
+        return False
+    size = metadata.get('size', metadata.get('contentLength'))
+    return size is None or int(size) == digest['size']
+
+
+def load_builder():
+    """build-protected-pages.py (hyphenated, so load it by path)"""
+    spec = importlib.util.spec_from_file_location(
+        'build_protected_pages', Path(__file__).with_name('build-protected-pages.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def upload_items(build=True):
+    """(storage_path, local file) pairs to sync, plus the PROTECTED_FILES entries whose source is missing
+
+    With build=True the pages are minified and pre-compressed first and every
+    variant (page.html, page.html.gz, page.html.br) is uploaded, together with
+    chunk-pages.json (which pages each shared chunk belongs to).
+    """
+    if not build:
+        items = [(f['storage_path'], PROJECT_ROOT / f['local_path']) for f in PROTECTED_FILES]
+        return [i for i in items if i[1].exists()], \
+            [f for f in PROTECTED_FILES if not (PROJECT_ROOT / f['local_path']).exists()]
+
+    builder = load_builder()
+    built = builder.build_all(PROTECTED_FILES)
+    items = [(v['path'], builder.BUILD_DIR / v['path'])
+             for entry in built.values() for v in entry['variants'].values()]
+    items.append((builder.CHUNK_PAGES_NAME, builder.BUILD_DIR / builder.CHUNK_PAGES_NAME))
+    return items, [f for f in PROTECTED_FILES if f['storage_path'] not in built]
+
+
+def plan_uploads(items, manifest, remote=None, force=False):
+    """Split (storage_path, local file) pairs into (to upload, unchanged)"""
+    changed, unchanged = [], []
+    for storage_path, full_path in items:
+        digest = file_digest(full_path)
+        entry = manifest.get(storage_path)
+        is_same = entry is not None and entry.get('sha256') == digest['sha256']
+        if remote is not None:
+            is_same = is_same and remote_matches(remote.get(storage_path), digest)
+        item = {'storage_path': storage_path, 'full_path': full_path, 'digest': digest}
+        (unchanged if is_same and not force else changed).append(item)
+    return changed, unchanged
+
+
+def upload_file(item):
+    """Upload a single file (streamed, one upsert request)"""
+    storage_path = item['storage_path']
+    log(f"📄 Uploading: {storage_path} ({item['digest']['size'] / 1024:.1f} KB)")
+
+    # .gz/.br variants and chunk-pages.json keep text/html too: the bucket only allows that
+    # MIME type and serve-protected-page sets Content-Type / Content-Encoding itself
+    with open(item['full_path'], 'rb') as f:
+        result = supabase_request(
+            'POST',
+            f'/object/{BUCKET_NAME}/{storage_path}',
+            f,
+            CONTENT_TYPE,
+            {'x-upsert': 'true', 'cache-control': 'no-cache'}
+        )
+
     if result['status'] in [200, 201]:
-        print(f"   {GREEN}✓ Uploaded successfully{NC}")
+        log(f"   {GREEN}✓ Uploaded successfully: {storage_path}{NC}")
         return True
-    
-    print(f"   {RED}❌ Upload failed:{NC}", result['data'])
+
+    log(f"   {RED}❌ Upload failed: {storage_path}{NC}", result['data'])
     return False
 
 
 def main():
     global SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
-    
+
+    parser = argparse.ArgumentParser(description='Upload protected pages to Supabase Storage')
+    parser.add_argument('--force', action='store_true', help='upload every page, ignoring the manifest')
+    parser.add_argument('--dry-run', action='store_true', help='only show which pages would be uploaded')
+    parser.add_argument('--verify-remote', action='store_true',
+                        help='also compare against object metadata in the bucket')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='concurrent uploads')
+    parser.add_argument('--no-build', action='store_true',
+                        help='upload the source pages as-is (no minified / compressed variants)')
+    args = parser.parse_args()
+
     load_env()
-    
+
     SUPABASE_URL = os.environ.get('SUPABASE_URL') or os.environ.get('NEXT_PUBLIC_SUPABASE_URL', 'https://iwudkwhafyrhgzuntdgm.supabase.co')
     SUPABASE_SERVICE_ROLE_KEY = os.environ.get('SUPABASE_SERVICE_ROLE_KEY') or os.environ.get('NEXT_PUBLIC_SUPABASE_ANON_KEY')
-    
+
     if not SUPABASE_SERVICE_ROLE_KEY:
         print(f"{RED}❌ Error: SUPABASE_SERVICE_ROLE_KEY or NEXT_PUBLIC_SUPABASE_ANON_KEY environment variable is required{NC}")
         print()
@@ -194,36 +386,69 @@ def main():
         print()
         print("Note: Storage upload typically requires SERVICE_ROLE_KEY (not ANON_KEY)")
         sys.exit(1)
-    
+
     print()
     print("🚀 Supabase Protected Pages Uploader")
     print("=" * 45)
     print(f"   URL: {SUPABASE_URL}")
     print()
-    
-    # Ensure bucket exists
-    if not ensure_bucket():
-        sys.exit(1)
-    
-    print()
-    
-    # Upload each file
+
+    manifest = load_manifest()
+    remote = None
+    if args.verify_remote and not args.force:
+        print(f"🔍 Listing objects in: {BUCKET_NAME}")
+        remote = list_remote_objects()
+        if remote is None:
+            remote = {}
+
+    items, missing = upload_items(build=not args.no_build)
+    if not args.no_build:
+        print()
+    changed, unchanged = plan_uploads(items, manifest, remote, args.force)
+    for item in missing:
+        print(f"   {YELLOW}⚠️  File not found: {item['local_path']}{NC}")
+    for item in unchanged:
+        print(f"   ✓ Unchanged: {item['storage_path']}")
+
+    if args.dry_run:
+        for item in changed:
+            print(f"   → Would upload: {item['storage_path']} ({item['digest']['size'] / 1024:.1f} KB)")
+        print()
+        sys.exit(0)
+
     success_count = 0
-    fail_count = 0
-    
-    for file_info in PROTECTED_FILES:
-        if upload_file(file_info['local_path'], file_info['storage_path']):
-            success_count += 1
-        else:
-            fail_count += 1
-    
+    fail_count = len(missing)
+
+    if changed:
+        # Ensure bucket exists
+        if not ensure_bucket():
+            sys.exit(1)
+        print()
+
+        workers = max(1, min(args.workers, len(changed)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(upload_file, changed))
+
+        for item, ok in zip(changed, results):
+            if ok:
+                success_count += 1
+                manifest[item['storage_path']] = {
+                    'sha256': item['digest']['sha256'],
+                    'md5': item['digest']['md5'],
+                    'size': item['digest']['size'],
+                }
+            else:
+                fail_count += 1
+        save_manifest(manifest)
+
     print()
     print("=" * 45)
     print(f"{GREEN}✅ Success: {success_count} files{NC}")
+    print(f"   Skipped (unchanged): {len(unchanged)} files")
     if fail_count > 0:
         print(f"{RED}❌ Failed: {fail_count} files{NC}")
     print()
-    
+
     sys.exit(1 if fail_count > 0 else 0)
 
 
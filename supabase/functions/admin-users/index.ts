@@ -10,6 +10,10 @@ const ADMIN_EMAIL_ALLOWLIST = (Deno.env.get("ADMIN_EMAIL_ALLOWLIST") ?? "")
   .map((email) => email.trim())
   .filter(Boolean);
 
+// auth.admin.listUsers page size for the "list" action, and ids per user_profiles lookup
+const LIST_PAGE_SIZE = 500;
+const PROFILE_BATCH_SIZE = 100;
+
 const corsHeaders = {
   "Access-Control-Allow-Origin": "*",
   "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type",
@@ -156,57 +160,86 @@ Deno.serve(async (req) => {
   // List all users (from auth.users, with profile permissions)
   // ============================================
   if (action === "list") {
-    // Primary source: auth.users (includes unverified users)
-    const { data: authData, error: authError } = await supabase.auth.admin.listUsers();
-    
-    if (authError) {
-      return new Response(authError.message, {
-        status: 400,
-        headers: corsHeaders,
-      });
-    }
+    // Primary source: auth.users (includes unverified users), read page by page.
+    // payload.page / payload.per_page return a single page (with next_page); without them
+    // every page is read. Profiles are joined per page by id instead of a full table select.
+    const perPage = Math.min(Math.max(Number(payload.per_page ?? LIST_PAGE_SIZE), 1), 1000);
+    const singlePage = payload.page !== undefined;
+    let page = singlePage ? Math.max(Number(payload.page), 1) : 1;
+    let nextPage: number | null = null;
+
+    type UserProfile = {
+      id: string;
+      business_name: string | null;
+      business_number: string | null;
+      phone: string | null;
+      is_approved: boolean;
+      role: string;
+      access_beam: boolean;
+      access_column: boolean;
+    };
+    const users = [];
+
+    while (true) {
+      const { data: authData, error: authError } = await supabase.auth.admin.listUsers({ page, perPage });
+
+      if (authError) {
+        return new Response(authError.message, {
+          status: 400,
+          headers: corsHeaders,
+        });
+      }
 
-    // Get profiles for permission data
-    const { data: profiles, error: profileError } = await supabase
-      .from("user_profiles")
-      .select("id,business_name,business_number,phone,is_approved,role,access_beam,access_column");
-    
-    if (profileError) {
-      console.error("Failed to fetch profiles:", profileError);
-    }
+      const authUsers = authData?.users ?? [];
+      const ids = authUsers.map((authUser) => authUser.id).sort();
+
+      // Get profiles for permission data (this page only, in id-ordered batches)
+      const profileMap = new Map<string, UserProfile>();
+      for (let i = 0; i < ids.length; i += PROFILE_BATCH_SIZE) {
+        const { data: profiles, error: profileError } = await supabase
+          .from("user_profiles")
+          .select("id,business_name,business_number,phone,is_approved,role,access_beam,access_column")
+          .in("id", ids.slice(i, i + PROFILE_BATCH_SIZE));
+
+        if (profileError) {
+          console.error("Failed to fetch profiles:", profileError);
+        }
+        for (const profile of (profiles ?? []) as UserProfile[]) {
+          profileMap.set(profile.id, profile);
+        }
+      }
 
-    // Create a map of user id -> profile
-    const profileMap = new Map<string, typeof profiles[0]>();
-    if (profiles) {
-      for (const profile of profiles) {
-        profileMap.set(profile.id, profile);
+      // Merge auth users with profile data
+      for (const authUser of authUsers) {
+        const profile = profileMap.get(authUser.id);
+        const metadata = authUser.user_metadata || {};
+
+        users.push({
+          id: authUser.id,
+          email: authUser.email,
+          email_verified: !!authUser.email_confirmed_at,
+          created_at: authUser.created_at,
+          // Profile data (if exists) or metadata fallback
+          business_name: profile?.business_name ?? metadata.business_name ?? null,
+          business_number: profile?.business_number ?? metadata.business_number ?? null,
+          phone: profile?.phone ?? metadata.phone ?? null,
+          // Permission data (only from profile)
+          has_profile: !!profile,
+          is_approved: profile?.is_approved ?? false,
+          role: profile?.role ?? "viewer",
+          access_beam: profile?.access_beam ?? false,
+          access_column: profile?.access_column ?? false,
+        });
       }
+
+      nextPage = authUsers.length < perPage ? null : page + 1;
+      if (singlePage || nextPage === null) break;
+      page = nextPage;
     }
 
-    // Merge auth users with profile data
-    const users = (authData?.users ?? []).map((authUser) => {
-      const profile = profileMap.get(authUser.id);
-      const metadata = authUser.user_metadata || {};
-      
-      return {
-        id: authUser.id,
-        email: authUser.email,
-        email_verified: !!authUser.email_confirmed_at,
-        created_at: authUser.created_at,
-        // Profile data (if exists) or metadata fallback
-        business_name: profile?.business_name ?? metadata.business_name ?? null,
-        business_number: profile?.business_number ?? metadata.business_number ?? null,
-        phone: profile?.phone ?? metadata.phone ?? null,
-        // Permission data (only from profile)
-        has_profile: !!profile,
-        is_approved: profile?.is_approved ?? false,
-        role: profile?.role ?? "viewer",
-        access_beam: profile?.access_beam ?? false,
-        access_column: profile?.access_column ?? false,
-      };
-    }).sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime());
+    users.sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime());
 
-    return new Response(JSON.stringify({ users }), {
+    return new Response(JSON.stringify(singlePage ? { users, page, next_page: nextPage } : { users }), {
       status: 200,
       headers: { ...corsHeaders, "Content-Type": "application/json" },
     });
@@ -425,16 +458,72 @@ Deno.serve(async (req) => {
   // ============================================
   if (action === "get_page_usage_stats") {
     const now = new Date();
-    // Last 2 weeks (14 days)
-    const startDate = new Date(now.getTime() - 14 * 24 * 60 * 60 * 1000);
+    // Last 2 weeks (14 days), from UTC midnight so whole days of usage_daily_stats line up
+    const fromTime = new Date(now.getTime() - 14 * 24 * 60 * 60 * 1000);
+    const startDate = new Date(Date.UTC(fromTime.getUTCFullYear(), fromTime.getUTCMonth(), fromTime.getUTCDate()));
+
+    // Aggregate: user_id -> page_path -> count
+    const userPageMap = new Map<string, Map<string, number>>();
+    const addCount = (userId: string, pagePath: string, count: number) => {
+      if (!userPageMap.has(userId)) {
+        userPageMap.set(userId, new Map<string, number>());
+      }
+      const pageMap = userPageMap.get(userId)!;
+      pageMap.set(pagePath, (pageMap.get(pagePath) ?? 0) + count);
+    };
+
+    // Rows up to the rollup watermark are already counted per day in usage_daily_stats
+    // (scripts/rollup-usage-logs.py); only newer usage_logs rows are read raw.
+    const { data: rollupState, error: stateError } = await supabase
+      .from("usage_rollup_state")
+      .select("last_accessed_at, last_id")
+      .eq("name", "usage_daily_stats")
+      .maybeSingle();
+
+    if (stateError) {
+      return new Response(stateError.message, {
+        status: 400,
+        headers: corsHeaders,
+      });
+    }
+
+    if (rollupState?.last_accessed_at) {
+      const pageSize = 1000;
+      for (let from = 0; ; from += pageSize) {
+        const { data: dailyStats, error: statsError } = await supabase
+          .from("usage_daily_stats")
+          .select("user_id, feature_name, count")
+          .gte("day", startDate.toISOString().slice(0, 10))
+          .order("day", { ascending: true })
+          .order("user_id", { ascending: true })
+          .order("feature_name", { ascending: true })
+          .range(from, from + pageSize - 1);
+
+        if (statsError) {
+          return new Response(statsError.message, {
+            status: 400,
+            headers: corsHeaders,
+          });
+        }
+
+        (dailyStats ?? []).forEach((row: { user_id: string; feature_name: string; count: number }) => {
+          addCount(row.user_id, row.feature_name, row.count);
+        });
+        if ((dailyStats ?? []).length < pageSize) break;
+      }
+    }
 
-    // Get all usage logs in the last 2 weeks
-    const { data: usageLogs, error: logsError } = await supabase
+    // Usage logs in the last 2 weeks that are not rolled up yet
+    let logsQuery = supabase
       .from("usage_logs")
       .select("user_id, feature_name, accessed_at")
       .gte("accessed_at", startDate.toISOString())
-      .lte("accessed_at", now.toISOString())
-      .order("accessed_at", { ascending: false });
+      .lte("accessed_at", now.toISOString());
+    if (rollupState?.last_accessed_at) {
+      const at = rollupState.last_accessed_at;
+      logsQuery = logsQuery.or(`accessed_at.gt."${at}",and(accessed_at.eq."${at}",id.gt.${rollupState.last_id})`);
+    }
+    const { data: usageLogs, error: logsError } = await logsQuery.order("accessed_at", { ascending: false });
 
     if (logsError) {
       return new Response(logsError.message, {
@@ -443,6 +532,10 @@ Deno.serve(async (req) => {
       });
     }
 
+    (usageLogs ?? []).forEach((log: { user_id: string; feature_name: string; accessed_at: string }) => {
+      addCount(log.user_id, log.feature_name, 1);
+    });
+
     // Get all users with their details
     const { data: allUsers, error: usersError } = await supabase
       .from("user_profiles")
@@ -461,21 +554,6 @@ Deno.serve(async (req) => {
       userMap.set(user.id, { email: user.email ?? "", business_name: user.business_name ?? "" });
     });
 
-    // Aggregate: user_id -> page_path -> count
-    const userPageMap = new Map<string, Map<string, number>>();
-
-    (usageLogs ?? []).forEach((log: { user_id: string; feature_name: string; accessed_at: string }) => {
-      const userId = log.user_id;
-      const pagePath = log.feature_name;
-
-      if (!userPageMap.has(userId)) {
-        userPageMap.set(userId, new Map<string, number>());
-      }
-
-      const pageMap = userPageMap.get(userId)!;
-      pageMap.set(pagePath, (pageMap.get(pagePath) ?? 0) + 1);
-    });
-
     // Convert to array format: [{ user_id, email, business_name, pages: [{ page_path, count }] }]
     const result = Array.from(userPageMap.entries()).map(([userId, pageMap]) => {
       const userInfo = userMap.get(userId) ?? { email: "Unknown", business_name: "" };
@@ -10,6 +10,10 @@ const SERVICE_ROLE_KEY = Deno.env.get("SUPABASE_SERVICE_ROLE_KEY") ?? "";
 // Cleanup threshold: 48 hours in milliseconds
 const CLEANUP_THRESHOLD_MS = 48 * 60 * 60 * 1000;
 
+// auth.admin.listUsers page size, and how many deletions run at once
+const LIST_PAGE_SIZE = 500;
+const DELETE_CONCURRENCY = 5;
+
 const corsHeaders = {
   "Access-Control-Allow-Origin": "*",
   "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type",
@@ -41,56 +45,78 @@ Deno.serve(async (req) => {
     const cutoffDate = new Date(Date.now() - CLEANUP_THRESHOLD_MS);
     console.log("[cleanup] Cutoff date:", cutoffDate.toISOString());
 
-    // Get all users via admin API
-    const { data: authData, error: listError } = await supabase.auth.admin.listUsers();
-    
-    if (listError) {
-      console.error("[cleanup] Failed to list users:", listError);
-      return new Response(JSON.stringify({ error: listError.message }), {
-        status: 500,
-        headers: { ...corsHeaders, "Content-Type": "application/json" },
-      });
+    // POST {"dry_run": true} only reports the candidates
+    let dryRun = false;
+    if (req.method === "POST") {
+      try {
+        dryRun = (await req.json())?.dry_run === true;
+      } catch {
+        // Empty body (pg_cron call)
+      }
     }
 
-    const users = authData?.users ?? [];
-    console.log("[cleanup] Total users:", users.length);
+    // Scan auth users page by page; candidates are collected first and deleted after the scan,
+    // since deleting while paging would shift later users onto pages already read
+    const unverifiedToDelete: { id: string; email: string }[] = [];
+    let totalUsers = 0;
 
-    // Filter unverified users older than threshold
-    const unverifiedToDelete = users.filter((user) => {
-      // Skip if email is verified
-      if (user.email_confirmed_at) {
-        return false;
+    for (let page = 1; ; page++) {
+      const { data: authData, error: listError } = await supabase.auth.admin.listUsers({
+        page,
+        perPage: LIST_PAGE_SIZE,
+      });
+
+      if (listError) {
+        console.error("[cleanup] Failed to list users:", listError);
+        return new Response(JSON.stringify({ error: listError.message }), {
+          status: 500,
+          headers: { ...corsHeaders, "Content-Type": "application/json" },
+        });
       }
-      
-      // Check if user was created before cutoff
-      const createdAt = new Date(user.created_at);
-      return createdAt < cutoffDate;
-    });
 
+      const users = authData?.users ?? [];
+      totalUsers += users.length;
+
+      // Unverified users created before the cutoff
+      const candidates = users.filter((user) => !user.email_confirmed_at && new Date(user.created_at) < cutoffDate);
+      for (const user of candidates) {
+        unverifiedToDelete.push({ id: user.id, email: user.email ?? "" });
+      }
+      console.log("[cleanup] Page", page, "users:", users.length, "candidates:", candidates.length);
+
+      if (users.length < LIST_PAGE_SIZE) break;
+    }
+
+    console.log("[cleanup] Total users:", totalUsers);
     console.log("[cleanup] Unverified users to delete:", unverifiedToDelete.length);
 
-    // Delete each unverified user
+    // Delete in batches of DELETE_CONCURRENCY concurrent requests
     const results = {
       deleted: [] as string[],
       failed: [] as { id: string; email: string; error: string }[],
+      batches: [] as { size: number; elapsed_ms: number; max_ms: number }[],
     };
 
-    for (const user of unverifiedToDelete) {
-      console.log("[cleanup] Deleting user:", user.id, user.email);
-      
-      const { error: deleteError } = await supabase.auth.admin.deleteUser(user.id);
-      
-      if (deleteError) {
-        console.error("[cleanup] Failed to delete user:", user.id, deleteError);
-        results.failed.push({
-          id: user.id,
-          email: user.email ?? "",
-          error: deleteError.message,
-        });
-      } else {
-        console.log("[cleanup] Successfully deleted user:", user.id);
-        results.deleted.push(user.id);
-      }
+    for (let i = 0; !dryRun && i < unverifiedToDelete.length; i += DELETE_CONCURRENCY) {
+      const batch = unverifiedToDelete.slice(i, i + DELETE_CONCURRENCY);
+      const batchStart = Date.now();
+
+      const latencies = await Promise.all(batch.map(async (user) => {
+        const started = Date.now();
+        const { error: deleteError } = await supabase.auth.admin.deleteUser(user.id);
+
+        if (deleteError) {
+          console.error("[cleanup] Failed to delete user:", user.id, deleteError);
+          results.failed.push({ id: user.id, email: user.email, error: deleteError.message });
+        } else {
+          results.deleted.push(user.id);
+        }
+        return Date.now() - started;
+      }));
+
+      const elapsed = Date.now() - batchStart;
+      results.batches.push({ size: batch.length, elapsed_ms: elapsed, max_ms: Math.max(...latencies) });
+      console.log("[cleanup] Batch", results.batches.length, "size:", batch.length, "in", elapsed, "ms (slowest", Math.max(...latencies), "ms)");
     }
 
     console.log("[cleanup] Cleanup complete. Deleted:", results.deleted.length, "Failed:", results.failed.length);
@@ -99,11 +125,15 @@ Deno.serve(async (req) => {
       success: true,
       threshold_hours: 48,
       cutoff_date: cutoffDate.toISOString(),
-      total_users: users.length,
+      dry_run: dryRun,
+      total_users: totalUsers,
+      candidate_count: unverifiedToDelete.length,
+      candidates: dryRun ? unverifiedToDelete : undefined,
       deleted_count: results.deleted.length,
       failed_count: results.failed.length,
       deleted: results.deleted,
       failed: results.failed,
+      batches: results.batches,
     }), {
       status: 200,
       headers: { ...corsHeaders, "Content-Type": "application/json" },
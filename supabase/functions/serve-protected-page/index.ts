@@ -1,6 +1,6 @@
 // Supabase Edge Function: serve-protected-page
 // Serves protected HTML pages only to authenticated users with proper permissions
-// Optimized with in-memory caching for faster responses
+// Optimized with in-memory caching and pre-compressed (br/gzip) variants for faster responses
 
 import { createClient } from "jsr:@supabase/supabase-js@2";
 
@@ -19,10 +19,175 @@ const PROTECTED_PAGES: Record<string, { permission: "column" | "beam"; file: str
   "composite-castellatedbeam-design-calculator": { permission: "beam", file: "composite-castellatedbeam-design-calculator.html" },
 };
 
-// In-memory cache for HTML content (persists across warm invocations)
-const pageCache: Map<string, { content: string; timestamp: number }> = new Map();
+// In-memory cache for page bytes per stored variant (persists across warm invocations)
+// body === null records a variant that is not in Storage (e.g. .br when brotli wasn't available at build time)
+const pageCache: Map<string, { body: Uint8Array | null; etag: string; timestamp: number }> = new Map();
 const CACHE_TTL_MS = 5 * 60 * 1000; // 5 minutes cache
 
+// Pre-compressed variants written by scripts/build-protected-pages.py, in order of preference
+const ENCODED_VARIANTS: { encoding: string; suffix: string }[] = [
+  { encoding: "br", suffix: ".br" },
+  { encoding: "gzip", suffix: ".gz" },
+];
+
+// Shared-code chunks written by scripts/bundle-protected-pages.py (content-hash names, never change)
+const CHUNK_NAME_RE = /^chunk-[0-9a-f]{16}\.js$/;
+
+// chunk name -> storage files of the pages that load it (written by scripts/build-protected-pages.py)
+const CHUNK_PAGES_FILE = "chunk-pages.json";
+// An unknown chunk re-reads the map (it may have been uploaded after the cached copy), at most this often
+const CHUNK_PAGES_REFRESH_MS = 10 * 1000;
+let chunkPages: { etag: string; owners: Record<string, string[]> } | null = null;
+
+function acceptedEncodings(req: Request): Set<string> {
+  const accepted = new Set<string>();
+  for (const part of (req.headers.get("Accept-Encoding") || "").split(",")) {
+    const [name, ...params] = part.trim().toLowerCase().split(";");
+    const q = params.map((p) => p.trim()).find((p) => p.startsWith("q="));
+    if (name && !(q && parseFloat(q.slice(2)) === 0)) {
+      accepted.add(name);
+    }
+  }
+  return accepted;
+}
+
+// Same content-hash ETag as the build manifest: first 32 hex chars of SHA-256 of the served bytes
+async function contentEtag(body: Uint8Array): Promise<string> {
+  const digest = new Uint8Array(await crypto.subtle.digest("SHA-256", body));
+  const hex = Array.from(digest, (b) => b.toString(16).padStart(2, "0")).join("");
+  return `"${hex.slice(0, 32)}"`;
+}
+
+async function loadVariant(
+  supabase: ReturnType<typeof createClient>,
+  path: string,
+  now: number,
+  rememberMissing: boolean,
+) {
+  const cached = pageCache.get(path);
+  if (cached && (now - cached.timestamp) < CACHE_TTL_MS) {
+    console.log(`Cache hit for ${path}`);
+    return cached;
+  }
+
+  console.log(`Cache miss for ${path}, fetching from Storage`);
+  const { data: fileData, error: fileError } = await supabase
+    .storage
+    .from("protected-pages")
+    .download(path);
+
+  let entry: { body: Uint8Array | null; etag: string; timestamp: number };
+  if (fileError || !fileData) {
+    entry = { body: null, etag: "", timestamp: now };
+    if (!rememberMissing) {
+      console.error("File fetch error:", fileError);
+      return entry;
+    }
+  } else {
+    const body = new Uint8Array(await fileData.arrayBuffer());
+    entry = { body, etag: await contentEtag(body), timestamp: now };
+  }
+  pageCache.set(path, entry);
+  return entry;
+}
+
+async function loadChunkPages(supabase: ReturnType<typeof createClient>, now: number) {
+  const entry = await loadVariant(supabase, CHUNK_PAGES_FILE, now, false);
+  if (!entry.body) {
+    return {};
+  }
+  if (chunkPages?.etag !== entry.etag) {
+    try {
+      chunkPages = { etag: entry.etag, owners: JSON.parse(new TextDecoder().decode(entry.body)) };
+    } catch (parseError) {
+      console.error("Invalid chunk map:", parseError);
+      return {};
+    }
+  }
+  return chunkPages!.owners;
+}
+
+// Storage files of the pages that load a chunk (empty if the chunk is unknown)
+async function chunkOwners(supabase: ReturnType<typeof createClient>, chunk: string) {
+  const now = Date.now();
+  let owners = await loadChunkPages(supabase, now);
+  const cached = pageCache.get(CHUNK_PAGES_FILE);
+  if (!owners[chunk] && cached && (now - cached.timestamp) >= CHUNK_PAGES_REFRESH_MS) {
+    pageCache.delete(CHUNK_PAGES_FILE);
+    owners = await loadChunkPages(supabase, now);
+  }
+  return owners[chunk] || [];
+}
+
+function canOpen(
+  profile: { role: string; access_beam: boolean; access_column: boolean },
+  permission: "column" | "beam",
+) {
+  return profile.role === "admin" ||
+    (permission === "column" && profile.access_column) ||
+    (permission === "beam" && profile.access_beam);
+}
+
+// Serve a stored object: prefer a pre-compressed variant the client accepts, fall back to the plain file
+async function serveStored(
+  req: Request,
+  supabase: ReturnType<typeof createClient>,
+  file: string,
+  contentType: string,
+  cacheControl: string,
+) {
+  const now = Date.now();
+  const accepted = acceptedEncodings(req);
+  let page: { body: Uint8Array | null; etag: string } | null = null;
+  let contentEncoding: string | null = null;
+
+  for (const variant of ENCODED_VARIANTS) {
+    if (!accepted.has(variant.encoding)) continue;
+    const entry = await loadVariant(supabase, file + variant.suffix, now, true);
+    if (entry.body) {
+      page = entry;
+      contentEncoding = variant.encoding;
+      break;
+    }
+  }
+
+  if (!page) {
+    page = await loadVariant(supabase, file, now, false);
+  }
+
+  if (!page.body) {
+    return new Response(JSON.stringify({ 
+      error: "not_found", 
+      message: "페이지를 찾을 수 없습니다" 
+    }), { 
+      status: 404, 
+      headers: { ...corsHeaders, "Content-Type": "application/json" } 
+    });
+  }
+
+  const responseHeaders: Record<string, string> = {
+    ...corsHeaders,
+    "Content-Type": contentType,
+    "Cache-Control": cacheControl,
+    "ETag": page.etag,
+    "Vary": "Accept-Encoding",
+  };
+  if (contentEncoding) {
+    responseHeaders["Content-Encoding"] = contentEncoding;
+  }
+
+  // Revalidation (GET with If-None-Match): the caller has already run the permission checks
+  const ifNoneMatch = req.headers.get("If-None-Match");
+  if (ifNoneMatch && ifNoneMatch.split(",").some((tag) => tag.trim() === page!.etag)) {
+    return new Response(null, { status: 304, headers: responseHeaders });
+  }
+
+  return new Response(page.body, {
+    status: 200,
+    headers: responseHeaders,
+  });
+}
+
 // Reuse Supabase client (avoid recreating on each request)
 let supabaseClient: ReturnType<typeof createClient> | null = null;
 
@@ -42,13 +207,15 @@ Deno.serve(async (req) => {
   }
 
   try {
-    // Get page ID from body (POST) or query params (GET)
+    // Get page ID (or shared chunk name) from body (POST) or query params (GET)
     let pageId: string | null = null;
+    let chunk: string | null = null;
     
     if (req.method === "POST") {
       try {
         const body = await req.json();
         pageId = body.page || null;
+        chunk = body.chunk || null;
       } catch (jsonError) {
         return new Response(JSON.stringify({ 
           error: "bad_request", 
@@ -61,9 +228,10 @@ Deno.serve(async (req) => {
     } else {
       const url = new URL(req.url);
       pageId = url.searchParams.get("page");
+      chunk = url.searchParams.get("chunk");
     }
 
-    if (!pageId || !PROTECTED_PAGES[pageId]) {
+    if (chunk ? !CHUNK_NAME_RE.test(chunk) : (!pageId || !PROTECTED_PAGES[pageId])) {
       return new Response("Page not found", { 
         status: 404, 
         headers: { ...corsHeaders, "Content-Type": "text/plain" } 
@@ -127,13 +295,35 @@ Deno.serve(async (req) => {
       });
     }
 
-    // Check specific permission
-    const pageConfig = PROTECTED_PAGES[pageId];
-    const hasPermission = profile.role === "admin" || 
-      (pageConfig.permission === "column" && profile.access_column) ||
-      (pageConfig.permission === "beam" && profile.access_beam);
+    // Shared chunks hold code common to several pages: served only to users who may open
+    // at least one of those pages. The name is a content hash, so browsers may keep them indefinitely.
+    if (chunk) {
+      const owners = await chunkOwners(supabase, chunk);
+      if (!owners.length) {
+        return new Response("Page not found", { 
+          status: 404, 
+          headers: { ...corsHeaders, "Content-Type": "text/plain" } 
+        });
+      }
+      const allowed = Object.values(PROTECTED_PAGES)
+        .some((page) => owners.includes(page.file) && canOpen(profile, page.permission));
+      if (!allowed) {
+        return new Response(JSON.stringify({ 
+          error: "forbidden", 
+          message: "기능 사용 권한이 없습니다. 관리자에게 문의하세요." 
+        }), { 
+          status: 403, 
+          headers: { ...corsHeaders, "Content-Type": "application/json" } 
+        });
+      }
+      return await serveStored(
+        req, supabase, chunk, "application/javascript; charset=utf-8", "private, max-age=31536000, immutable",
+      );
+    }
 
-    if (!hasPermission) {
+    // Check specific permission
+    const pageConfig = PROTECTED_PAGES[pageId!];
+    if (!canOpen(profile, pageConfig.permission)) {
       return new Response(JSON.stringify({ 
         error: "forbidden", 
         message: `${pageConfig.permission === "column" ? "Cross-H Column" : "Beam"} 기능 사용 권한이 없습니다. 관리자에게 문의하세요.` 
@@ -148,7 +338,7 @@ Deno.serve(async (req) => {
       .from("usage_logs")
       .insert({
         user_id: user.id,
-        feature_name: pageId,
+        feature_name: pageId!,
         metadata: { page_file: pageConfig.file },
       })
       .then(({ error }) => {
@@ -158,49 +348,10 @@ Deno.serve(async (req) => {
       });
 
     // User is authorized - get page from cache or Storage
-    const cacheKey = pageConfig.file;
-    const cached = pageCache.get(cacheKey);
-    const now = Date.now();
-    
-    let htmlContent: string;
-    
-    if (cached && (now - cached.timestamp) < CACHE_TTL_MS) {
-      // Use cached content
-      htmlContent = cached.content;
-      console.log(`Cache hit for ${cacheKey}`);
-    } else {
-      // Fetch from Storage
-      console.log(`Cache miss for ${cacheKey}, fetching from Storage`);
-      const { data: fileData, error: fileError } = await supabase
-        .storage
-        .from("protected-pages")
-        .download(pageConfig.file);
-
-      if (fileError || !fileData) {
-        console.error("File fetch error:", fileError);
-        return new Response(JSON.stringify({ 
-          error: "not_found", 
-          message: "페이지를 찾을 수 없습니다" 
-        }), { 
-          status: 404, 
-          headers: { ...corsHeaders, "Content-Type": "application/json" } 
-        });
-      }
-
-      htmlContent = await fileData.text();
-      
-      // Store in cache
-      pageCache.set(cacheKey, { content: htmlContent, timestamp: now });
-    }
-
-    return new Response(htmlContent, {
-      status: 200,
-      headers: {
-        ...corsHeaders,
-        "Content-Type": "text/html; charset=utf-8",
-        "Cache-Control": "no-store, no-cache, must-revalidate",
-      },
-    });
+    // Pages must not be kept in browser or proxy caches (permissions can be revoked at any time)
+    return await serveStored(
+      req, supabase, pageConfig.file, "text/html; charset=utf-8", "no-store, no-cache, must-revalidate",
+    );
 
   } catch (error) {
     console.error("Error:", error);
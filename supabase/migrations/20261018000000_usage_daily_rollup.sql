@@ -0,0 +1,91 @@
+-- Migration: Daily usage rollup
+--
+-- Changes:
+-- 1. usage_daily_stats: per-day / per-user / per-feature page-open counts
+--    (filled by scripts/rollup-usage-logs.py, read by admin-users get_page_usage_stats)
+-- 2. usage_rollup_state: keyset watermark (accessed_at, id) of the last rolled-up usage_logs row
+-- 3. apply_usage_rollup(): adds one batch of counts and advances the watermark in a single
+--    transaction, so a batch is counted exactly once even if the job is interrupted or re-run
+--
+-- Days are UTC dates of accessed_at. Rows with a NULL accessed_at or user_id are not counted.
+
+-- ============================================
+-- Aggregate table
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS public.usage_daily_stats (
+    day date NOT NULL,
+    user_id uuid NOT NULL,
+    feature_name text NOT NULL,
+    count integer NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, user_id, feature_name),
+    -- Same lifetime as the usage_logs rows it summarises
+    FOREIGN KEY (user_id) REFERENCES auth.users(id) ON DELETE CASCADE
+);
+
+ALTER TABLE public.usage_daily_stats ENABLE ROW LEVEL SECURITY;
+-- No policies: only the service role (admin-users, rollup job) reads or writes it
+
+
+-- ============================================
+-- Watermark
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS public.usage_rollup_state (
+    name text PRIMARY KEY,
+    last_accessed_at timestamp with time zone,
+    last_id uuid,
+    rows_processed bigint NOT NULL DEFAULT 0,
+    updated_at timestamp with time zone DEFAULT now()
+);
+
+ALTER TABLE public.usage_rollup_state ENABLE ROW LEVEL SECURITY;
+
+
+-- ============================================
+-- Apply one batch
+-- ============================================
+-- counts: [{"day": "2026-10-18", "user_id": "...", "feature_name": "...", "count": 3}, ...]
+-- expected_at / expected_id: the watermark the batch was read after (NULL for the first run).
+-- Raises if another run moved the watermark in the meantime, so counts are never added twice.
+
+CREATE OR REPLACE FUNCTION public.apply_usage_rollup(
+    rollup_name text,
+    counts jsonb,
+    expected_at timestamp with time zone,
+    expected_id uuid,
+    new_at timestamp with time zone,
+    new_id uuid,
+    batch_rows integer
+) RETURNS void
+    LANGUAGE plpgsql SECURITY DEFINER
+    SET search_path = public
+    AS $$
+DECLARE
+    current_state usage_rollup_state%ROWTYPE;
+BEGIN
+    INSERT INTO usage_rollup_state (name) VALUES (rollup_name) ON CONFLICT (name) DO NOTHING;
+
+    SELECT * INTO current_state FROM usage_rollup_state WHERE name = rollup_name FOR UPDATE;
+    IF current_state.last_accessed_at IS DISTINCT FROM expected_at
+       OR current_state.last_id IS DISTINCT FROM expected_id THEN
+        RAISE EXCEPTION 'usage rollup watermark moved (expected %, %; found %, %)',
+            expected_at, expected_id, current_state.last_accessed_at, current_state.last_id;
+    END IF;
+
+    INSERT INTO usage_daily_stats (day, user_id, feature_name, count)
+    SELECT (c->>'day')::date, (c->>'user_id')::uuid, c->>'feature_name', (c->>'count')::integer
+    FROM jsonb_array_elements(counts) AS c
+    ON CONFLICT (day, user_id, feature_name)
+    DO UPDATE SET count = usage_daily_stats.count + EXCLUDED.count;
+
+    UPDATE usage_rollup_state
+    SET last_accessed_at = new_at,
+        last_id = new_id,
+        rows_processed = rows_processed + batch_rows,
+        updated_at = now()
+    WHERE name = rollup_name;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.apply_usage_rollup(text, jsonb, timestamp with time zone, uuid, timestamp with time zone, uuid, integer) FROM PUBLIC, anon, authenticated;
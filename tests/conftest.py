@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""pytest 공통 설정
+- assets/castillated beam python 을 import 경로에 추가, scripts/*.py 는 경로로 읽기
+- 외부 서비스 대신 쓰는 로컬 HTTP 스텁 서버
+"""
+
+import importlib.util
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+PYTHON_DIR = ROOT / "assets" / "castillated beam python"
+SCRIPTS_DIR = ROOT / "scripts"
+
+sys.path.insert(0, str(PYTHON_DIR))
+
+
+def load_script(name):
+    """scripts/<name>.py (이름에 '-' 가 있어 import 불가) 를 모듈로 읽기"""
+    path = SCRIPTS_DIR / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def script():
+    return load_script
+
+
+class StubServer:
+    """로컬 http.server 스텁: handler(method, path, headers, body) → (status, payload[, headers])
+
+    payload 가 bytes 가 아니면 JSON 으로 보냅니다. 받은 요청은 requests 에 (method, path, body) 로 기록.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            wbufsize = 64 * 1024             # 헤더와 본문을 한 번에 보냄 (keep-alive 지연 방지)
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                stub.requests.append((self.command, self.path, body))
+                status, payload, *extra = stub.handler(self.command, self.path, self.headers, body)
+                headers = extra[0] if extra else {}
+                if not isinstance(payload, bytes):
+                    payload = json.dumps(payload).encode("utf-8")
+                    headers.setdefault("Content-Type", "application/json")
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def http_stub():
+    servers = []
+
+    def start(handler):
+        server = StubServer(handler)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""build-protected-pages.py: 공유 코드 chunk 와 chunk-pages.json (chunk → 페이지)"""
+
+import json
+
+SHARED = "function shared() {\n" + "".join(f"  var v{i} = {i} * 2;\n" for i in range(60)) + "  return v0;\n}\n"
+
+
+def page(name):
+    return (f"<html><body><h1>{name}</h1>\n<script>\n{SHARED}"
+            f"function only_{name}() {{ return shared() + 1; }}\n</script></body></html>\n")
+
+
+def test_chunk_pages_lists_owner_pages(script, tmp_path, monkeypatch):
+    builder = script("build-protected-pages")
+    (tmp_path / "dev").mkdir()
+    for name in ("a", "b", "c"):
+        html = page(name) if name != "c" else "<html><body><script>function c() {}</script></body></html>\n"
+        (tmp_path / "dev" / f"{name}.html").write_text(html, encoding="utf-8")
+    monkeypatch.setattr(builder, "PROJECT_ROOT", tmp_path)
+    files = [{"local_path": f"dev/{n}.html", "storage_path": f"{n}.html"} for n in ("a", "b", "c")]
+
+    out = tmp_path / "build"
+    manifest = builder.build_all(files, out)
+    chunks = [name for name, entry in manifest.items() if entry["source"] == "bundle"]
+    assert len(chunks) == 1
+
+    chunk_pages = json.loads((out / builder.CHUNK_PAGES_NAME).read_text(encoding="utf-8"))
+    assert chunk_pages == {chunks[0]: ["a.html", "b.html"]}
+    assert chunks[0] in (out / "a.html").read_text(encoding="utf-8")
+    assert chunks[0] not in (out / "c.html").read_text(encoding="utf-8")
+
+    # chunk 가 없어져도 파일은 다시 쓰여 (업로드되어) 예전 소유 페이지가 남지 않음
+    builder.build_all(files, out, bundle=False)
+    assert json.loads((out / builder.CHUNK_PAGES_NAME).read_text(encoding="utf-8")) == {}
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""castillated_store: 기록 중인 저장소를 읽기 전용으로 열어도 파일을 바꾸지 않는지 확인"""
+
+import numpy as np
+
+from castillated_store import RECORD_DTYPE, SweepStore
+
+
+def chunk(n, start=0, section=0):
+    records = np.zeros(n, dtype=RECORD_DTYPE)
+    records["section"] = section
+    records["L"] = 13.5
+    records["e"] = np.arange(start, start + n, dtype=float)
+    records["weight"] = 1000.0 + records["e"]
+    records["UR_gov"] = np.linspace(0.5, 1.2, n)
+    records["buckling_ok"] = records["UR_gov"] <= 1.0
+    return records
+
+
+def file_sizes(path):
+    return {f.name: f.stat().st_size for f in sorted(path.glob("*.bin"))}
+
+
+def test_reader_does_not_truncate_writer(tmp_path):
+    path = tmp_path / "sweep"
+    writer = SweepStore.create(path, sections=["A", "B"])
+    writer.append(chunk(100))
+
+    # 쓰는 도중 (열 데이터는 썼고 meta.json 은 아직): 읽기 전용 열기는 파일을 그대로 둠
+    partial = chunk(50, start=900)
+    for name in RECORD_DTYPE.names:
+        with open(path / f"{name}.bin", "ab") as f:
+            f.write(partial[name].tobytes())
+    before = file_sizes(path)
+
+    reader = SweepStore(path)
+    assert len(reader) == 100
+    assert len(reader.query(ur_max=1.0)) == int(chunk(100)["buckling_ok"].sum())
+    reader.summary()
+    assert file_sizes(path) == before
+
+    # writer 는 meta.json 의 행 수 위치부터 이어서 기록 (쓰다 만 데이터는 덮어쓰고 잘라냄)
+    writer.append(chunk(30, start=100, section=1))
+    reader = SweepStore(path)
+    assert len(reader) == 130
+    assert np.array_equal(reader.column("e")[:], np.arange(130, dtype=float))
+    assert reader.summary()["sections"] == {"A": 100, "B": 30}
+    assert (path / "e.bin").stat().st_size == 130 * RECORD_DTYPE["e"].itemsize
+
+
+def test_interrupted_write_is_trimmed_on_next_append(tmp_path):
+    path = tmp_path / "sweep"
+    SweepStore.create(path).append(chunk(10))
+    with open(path / "e.bin", "ab") as f:
+        f.write(b"\0" * 64)                     # 중단된 청크의 일부
+
+    store = SweepStore(path)
+    store.append(chunk(5, start=10))
+    assert len(store) == 15
+    assert (path / "e.bin").stat().st_size == 15 * RECORD_DTYPE["e"].itemsize
+    assert np.array_equal(SweepStore(path).column("e")[:], np.arange(15, dtype=float))
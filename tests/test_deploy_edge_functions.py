@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""deploy-edge-functions.py 를 PATH 의 스텁 supabase CLI 로 실행"""
+
+import os
+import sys
+
+import pytest
+
+STUB_CLI = """#!{python}
+import os, sys
+with open(os.environ["STUB_SUPABASE_LOG"], "a") as f:
+    f.write(" ".join(sys.argv[1:]) + "\\n")
+name = sys.argv[3]
+print(f"Bundling {{name}}")
+sys.exit(1 if name in os.environ.get("STUB_SUPABASE_FAIL", "").split(",") else 0)
+"""
+
+
+@pytest.fixture
+def deployer(script, tmp_path, monkeypatch):
+    module = script("deploy-edge-functions")
+    functions = tmp_path / "supabase" / "functions"
+    for name in ("alpha", "beta"):
+        (functions / name).mkdir(parents=True)
+    (functions / "alpha" / "index.ts").write_text('import { x } from "../_shared/util.ts";\n', encoding="utf-8")
+    (functions / "beta" / "index.ts").write_text("Deno.serve(() => new Response('b'));\n", encoding="utf-8")
+    (functions / "_shared").mkdir()
+    (functions / "_shared" / "util.ts").write_text("export const x = 1;\n", encoding="utf-8")
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    cli = bin_dir / "supabase"
+    cli.write_text(STUB_CLI.format(python=sys.executable), encoding="utf-8")
+    cli.chmod(0o755)
+    log = tmp_path / "supabase.log"
+    log.touch()
+
+    monkeypatch.setattr(module, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(module, "FUNCTIONS_DIR", functions)
+    monkeypatch.setattr(module, "MANIFEST_PATH", tmp_path / ".edge-functions-manifest.json")
+    monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+    monkeypatch.setenv("SUPABASE_PROJECT_REF", "stubref")
+    monkeypatch.setenv("STUB_SUPABASE_LOG", str(log))
+    monkeypatch.delenv("STUB_SUPABASE_FAIL", raising=False)
+
+    def run(*args):
+        log.write_text("")
+        monkeypatch.setattr(sys, "argv", ["deploy-edge-functions.py", *args])
+        with pytest.raises(SystemExit) as exit_info:
+            module.main()
+        return exit_info.value.code, sorted(log.read_text().splitlines())
+
+    run.functions = functions
+    return run
+
+
+def test_deploys_changed_functions_only(deployer):
+    code, calls = deployer()
+    assert code == 0
+    assert calls == [
+        "functions deploy alpha --project-ref stubref --no-verify-jwt",
+        "functions deploy beta --project-ref stubref --no-verify-jwt",
+    ]
+
+    assert deployer() == (0, [])
+
+    # 공유 모듈만 바뀌어도 그것을 import 하는 함수는 다시 배포
+    (deployer.functions / "_shared" / "util.ts").write_text("export const x = 2;\n", encoding="utf-8")
+    code, calls = deployer()
+    assert code == 0
+    assert calls == ["functions deploy alpha --project-ref stubref --no-verify-jwt"]
+
+
+def test_named_force_and_dry_run(deployer):
+    assert deployer()[0] == 0
+    assert deployer("beta")[1] == ["functions deploy beta --project-ref stubref --no-verify-jwt"]
+    assert len(deployer("--force")[1]) == 2
+    (deployer.functions / "beta" / "index.ts").write_text("// changed\n", encoding="utf-8")
+    assert deployer("--dry-run") == (0, [])
+
+
+def test_failed_deploy_is_retried(deployer, monkeypatch):
+    monkeypatch.setenv("STUB_SUPABASE_FAIL", "beta")
+    code, calls = deployer()
+    assert code == 1
+    assert len(calls) == 2
+
+    monkeypatch.setenv("STUB_SUPABASE_FAIL", "")
+    code, calls = deployer()
+    assert code == 0
+    assert calls == ["functions deploy beta --project-ref stubref --no-verify-jwt"]
+
+
+def test_unknown_function(deployer):
+    assert deployer("gamma") == (1, [])
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""kcol_boq: 기본값은 웹 generateBOQWithLengths 와 같이 기둥명을 전부 보관"""
+
+from kcol_boq import ColumnBOQ
+
+
+def result(name):
+    return {"name": name, "combination": "조합1", "h": 500, "b": 500, "tw": 12, "tf": 20, "area": 30000,
+            "unit_weight": 235.5, "steel_grade": "SM355", "H1": 500, "H2": 500, "B1": 500, "B2": 500}
+
+
+def test_default_keeps_every_column_name():
+    names = [f"KC{i}" for i in range(1, 121)]
+    boq = ColumnBOQ({n: (1, 0, 0, 0) for n in names}).extend(result(n) for n in names)
+    (item,) = boq.items
+    assert item.count == 120
+    assert item.names.join() == ", ".join(f"{n}-Type1" for n in names)
+
+
+def test_max_names_is_opt_in_display_limit():
+    names = [f"KC{i}" for i in range(1, 61)]
+    boq = ColumnBOQ({n: (1, 0, 0, 0) for n in names}, max_names=50).extend(result(n) for n in names)
+    (item,) = boq.items
+    assert len(item.names) == 60
+    assert item.names.join().endswith("KC50-Type1 외 10개")
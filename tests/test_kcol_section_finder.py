@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""kcol_section_finder: bisect 탐색이 grid (전체 후보) 와 같은 단면을 고르는지 확인"""
+
+import numpy as np
+
+import kcol_section_finder as ksf
+
+
+def make_row(i, pu, mux, muy, lx=4.5, ly=4.5, kx=1.0, ky=1.0):
+    return {"no": i, "name": f"KC{i}", "pu": pu, "mux": mux, "muy": muy,
+            "lx": lx, "ly": ly, "kx": kx, "ky": ky}
+
+
+def random_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        make_row(i + 1,
+                 pu=round(float(rng.uniform(-100.0, 8000.0)), 1),
+                 mux=round(float(rng.uniform(-1500.0, 1500.0)), 1),
+                 muy=round(float(rng.uniform(-800.0, 800.0)), 1),
+                 lx=float(rng.choice([3.0, 4.5, 6.0, 9.0, 12.0])),
+                 ly=float(rng.choice([3.0, 4.5, 6.0, 9.0])),
+                 kx=float(rng.choice([0.8, 1.0, 2.0])),
+                 ky=float(rng.choice([0.8, 1.0, 2.0])))
+        for i in range(n)
+    ]
+
+
+def test_crosscheck_negative_moments():
+    # 음수 모멘트: tf 가 커지면 P-M-M 이 0 이하가 되어 다시 불통과 (bisect 단조 가정이 깨지는 행)
+    rows = [make_row(1, pu=464.8, mux=-301.9, muy=-44.3, lx=12, ly=6, kx=2, ky=0.8)]
+    checked = ksf.run(rows, workers=1, crosscheck=True)
+    grid = ksf.run(rows, workers=1, search="grid")
+    assert checked == grid
+
+
+def test_crosscheck_signed_rows_match_grid():
+    rows = random_rows(600)
+    checked = ksf.run(rows, workers=1, crosscheck=True)
+    grid = ksf.run(rows, workers=1, search="grid")
+    assert checked == grid
+
+
+def test_bisect_matches_grid_positive_rows():
+    rows = [dict(r, mux=abs(r["mux"]), muy=abs(r["muy"]), pu=abs(r["pu"]) + 1.0)
+            for r in random_rows(300, seed=1)]
+    assert ksf.run(rows, workers=1) == ksf.run(rows, workers=1, search="grid")
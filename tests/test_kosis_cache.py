@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""kosis-cache.py 를 로컬 KOSIS 스텁 (KOSIS_ENDPOINT) 에 대해 실행"""
+
+import json
+import sys
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+ITEMS = ("T10", "T20")
+
+
+def months_back(period, n):
+    year, month = divmod(int(period[:4]) * 12 + int(period[4:]) - 1 - n, 12)
+    return f"{year}{month + 1:02d}"
+
+
+class FakeKosis:
+    """월별 표 하나: 2개 항목 × (first ~ published) 기간, kosis.kr 또는 data.go.kr 형식
+
+    data.go.kr 는 기간 요청도 numOfRows (기본 10, 상한 max_rows) / pageNo 로 잘라서 반환
+    """
+
+    def __init__(self, published):
+        self.first = months_back(published, 36)
+        self.published = published
+        self.max_rows = 1000
+        self.queries = []
+
+    def periods(self):
+        p, out = self.first, []
+        while p <= self.published:
+            out.append(p)
+            p = months_back(p, -1)
+        return out
+
+    def __call__(self, method, path, headers, body):
+        q = {k: v[0] for k, v in parse_qs(urlsplit(path).query).items()}
+        self.queries.append(q)
+        periods = self.periods()
+        if "startPrdDe" in q:
+            periods = [p for p in periods if q["startPrdDe"] <= p <= q["endPrdDe"]]
+        else:
+            periods = periods[-int(q.get("newEstPrdCnt") or q["numOfRows"]):]
+        rows = [{"ORG_ID": q["orgId"], "TBL_ID": q["tblId"], "ITM_ID": item, "C1": "00",
+                 "PRD_SE": q["prdSe"], "PRD_DE": p, "DT": str(int(p) % 1000 + i)}
+                for p in periods for i, item in enumerate(ITEMS)]
+        if "serviceKey" in q:
+            total = len(rows)
+            if "startPrdDe" in q:
+                size = min(int(q.get("numOfRows", 10)), self.max_rows)
+                page = int(q.get("pageNo", 1))
+                rows = rows[(page - 1) * size:page * size]
+            return 200, {"response": {"body": {"items": {"item": rows}, "totalCount": total}}}
+        if not rows:
+            return 200, {"err": "30", "errMsg": "데이터가 존재하지 않습니다."}
+        return 200, rows
+
+
+@pytest.fixture
+def kosis(script, http_stub, tmp_path, monkeypatch):
+    current = f"{date.today().year}{date.today().month:02d}"
+    upstream = FakeKosis(months_back(current, 2))
+    server = http_stub(upstream)
+    module = script("kosis-cache")
+    monkeypatch.setattr(module, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setenv("KOSIS_ENDPOINT", f"{server.url}/openapi/statisticsData.do")
+    monkeypatch.setenv("KOSIS_API_KEY", "test-key")
+    monkeypatch.delenv("KOSIS_SERVICE_KEY", raising=False)
+    db = tmp_path / "kosis.sqlite"
+
+    def run(*args):
+        monkeypatch.setattr(sys, "argv", ["kosis-cache.py", "--db", str(db), *args])
+        try:
+            module.main()
+        except SystemExit as e:
+            return e.code
+        return 0
+
+    run.module, run.upstream, run.db, run.current = module, upstream, db, current
+    return run
+
+
+def stored_periods(run):
+    conn = run.module.open_store(run.db)
+    try:
+        return [p for (p,) in conn.execute("SELECT DISTINCT prd_de FROM observations ORDER BY prd_de")]
+    finally:
+        conn.close()
+
+
+def test_fetch_is_incremental(kosis):
+    upstream = kosis.upstream
+    assert kosis("fetch", "--orgId", "101", "--tblId", "DT_1ST1501", "--rows", "6") == 0
+    assert upstream.queries[-1]["newEstPrdCnt"] == "6"
+    assert stored_periods(kosis) == upstream.periods()[-6:]
+
+    # 새로 공표된 기간만 요청
+    upstream.published = kosis.current
+    assert kosis("fetch", "--orgId", "101", "--tblId", "DT_1ST1501") == 0
+    query = upstream.queries[-1]
+    assert (query["startPrdDe"], query["endPrdDe"]) == (months_back(kosis.current, 1), kosis.current)
+    assert stored_periods(kosis) == upstream.periods()[-8:]
+
+    # 이번 달까지 저장됨: 요청 없음
+    count = len(upstream.queries)
+    assert kosis("refresh") == 0
+    assert len(upstream.queries) == count
+
+
+def test_refresh_no_new_data_and_snapshot(kosis, tmp_path):
+    upstream = kosis.upstream
+    assert kosis("fetch", "--orgId", "397", "--tblId", "DT_39701_A003", "--rows", "4") == 0
+    assert kosis("refresh") == 0                 # 아직 공표 전: err 30 → 0 행
+    assert "startPrdDe" in upstream.queries[-1]
+    assert stored_periods(kosis) == upstream.periods()[-4:]
+
+    out = tmp_path / "snapshots"
+    assert kosis("snapshot", "--out", str(out), "--rows", "3") == 0
+    (path,) = out.iterdir()
+    rows = json.loads(path.read_text(encoding="utf-8"))
+    assert [r["PRD_DE"] for r in rows] == [p for p in upstream.periods()[-3:] for _ in range(2)]
+    assert [r["ITM_ID"] for r in rows] == list(ITEMS) * 3
+
+
+def test_data_go_kr_format(kosis, monkeypatch):
+    monkeypatch.delenv("KOSIS_API_KEY")
+    monkeypatch.setenv("KOSIS_SERVICE_KEY", "gateway-key")
+    assert kosis("fetch", "--orgId", "301", "--tblId", "DT_404Y016", "--rows", "2") == 0
+    assert kosis.upstream.queries[-1]["numOfRows"] == "2"
+    assert stored_periods(kosis) == kosis.upstream.periods()[-2:]
+
+
+def test_data_go_kr_pages_new_periods(kosis, monkeypatch):
+    monkeypatch.delenv("KOSIS_API_KEY")
+    monkeypatch.setenv("KOSIS_SERVICE_KEY", "gateway-key")
+    upstream = kosis.upstream
+    upstream.published = months_back(kosis.current, 20)
+    assert kosis("fetch", "--orgId", "301", "--tblId", "DT_404Y016", "--rows", "2") == 0
+
+    # 20 개월 × 2 항목 = 40 행: 게이트웨이가 페이지를 15 행으로 제한해도 전부 저장
+    upstream.published, upstream.max_rows = kosis.current, 15
+    count = len(upstream.queries)
+    assert kosis("fetch", "--orgId", "301", "--tblId", "DT_404Y016") == 0
+    assert [q["pageNo"] for q in upstream.queries[count:]] == ["1", "2", "3"]
+    assert stored_periods(kosis) == upstream.periods()[-22:]
+
+
+def test_upstream_error_fails_the_run(kosis):
+    kosis.upstream.published = None
+    assert kosis("fetch", "--orgId", "101", "--tblId", "DT_1ST1501") == 1
+    assert stored_periods(kosis) == []
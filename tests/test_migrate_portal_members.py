@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""migrate-portal-members.py 를 Firestore 에뮬레이터에 대해 실행
+
+    firebase emulators:start --only firestore
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python -m pytest tests/test_migrate_portal_members.py
+
+FIRESTORE_EMULATOR_HOST 가 없으면 건너뜁니다.
+"""
+
+import argparse
+import os
+import uuid
+
+import pytest
+
+pytest.importorskip("firebase_admin")
+if not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+    pytest.skip("FIRESTORE_EMULATOR_HOST 가 설정되지 않음 (Firestore 에뮬레이터 필요)", allow_module_level=True)
+
+from google.cloud import firestore  # noqa: E402
+
+EMULATOR_PROJECT = "demo-kcol"
+
+
+@pytest.fixture
+def migrator(script, tmp_path, monkeypatch):
+    module = script("migrate-portal-members")
+    monkeypatch.setattr(module, "CHECKPOINT_PATH", tmp_path / ".migration-checkpoint.json")
+    return module
+
+
+@pytest.fixture
+def db():
+    return firestore.Client(project=EMULATOR_PROJECT)
+
+
+@pytest.fixture
+def options():
+    """테스트마다 다른 원본 컬렉션 (에뮬레이터 데이터 공유)"""
+    source = f"portal_members_{uuid.uuid4().hex[:8]}"
+    return argparse.Namespace(
+        source=source, target=source + "_projects/{project}/portal_members",
+        page_size=3, read_batch=2, max_ops=50, dry_run=False, restart=False,
+    )
+
+
+def add_members(db, source, ids):
+    for doc_id in ids:
+        db.collection(source).document(doc_id).set({"uid": doc_id, "role": "member"})
+
+
+def target_docs(db, options, project="P1"):
+    return {doc.id: doc.to_dict() for doc in db.collection(options.target.format(project=project)).stream()}
+
+
+def test_migrates_every_page(migrator, db, options):
+    ids = [f"user{i:02d}" for i in range(10)]
+    add_members(db, options.source, ids)
+
+    stats = migrator.migrate_project(db, "P1", options)
+    assert stats["ok"]
+    assert (stats["scanned"], stats["migrated"], stats["skipped"]) == (10, 10, 0)
+    assert target_docs(db, options) == {i: {"uid": i, "role": "member"} for i in ids}
+
+
+def test_existing_target_docs_are_skipped(migrator, db, options):
+    add_members(db, options.source, ["a", "b", "c", "d"])
+    target = db.collection(options.target.format(project="P1"))
+    target.document("b").set({"uid": "b", "role": "admin"})
+
+    stats = migrator.migrate_project(db, "P1", options)
+    assert (stats["migrated"], stats["skipped"]) == (3, 1)
+    assert target_docs(db, options)["b"]["role"] == "admin"
+
+
+def test_resumes_after_checkpoint(migrator, db, options):
+    add_members(db, options.source, ["a", "b", "c", "d", "e"])
+    key = migrator.checkpoint_key(options.source, options.target.format(project="P1"))
+    migrator.save_checkpoint(key, {"last_id": "c", "scanned": 3, "migrated": 3, "skipped": 0})
+
+    stats = migrator.migrate_project(db, "P1", options)
+    assert (stats["scanned"], stats["migrated"]) == (5, 5)
+    assert sorted(target_docs(db, options)) == ["d", "e"]
+
+
+def test_dry_run_writes_nothing(migrator, db, options):
+    add_members(db, options.source, ["a", "b"])
+    options.dry_run = True
+
+    stats = migrator.migrate_project(db, "P1", options)
+    assert stats["migrated"] == 2
+    assert target_docs(db, options) == {}
+    assert not migrator.CHECKPOINT_PATH.exists()
+
+
+def test_parallel_projects_and_delete_source(migrator, db, options):
+    add_members(db, options.source, [f"u{i}" for i in range(7)])
+    for project in ("P1", "P2"):
+        assert migrator.migrate_project(db, project, options)["migrated"] == 7
+        assert len(target_docs(db, options, project)) == 7
+
+    deleted, _, _, ok = migrator.delete_source(db, options)
+    assert ok and deleted == 7
+    assert list(db.collection(options.source).stream()) == []
+
+
+def test_rerun_after_completion_migrates_new_members(migrator, db, options):
+    # 원본을 지우지 않고 끝낸 뒤 추가된 회원 (문서 ID 는 순서 없이 생김: 마지막 ID 앞에 올 수 있음)
+    add_members(db, options.source, ["m1", "m2", "m3", "m4"])
+    assert migrator.migrate_project(db, "P1", options)["migrated"] == 4
+    assert not migrator.load_checkpoint()
+
+    add_members(db, options.source, ["a0", "z9"])
+    stats = migrator.migrate_project(db, "P1", options)
+    assert stats["ok"]
+    assert (stats["scanned"], stats["migrated"], stats["skipped"]) == (6, 2, 4)
+    assert sorted(target_docs(db, options)) == ["a0", "m1", "m2", "m3", "m4", "z9"]
+
+
+def test_interrupted_run_keeps_checkpoint(migrator, db, options):
+    add_members(db, options.source, ["a", "b", "c", "d"])
+    key = migrator.checkpoint_key(options.source, options.target.format(project="P1"))
+    failed = {"success": 0, "failed": [("d", "unavailable")], "retries": 4, "elapsed": 0.0}
+    real_bulk_apply = migrator.bulk_apply
+    calls = []
+
+    def flaky_bulk_apply(db_, operations, max_ops):
+        calls.append(len(operations))
+        return failed if len(calls) == 2 else real_bulk_apply(db_, operations, max_ops)
+
+    migrator.bulk_apply = flaky_bulk_apply
+    stats = migrator.migrate_project(db, "P1", options)
+    assert not stats["ok"]
+    assert migrator.load_checkpoint()[key]["last_id"] == "c"
+
+    migrator.bulk_apply = real_bulk_apply
+    stats = migrator.migrate_project(db, "P1", options)
+    assert stats["ok"] and stats["migrated"] == 4
+    assert not migrator.load_checkpoint()
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""reconcile-users.py 를 로컬 스텁 (GoTrue admin API + PostgREST user_profiles) 에 대해 실행"""
+
+import json
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+NOW = datetime.now(timezone.utc)
+OLD = (NOW - timedelta(hours=72)).isoformat()
+RECENT = (NOW - timedelta(hours=1)).isoformat()
+
+
+def user_id(n):
+    return str(uuid.UUID(int=n))
+
+
+class FakeSupabase:
+    """auth 사용자 목록 (page/per_page), 사용자 삭제, user_profiles 조회/수정
+
+    fail_ids 에 든 id 의 DELETE 와, 그 id 를 포함한 PATCH 는 500 으로 실패
+    """
+
+    def __init__(self):
+        self.users = []
+        self.profiles = {}
+        self.fail_ids = set()
+        self.list_error = False
+
+    def add(self, n, created_at=OLD, confirmed=True, approved=None, role="member"):
+        self.users.append({"id": user_id(n), "email": f"user{n}@example.com", "created_at": created_at,
+                           "email_confirmed_at": created_at if confirmed else None})
+        if approved is not None:
+            self.profiles[user_id(n)] = {"id": user_id(n), "is_approved": approved, "role": role}
+
+    def __call__(self, method, path, headers, body):
+        if headers.get("apikey") != "service-key":
+            return 401, {"message": "invalid key"}
+        url = urlsplit(path)
+        params = dict(parse_qsl(url.query))
+        if method == "GET" and url.path == "/auth/v1/admin/users":
+            if self.list_error:
+                return 500, {"msg": "database error"}
+            page, size = int(params["page"]), int(params["per_page"])
+            return 200, {"users": self.users[(page - 1) * size:page * size], "aud": "authenticated"}
+        if method == "DELETE" and url.path.startswith("/auth/v1/admin/users/"):
+            target = url.path.rsplit("/", 1)[1]
+            if target in self.fail_ids:
+                return 500, {"msg": "delete failed"}
+            self.users = [u for u in self.users if u["id"] != target]
+            self.profiles.pop(target, None)
+            return 200, {}
+        if url.path == "/rest/v1/user_profiles":
+            ids = params["id"].removeprefix("in.(").removesuffix(")").split(",")
+            if method == "GET":
+                return 200, [self.profiles[i] for i in ids if i in self.profiles]
+            if method == "PATCH":
+                if self.fail_ids.intersection(ids):
+                    return 500, {"message": "update failed"}
+                for i in ids:
+                    if i in self.profiles:
+                        self.profiles[i].update(json.loads(body))
+                return 204, b""
+        return 404, {"message": f"unexpected {method} {path}"}
+
+
+@pytest.fixture
+def reconcile(script, http_stub, tmp_path, monkeypatch):
+    db = FakeSupabase()
+    db.add(1, confirmed=False)                        # unverified (72h)
+    db.add(2, created_at=RECENT, confirmed=False)     # 가입 직후: 대상 아님
+    db.add(3, approved=True)
+    db.add(4, approved=False)                         # unapproved
+    db.add(5, approved=False, role="admin")           # admin: 대상 아님
+    db.add(6)                                         # missing_profile
+    db.add(7, confirmed=False)                        # unverified
+    db.add(8, approved=False)                         # unapproved
+    server = http_stub(db)
+    module = script("reconcile-users")
+    monkeypatch.setattr(module, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setenv("SUPABASE_URL", server.url)
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service-key")
+
+    def run(*args):
+        monkeypatch.setattr(sys, "argv", ["reconcile-users.py", "--page-size", "3", *args])
+        try:
+            module.main()
+        except SystemExit as e:
+            return e.code
+        return 0
+
+    run.db, run.server = db, server
+    return run
+
+
+def mutations(server):
+    return [(method, path) for method, path, _ in server.requests if method not in ("GET", "HEAD")]
+
+
+def test_report_pages_and_joins_profiles(reconcile, tmp_path):
+    out = tmp_path / "candidates.jsonl"
+    assert reconcile("--output", str(out)) == 0
+
+    requests = [urlsplit(path) for method, path, _ in reconcile.server.requests]
+    pages = [dict(parse_qsl(r.query))["page"] for r in requests if r.path == "/auth/v1/admin/users"]
+    assert pages == ["1", "2", "3"]                   # 3 + 3 + 2: 마지막 페이지가 덜 차면 끝
+    lookups = [dict(parse_qsl(r.query))["id"] for r in requests if r.path == "/rest/v1/user_profiles"]
+    assert lookups == [f"in.({','.join(sorted(user_id(n) for n in page))})"
+                       for page in ((1, 2, 3), (4, 5, 6), (7, 8))]
+
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [(r["kind"], r["id"]) for r in rows] == [
+        ("unverified", user_id(1)), ("unapproved", user_id(4)), ("missing_profile", user_id(6)),
+        ("unverified", user_id(7)), ("unapproved", user_id(8)),
+    ]
+    assert mutations(reconcile.server) == []
+
+
+def test_dry_run_changes_nothing(reconcile, capsys):
+    assert reconcile("--delete-unverified", "--approve-unapproved", "--dry-run") == 0
+    assert mutations(reconcile.server) == []
+    out = capsys.readouterr().out
+    assert "2 unverified users would be deleted" in out
+    assert "2 users would be approved" in out
+
+
+def test_delete_and_approve(reconcile, capsys):
+    db = reconcile.db
+    assert reconcile("--delete-unverified", "--batch-size", "1", "--workers", "2") == 0
+    assert [u["id"] for u in db.users] == [user_id(n) for n in (2, 3, 4, 5, 6, 8)]
+    assert not db.profiles[user_id(4)]["is_approved"]  # --approve-unapproved 없이는 그대로
+    assert "Deleted: 2, failed: 0" in capsys.readouterr().out
+
+    assert reconcile("--approve-unapproved") == 0
+    assert mutations(reconcile.server)[-1] == (
+        "PATCH", f"/rest/v1/user_profiles?id=in.({user_id(4)},{user_id(8)})")   # 배치 하나에 PATCH 한 번
+    assert all(p["is_approved"] for n, p in db.profiles.items() if n != user_id(5))
+    assert "Approved: 2, failed: 0" in capsys.readouterr().out
+
+    assert reconcile("--delete-unverified", "--approve-unapproved") == 0
+    out = capsys.readouterr().out
+    assert "Unverified (>48h): 0" in out and "Unapproved: 0" in out
+
+
+def test_failures_are_counted(reconcile, capsys):
+    db = reconcile.db
+    db.fail_ids = {user_id(1), user_id(4)}
+    assert reconcile("--delete-unverified", "--approve-unapproved", "--batch-size", "1") == 1
+    out = capsys.readouterr().out
+    assert "Deleted: 1, failed: 1" in out
+    assert "Approved: 1, failed: 1" in out
+    assert "Failed: 2 users" in out
+    assert user_id(1) in [u["id"] for u in db.users] and user_id(7) not in [u["id"] for u in db.users]
+    assert not db.profiles[user_id(4)]["is_approved"] and db.profiles[user_id(8)]["is_approved"]
+
+    # 실패한 배치 크기만큼 센다 (PATCH 하나가 배치 전체)
+    assert reconcile("--approve-unapproved", "--batch-size", "5") == 1
+    assert "Approved: 0, failed: 1" in capsys.readouterr().out
+
+
+def test_scan_error_fails_the_run(reconcile):
+    reconcile.db.list_error = True
+    assert reconcile("--delete-unverified") == 1
+    assert mutations(reconcile.server) == []
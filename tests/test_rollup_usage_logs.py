@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""rollup-usage-logs.py 를 로컬 PostgREST 스텁에 대해 실행
+
+스텁은 usage_logs 조회 (keyset 필터), usage_rollup_state, apply_usage_rollup RPC
+(supabase/migrations/20261018000000_usage_daily_rollup.sql 과 같은 watermark 확인) 를 흉내냅니다.
+"""
+
+import json
+import re
+import sys
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+ROLLUP = "usage_daily_stats"
+USERS = [str(uuid.UUID(int=i + 1)) for i in range(3)]
+
+
+def ts(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class FakePostgrest:
+    def __init__(self):
+        self.logs = []
+        self.stats = Counter()               # (day, user_id, feature) -> count
+        self.state = {}                      # name -> {last_accessed_at, last_id, rows_processed}
+
+    def add_log(self, accessed_at, user_id=USERS[0], feature="auto-find-section"):
+        at = accessed_at.isoformat() if accessed_at else None
+        self.logs.append({"id": str(uuid.uuid4()), "user_id": user_id, "feature_name": feature, "accessed_at": at})
+
+    def select_logs(self, params):
+        rows = sorted((r for r in self.logs if r["accessed_at"]), key=lambda r: (ts(r["accessed_at"]), r["id"]))
+        limit = None
+        for key, value in params:
+            if key == "accessed_at" and value.startswith("lt."):
+                rows = [r for r in rows if ts(r["accessed_at"]) < ts(value[3:])]
+            elif key == "or":
+                m = re.fullmatch(r'\(accessed_at\.gt\."(.+)",and\(accessed_at\.eq\."(.+)",id\.gt\.(.+)\)\)', value)
+                after_at, after_id = ts(m.group(1)), m.group(3)
+                rows = [r for r in rows if (ts(r["accessed_at"]), r["id"]) > (after_at, after_id)]
+            elif key == "limit":
+                limit = int(value)
+        return rows[:limit]
+
+    def apply(self, body):
+        state = self.state.setdefault(body["rollup_name"],
+                                      {"last_accessed_at": None, "last_id": None, "rows_processed": 0})
+        expected_at = ts(body["expected_at"]) if body["expected_at"] else None
+        current_at = ts(state["last_accessed_at"]) if state["last_accessed_at"] else None
+        if (current_at, state["last_id"]) != (expected_at, body["expected_id"]):
+            return 400, {"code": "P0001", "message": "usage rollup watermark moved"}
+        for c in body["counts"]:
+            self.stats[(c["day"], c["user_id"], c["feature_name"])] += c["count"]
+        state.update(last_accessed_at=body["new_at"], last_id=body["new_id"])
+        state["rows_processed"] += body["batch_rows"]
+        return 200, None
+
+    def __call__(self, method, path, headers, body):
+        if headers.get("apikey") != "service-key":
+            return 401, {"message": "invalid key"}
+        url = urlsplit(path)
+        params = parse_qsl(url.query)
+        table = url.path.removeprefix("/rest/v1/")
+        if method == "GET" and table == "usage_logs":
+            return 200, self.select_logs(params)
+        if method == "GET" and table == "usage_rollup_state":
+            name = dict(params)["name"].removeprefix("eq.")
+            return 200, [self.state[name]] if name in self.state else []
+        if method == "POST" and table == "rpc/apply_usage_rollup":
+            status, payload = self.apply(json.loads(body))
+            return (204, b"") if status == 200 else (status, payload)
+        if method == "DELETE" and table == "usage_daily_stats":
+            self.stats.clear()
+            return 204, b""
+        if method == "DELETE" and table == "usage_rollup_state":
+            self.state.pop(dict(params)["name"].removeprefix("eq."), None)
+            return 204, b""
+        return 404, {"message": f"unexpected {method} {path}"}
+
+
+@pytest.fixture
+def rollup(script, http_stub, tmp_path, monkeypatch):
+    db = FakePostgrest()
+    server = http_stub(db)
+    module = script("rollup-usage-logs")
+    monkeypatch.setattr(module, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setenv("SUPABASE_URL", server.url)
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service-key")
+
+    def run(*args):
+        monkeypatch.setattr(sys, "argv", ["rollup-usage-logs.py", "--page-size", "3", *args])
+        try:
+            module.main()
+        except SystemExit as e:
+            return e.code
+        return 0
+
+    run.db, run.server = db, server
+    return run
+
+
+def expected_stats(db, until=None):
+    counts = Counter()
+    for r in db.logs:
+        if r["accessed_at"] and r["user_id"] and (until is None or ts(r["accessed_at"]) < until):
+            counts[(ts(r["accessed_at"]).astimezone(timezone.utc).date().isoformat(),
+                    r["user_id"], r["feature_name"])] += 1
+    return counts
+
+
+def add_day(db, day, n=4):
+    base = datetime(2026, 3, day, 23, 58, tzinfo=timezone.utc)
+    for i in range(n):
+        db.add_log(base + timedelta(minutes=i), user_id=USERS[i % 3],
+                   feature="boq-report" if i % 2 else "auto-find-section")
+
+
+def test_rolls_up_pages_and_resumes_from_watermark(rollup):
+    db = rollup.db
+    add_day(db, 1, 7)                        # 자정을 넘는 행: UTC 날짜로 나뉨
+    db.add_log(datetime(2026, 3, 1, 12, 0, tzinfo=timezone(timedelta(hours=9))))   # KST 도 UTC 날짜로
+    db.add_log(datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc), user_id=None)      # 비로그인: 제외
+    db.add_log(None)                                                                  # accessed_at 없음: 제외
+
+    assert rollup() == 0
+    assert db.stats == expected_stats(db)
+    assert db.state[ROLLUP]["rows_processed"] == 9
+
+    # 새 행만 읽음 (watermark 와 같은 시각의 행은 id 로 이어서)
+    state = db.state[ROLLUP]
+    db.add_log(ts(state["last_accessed_at"]), user_id=USERS[2])
+    db.logs[-1]["id"] = "ffffffff-ffff-4fff-bfff-ffffffffffff"
+    add_day(db, 5)
+    assert rollup() == 0
+    assert db.stats == expected_stats(db)
+    assert db.state[ROLLUP]["rows_processed"] == 14
+
+    assert rollup() == 0
+    assert db.stats == expected_stats(db)
+
+
+def test_recent_rows_wait_for_next_run(rollup):
+    db = rollup.db
+    add_day(db, 2)
+    db.add_log(datetime.now(timezone.utc))
+    assert rollup("--lag-minutes", "5") == 0
+    assert sum(db.stats.values()) == 4
+    assert rollup("--lag-minutes", "0") == 0
+    assert sum(db.stats.values()) == 5
+
+
+def test_moved_watermark_is_not_counted_twice(rollup):
+    db = rollup.db
+    add_day(db, 3, 5)
+    real_apply = db.apply
+
+    def concurrent_apply(body):
+        # 다른 실행이 먼저 같은 배치를 반영
+        db.apply = real_apply
+        real_apply(dict(body))
+        return real_apply(body)
+
+    db.apply = concurrent_apply
+    assert rollup() == 1
+    assert db.stats == expected_stats(db, until=ts(db.state[ROLLUP]["last_accessed_at"]) + timedelta(microseconds=1))
+
+    assert rollup() == 0
+    assert db.stats == expected_stats(db)
+
+
+def test_dry_run_and_reset(rollup):
+    db = rollup.db
+    add_day(db, 4, 6)
+    assert rollup("--dry-run") == 0
+    assert db.stats == Counter() and db.state == {}
+
+    assert rollup() == 0
+    totals = Counter(db.stats)
+    db.stats[next(iter(db.stats))] += 100                 # 집계가 틀어진 경우
+    assert rollup("--reset") == 0
+    assert db.stats == totals
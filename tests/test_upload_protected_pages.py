@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""upload-protected-pages.py 를 로컬 Storage API 스텁에 대해 실행"""
+
+import hashlib
+import json
+import re
+import sys
+
+import pytest
+
+PAGES = {"dev/a.html": "<html>a</html>\n", "dev/b.html": "<html>b</html>\n"}
+
+
+class FakeStorage:
+    """Supabase Storage REST API 중 업로더가 쓰는 부분 (bucket 조회/생성, 업로드, 목록)"""
+
+    def __init__(self):
+        self.buckets = set()
+        self.objects = {}
+
+    def __call__(self, method, path, headers, body):
+        if method == "GET" and (m := re.fullmatch(r"/storage/v1/bucket/([^/]+)", path)):
+            return (200, {"id": m.group(1)}) if m.group(1) in self.buckets else (404, {"error": "not found"})
+        if method == "POST" and path == "/storage/v1/bucket":
+            self.buckets.add(json.loads(body)["id"])
+            return 200, {"name": json.loads(body)["id"]}
+        if method == "POST" and (m := re.fullmatch(r"/storage/v1/object/list/([^/]+)", path)):
+            return 200, [
+                {"name": name, "metadata": {"eTag": f'"{hashlib.md5(data).hexdigest()}"', "size": len(data)}}
+                for name, data in sorted(self.objects.items())
+            ]
+        if method == "POST" and (m := re.fullmatch(r"/storage/v1/object/([^/]+)/(.+)", path)):
+            if headers.get("Authorization") != "Bearer service-key":
+                return 401, {"error": "unauthorized"}
+            self.objects[m.group(2)] = body
+            return 200, {"Key": f"{m.group(1)}/{m.group(2)}"}
+        return 404, {"error": f"unexpected {method} {path}"}
+
+
+@pytest.fixture
+def uploader(script, http_stub, tmp_path, monkeypatch):
+    storage = FakeStorage()
+    server = http_stub(storage)
+    module = script("upload-protected-pages")
+    for local_path, html in PAGES.items():
+        (tmp_path / local_path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / local_path).write_text(html, encoding="utf-8")
+    monkeypatch.setattr(module, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(module, "MANIFEST_PATH", tmp_path / ".protected-pages-manifest.json")
+    monkeypatch.setattr(module, "PROTECTED_FILES", [
+        {"local_path": p, "storage_path": p.split("/")[-1]} for p in PAGES
+    ])
+    monkeypatch.setenv("SUPABASE_URL", server.url)
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service-key")
+
+    def run(*args):
+        monkeypatch.setattr(sys, "argv", ["upload-protected-pages.py", "--no-build", *args])
+        with pytest.raises(SystemExit) as exit_info:
+            module.main()
+        return exit_info.value.code
+
+    run.module, run.storage, run.server, run.root = module, storage, server, tmp_path
+    return run
+
+
+def uploads(server):
+    return sorted(path.rsplit("/", 1)[-1] for method, path, _ in server.requests
+                  if method == "POST" and path.startswith("/storage/v1/object/protected-pages/"))
+
+
+def test_uploads_then_skips_unchanged(uploader):
+    assert uploader() == 0
+    assert uploader.storage.buckets == {"protected-pages"}
+    assert uploader.storage.objects == {"a.html": b"<html>a</html>\n", "b.html": b"<html>b</html>\n"}
+    assert uploads(uploader.server) == ["a.html", "b.html"]
+
+    uploader.server.requests.clear()
+    assert uploader() == 0
+    assert uploads(uploader.server) == []
+
+    (uploader.root / "dev" / "b.html").write_text("<html>b2</html>\n", encoding="utf-8")
+    assert uploader() == 0
+    assert uploads(uploader.server) == ["b.html"]
+    assert uploader.storage.objects["b.html"] == b"<html>b2</html>\n"
+
+
+def test_verify_remote_reuploads_changed_objects(uploader):
+    assert uploader() == 0
+    uploader.storage.objects["a.html"] = b"edited in the dashboard"
+    uploader.server.requests.clear()
+
+    assert uploader("--verify-remote") == 0
+    assert uploads(uploader.server) == ["a.html"]
+    assert uploader.storage.objects["a.html"] == b"<html>a</html>\n"
+
+
+def test_dry_run_uploads_nothing(uploader):
+    assert uploader("--dry-run") == 0
+    assert uploader.storage.objects == {}
+    assert uploads(uploader.server) == []
+
+
+def test_failed_upload_is_not_recorded(uploader):
+    storage = uploader.storage
+
+    def failing(method, path, headers, body):
+        if path.endswith("/b.html"):
+            return 500, {"error": "boom"}
+        return storage(method, path, headers, body)
+
+    uploader.server.handler = failing
+    assert uploader() == 1
+    manifest = json.loads((uploader.root / ".protected-pages-manifest.json").read_text())
+    assert sorted(manifest[f"{uploader.server.url}/protected-pages"]) == ["a.html"]
+
+    uploader.server.handler = storage
+    uploader.server.requests.clear()
+    assert uploader() == 0
+    assert uploads(uploader.server) == ["b.html"]